@@ -0,0 +1,82 @@
+"""store user recipe ingredients as overrides of the base recipe
+
+Revision ID: a41c7e92d5b0
+Revises: 3b19fd56fe81
+Create Date: 2026-10-19 10:12:03.418275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c7e92d5b0'
+down_revision: Union[str, Sequence[str], None] = '3b19fd56fe81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'user_recipe_ingredients',
+        sa.Column('is_removed', sa.Boolean(), server_default=sa.false(), nullable=False),
+        schema='recipes'
+    )
+    op.alter_column(
+        'user_recipe_ingredients',
+        'quantity',
+        existing_type=sa.DOUBLE_PRECISION(precision=53),
+        nullable=True,
+        schema='recipes'
+    )
+    op.create_check_constraint(
+        'ck_user_recipe_ingredient_quantity',
+        'user_recipe_ingredients',
+        'is_removed OR quantity IS NOT NULL',
+        schema='recipes'
+    )
+    # Full copies made before overrides existed: drop the lines that are
+    # identical to the base recipe, they are resolved from it on read.
+    op.execute(
+        """
+        DELETE FROM recipes.user_recipe_ingredients AS uri
+        USING recipes.user_recipes AS ur, recipes.recipe_ingredients AS ri
+        WHERE uri.user_recipe_id = ur.id
+          AND ri.recipe_id = ur.base_recipe_id
+          AND ri.ingredient_id = uri.ingredient_id
+          AND ri.quantity = uri.quantity
+          AND ri.unit_id IS NOT DISTINCT FROM uri.unit_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Materialize the effective ingredient list again before dropping tombstones.
+    op.execute(
+        """
+        INSERT INTO recipes.user_recipe_ingredients
+            (user_recipe_id, ingredient_id, quantity, unit_id)
+        SELECT ur.id, ri.ingredient_id, ri.quantity, ri.unit_id
+        FROM recipes.user_recipes AS ur
+        JOIN recipes.recipe_ingredients AS ri ON ri.recipe_id = ur.base_recipe_id
+        ON CONFLICT (user_recipe_id, ingredient_id) DO NOTHING
+        """
+    )
+    op.execute("DELETE FROM recipes.user_recipe_ingredients WHERE is_removed")
+    op.drop_constraint(
+        'ck_user_recipe_ingredient_quantity',
+        'user_recipe_ingredients',
+        schema='recipes',
+        type_='check'
+    )
+    op.alter_column(
+        'user_recipe_ingredients',
+        'quantity',
+        existing_type=sa.DOUBLE_PRECISION(precision=53),
+        nullable=False,
+        schema='recipes'
+    )
+    op.drop_column('user_recipe_ingredients', 'is_removed', schema='recipes')
@@ -0,0 +1,60 @@
+"""ingredient_substitutions graph
+
+Revision ID: a47c2e9b5d31
+Revises: d61a4c8e3b25
+Create Date: 2026-10-19 18:39:34.512806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a47c2e9b5d31'
+down_revision: Union[str, Sequence[str], None] = 'd61a4c8e3b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'ingredient_substitutions',
+        sa.Column('ingredient_id', sa.BigInteger(), nullable=False),
+        sa.Column('substitute_id', sa.BigInteger(), nullable=False),
+        sa.Column('weight', sa.Float(), nullable=False),
+        sa.CheckConstraint(
+            'weight > 0 AND weight <= 1',
+            name='ck_ingredient_substitution_weight'
+        ),
+        sa.CheckConstraint(
+            'ingredient_id <> substitute_id',
+            name='ck_ingredient_substitution_not_self'
+        ),
+        sa.ForeignKeyConstraint(
+            ['ingredient_id'], ['recipes.ingredients.id'], ondelete='CASCADE'
+        ),
+        sa.ForeignKeyConstraint(
+            ['substitute_id'], ['recipes.ingredients.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('ingredient_id', 'substitute_id'),
+        schema='recipes'
+    )
+    op.create_index(
+        'ix_ingredient_substitutions_substitute_id',
+        'ingredient_substitutions',
+        ['substitute_id'],
+        unique=False,
+        schema='recipes'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_ingredient_substitutions_substitute_id',
+        table_name='ingredient_substitutions',
+        schema='recipes'
+    )
+    op.drop_table('ingredient_substitutions', schema='recipes')
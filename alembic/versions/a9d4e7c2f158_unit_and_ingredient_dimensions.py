@@ -0,0 +1,110 @@
+"""dimensions (mass, volume, count) of units and ingredients
+
+Revision ID: a9d4e7c2f158
+Revises: d82c5f4e1a97
+Create Date: 2026-10-20 09:14:36.502817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4e7c2f158'
+down_revision: Union[str, Sequence[str], None] = 'd82c5f4e1a97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DIMENSIONS = "('mass', 'volume', 'count')"
+
+# Dimension and base units (g, ml or piece) per unit for the usual symbols;
+# any other unit (pinch, slice, clove) has neither and is left out of nutrition.
+UNIT_DIMENSIONS = {
+    'g': ('mass', 1), 'mg': ('mass', 0.001), 'kg': ('mass', 1000),
+    'oz': ('mass', 28.35), 'lb': ('mass', 453.6),
+    'ml': ('volume', 1), 'l': ('volume', 1000), 'dl': ('volume', 100),
+    'cl': ('volume', 10), 'tsp': ('volume', 5), 'tbsp': ('volume', 15),
+    'cup': ('volume', 240),
+    'pc': ('count', 1), 'pcs': ('count', 1), 'piece': ('count', 1),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'units',
+        sa.Column('dimension', sa.String(length=10), nullable=True),
+        schema='recipes'
+    )
+    op.alter_column(
+        'units',
+        'base_factor',
+        existing_type=sa.Float(),
+        nullable=True,
+        server_default=None,
+        schema='recipes'
+    )
+    units = sa.table(
+        'units',
+        sa.column('symbol'),
+        sa.column('dimension'),
+        sa.column('base_factor'),
+        schema='recipes'
+    )
+    op.execute(units.update().values(base_factor=None))
+    for symbol, (dimension, factor) in UNIT_DIMENSIONS.items():
+        op.execute(
+            units.update()
+            .where(units.c.symbol == symbol)
+            .values(dimension=dimension, base_factor=factor)
+        )
+    op.create_check_constraint(
+        'ck_unit_dimension',
+        'units',
+        f"dimension IN {DIMENSIONS}",
+        schema='recipes'
+    )
+    op.create_check_constraint(
+        'ck_unit_base_factor',
+        'units',
+        "(dimension IS NULL) = (base_factor IS NULL) AND base_factor > 0",
+        schema='recipes'
+    )
+
+    op.add_column(
+        'ingredients',
+        sa.Column(
+            'dimension',
+            sa.String(length=10),
+            server_default='mass',
+            nullable=False
+        ),
+        schema='recipes'
+    )
+    op.create_check_constraint(
+        'ck_ingredient_dimension',
+        'ingredients',
+        f"dimension IN {DIMENSIONS}",
+        schema='recipes'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        'ck_ingredient_dimension', 'ingredients', schema='recipes', type_='check'
+    )
+    op.drop_column('ingredients', 'dimension', schema='recipes')
+    op.drop_constraint('ck_unit_base_factor', 'units', schema='recipes', type_='check')
+    op.drop_constraint('ck_unit_dimension', 'units', schema='recipes', type_='check')
+    op.execute("UPDATE recipes.units SET base_factor = 1 WHERE base_factor IS NULL")
+    op.alter_column(
+        'units',
+        'base_factor',
+        existing_type=sa.Float(),
+        nullable=False,
+        server_default=sa.text('1'),
+        schema='recipes'
+    )
+    op.drop_column('units', 'dimension', schema='recipes')
@@ -0,0 +1,81 @@
+"""group permissions bitmask and change logging of group membership
+
+Groups and memberships are written by the user service, so triggers log
+their changes to the change feed; recipe service workers drop the cached
+permissions of the affected users (recipe_service.core.permissions).
+
+Revision ID: b4e7a2d91c35
+Revises: f3d92a6c4b18
+Create Date: 2026-10-19 21:04:17.381256
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e7a2d91c35'
+down_revision: Union[str, Sequence[str], None] = 'f3d92a6c4b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'groups',
+        sa.Column('permissions', sa.BigInteger(), server_default=sa.text('0'),
+                  nullable=False),
+        schema='users'
+    )
+
+    # groups has an id: the generic recipes.log_change() fits
+    op.execute(
+        """
+        CREATE TRIGGER log_change
+        AFTER INSERT OR UPDATE OR DELETE ON users.groups
+        FOR EACH ROW EXECUTE FUNCTION recipes.log_change()
+        """
+    )
+    # user_groups has none: log the user, whose permissions changed.
+    # Same lock and payload as recipes.log_change()
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION users.log_membership_change() RETURNS trigger AS $$
+        DECLARE
+            changed recipes.change_log;
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtext('recipes.change_log'));
+            INSERT INTO recipes.change_log (table_name, row_id, op)
+            VALUES (
+                TG_TABLE_NAME,
+                CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END,
+                left(TG_OP, 1)
+            )
+            RETURNING * INTO changed;
+            PERFORM pg_notify(
+                'recipe_changes',
+                concat_ws('|', changed.id, changed.table_name, changed.row_id,
+                          changed.op, extract(epoch FROM changed.changed_at))
+            );
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER log_change
+        AFTER INSERT OR UPDATE OR DELETE ON users.user_groups
+        FOR EACH ROW EXECUTE FUNCTION users.log_membership_change()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS log_change ON users.user_groups")
+    op.execute("DROP FUNCTION IF EXISTS users.log_membership_change()")
+    op.execute("DROP TRIGGER IF EXISTS log_change ON users.groups")
+    op.drop_column('groups', 'permissions', schema='users')
@@ -0,0 +1,50 @@
+"""pantry_items for "cookable now" matching
+
+Revision ID: b83e5f2a9c17
+Revises: f7a3c1d95e42
+Create Date: 2026-10-19 15:42:08.311927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83e5f2a9c17'
+down_revision: Union[str, Sequence[str], None] = 'f7a3c1d95e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'pantry_items',
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('ingredient_id', sa.BigInteger(), nullable=False),
+        sa.Column(
+            'added_at',
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ['ingredient_id'], ['recipes.ingredients.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('user_id', 'ingredient_id'),
+        schema='recipes'
+    )
+    op.create_index(
+        'ix_pantry_items_ingredient_id',
+        'pantry_items',
+        ['ingredient_id'],
+        unique=False,
+        schema='recipes'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_pantry_items_ingredient_id', table_name='pantry_items', schema='recipes')
+    op.drop_table('pantry_items', schema='recipes')
@@ -0,0 +1,81 @@
+"""indexes for the hot query patterns
+
+Indexes are built with CREATE INDEX CONCURRENTLY outside of the migration
+transaction, so tables stay writable while they are created.
+
+Revision ID: c5e08d3f1a27
+Revises: a41c7e92d5b0
+Create Date: 2026-10-19 11:02:47.120934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e08d3f1a27'
+down_revision: Union[str, Sequence[str], None] = 'a41c7e92d5b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns, extra kwargs)
+INDEXES = [
+    # search_recipes: recipe_ingredients filtered by ingredient_id, index-only join
+    ('ix_recipe_ingredients_ingredient_id', 'recipe_ingredients',
+     ['ingredient_id', 'recipe_id'], {}),
+    # get_ingredients_by_category_id / Category.ingredients
+    ('ix_ingredient_categories_category_id', 'ingredient_categories',
+     ['category_id', 'ingredient_id'], {}),
+    # recipes by author; most catalogue recipes have no author
+    ('ix_recipes_author_id', 'recipes',
+     ['author_id'], {'postgresql_where': sa.text('author_id IS NOT NULL')}),
+    # get_user_recipes(user_id) ordered by id
+    ('ix_user_recipes_user_id', 'user_recipes', ['user_id', 'id'], {}),
+    # FK checks when a base recipe is deleted
+    ('ix_user_recipes_base_recipe_id', 'user_recipes', ['base_recipe_id'], {}),
+    # FK checks when an ingredient is deleted
+    ('ix_user_recipe_ingredients_ingredient_id', 'user_recipe_ingredients',
+     ['ingredient_id'], {}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                schema='recipes',
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **kwargs
+            )
+        # Name lookups in create/update; the model declares the column unique
+        # but databases built from migrations never got the constraint.
+        op.create_index(
+            'ingredients_name_key',
+            'ingredients',
+            ['name'],
+            unique=True,
+            schema='recipes',
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                schema='recipes',
+                postgresql_concurrently=True,
+                if_exists=True
+            )
+        # ingredients_name_key stays: it enforces the unique name the models
+        # declare, and databases built with create_all() had it before this
+        # revision (as a constraint, which DROP INDEX could not remove).
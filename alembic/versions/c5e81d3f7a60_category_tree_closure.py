@@ -0,0 +1,80 @@
+"""category tree: parent_id and category_closure
+
+Revision ID: c5e81d3f7a60
+Revises: a47c2e9b5d31
+Create Date: 2026-10-19 18:43:18.966628
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e81d3f7a60'
+down_revision: Union[str, Sequence[str], None] = 'a47c2e9b5d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing categories become roots: no parent and no closure rows
+    op.add_column(
+        'categories',
+        sa.Column('parent_id', sa.BigInteger(), nullable=True),
+        schema='recipes'
+    )
+    op.create_foreign_key(
+        'categories_parent_id_fkey',
+        'categories', 'categories',
+        ['parent_id'], ['id'],
+        source_schema='recipes',
+        referent_schema='recipes',
+        deferrable=True,
+        initially='DEFERRED'
+    )
+    op.create_index(
+        'ix_categories_parent_id',
+        'categories',
+        ['parent_id'],
+        unique=False,
+        schema='recipes'
+    )
+    op.create_table(
+        'category_closure',
+        sa.Column('ancestor_id', sa.BigInteger(), nullable=False),
+        sa.Column('descendant_id', sa.BigInteger(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.CheckConstraint('depth > 0', name='ck_category_closure_depth'),
+        sa.ForeignKeyConstraint(
+            ['ancestor_id'], ['recipes.categories.id'], ondelete='CASCADE'
+        ),
+        sa.ForeignKeyConstraint(
+            ['descendant_id'], ['recipes.categories.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id'),
+        schema='recipes'
+    )
+    op.create_index(
+        'ix_category_closure_descendant_id',
+        'category_closure',
+        ['descendant_id', 'ancestor_id'],
+        unique=False,
+        schema='recipes'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_category_closure_descendant_id',
+        table_name='category_closure',
+        schema='recipes'
+    )
+    op.drop_table('category_closure', schema='recipes')
+    op.drop_index('ix_categories_parent_id', table_name='categories', schema='recipes')
+    op.drop_constraint(
+        'categories_parent_id_fkey', 'categories', schema='recipes', type_='foreignkey'
+    )
+    op.drop_column('categories', 'parent_id', schema='recipes')
@@ -0,0 +1,55 @@
+"""defer the change log triggers to commit
+
+Revision ID: c8f1b6d3e274
+Revises: a9d4e7c2f158
+Create Date: 2026-10-20 11:02:51.337604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f1b6d3e274'
+down_revision: Union[str, Sequence[str], None] = 'a9d4e7c2f158'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> trigger function; every one takes the global change log lock
+LOGGED_TABLES = {
+    'translations.recipe_translations': 'recipes.log_change()',
+    'translations.ingredient_translations': 'recipes.log_change()',
+    'users.groups': 'recipes.log_change()',
+    'users.user_groups': 'users.log_membership_change()',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # As row triggers the change log lock was held from the first logged
+    # row to COMMIT, serializing every other catalogue write behind the
+    # rest of the transaction. Deferred, they run at COMMIT like the
+    # application's outbox insert and hold it only for the commit itself.
+    for table, function in LOGGED_TABLES.items():
+        op.execute(f"DROP TRIGGER log_change ON {table}")
+        op.execute(
+            f"""
+            CREATE CONSTRAINT TRIGGER log_change
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            DEFERRABLE INITIALLY DEFERRED
+            FOR EACH ROW EXECUTE FUNCTION {function}
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, function in LOGGED_TABLES.items():
+        op.execute(f"DROP TRIGGER log_change ON {table}")
+        op.execute(
+            f"""
+            CREATE TRIGGER log_change
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {function}
+            """
+        )
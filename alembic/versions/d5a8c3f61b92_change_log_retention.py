@@ -0,0 +1,50 @@
+"""change log retention: horizon of purged deletes
+
+Revision ID: d5a8c3f61b92
+Revises: c8f1b6d3e274
+Create Date: 2026-10-20 11:40:17.826093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8c3f61b92'
+down_revision: Union[str, Sequence[str], None] = 'c8f1b6d3e274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_change_log_table_name_row_id',
+        'change_log',
+        ['table_name', 'row_id', 'id'],
+        unique=False,
+        schema='recipes'
+    )
+    op.create_table(
+        'change_log_horizon',
+        sa.Column('id', sa.Boolean(), server_default=sa.true(), nullable=False),
+        sa.Column(
+            'purged_through', sa.BigInteger(), server_default=sa.text('0'),
+            nullable=False
+        ),
+        sa.CheckConstraint('id', name='ck_change_log_horizon_single_row'),
+        sa.PrimaryKeyConstraint('id'),
+        schema='recipes'
+    )
+    op.execute("INSERT INTO recipes.change_log_horizon DEFAULT VALUES")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('change_log_horizon', schema='recipes')
+    op.drop_index(
+        'ix_change_log_table_name_row_id',
+        table_name='change_log',
+        schema='recipes'
+    )
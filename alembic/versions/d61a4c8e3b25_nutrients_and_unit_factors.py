@@ -0,0 +1,79 @@
+"""nutrients per ingredient and base unit factors
+
+Revision ID: d61a4c8e3b25
+Revises: b83e5f2a9c17
+Create Date: 2026-10-19 16:27:45.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd61a4c8e3b25'
+down_revision: Union[str, Sequence[str], None] = 'b83e5f2a9c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Base units (g, ml or piece) per unit for the usual symbols
+BASE_FACTORS = {
+    'mg': 0.001, 'kg': 1000, 'oz': 28.35, 'lb': 453.6,
+    'l': 1000, 'dl': 100, 'cl': 10, 'tsp': 5, 'tbsp': 15, 'cup': 240,
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'nutrients',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('unit', sa.String(length=10), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+        schema='recipes'
+    )
+    op.create_table(
+        'ingredient_nutrients',
+        sa.Column('ingredient_id', sa.BigInteger(), nullable=False),
+        sa.Column('nutrient_id', sa.BigInteger(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['ingredient_id'], ['recipes.ingredients.id'], ondelete='CASCADE'
+        ),
+        sa.ForeignKeyConstraint(
+            ['nutrient_id'], ['recipes.nutrients.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('ingredient_id', 'nutrient_id'),
+        schema='recipes'
+    )
+    op.create_index(
+        'ix_ingredient_nutrients_nutrient_id',
+        'ingredient_nutrients',
+        ['nutrient_id'],
+        unique=False,
+        schema='recipes'
+    )
+    op.add_column(
+        'units',
+        sa.Column('base_factor', sa.Float(), server_default=sa.text('1'), nullable=False),
+        schema='recipes'
+    )
+    units = sa.table('units', sa.column('symbol'), sa.column('base_factor'), schema='recipes')
+    for symbol, factor in BASE_FACTORS.items():
+        op.execute(
+            units.update().where(units.c.symbol == symbol).values(base_factor=factor)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('units', 'base_factor', schema='recipes')
+    op.drop_index(
+        'ix_ingredient_nutrients_nutrient_id',
+        table_name='ingredient_nutrients',
+        schema='recipes'
+    )
+    op.drop_table('ingredient_nutrients', schema='recipes')
+    op.drop_table('nutrients', schema='recipes')
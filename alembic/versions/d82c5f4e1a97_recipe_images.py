@@ -0,0 +1,79 @@
+"""images: content-addressed recipe image uploads
+
+Revision ID: d82c5f4e1a97
+Revises: b4e7a2d91c35
+Create Date: 2026-10-19 22:31:08.614920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd82c5f4e1a97'
+down_revision: Union[str, Sequence[str], None] = 'b4e7a2d91c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'images',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('format', sa.String(length=10), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=False),
+        sa.Column('height', sa.Integer(), nullable=False),
+        sa.Column('byte_size', sa.Integer(), nullable=False),
+        sa.Column(
+            'thumbnails_ready',
+            sa.Boolean(),
+            server_default=sa.text('false'),
+            nullable=False
+        ),
+        sa.Column(
+            'created_at',
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False
+        ),
+        sa.PrimaryKeyConstraint('hash'),
+        schema='recipes'
+    )
+    op.create_index(
+        'ix_images_pending_thumbnails',
+        'images',
+        ['created_at'],
+        unique=False,
+        schema='recipes',
+        postgresql_where=sa.text('NOT thumbnails_ready')
+    )
+    op.add_column(
+        'recipes',
+        sa.Column('image_hash', sa.String(length=64), nullable=True),
+        schema='recipes'
+    )
+    op.create_foreign_key(
+        'recipes_image_hash_fkey',
+        'recipes', 'images',
+        ['image_hash'], ['hash'],
+        source_schema='recipes',
+        referent_schema='recipes',
+        ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        'recipes_image_hash_fkey', 'recipes', schema='recipes', type_='foreignkey'
+    )
+    op.drop_column('recipes', 'image_hash', schema='recipes')
+    op.drop_index(
+        'ix_images_pending_thumbnails',
+        table_name='images',
+        schema='recipes',
+        postgresql_where=sa.text('NOT thumbnails_ready')
+    )
+    op.drop_table('images', schema='recipes')
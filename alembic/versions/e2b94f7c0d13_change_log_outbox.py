@@ -0,0 +1,41 @@
+"""change_log outbox for the cache invalidation feed
+
+Revision ID: e2b94f7c0d13
+Revises: c5e08d3f1a27
+Create Date: 2026-10-19 12:20:31.584102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b94f7c0d13'
+down_revision: Union[str, Sequence[str], None] = 'c5e08d3f1a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'change_log',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('table_name', sa.String(length=50), nullable=False),
+        sa.Column('row_id', sa.BigInteger(), nullable=False),
+        sa.Column('op', sa.String(length=1), nullable=False),
+        sa.Column(
+            'changed_at',
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text('clock_timestamp()'),
+            nullable=False
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        schema='recipes'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('change_log', schema='recipes')
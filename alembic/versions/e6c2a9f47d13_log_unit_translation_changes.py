@@ -0,0 +1,44 @@
+"""log unit translation changes
+
+Revision ID: e6c2a9f47d13
+Revises: d5a8c3f61b92
+Create Date: 2026-10-20 12:18:44.061735
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c2a9f47d13'
+down_revision: Union[str, Sequence[str], None] = 'd5a8c3f61b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Deferred like the other change log triggers (see c8f1b6d3e274)
+    op.execute(
+        """
+        CREATE CONSTRAINT TRIGGER log_change
+        AFTER INSERT OR UPDATE OR DELETE ON translations.unit_translations
+        DEFERRABLE INITIALLY DEFERRED
+        FOR EACH ROW EXECUTE FUNCTION recipes.log_change()
+        """
+    )
+    # Existing rows, so a full sync from cursor 0 returns them
+    op.execute(
+        """
+        INSERT INTO recipes.change_log (table_name, row_id, op)
+        SELECT 'unit_translations', id, 'I'
+        FROM translations.unit_translations
+        ORDER BY id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS log_change ON translations.unit_translations")
+    op.execute("DELETE FROM recipes.change_log WHERE table_name = 'unit_translations'")
@@ -0,0 +1,74 @@
+"""composite indexes for recipe search filters and sort orders
+
+Indexes are built with CREATE INDEX CONCURRENTLY outside of the migration
+transaction, so recipes stay writable while they are created.
+
+Revision ID: e9b3f6a21c48
+Revises: c5e81d3f7a60
+Create Date: 2026-10-19 18:52:06.471225
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b3f6a21c48'
+down_revision: Union[str, Sequence[str], None] = 'c5e81d3f7a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, columns, extra kwargs); every sort key ends with id for keysets
+INDEXES = [
+    # author filter sorted by recency; its prefix replaces ix_recipes_author_id
+    ('ix_recipes_author_id_created_at', ['author_id', 'created_at', 'id'],
+     {'postgresql_where': sa.text('author_id IS NOT NULL')}),
+    ('ix_recipes_created_at', ['created_at', 'id'], {}),
+    ('ix_recipes_updated_at', ['updated_at', 'id'], {}),
+    # unknown cooking times sort last, see recipes_models.COOKING_TIME_SORT_KEY
+    ('ix_recipes_cooking_time',
+     [sa.text('coalesce(cooking_time_in_minutes, 2147483647)'), 'id'], {}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, columns, kwargs in INDEXES:
+            op.create_index(
+                name,
+                'recipes',
+                columns,
+                schema='recipes',
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **kwargs
+            )
+        op.drop_index(
+            'ix_recipes_author_id',
+            schema='recipes',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_recipes_author_id',
+            'recipes',
+            ['author_id'],
+            schema='recipes',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+            postgresql_where=sa.text('author_id IS NOT NULL')
+        )
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                schema='recipes',
+                postgresql_concurrently=True,
+                if_exists=True
+            )
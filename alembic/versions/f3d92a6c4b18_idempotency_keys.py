@@ -0,0 +1,55 @@
+"""idempotency_keys for retried POST/PUT requests
+
+Revision ID: f3d92a6c4b18
+Revises: e9b3f6a21c48
+Create Date: 2026-10-19 19:12:40.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3d92a6c4b18'
+down_revision: Union[str, Sequence[str], None] = 'e9b3f6a21c48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('fingerprint', sa.LargeBinary(length=32), nullable=False),
+        sa.Column('status_code', sa.SmallInteger(), nullable=True),
+        sa.Column('content_type', sa.String(length=100), nullable=True),
+        sa.Column('body', sa.LargeBinary(), nullable=True),
+        sa.Column(
+            'created_at',
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False
+        ),
+        sa.Column('expires_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+        schema='recipes'
+    )
+    op.create_index(
+        'ix_idempotency_keys_expires_at',
+        'idempotency_keys',
+        ['expires_at'],
+        unique=False,
+        schema='recipes'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_idempotency_keys_expires_at',
+        table_name='idempotency_keys',
+        schema='recipes'
+    )
+    op.drop_table('idempotency_keys', schema='recipes')
@@ -0,0 +1,85 @@
+"""log translation changes and backfill change_log for delta sync
+
+Translations are written outside the recipe service, so a trigger logs
+their changes. Existing rows are logged as inserts so that a sync from
+cursor 0 returns the whole catalogue.
+
+Revision ID: f7a3c1d95e42
+Revises: e2b94f7c0d13
+Create Date: 2026-10-19 13:05:12.772410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a3c1d95e42'
+down_revision: Union[str, Sequence[str], None] = 'e2b94f7c0d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRANSLATION_TABLES = ['recipe_translations', 'ingredient_translations']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Same lock and payload as recipe_service.core.change_feed
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION recipes.log_change() RETURNS trigger AS $$
+        DECLARE
+            changed recipes.change_log;
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtext('recipes.change_log'));
+            INSERT INTO recipes.change_log (table_name, row_id, op)
+            VALUES (
+                TG_TABLE_NAME,
+                CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END,
+                left(TG_OP, 1)
+            )
+            RETURNING * INTO changed;
+            PERFORM pg_notify(
+                'recipe_changes',
+                concat_ws('|', changed.id, changed.table_name, changed.row_id,
+                          changed.op, extract(epoch FROM changed.changed_at))
+            );
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TRANSLATION_TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER log_change
+            AFTER INSERT OR UPDATE OR DELETE ON translations.{table}
+            FOR EACH ROW EXECUTE FUNCTION recipes.log_change()
+            """
+        )
+
+    op.execute(
+        """
+        INSERT INTO recipes.change_log (table_name, row_id, op)
+        SELECT table_name, row_id, 'I'
+        FROM (
+            SELECT 1 AS ord, 'categories' AS table_name, id AS row_id FROM recipes.categories
+            UNION ALL
+            SELECT 2, 'ingredients', id FROM recipes.ingredients
+            UNION ALL
+            SELECT 3, 'recipes', id FROM recipes.recipes
+            UNION ALL
+            SELECT 4, 'recipe_translations', id FROM translations.recipe_translations
+            UNION ALL
+            SELECT 5, 'ingredient_translations', id FROM translations.ingredient_translations
+        ) AS existing
+        ORDER BY ord, row_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TRANSLATION_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS log_change ON translations.{table}")
+    op.execute("DROP FUNCTION IF EXISTS recipes.log_change()")
@@ -0,0 +1,123 @@
+"""Latency of GET /recipes/{id} during login bursts, hashing on and off the loop.
+
+Readers request a recipe back to back while bursts of logins hit
+POST /auth/login in the same worker. "idle" has no logins, "on-loop"
+verifies the password with ``PasswordHasher.verify_sync`` on the event
+loop (what a plain bcrypt/scrypt call in a route does), "off-loop" awaits
+``PasswordHasher.verify`` on its bounded thread pool. Services are
+replaced by in-memory stubs, so only the HTTP stack and hashing count.
+
+Usage:
+    python -m benchmarks.auth_load_benchmark [--seconds 5] [--readers 20] [--burst 16]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timezone
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from common.tokens import TokenSigner
+from recipe_service.core.dependencies import get_recipe_service
+from recipe_service.routers.recipes import recipe_router
+from user_service.core.dependencies import get_auth_service
+from user_service.core.security import PasswordHasher
+from user_service.routes import auth
+
+NOW = datetime.now(timezone.utc)
+RECIPE = {
+    "id": 1,
+    "author_id": 1,
+    "cooking_time_in_minutes": 30,
+    "image_url": None,
+    "ingredients": [{"ingredient_id": 1, "quantity": 100, "unit_id": 1}],
+    "created_at": NOW,
+    "updated_at": NOW,
+}
+
+
+class InMemoryRecipeService:
+    async def get_recipe_by_id(self, recipe_id: int):
+        return RECIPE
+
+
+class InMemoryAuthService:
+    def __init__(self, hasher: PasswordHasher, encoded: str, on_loop: bool):
+        self.hasher = hasher
+        self.encoded = encoded
+        self.on_loop = on_loop
+        self.signer = TokenSigner({"bench": b"secret"})
+
+    async def login(self, username: str, password: str):
+        if self.on_loop:
+            self.hasher.verify_sync(password, self.encoded)
+        else:
+            await self.hasher.verify(password, self.encoded)
+        return self.signer.sign(1)
+
+
+def build_app(variant: str, hasher: PasswordHasher, encoded: str) -> FastAPI:
+    app = FastAPI()
+    app.include_router(recipe_router.router)
+    app.include_router(auth.router)
+    app.dependency_overrides[get_recipe_service] = InMemoryRecipeService
+    service = InMemoryAuthService(hasher, encoded, on_loop=variant == "on-loop")
+    app.dependency_overrides[get_auth_service] = lambda: service
+    return app
+
+
+def percentile(values: list[float], q: float) -> float:
+    return sorted(values)[min(int(len(values) * q), len(values) - 1)]
+
+
+async def run(variant: str, app: FastAPI, args) -> tuple[list[float], int]:
+    latencies, logins = [], 0
+    deadline = time.perf_counter() + args.seconds
+    async with AsyncClient(transport=ASGITransport(app=app),
+                           base_url="http://bench") as client:
+        async def reader():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get("/recipes/1")
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200
+
+        async def login_bursts():
+            nonlocal logins
+            while variant != "idle" and time.perf_counter() < deadline:
+                responses = await asyncio.gather(*(
+                    client.post("/auth/login", json={"username": "u", "password": "pw"})
+                    for _ in range(args.burst)
+                ))
+                logins += len(responses)
+                await asyncio.sleep(args.pause)
+
+        await asyncio.gather(login_bursts(), *(reader() for _ in range(args.readers)))
+    return latencies, logins
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=20)
+    parser.add_argument("--burst", type=int, default=16, help="Logins per burst")
+    parser.add_argument("--pause", type=float, default=0.2,
+                        help="Seconds between login bursts")
+    parser.add_argument("--workers", type=int, default=2, help="Hashing threads")
+    parser.add_argument("--n", type=int, default=2 ** 14, help="scrypt cost")
+    args = parser.parse_args()
+
+    hasher = PasswordHasher(args.workers, args.n)
+    encoded = hasher.hash_sync("pw")
+    for variant in ("idle", "on-loop", "off-loop"):
+        app = build_app(variant, hasher, encoded)
+        latencies, logins = await run(variant, app, args)
+        print(f"{variant:<9} recipe p50 {statistics.median(latencies):7.2f} ms  "
+              f"p99 {percentile(latencies, 0.99):7.2f} ms  "
+              f"logins {logins / args.seconds:6.1f}/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""Bytes versus CPU trade-off of the response compression encoders.
+
+Builds a recipe list payload shaped like ``GET /recipes`` and compresses it
+with every available encoder and level, both as one body and as a stream of
+NDJSON chunks (flushed per chunk, as the middleware does).
+
+Usage:
+    python -m benchmarks.compression_benchmark [--recipes 5000] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import time
+
+from recipe_service.core.compression import (
+    BrotliEncoder,
+    GzipEncoder,
+    ZstdEncoder,
+    available_encodings
+)
+
+LEVELS = {
+    GzipEncoder: (1, 6, 9),
+    BrotliEncoder: (1, 4, 6, 11),
+    ZstdEncoder: (1, 3, 9, 19),
+}
+
+
+def build_payload(recipes: int, seed: int = 42) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "author_id": rng.randint(1, 500),
+            "cooking_time_in_minutes": rng.choice((10, 15, 30, 45, 60, 90)),
+            "image_url": f"https://example.com/images/{i}.jpg",
+            "ingredients": [
+                {"ingredient_id": rng.randint(1, 2000),
+                 "quantity": rng.choice((1, 5, 50, 100, 250)),
+                 "unit_id": rng.randint(1, 12)}
+                for _ in range(rng.randint(3, 15))
+            ],
+            "created_at": "2025-10-21T12:43:36.937602+00:00",
+            "updated_at": "2025-10-21T12:43:36.937602+00:00",
+        }
+        for i in range(recipes)
+    ]
+
+
+def measure(encoder_cls, level: int, chunks: list[bytes], repeat: int):
+    best_cpu, size = float("inf"), 0
+    for _ in range(repeat):
+        start = time.process_time()
+        encoder = encoder_cls(level)
+        out = 0
+        for chunk in chunks[:-1]:
+            out += len(encoder.compress(chunk)) + len(encoder.flush())
+        out += len(encoder.compress(chunks[-1])) + len(encoder.finish())
+        best_cpu = min(best_cpu, time.process_time() - start)
+        size = out
+    return size, best_cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = build_payload(args.recipes)
+    whole = [json.dumps(payload).encode()]
+    ndjson = [(json.dumps(item) + "\n").encode() for item in payload]
+    raw_size = len(whole[0])
+    encodings = available_encodings()
+
+    print(f"payload: {args.recipes} recipes, {raw_size / 1024:.0f} KiB raw")
+    print(f"{'encoding':<8} {'level':>5} {'mode':<7} {'bytes':>10} "
+          f"{'ratio':>6} {'cpu ms':>8} {'MiB/s':>8}")
+    for encoder_cls, levels in LEVELS.items():
+        if encoder_cls.name not in encodings:
+            print(f"{encoder_cls.name:<8} skipped (codec not installed)")
+            continue
+        for level in levels:
+            for mode, chunks in (("body", whole), ("ndjson", ndjson)):
+                size, cpu = measure(encoder_cls, level, chunks, args.repeat)
+                throughput = raw_size / 2**20 / cpu if cpu else float("inf")
+                print(f"{encoder_cls.name:<8} {level:>5} {mode:<7} {size:>10} "
+                      f"{raw_size / size:>6.1f} {cpu * 1000:>8.1f} {throughput:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Throughput of GET /recipes/{id} with the old and the new error middleware.
+
+"before" wraps the app in the former ``@app.middleware("http")``
+db_error_middleware (Starlette BaseHTTPMiddleware), "after" uses the
+exception handler plus the pure ASGI ErrorTimingMiddleware. The recipe
+service is replaced by an in-memory stub so only the HTTP stack is measured.
+
+Usage:
+    python -m benchmarks.middleware_benchmark [--requests 5000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.exc import SQLAlchemyError
+
+from recipe_service.core.dependencies import get_recipe_service
+from recipe_service.core.middleware import (
+    ErrorTimingMiddleware,
+    sqlalchemy_error_handler
+)
+from recipe_service.routers.recipes import recipe_router
+
+NOW = datetime.now(timezone.utc)
+RECIPE = {
+    "id": 1,
+    "author_id": 1,
+    "cooking_time_in_minutes": 30,
+    "image_url": "https://example.com/image1.jpg",
+    "ingredients": [
+        {"ingredient_id": i, "quantity": 100, "unit_id": 1} for i in range(1, 9)
+    ],
+    "created_at": NOW,
+    "updated_at": NOW,
+}
+
+
+class InMemoryRecipeService:
+    async def get_recipe_by_id(self, recipe_id: int):
+        return RECIPE
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+    app.include_router(recipe_router.router)
+    app.dependency_overrides[get_recipe_service] = InMemoryRecipeService
+
+    if variant == "before":
+        @app.middleware("http")
+        async def db_error_middleware(request: Request, call_next):
+            try:
+                return await call_next(request)
+            except HTTPException:
+                raise
+            except SQLAlchemyError:
+                return JSONResponse(status_code=500,
+                                    content={"detail": "Internal database error"})
+            except Exception:
+                return JSONResponse(status_code=500,
+                                    content={"detail": "Internal server error"})
+    else:
+        app.add_exception_handler(SQLAlchemyError, sqlalchemy_error_handler)
+        app.add_middleware(ErrorTimingMiddleware)
+    return app
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> float:
+    async with AsyncClient(transport=ASGITransport(app=app),
+                           base_url="http://bench") as client:
+        async def worker(count: int):
+            for _ in range(count):
+                response = await client.get("/recipes/1")
+                assert response.status_code == 200
+
+        await worker(50)  # warm-up
+        per_worker = requests // concurrency
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        return per_worker * concurrency / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    for variant in ("before", "after"):
+        app = build_app(variant)
+        results[variant] = max([
+            await run(app, args.requests, args.concurrency) for _ in range(args.rounds)
+        ])
+        print(f"{variant:<7} {results[variant]:>9.0f} req/s")
+    print(f"speed-up {results['after'] / results['before']:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""Plans and latency of every GET /recipes/search filter combination and sort.
+
+Runs against the catalogue loaded by ``tools.generate_dataset``. For each
+filter combination x sort order the first page and a deep page (reached by
+following ``--depth`` cursors) are fetched through ``RecipeService``; every
+SELECT it sends is then run again under ``EXPLAIN (ANALYZE, FORMAT JSON)``.
+A row reports the top plan node, whether any relation was read with a Seq
+Scan, and the execution time of the first and the deep page. With keyset
+pagination the deep page should cost about the same as the first.
+
+Usage:
+    python -m benchmarks.search_filter_benchmark [--depth 50] [--limit 100]
+"""
+import argparse
+import asyncio
+import json
+from itertools import product
+
+from sqlalchemy import event
+
+from database import async_engine, async_session
+from recipe_service.pydantic_schemas.recipes_schemas import RecipeSearchQuerySchema
+from recipe_service.services.recipe_service import RecipeService
+
+FILTERS = {
+    "none": {},
+    "ingredients any": {"ingredient_ids": [1, 2, 3]},
+    "ingredients all": {"ingredient_ids": [1, 2], "match_all": True},
+    "author": {"author_id": 7},
+    "author + time": {"author_id": 7, "max_cooking_time": 30},
+    "time range": {"min_cooking_time": 15, "max_cooking_time": 45},
+    "created + image": {"created_after": "2000-01-01T00:00:00Z", "has_image": True},
+    "ingredients + time": {"ingredient_ids": [1, 2, 3], "max_cooking_time": 30},
+}
+SORTS = ["id", "cooking_time", "-cooking_time", "created_at", "-updated_at"]
+
+
+def walk(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+async def explain(session, statements) -> tuple[str, bool, float]:
+    """Top node, any Seq Scan, and total execution time (ms) of the statements."""
+    connection = await session.connection()
+    node, seq_scan, elapsed = None, False, 0.0
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters
+        )
+        raw = result.scalar_one()
+        explained = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+        node = node or explained["Plan"]["Node Type"]
+        seq_scan |= any(n["Node Type"] == "Seq Scan" for n in walk(explained["Plan"]))
+        elapsed += explained["Execution Time"]
+    return node, seq_scan, elapsed
+
+
+async def run(depth: int, limit: int) -> None:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    print(f"{'filters':<20} {'sort':<14} {'plan':<18} {'seq':<4} "
+          f"{'first ms':>9} {'page ' + str(depth) + ' ms':>11}")
+    async with async_session() as session:
+        service = RecipeService(session)
+        for (name, filters), sort in product(FILTERS.items(), SORTS):
+            query = RecipeSearchQuerySchema(**filters, sort=sort, limit=limit)
+            event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+            page = await service.filter_recipes(query)
+            event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+            first = await explain(session, statements)
+            statements.clear()
+
+            for _ in range(depth - 1):
+                if page.next_cursor is None:
+                    break
+                query = query.model_copy(update={"after": page.next_cursor})
+                page = await service.filter_recipes(query)
+            event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+            await service.filter_recipes(query)
+            event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+            deep = await explain(session, statements)
+            statements.clear()
+
+            seq = "yes" if first[1] or deep[1] else "no"
+            print(f"{name:<20} {sort:<14} {first[0]:<18} {seq:<4} "
+                  f"{first[2]:9.2f} {deep[2]:11.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=50,
+                        help="Page reached by following cursors")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.depth, args.limit))
+
+
+if __name__ == "__main__":
+    main()
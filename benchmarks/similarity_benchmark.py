@@ -0,0 +1,107 @@
+"""Recall and latency of MinHash LSH "more like this" against exact Jaccard.
+
+Recipes come from the synthetic dataset generator (Zipf-distributed
+ingredients). "before" is the exact top-k: intersections counted through
+an ingredient -> recipes inverted index, the in-memory equivalent of the
+pairwise Jaccard query over recipe_ingredients. "after" is the first
+``MinHashLSH.query`` for a recipe, "cached" the same query again (results
+are memoized until the index changes). Recall@k is the share of the exact
+top-k (ties at the k-th similarity included) that the index returns.
+
+Usage:
+    python -m benchmarks.similarity_benchmark [--recipes 100000] [--queries 200]
+        [--k 10]
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import Counter
+from itertools import groupby
+
+from recipe_service.core.similarity import MinHashLSH
+from tools.generate_dataset import Plan, generate_rows
+
+
+def build_recipes(recipes: int, seed: int) -> dict[int, set[int]]:
+    plan = Plan(seed=seed, recipes=recipes)
+    rows = generate_rows(plan, "recipe_ingredients", 1, recipes + 1)
+    return {recipe_id: {row[1] for row in lines}
+            for recipe_id, lines in groupby(rows, key=lambda row: row[0])}
+
+
+def exact_top_k(recipe_id: int, recipes: dict[int, set[int]],
+                by_ingredient: dict[int, list[int]], k: int) -> set[int]:
+    ingredients = recipes[recipe_id]
+    shared = Counter()
+    for ingredient_id in ingredients:
+        shared.update(by_ingredient[ingredient_id])
+    del shared[recipe_id]
+    scores = sorted(
+        (n / (len(ingredients) + len(recipes[other]) - n)
+         for other, n in shared.items()),
+        reverse=True
+    )
+    if not scores:
+        return set()
+    threshold = scores[min(k, len(scores)) - 1]
+    return {other for other, n in shared.items()
+            if n / (len(ingredients) + len(recipes[other]) - n) >= threshold}
+
+
+def percentile(values: list[float], q: float) -> float:
+    return sorted(values)[min(int(len(values) * q), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--num-perm", type=int, default=64)
+    parser.add_argument("--bands", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    recipes = build_recipes(args.recipes, args.seed)
+    by_ingredient: dict[int, list[int]] = {}
+    for recipe_id, ingredients in recipes.items():
+        for ingredient_id in ingredients:
+            by_ingredient.setdefault(ingredient_id, []).append(recipe_id)
+
+    started = time.perf_counter()
+    index = MinHashLSH(args.num_perm, args.bands)
+    for recipe_id, ingredients in recipes.items():
+        index.upsert(recipe_id, ingredients)
+    elapsed = time.perf_counter() - started
+    print(f"index of {len(recipes):,} recipes built in {elapsed:.1f} s")
+
+    sample = random.Random(args.seed).sample(sorted(recipes), args.queries)
+    exact_ms, lsh_ms, cached_ms, recalls = [], [], [], []
+    for recipe_id in sample:
+        started = time.perf_counter()
+        expected = exact_top_k(recipe_id, recipes, by_ingredient, args.k)
+        exact_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        found = index.query(recipe_id, args.k)
+        lsh_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        index.query(recipe_id, args.k)
+        cached_ms.append((time.perf_counter() - started) * 1000)
+
+        if expected:
+            hits = len(expected & {other for other, _ in found})
+            recalls.append(hits / min(args.k, len(expected)))
+
+    variants = (("before", exact_ms), ("after", lsh_ms), ("cached", cached_ms))
+    for name, timings in variants:
+        print(f"{name:<7} p50 {statistics.median(timings):8.3f} ms  "
+              f"p99 {percentile(timings, 0.99):8.3f} ms")
+    print(f"recall@{args.k} {statistics.mean(recalls):.3f} "
+          f"(num_perm {args.num_perm}, bands {args.bands})")
+
+
+if __name__ == "__main__":
+    main()
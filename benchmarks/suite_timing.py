@@ -0,0 +1,52 @@
+"""Wall-clock time of the test suite before and after per-worker databases.
+
+"before" runs serially and rebuilds the schema at session start, like the
+former conftest that called drop_all/create_all on one shared database.
+"after" runs next, so the template is current: it only clones one
+database per pytest-xdist worker and runs the workers in parallel.
+
+Usage:
+    python -m benchmarks.suite_timing [--workers 4] [--rounds 3] [pytest args ...]
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+VARIANTS = {
+    "before": ["-p", "no:xdist", "--rebuild-template"],
+    "after": ["-n", "{workers}"],
+}
+
+
+def run(args: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-m", "pytest", "-q", *args],
+                            capture_output=True, text=True)
+    return time.perf_counter() - start, result.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="4")
+    parser.add_argument("--rounds", type=int, default=3)
+    args, pytest_args = parser.parse_known_args()
+
+    results = {}
+    for variant, options in VARIANTS.items():
+        options = [option.format(workers=args.workers) for option in options]
+        timings = []
+        for _ in range(args.rounds):
+            elapsed, returncode = run([*options, *pytest_args])
+            if returncode not in (0, 1):
+                sys.exit(
+                    f"pytest {' '.join(options)} failed with exit code {returncode}"
+                )
+            timings.append(elapsed)
+        results[variant] = min(timings)
+        print(f"{variant:<7} {results[variant]:>7.2f} s")
+    print(f"speed-up {results['before'] / results['after']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
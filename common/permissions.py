@@ -0,0 +1,46 @@
+# 1. Standard library imports
+from enum import IntFlag
+
+# 2. Third-party imports
+from sqlalchemy import BigInteger, column, table
+
+
+class Permission(IntFlag):
+    """Rights granted by groups, stored as a bitmask in ``users.groups.permissions``.
+
+    Bit positions are persisted: add new permissions at the end, never
+    renumber existing ones.
+    """
+    RECIPE_CREATE = 1 << 0
+    RECIPE_EDIT_OWN = 1 << 1
+    RECIPE_EDIT_ANY = 1 << 2
+    RECIPE_DELETE_OWN = 1 << 3
+    RECIPE_DELETE_ANY = 1 << 4
+
+
+# Every signed-in user may manage their own recipes; groups grant the rest
+DEFAULT_PERMISSIONS = (
+    Permission.RECIPE_CREATE | Permission.RECIPE_EDIT_OWN | Permission.RECIPE_DELETE_OWN
+)
+
+NO_PERMISSIONS = Permission(0)
+
+
+# ----------------------------------------------------------
+# Tables read by other services
+# ----------------------------------------------------------
+# The columns of user_service's tables that permission checks read, so
+# services that check permissions need not import user_service's models.
+groups = table(
+    "groups",
+    column("id", BigInteger),
+    column("permissions", BigInteger),
+    schema="users"
+)
+
+user_groups = table(
+    "user_groups",
+    column("user_id", BigInteger),
+    column("group_id", BigInteger),
+    schema="users"
+)
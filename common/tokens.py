@@ -0,0 +1,102 @@
+# 1. Standard library imports
+import base64
+import hashlib
+import hmac
+import json
+import time
+from functools import cache
+
+# 3. Local application imports
+from config import settings
+
+
+class InvalidToken(Exception):
+    """Exception thrown when a token is malformed, forged or expired."""
+
+
+# ----------------------------------------------------------
+# Signed tokens
+# ----------------------------------------------------------
+class TokenSigner:
+    """Stateless HMAC-SHA256 tokens: ``payload.signature``, both base64url.
+
+    The payload names the key it was signed with (``kid``), so keys can be
+    rotated: the first key signs, every listed key still verifies. Keys are
+    prepared once as HMAC objects and copied per token, which skips the key
+    setup on every verification.
+
+    user_service signs the tokens, every other service only verifies them;
+    both read the keys from ``AUTH_SIGNING_KEYS``.
+    """
+
+    def __init__(self, keys: dict[str, bytes], ttl: int = 3600):
+        if not keys:
+            raise RuntimeError(
+                "AUTH_SIGNING_KEYS is not configured: set it to comma separated "
+                "kid:secret pairs, the same on every service"
+            )
+        self.current_kid = next(iter(keys))
+        self.ttl = ttl
+        self._keys = {kid: hmac.new(key, digestmod=hashlib.sha256)
+                      for kid, key in keys.items()}
+
+    def sign(self, user_id: int, now: float | None = None) -> tuple[str, int]:
+        """A token for the user and its expiry (unix time)."""
+        expires_at = int(now or time.time()) + self.ttl
+        payload = b64url_encode(json.dumps(
+            {"sub": user_id, "exp": expires_at, "kid": self.current_kid},
+            separators=(",", ":")
+        ).encode())
+        return f"{payload}.{self._signature(self.current_kid, payload)}", expires_at
+
+    def verify(self, token: str, now: float | None = None) -> tuple[int, int]:
+        """User id and expiry of a valid token; ``InvalidToken`` otherwise."""
+        try:
+            payload, signature = token.split(".")
+            claims = json.loads(b64url_decode(payload))
+            kid, user_id, expires_at = claims["kid"], claims["sub"], claims["exp"]
+            if not isinstance(user_id, int) or not isinstance(expires_at, int):
+                raise ValueError
+        except (ValueError, KeyError, TypeError) as e:
+            raise InvalidToken("Malformed token") from e
+        if kid not in self._keys or not hmac.compare_digest(
+                signature, self._signature(kid, payload)
+        ):
+            raise InvalidToken("Invalid token signature")
+        if expires_at <= (now or time.time()):
+            raise InvalidToken("Token expired")
+        return user_id, expires_at
+
+    def _signature(self, kid: str, payload: str) -> str:
+        mac = self._keys[kid].copy()
+        mac.update(payload.encode())
+        return b64url_encode(mac.digest())
+
+
+def parse_signing_keys(pairs: list[str]) -> dict[str, bytes]:
+    """``kid:secret`` pairs -> {kid: secret}, in order (the first one signs)."""
+    keys = {}
+    for pair in pairs:
+        kid, _, secret = pair.partition(":")
+        if not kid or not secret:
+            raise RuntimeError("AUTH_SIGNING_KEYS entries must be kid:secret")
+        if kid in keys:
+            raise RuntimeError(f"AUTH_SIGNING_KEYS lists key id {kid!r} twice")
+        keys[kid] = secret.encode()
+    return keys
+
+
+@cache
+def token_signer() -> TokenSigner:
+    """The signer of this worker; raises at once if the keys are missing."""
+    return TokenSigner(
+        parse_signing_keys(settings.AUTH_SIGNING_KEYS), settings.AUTH_TOKEN_TTL_SECONDS
+    )
+
+
+def b64url_encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def b64url_decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
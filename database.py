@@ -1,32 +1,194 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from sqlalchemy.orm import sessionmaker
+import itertools
+import time
+from functools import cache, cached_property, wraps
+from typing import Callable
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
+from sqlalchemy.orm import Session, sessionmaker
 
 from config import settings
 
-# ---------------------------------------------
-# SYNC ENGINE
-# ---------------------------------------------
 
+# ----------------------------------------------------------
+# Engines
+# ----------------------------------------------------------
+# Creating an engine imports the DBAPI driver, so engines are built on first
+# use rather than at import: ``from database import async_engine`` still
+# works, it just happens when the name is first looked up.
+@cache
+def get_engine() -> Engine:
+    return create_engine(
+        url=settings.database_url,
+        echo=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT
+    )
+
+
+@cache
+def get_async_engine() -> AsyncEngine:
+    return create_async_engine(
+        url=settings.database_url,
+        echo=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT
+    )
+
+
+def pool_usage() -> float:
+    """Share of the primary's connections (overflow included) checked out."""
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    return get_async_engine().pool.checkedout() / capacity
+
+
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "async_engine": get_async_engine,
+    "session": lambda: sessionmaker(get_engine()),
+}
 
-engine = create_engine(
-    url=settings.database_url,
-    echo=True,
-    pool_size=5,
-    max_overflow=10
-)
 
-session = sessionmaker(engine)
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        value = globals()[name] = _LAZY_ATTRIBUTES[name]()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# ---------------------------------------------
-# ASYNC ENGINE
-# ---------------------------------------------
 
-async_engine = create_async_engine(
-    url=settings.database_url,
-    echo=True,
-    pool_size=5,
-    max_overflow=10
+# ----------------------------------------------------------
+# Read replicas
+# ----------------------------------------------------------
+class ReplicaSet:
+    """Round-robin over read replicas, skipping the ones that recently failed."""
+
+    def __init__(
+            self,
+            engines: list[AsyncEngine] | Callable[[], list[AsyncEngine]],
+            retry_after: float
+    ):
+        # A callable is only invoked when the replicas are first needed
+        self._engines = engines
+        self.retry_after = retry_after
+        self._down_until: dict[AsyncEngine, float] = {}
+
+    @cached_property
+    def engines(self) -> list[AsyncEngine]:
+        return self._engines() if callable(self._engines) else self._engines
+
+    @cached_property
+    def _cycle(self):
+        return itertools.cycle(self.engines) if self.engines else None
+
+    def pick(self) -> AsyncEngine | None:
+        """Return a healthy replica, or None to use the primary."""
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            replica = next(self._cycle)
+            if self._down_until.get(replica, 0.0) <= now:
+                return replica
+        return None
+
+    def mark_down(self, replica: AsyncEngine) -> None:
+        self._down_until[replica] = time.monotonic() + self.retry_after
+
+
+replicas = ReplicaSet(
+    lambda: [
+        create_async_engine(
+            url=url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=True
+        )
+        for url in settings.database_replica_urls
+    ],
+    retry_after=settings.DB_REPLICA_RETRY_SECONDS
 )
 
-async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+
+class RoutingSession(Session):
+    """Sends reads of ``read_replica`` service methods to a replica.
+
+    Everything else goes to the primary: flushes and DML, any read once the
+    session has written, and reads while ``info["primary_only"]`` is set
+    (the client is inside its read-your-writes window).
+    """
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        info = self.info
+        if (info.get("replica")
+                and not info.get("wrote")
+                and not info.get("primary_only")
+                and not self._flushing
+                and (clause is None or getattr(clause, "is_select", False))):
+            replica = info.get("replica_engine") or replicas.pick()
+            if replica is not None:
+                info["replica_engine"] = replica
+                return replica.sync_engine
+        if self.bind is None:
+            # Sessions from ``async_session`` are unbound: use the primary
+            return get_async_engine().sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_written_on_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_written_on_dml(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _start_read_your_writes_window(session):
+    """Let the client's next requests read from the primary for a while."""
+    on_write_commit = session.info.get("on_write_commit")
+    if session.info.get("wrote") and on_write_commit is not None:
+        on_write_commit()
+
+
+def read_replica(func):
+    """Runs a read-only service method against a read replica.
+
+    Falls back to the primary when no replica is healthy, and retries once
+    on the primary if the replica connection fails mid-call.
+    """
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        info = self.session.info
+        if not replicas.engines or info.get("replica"):
+            return await func(self, *args, **kwargs)
+
+        info["replica"] = True
+        try:
+            return await func(self, *args, **kwargs)
+        except OperationalError as e:
+            # Unreachable replica, or a query cancelled by recovery conflicts:
+            # the method only reads, so running it again on the primary is safe.
+            replica = info.pop("replica_engine", None)
+            if replica is None:
+                raise
+            if e.connection_invalidated or e.statement is None:
+                replicas.mark_down(replica)
+            await self.session.rollback()
+            info["replica"] = False
+            return await func(self, *args, **kwargs)
+        finally:
+            info.pop("replica", None)
+            info.pop("replica_engine", None)
+
+    return wrapper
+
+
+async_session = async_sessionmaker(
+    expire_on_commit=False,
+    sync_session_class=RoutingSession
+)
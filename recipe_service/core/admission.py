@@ -0,0 +1,183 @@
+# 1. Standard library imports
+import asyncio
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+# 2. Third-party imports
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+# ----------------------------------------------------------
+# Lanes
+# ----------------------------------------------------------
+@dataclass
+class Lane:
+    """Concurrency limit and waiting room of one route class.
+
+    At most ``limit`` requests of the lane run at once; up to ``max_queue``
+    more wait, each for at most ``max_wait`` seconds. Once the share of
+    checked out pool connections reaches ``shed_at``, new requests of the
+    lane are refused outright so the connections left go to other lanes.
+    """
+    name: str
+    limit: int
+    max_queue: int
+    max_wait: float
+    shed_at: float = float("inf")
+    active: int = 0
+    waiters: deque[asyncio.Future] = field(default_factory=deque)
+    admitted: int = 0
+    shed: int = 0
+
+
+def default_lanes(pool_capacity: int) -> dict[str, Lane]:
+    """Lanes sized on the connection pool (size + overflow) of the primary.
+
+    Reads by id are one short query and may use the whole pool, writes
+    half of it. Searches get a third and are shed once 80% of the pool is
+    checked out, bulk requests two slots and are shed at half, so a burst
+    of searches never starves ``GET /recipes/{id}``.
+    """
+    half, third = max(pool_capacity // 2, 1), max(pool_capacity // 3, 1)
+    return {
+        "read": Lane("read", pool_capacity, pool_capacity * 8, max_wait=2.0),
+        "write": Lane("write", half, pool_capacity * 4, max_wait=5.0),
+        "search": Lane("search", third, pool_capacity, max_wait=1.0, shed_at=0.8),
+        "bulk": Lane("bulk", 2, 2, max_wait=1.0, shed_at=0.5),
+    }
+
+
+# (methods, path, lane): first match wins, other GETs are reads and the rest writes
+ROUTE_CLASSES = [
+    ({"POST"}, re.compile(r"^/nutrition/"), "bulk"),
+    ({"GET"}, re.compile(r"^/sync$"), "bulk"),
+    ({"GET"}, re.compile(r"/search(/|$)|/similar$|/cookable$"), "search"),
+    # Unpaginated listings
+    ({"GET"}, re.compile(r"^/(recipes|ingredients|ingredient_category|user_recipes)$"),
+     "search"),
+]
+# Monitoring and docs must answer under load
+EXEMPT_PATHS = re.compile(r"^/(system/|docs|redoc|openapi\.json)")
+
+
+# ----------------------------------------------------------
+# Controller
+# ----------------------------------------------------------
+class AdmissionController:
+    """Admits, queues or sheds requests per lane, in arrival order.
+
+    A freed slot is handed straight to the oldest waiter of its lane, so a
+    request that waited is never overtaken by one that just arrived.
+    """
+
+    def __init__(
+            self,
+            lanes: dict[str, Lane],
+            pool_usage: Callable[[], float],
+            retry_after: int = 1
+    ):
+        self.lanes = lanes
+        self.pool_usage = pool_usage
+        self.retry_after = retry_after
+
+    def classify(self, method: str, path: str) -> Lane | None:
+        """The lane of a request, ``None`` when it is never throttled."""
+        if EXEMPT_PATHS.match(path):
+            return None
+        for methods, pattern, lane in ROUTE_CLASSES:
+            if method in methods and pattern.search(path):
+                return self.lanes[lane]
+        return self.lanes["read" if method in ("GET", "HEAD") else "write"]
+
+    async def acquire(self, lane: Lane) -> bool:
+        """Take a slot of the lane, waiting if needed; ``False`` if shed."""
+        if lane.shed_at != float("inf") and self.pool_usage() >= lane.shed_at:
+            return self._shed(lane)
+        if lane.active < lane.limit and not lane.waiters:
+            lane.active += 1
+            lane.admitted += 1
+            return True
+        if len(lane.waiters) >= lane.max_queue:
+            return self._shed(lane)
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiters.append(waiter)
+        try:
+            async with asyncio.timeout(lane.max_wait):
+                await waiter
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted while timing out or disconnecting: pass it on
+                self.release(lane)
+            elif waiter in lane.waiters:
+                lane.waiters.remove(waiter)
+            if isinstance(e, TimeoutError):
+                return self._shed(lane)
+            raise
+        lane.admitted += 1
+        return True
+
+    def release(self, lane: Lane) -> None:
+        while lane.waiters:
+            waiter = lane.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        lane.active -= 1
+
+    def _shed(self, lane: Lane) -> bool:
+        lane.shed += 1
+        return False
+
+    def snapshot(self) -> dict:
+        return {
+            "pool_usage": self.pool_usage(),
+            "lanes": {
+                name: {
+                    "limit": lane.limit,
+                    "active": lane.active,
+                    "queued": len(lane.waiters),
+                    "admitted": lane.admitted,
+                    "shed": lane.shed,
+                }
+                for name, lane in self.lanes.items()
+            },
+        }
+
+
+# ----------------------------------------------------------
+# Pure ASGI middleware
+# ----------------------------------------------------------
+class AdmissionMiddleware:
+    """Sheds excess load with 503 and ``Retry-After`` before it reaches the
+    connection pool, where it would otherwise wait ``pool_timeout`` and
+    slow every other request down.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        lane = None
+        if scope["type"] == "http":
+            lane = self.controller.classify(scope["method"], scope["path"])
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.acquire(lane):
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, try again later"},
+                headers={"Retry-After": str(self.controller.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(lane)
@@ -0,0 +1,131 @@
+# 1. Standard library imports
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+# 3. Local application imports
+from config import settings
+
+
+# ----------------------------------------------------------
+# In-process cache
+# ----------------------------------------------------------
+class LocalCache:
+    """Per-worker cache whose entries are tagged with the tables they read.
+
+    A tag is either a table name ("categories"), matching any change in
+    that table, or a single row ("categories:5"). Entries also expire after
+    ``ttl`` seconds, which bounds staleness of values read from a lagging
+    replica. Expired entries are dropped when read and swept at most once
+    per ``ttl`` on writes; past ``max_entries`` the least recently used go.
+    Tags of removed or overwritten entries are dropped with them, so the
+    tag index never outgrows the entries.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 10_000):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (expires at, value, tags), least recently used first
+        self._entries: OrderedDict[Hashable, tuple[float, Any, tuple[str, ...]]] = (
+            OrderedDict()
+        )
+        self._keys_by_tag: dict[str, set[Hashable]] = {}
+        self._next_sweep = time.monotonic() + ttl
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        if entry[0] < time.monotonic():
+            self._remove(key)
+            return default
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Hashable, value, tags: Iterable[str]) -> None:
+        if key in self._entries:
+            self._remove(key)
+        tags = tuple(dict.fromkeys(tags))
+        now = time.monotonic()
+        self._entries[key] = (now + self.ttl, value, tags)
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        if now >= self._next_sweep:
+            self._sweep(now)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    async def get_or_load(
+            self,
+            key: Hashable,
+            loader: Callable[[], Awaitable[Any]],
+            tags: Iterable[str]
+    ):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = await loader()
+            self.set(key, value, tags)
+        return value
+
+    def invalidate(self, table: str, row_id: int | None = None) -> None:
+        tags = [table] if row_id is None else [table, f"{table}:{row_id}"]
+        for tag in tags:
+            for key in list(self._keys_by_tag.get(tag, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_tag.clear()
+        self._next_sweep = time.monotonic() + self.ttl
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag[tag]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_tag[tag]
+
+    def _sweep(self, now: float) -> None:
+        expired = [key for key, (expires_at, _, _) in self._entries.items()
+                   if expires_at < now]
+        for key in expired:
+            self._remove(key)
+        self._next_sweep = now + self.ttl
+
+
+_MISSING = object()
+_caches: dict[str, LocalCache] = {}
+
+
+def local_cache(name: str) -> LocalCache:
+    """Return the named cache of this worker, creating it on first use."""
+    if name not in _caches:
+        _caches[name] = LocalCache(
+            name,
+            ttl=settings.LOCAL_CACHE_TTL_SECONDS,
+            max_entries=settings.LOCAL_CACHE_MAX_ENTRIES
+        )
+    return _caches[name]
+
+
+def register_local_cache(name: str, cache) -> None:
+    """Add a cache of another kind.
+
+    It needs ``invalidate(table, row_id)`` and ``clear()``.
+    """
+    _caches[name] = cache
+
+
+def invalidate_local_caches(table: str, row_id: int | None = None) -> None:
+    for cache in _caches.values():
+        cache.invalidate(table, row_id)
+
+
+def clear_local_caches() -> None:
+    for cache in _caches.values():
+        cache.clear()
@@ -0,0 +1,296 @@
+# 1. Standard library imports
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from datetime import timedelta
+from typing import Callable, Iterable
+
+# 2. Third-party imports
+from sqlalchemy import delete, event, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+# 3. Local application imports
+from database import RoutingSession, async_session
+from recipe_service.core.cache import invalidate_local_caches
+from recipe_service.models.changes_models import ChangeLog, ChangeLogHorizon
+
+logger = logging.getLogger("recipe_service")
+
+CHANNEL = "recipe_changes"
+
+# Writers of change_log serialize on this lock until COMMIT, so change ids
+# become visible in id order and ``id > cursor`` never skips a late commit.
+# It is one lock for every writer, so it is only taken for the commit tail:
+# here right before COMMIT, and by the recipes.log_change() and
+# users.log_membership_change() triggers, which are deferred to COMMIT.
+CHANGE_LOG_LOCK = func.hashtext("recipes.change_log")
+
+
+# ----------------------------------------------------------
+# Emitting changes
+# ----------------------------------------------------------
+def track_change(session, table: str, row_ids: Iterable[int], op: str) -> None:
+    """Remember a change; it is written to the outbox when the session commits.
+
+    No I/O happens here. All changes of a transaction are inserted into
+    ``change_log`` and announced with ``pg_notify`` by a single statement
+    right before COMMIT, so listeners only hear about committed changes.
+    Translations are written outside this service and logged by the
+    ``recipes.log_change()`` trigger instead.
+    """
+    pending = session.info.setdefault("pending_changes", {})
+    for row_id in row_ids:
+        # A later op on the same row wins (e.g. insert then delete -> delete)
+        pending[(table, row_id)] = op
+
+
+@event.listens_for(RoutingSession, "before_commit")
+def _write_outbox(session):
+    pending = session.info.get("pending_changes")
+    if not pending:
+        return
+    inserted = (
+        insert(ChangeLog)
+        .values([
+            {"table_name": table, "row_id": row_id, "op": op}
+            for (table, row_id), op in pending.items()
+        ])
+        .returning(ChangeLog.id, ChangeLog.table_name, ChangeLog.row_id,
+                   ChangeLog.op, ChangeLog.changed_at)
+        .cte("inserted")
+    )
+    payload = func.concat_ws(
+        "|",
+        inserted.c.id,
+        inserted.c.table_name,
+        inserted.c.row_id,
+        inserted.c.op,
+        func.extract("epoch", inserted.c.changed_at)
+    )
+    # Sync session inside the async greenlet, so SQL can be emitted here
+    session.execute(select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK)))
+    session.execute(select(func.pg_notify(CHANNEL, payload)).select_from(inserted))
+    session.info["committed_changes"] = session.info.pop("pending_changes")
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _invalidate_after_commit(session):
+    # The listener will hear about these too; invalidating right away means
+    # this worker never serves its own stale data in between.
+    for (table, row_id) in session.info.pop("committed_changes", {}):
+        invalidate_local_caches(table, row_id)
+
+
+@event.listens_for(RoutingSession, "after_soft_rollback")
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop("pending_changes", None)
+    session.info.pop("committed_changes", None)
+
+
+# ----------------------------------------------------------
+# Consuming changes
+# ----------------------------------------------------------
+@dataclass
+class ChangeFeedStats:
+    received: int = 0
+    recovered: int = 0
+    reconnects: int = 0
+    last_seq: int = 0
+    last_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+
+
+class ChangeFeedListener:
+    """Background task that applies other workers' changes to local caches.
+
+    Changes arrive through LISTEN/NOTIFY. Notifications are lost while the
+    connection is down, so after every (re)connect and every idle
+    ``poll_interval`` the outbox is read past the last seen sequence. The
+    ids of recently applied changes are remembered, which also catches
+    changes committed out of sequence order.
+    """
+
+    CATCH_UP_OVERLAP = 1000
+    SEEN_LIMIT = 10_000
+
+    def __init__(
+            self,
+            dsn: str,
+            on_change: Callable[[str, int], None] = invalidate_local_caches,
+            poll_interval: float = 5.0,
+            reconnect_delay: float = 1.0
+    ):
+        self.dsn = dsn
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self.stats = ChangeFeedStats()
+        self._seen: OrderedDict[int, None] = OrderedDict()
+        self._floor = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run(), name="change-feed-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self) -> None:
+        # Imported here: the driver is not needed until the first connection
+        import psycopg
+
+        first_connect = True
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                        self.dsn, autocommit=True
+                ) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    if first_connect:
+                        # Caches start empty: nothing before now needs replaying
+                        self._floor = self.stats.last_seq = await self._max_seq(conn)
+                        first_connect = False
+                    else:
+                        await self._catch_up(conn)
+                    while True:
+                        async for notify in conn.notifies(timeout=self.poll_interval):
+                            self._apply(notify.payload, recovered=False)
+                        await self._catch_up(conn)
+            except asyncio.CancelledError:
+                raise
+            except psycopg.Error as e:
+                self.stats.reconnects += 1
+                logger.warning(f"Change feed connection lost, reconnecting: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+
+    @staticmethod
+    async def _max_seq(conn) -> int:
+        cursor = await conn.execute(
+            "SELECT coalesce(max(id), 0) FROM recipes.change_log"
+        )
+        return (await cursor.fetchone())[0]
+
+    async def _catch_up(self, conn) -> None:
+        cursor = await conn.execute(
+            "SELECT concat_ws('|', id, table_name, row_id, op, "
+            "extract(epoch FROM changed_at)) "
+            "FROM recipes.change_log WHERE id > %s ORDER BY id",
+            (max(self.stats.last_seq - self.CATCH_UP_OVERLAP, self._floor),)
+        )
+        async for (payload,) in cursor:
+            self._apply(payload, recovered=True)
+
+    def _apply(self, payload: str, recovered: bool) -> None:
+        seq, table, row_id, _op, changed_at = payload.split("|")
+        seq = int(seq)
+        if seq in self._seen:
+            return
+        self._seen[seq] = None
+        if len(self._seen) > self.SEEN_LIMIT:
+            self._seen.popitem(last=False)
+
+        self.on_change(table, int(row_id))
+
+        stats = self.stats
+        stats.last_seq = max(stats.last_seq, seq)
+        if recovered:
+            stats.recovered += 1
+        else:
+            stats.received += 1
+            stats.last_lag_ms = max((time.time() - float(changed_at)) * 1000, 0.0)
+            stats.max_lag_ms = max(stats.max_lag_ms, stats.last_lag_ms)
+
+    def snapshot(self) -> dict:
+        return asdict(self.stats)
+
+
+# ----------------------------------------------------------
+# Retention of the outbox
+# ----------------------------------------------------------
+async def purge_change_log(
+        retention: float,
+        session_factory: Callable[[], AsyncSession] = async_session,
+        batch_size: int = 1000
+) -> int:
+    """Compact changes older than ``retention`` seconds.
+
+    An old change is deleted once a newer change of the same row exists,
+    and so is an old delete: what is left is the latest change of every
+    live row, so a sync from cursor 0 still returns the whole catalogue.
+    The highest purged delete is kept in ``change_log_horizon``; older sync
+    cursors may have missed it and get a full resync. The log is walked in
+    id order, ``batch_size`` rows per transaction, and its newest change
+    is always kept.
+    """
+    old = ChangeLog.changed_at < func.now() - timedelta(seconds=retention)
+    newer = aliased(ChangeLog)
+    superseded = (
+        select(newer.id)
+        .where(
+            newer.table_name == ChangeLog.table_name,
+            newer.row_id == ChangeLog.row_id,
+            newer.id > ChangeLog.id
+        )
+        .exists()
+    )
+    newest = select(func.max(ChangeLog.id)).scalar_subquery()
+
+    purged, after = 0, 0
+    while True:
+        async with session_factory() as session:
+            window = (await session.scalars(
+                select(ChangeLog.id)
+                .where(ChangeLog.id > after, old)
+                .order_by(ChangeLog.id)
+                .limit(batch_size)
+            )).all()
+            if not window:
+                return purged
+            deleted = (await session.execute(
+                delete(ChangeLog)
+                .where(
+                    ChangeLog.id.in_(window),
+                    ChangeLog.id < newest,
+                    or_(ChangeLog.op == "D", superseded)
+                )
+                .returning(ChangeLog.id, ChangeLog.op)
+            )).all()
+            deletes = [change_id for change_id, op in deleted if op == "D"]
+            if deletes:
+                await session.execute(
+                    update(ChangeLogHorizon).values(
+                        purged_through=func.greatest(
+                            ChangeLogHorizon.purged_through, max(deletes)
+                        )
+                    )
+                )
+            await session.commit()
+        purged += len(deleted)
+        after = window[-1]
+        if len(window) < batch_size:
+            return purged
+
+
+async def purge_change_log_periodically(
+        interval: float,
+        retention: float,
+        batch_size: int
+) -> None:
+    """Background task of each worker, like the idempotency key cleanup."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            purged = await purge_change_log(retention, batch_size=batch_size)
+            if purged:
+                logger.info(f"Compacted {purged} changes older than {retention}s")
+        except Exception as e:
+            logger.warning(f"Purging the change log failed: {e}")
@@ -0,0 +1,244 @@
+# 1. Standard library imports
+import zlib
+from importlib.util import find_spec
+from typing import Callable
+
+# 2. Third-party imports
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# The optional codecs (``brotli``, ``zstandard``) are only looked up at import
+# time; each is imported by the first response it encodes.
+
+
+# ----------------------------------------------------------
+# Encoders
+# ----------------------------------------------------------
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int = 6):
+        # wbits=31 -> gzip container around the deflate stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit everything buffered so far, keeping the stream open."""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int = 4):
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int = 3):
+        import zstandard
+
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encodings() -> list[str]:
+    """Encodings this process can produce, in server preference order."""
+    encodings = []
+    if find_spec("zstandard") is not None:
+        encodings.append(ZstdEncoder.name)
+    if find_spec("brotli") is not None:
+        encodings.append(BrotliEncoder.name)
+    encodings.append(GzipEncoder.name)
+    return encodings
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}."""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(header: str, encodings: list[str]) -> str | None:
+    """Pick the best encoding the client accepts, or None for identity."""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+# ----------------------------------------------------------
+# Middleware
+# ----------------------------------------------------------
+DEFAULT_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+class CompressionMiddleware:
+    """Pure ASGI response compression with content negotiation.
+
+    Supports gzip always, and brotli/zstd when the optional ``brotli`` and
+    ``zstandard`` packages are installed. Complete bodies smaller than
+    ``minimum_size`` are sent as is; streaming bodies are compressed chunk by
+    chunk and flushed so clients receive data as soon as it is produced.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            minimum_size: int = 1024,
+            gzip_level: int = 6,
+            brotli_quality: int = 4,
+            zstd_level: int = 3,
+            compressible_types: tuple[str, ...] = DEFAULT_COMPRESSIBLE_TYPES
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressible_types = compressible_types
+        self.encodings = available_encodings()
+        self._factories: dict[str, Callable] = {
+            GzipEncoder.name: lambda: GzipEncoder(gzip_level),
+            BrotliEncoder.name: lambda: BrotliEncoder(brotli_quality),
+            ZstdEncoder.name: lambda: ZstdEncoder(zstd_level),
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""),
+            self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(
+            send,
+            self._factories[encoding],
+            self.minimum_size,
+            self.compressible_types
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request state: decides on the first body chunk, then streams."""
+
+    def __init__(self, send: Send, encoder_factory: Callable, minimum_size: int,
+                 compressible_types: tuple[str, ...]):
+        self._send = send
+        self._encoder_factory = encoder_factory
+        self._minimum_size = minimum_size
+        self._compressible_types = compressible_types
+        self._start_message: Message | None = None
+        self._encoder = None
+        self._passthrough = False
+
+    def _should_compress(
+            self,
+            headers: MutableHeaders,
+            body: bytes,
+            more_body: bool
+    ) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if not content_type.startswith(self._compressible_types):
+            return False
+        return more_body or len(body) >= self._minimum_size
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Headers depend on the first body chunk, hold them until then
+            self._start_message = message
+            return
+        if message_type != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._encoder is None:
+            headers = MutableHeaders(raw=self._start_message["headers"])
+            if not self._should_compress(headers, body, more_body):
+                self._passthrough = True
+                await self._send(self._start_message)
+                await self._send(message)
+                return
+
+            self._encoder = self._encoder_factory()
+            headers["Content-Encoding"] = self._encoder.name
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self._encoder.compress(body) + self._encoder.finish()
+                headers["Content-Length"] = str(len(body))
+                await self._send(self._start_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            await self._send(self._start_message)
+
+        chunk = self._encoder.compress(body)
+        chunk += self._encoder.flush() if more_body else self._encoder.finish()
+        await self._send({
+            "type": "http.response.body",
+            "body": chunk,
+            "more_body": more_body
+        })
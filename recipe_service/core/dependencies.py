@@ -1,17 +1,26 @@
 # 1. Standard library imports
 import logging
+import time
 from typing import Annotated, Any, AsyncGenerator
 
 # 2. Third-party imports
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # 3. Local application imports
-from database import async_session
+from common.tokens import InvalidToken, token_signer
+from config import settings
+from database import async_session, replicas
 from recipe_service.services.category_service import CategoryService
+from recipe_service.services.image_service import ImageService
 from recipe_service.services.ingredient_service import IngredientService
+from recipe_service.services.nutrition_service import NutritionService
+from recipe_service.services.pantry_service import PantryService
 from recipe_service.services.recipe_service import RecipeService
+from recipe_service.services.sync_service import SyncService
+from recipe_service.services.user_recipe_service import UserRecipeService
 
 # ----------------------------------------------------------
 # Setting up logging
@@ -26,8 +35,35 @@ logger = logging.getLogger("recipe_service")
 # ----------------------------------------------------------
 # Session Dependency
 # ----------------------------------------------------------
-async def get_session() -> AsyncGenerator[Any, Any]:
+# After a write the client gets a short-lived cookie; while it is valid its
+# reads go to the primary, so it never sees a replica that lags its own write.
+PRIMARY_UNTIL_COOKIE = "db_primary_until"
+
+
+def _in_read_your_writes_window(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_UNTIL_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_session(
+        request: Request,
+        response: Response
+) -> AsyncGenerator[Any, Any]:
     async with async_session() as session:
+        def start_read_your_writes_window():
+            window = settings.DB_READ_YOUR_WRITES_SECONDS
+            response.set_cookie(
+                PRIMARY_UNTIL_COOKIE,
+                f"{time.time() + window:.3f}",
+                max_age=max(int(window), 1),
+                httponly=True
+            )
+
+        if replicas.engines:
+            session.info["primary_only"] = _in_read_your_writes_window(request)
+            session.info["on_write_commit"] = start_read_your_writes_window
         try:
             yield session
             logger.debug("Session successfully yielded")
@@ -60,6 +96,36 @@ async def get_session() -> AsyncGenerator[Any, Any]:
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
 
 
+# ----------------------------------------------------------
+# Acting user
+# ----------------------------------------------------------
+bearer = HTTPBearer(auto_error=False)
+
+
+def get_current_user_id(
+        credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer)]
+) -> int | None:
+    """The user id of the bearer token, ``None`` for anonymous requests.
+
+    Tokens are signed by the user service and verified here without a call
+    to it; permissions are resolved by the service that needs them.
+    """
+    if credentials is None:
+        return None
+    try:
+        user_id, _ = token_signer().verify(credentials.credentials)
+    except InvalidToken as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"}
+        ) from e
+    return user_id
+
+
+CurrentUserIdDep = Annotated[int | None, Depends(get_current_user_id)]
+
+
 # ----------------------------------------------------------
 # Service Dependencies
 # ----------------------------------------------------------
@@ -82,9 +148,54 @@ IngredientServiceDep = Annotated[CategoryService, Depends(get_ingredient_service
 
 
 # Recipe Service
-def get_recipe_service(session: SessionDep) -> RecipeService:
+def get_recipe_service(session: SessionDep, user_id: CurrentUserIdDep) -> RecipeService:
     """A dependency that provides an instance of RecipeService."""
-    return RecipeService(session)
+    return RecipeService(session, user_id)
 
 
 RecipeServiceDep = Annotated[CategoryService, Depends(get_recipe_service)]
+
+
+# User Recipe Service
+def get_user_recipe_service(session: SessionDep) -> UserRecipeService:
+    """A dependency that provides an instance of UserRecipeService."""
+    return UserRecipeService(session)
+
+
+UserRecipeServiceDep = Annotated[UserRecipeService, Depends(get_user_recipe_service)]
+
+
+# Sync Service
+def get_sync_service(session: SessionDep) -> SyncService:
+    """A dependency that provides an instance of SyncService."""
+    return SyncService(session)
+
+
+SyncServiceDep = Annotated[SyncService, Depends(get_sync_service)]
+
+
+# Pantry Service
+def get_pantry_service(session: SessionDep) -> PantryService:
+    """A dependency that provides an instance of PantryService."""
+    return PantryService(session)
+
+
+PantryServiceDep = Annotated[PantryService, Depends(get_pantry_service)]
+
+
+# Nutrition Service
+def get_nutrition_service(session: SessionDep) -> NutritionService:
+    """A dependency that provides an instance of NutritionService."""
+    return NutritionService(session)
+
+
+NutritionServiceDep = Annotated[NutritionService, Depends(get_nutrition_service)]
+
+
+# Image Service
+def get_image_service(session: SessionDep) -> ImageService:
+    """A dependency that provides an instance of ImageService."""
+    return ImageService(session)
+
+
+ImageServiceDep = Annotated[ImageService, Depends(get_image_service)]
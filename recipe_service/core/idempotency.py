@@ -0,0 +1,324 @@
+# 1. Standard library imports
+import asyncio
+import hashlib
+import logging
+import zlib
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+# 2. Third-party imports
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# 3. Local application imports
+from database import async_session
+from recipe_service.models.idempotency_models import IdempotencyKey
+
+logger = logging.getLogger("recipe_service")
+
+HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: bytes
+    # None while the first request is still running
+    status_code: int | None
+    content_type: str | None
+    body: bytes | None
+
+
+# ----------------------------------------------------------
+# Pure ASGI middleware
+# ----------------------------------------------------------
+class IdempotencyMiddleware:
+    """Runs a request carrying an ``Idempotency-Key`` at most once.
+
+    The first request claims the key in ``recipes.idempotency_keys`` for
+    ``lock_timeout`` seconds, runs, and stores its response for ``ttl``
+    seconds. Retries with the same key, request and ``Authorization``
+    header get the stored response (marked ``Idempotent-Replayed: true``)
+    without reaching the routes; duplicates that arrive while it runs wait
+    for it, for at most ``wait_timeout`` seconds, then get 409. A key reused
+    for a different request or by another caller gets 422. Server errors
+    are not stored, so they can be retried.
+
+    The body is buffered to fingerprint the request, so keyed requests are
+    limited to ``max_body`` bytes and refused with 413 past it. Raw image
+    uploads are larger; ``PUT /recipes/{id}/image`` is idempotent by itself
+    and needs no key.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            session_factory: Callable[[], AsyncSession] = async_session,
+            ttl: float = 86400.0,
+            lock_timeout: float = 60.0,
+            wait_timeout: float = 10.0,
+            max_body: int = 1024 * 1024,
+            methods: tuple[str, ...] = ("POST", "PUT", "PATCH")
+    ):
+        self.app = app
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.max_body = max_body
+        self.methods = methods
+        # Keys this worker is running, so local duplicates need not poll
+        self._in_flight: dict[str, asyncio.Event] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        key = None
+        if scope["type"] == "http" and scope["method"] in self.methods:
+            key = Headers(scope=scope).get(HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(key) <= 255:
+            response = JSONResponse(
+                status_code=400,
+                content={"detail": "Idempotency-Key must be 1 to 255 characters"}
+            )
+            await response(scope, receive, send)
+            return
+
+        body, receive = await _buffer_body(receive, self.max_body)
+        if body is None:
+            response = JSONResponse(
+                status_code=413,
+                content={"detail": "Requests with an Idempotency-Key are limited "
+                                   f"to {self.max_body} bytes"}
+            )
+            await response(scope, receive, send)
+            return
+        method, path = scope["method"].encode(), scope["path"].encode()
+        # Replays skip the routes and their permission checks, so a key only
+        # replays for the credentials that made the first request
+        authorization = Headers(scope=scope).get("authorization", "").encode()
+        fingerprint = hashlib.sha256(
+            b"\0".join((method, path, scope["query_string"], authorization, body))
+        ).digest()
+
+        deadline = asyncio.get_running_loop().time() + self.wait_timeout
+        while not await self.claim(key, fingerprint):
+            stored = await self.lookup(key)
+            if stored is None:
+                # Released or expired in between: try to claim it again
+                continue
+            response = None
+            if stored.fingerprint != fingerprint:
+                response = JSONResponse(
+                    status_code=422,
+                    content={"detail": "Idempotency-Key was used for another request"}
+                )
+            elif stored.status_code is not None:
+                response = Response(
+                    zlib.decompress(stored.body),
+                    status_code=stored.status_code,
+                    media_type=stored.content_type,
+                    headers={REPLAYED_HEADER: "true"}
+                )
+            elif asyncio.get_running_loop().time() >= deadline:
+                response = JSONResponse(
+                    status_code=409,
+                    content={"detail": "A request with this key is still in progress"}
+                )
+            if response is not None:
+                await response(scope, receive, send)
+                return
+            await self._wait(key, deadline)
+
+        await self._run(key, scope, receive, send)
+
+    async def _run(self, key: str, scope: Scope, receive: Receive, send: Send) -> None:
+        done = self._in_flight[key] = asyncio.Event()
+        start: dict = {}
+        chunks: list[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+            if start and start["status"] < 500:
+                headers = Headers(raw=start.get("headers", []))
+                await self.complete(
+                    key, start["status"], headers.get("content-type"), b"".join(chunks)
+                )
+            else:
+                await self.release(key)
+        except BaseException:
+            await self.release(key)
+            raise
+        finally:
+            del self._in_flight[key]
+            done.set()
+
+    async def _wait(self, key: str, deadline: float) -> None:
+        timeout = max(deadline - asyncio.get_running_loop().time(), 0.0)
+        running_here = self._in_flight.get(key)
+        if running_here is None:
+            # Running on another worker: poll
+            await asyncio.sleep(min(0.05, timeout))
+            return
+        try:
+            await asyncio.wait_for(running_here.wait(), timeout)
+        except TimeoutError:
+            pass
+
+    # Storage
+    async def claim(self, key: str, fingerprint: bytes) -> bool:
+        """Insert the key, or take it over if it expired; ``False`` if held."""
+        expires_at = func.now() + timedelta(seconds=self.lock_timeout)
+        statement = insert(IdempotencyKey).values(
+            key=key, fingerprint=fingerprint, expires_at=expires_at
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                "fingerprint": statement.excluded.fingerprint,
+                "status_code": None,
+                "content_type": None,
+                "body": None,
+                "created_at": func.now(),
+                "expires_at": statement.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at < func.now()
+        ).returning(IdempotencyKey.key)
+        async with self.session_factory() as session:
+            claimed = await session.scalar(statement)
+            await session.commit()
+        return claimed is not None
+
+    async def lookup(self, key: str) -> StoredResponse | None:
+        async with self.session_factory() as session:
+            row = (await session.execute(
+                select(
+                    IdempotencyKey.fingerprint,
+                    IdempotencyKey.status_code,
+                    IdempotencyKey.content_type,
+                    IdempotencyKey.body
+                )
+                .where(
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.expires_at >= func.now()
+                )
+            )).first()
+        return StoredResponse(*row) if row is not None else None
+
+    async def complete(
+            self,
+            key: str,
+            status_code: int,
+            content_type: str | None,
+            body: bytes
+    ) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(
+                    status_code=status_code,
+                    content_type=content_type,
+                    body=zlib.compress(body),
+                    expires_at=func.now() + timedelta(seconds=self.ttl)
+                )
+            )
+            await session.commit()
+
+    async def release(self, key: str) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))
+            )
+            await session.commit()
+
+
+async def _buffer_body(
+        receive: Receive,
+        limit: int
+) -> tuple[bytes | None, Receive]:
+    """Read the whole request body; returns it and a ``receive`` replaying it.
+
+    The body is ``None`` once it exceeds ``limit`` bytes; reading stops there.
+    """
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None, receive
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            break
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay() -> Message:
+        nonlocal replayed
+        if replayed:
+            return await receive()
+        replayed = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return body, replay
+
+
+# ----------------------------------------------------------
+# Cleanup of expired keys
+# ----------------------------------------------------------
+async def purge_expired_keys(
+        session_factory: Callable[[], AsyncSession] = async_session,
+        batch_size: int = 1000
+) -> int:
+    """Delete expired keys, ``batch_size`` rows per transaction, so the
+    cleanup never holds many row locks or a long transaction.
+    """
+    batch = (
+        select(IdempotencyKey.key)
+        .where(IdempotencyKey.expires_at < func.now())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    purged = 0
+    while True:
+        async with session_factory() as session:
+            deleted = (await session.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.key.in_(batch.scalar_subquery()))
+            )).rowcount
+            await session.commit()
+        purged += deleted
+        if deleted < batch_size:
+            return purged
+
+
+async def purge_periodically(interval: float, batch_size: int) -> None:
+    """Background task of each worker; keys are deleted with SKIP LOCKED,
+    so workers purging at the same time split the work.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            purged = await purge_expired_keys(batch_size=batch_size)
+            if purged:
+                logger.info(f"Purged {purged} expired idempotency keys")
+        except Exception as e:
+            logger.warning(f"Purging idempotency keys failed: {e}")
@@ -0,0 +1,259 @@
+# 1. Standard library imports
+import asyncio
+import logging
+import os
+import struct
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+# 3. Local application imports
+from config import settings
+
+logger = logging.getLogger("recipe_service")
+
+URL_PREFIX = "/images"
+
+CONTENT_TYPES = {
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+# Formats ``probe`` recognizes, i.e. that can be uploaded
+UPLOAD_FORMATS = ("jpeg", "png", "gif", "webp")
+
+# Encoder settings of the thumbnail formats (Pillow ``save`` arguments)
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "avif": {"format": "AVIF", "quality": 60},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+    "png": {"format": "PNG", "optimize": True},
+}
+
+
+class UnsupportedImage(Exception):
+    """Exception thrown when an upload is not an image this service accepts."""
+
+
+# ----------------------------------------------------------
+# Header probing: format and size without decoding
+# ----------------------------------------------------------
+@dataclass(frozen=True)
+class ImageInfo:
+    format: str
+    width: int
+    height: int
+
+
+# JPEG start-of-frame markers; C4, C8 and CC share the range but are not frames
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+             0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def probe(data: bytes) -> ImageInfo:
+    """Format and size of an image, read from its header.
+
+    Only the first bytes (JPEG: up to the frame header) are looked at, so
+    this is cheap enough for the request path and refuses decompression
+    bombs before any pixel is decoded.
+    """
+    try:
+        if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+            width, height = struct.unpack(">II", data[16:24])
+            return ImageInfo("png", width, height)
+        if data[:6] in (b"GIF87a", b"GIF89a"):
+            width, height = struct.unpack("<HH", data[6:10])
+            return ImageInfo("gif", width, height)
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            return _probe_webp(data)
+        if data[:2] == b"\xff\xd8":
+            return _probe_jpeg(data)
+    except (struct.error, IndexError) as e:
+        raise UnsupportedImage("Truncated image header") from e
+    raise UnsupportedImage("Only JPEG, PNG, GIF and WebP images are accepted")
+
+
+def _probe_webp(data: bytes) -> ImageInfo:
+    chunk = data[12:16]
+    if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", data[26:30])
+        return ImageInfo("webp", width & 0x3FFF, height & 0x3FFF)
+    if chunk == b"VP8L" and data[20] == 0x2F:
+        bits = int.from_bytes(data[21:25], "little")
+        return ImageInfo("webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return ImageInfo("webp", width, height)
+    raise UnsupportedImage("Unknown WebP encoding")
+
+
+def _probe_jpeg(data: bytes) -> ImageInfo:
+    i = 2
+    while True:
+        if data[i] != 0xFF:
+            raise UnsupportedImage("Corrupt JPEG segment")
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+        elif marker in _JPEG_SOF:
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return ImageInfo("jpeg", width, height)
+        elif marker == 0x01 or 0xD0 <= marker <= 0xD7:  # no length
+            i += 2
+        else:
+            (length,) = struct.unpack(">H", data[i + 2:i + 4])
+            i += 2 + length
+
+
+# ----------------------------------------------------------
+# Content-addressed storage
+# ----------------------------------------------------------
+def storage_root() -> Path:
+    return Path(settings.IMAGE_STORAGE_DIR)
+
+
+def original_path(digest: str, image_format: str) -> Path:
+    """``originals/ab/abcd....jpeg``: fanned out so no directory gets huge."""
+    return storage_root() / "originals" / digest[:2] / f"{digest}.{image_format}"
+
+
+def variant_path(digest: str, size: str, image_format: str) -> Path:
+    directory = storage_root() / "thumbnails" / digest[:2] / digest
+    return directory / f"{size}.{image_format}"
+
+
+def original_url(digest: str) -> str:
+    return f"{URL_PREFIX}/{digest}/original"
+
+
+def thumbnail_urls(digest: str) -> dict[str, str]:
+    """URL of each thumbnail size, in the preferred format.
+
+    Derived from the hash alone, so listings need no extra query; a
+    thumbnail that is not rendered yet redirects to the original.
+    """
+    image_format = settings.IMAGE_THUMBNAIL_FORMATS[0]
+    return {size: f"{URL_PREFIX}/{digest}/{size}.{image_format}"
+            for size in settings.IMAGE_THUMBNAIL_SIZES}
+
+
+def write_once(path: Path, data: bytes) -> None:
+    """Write a content-addressed file atomically; existing files are kept."""
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+        tmp.write(data)
+    os.replace(tmp.name, path)
+
+
+# ----------------------------------------------------------
+# Thumbnails, rendered in worker processes
+# ----------------------------------------------------------
+def render_thumbnails(
+        source: str,
+        targets: list[tuple[str, int, str]]
+) -> list[str]:
+    """Decode ``source`` once and write every ``(path, max_side, format)``.
+
+    Runs in a worker process. Sizes are rendered largest first, each one
+    scaled down from the previous, and JPEG sources are decoded at the
+    smallest DCT scale that still covers the largest size.
+    """
+    # Imported here: only the worker processes need Pillow
+    from PIL import Image, ImageOps
+
+    largest = max(side for _, side, _ in targets)
+    written = []
+    with Image.open(source) as opened:
+        opened.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(opened)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        for path, side, image_format in sorted(targets, key=lambda t: -t[1]):
+            image.thumbnail((side, side), Image.Resampling.LANCZOS)
+            frame = image
+            if image_format == "jpeg" and image.mode != "RGB":
+                frame = image.convert("RGB")
+            directory = Path(path).parent
+            directory.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=directory, delete=False) as tmp:
+                frame.save(tmp, **SAVE_OPTIONS[image_format])
+            os.replace(tmp.name, path)
+            written.append(path)
+    return written
+
+
+class ThumbnailPool:
+    """Process pool that renders thumbnails in the background.
+
+    Decoding, resizing and encoding are CPU-bound and only partly release
+    the GIL; in worker processes they cannot compete with the event loop
+    for it. Work is scheduled as
+    tasks of this worker and never awaited by a request. Workers are
+    spawned, not forked (the parent has threads and open connections),
+    and replaced every ``max_tasks_per_child`` images to return memory.
+    """
+
+    def __init__(self, workers: int = 2, max_tasks_per_child: int = 100):
+        self.workers = workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor = None
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def render(self, source: Path, targets: list[tuple[str, int, str]]):
+        if self._executor is None:
+            # Imported with the first thumbnail, not with the app
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=self.max_tasks_per_child
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, render_thumbnails, str(source), targets
+        )
+
+    def schedule(self, key: str, job: Callable[[], Awaitable[None]]) -> None:
+        """Run ``job`` in the background, once per ``key`` at a time."""
+        if key in self._tasks:
+            return
+        task = asyncio.create_task(self._run(key, job), name=f"thumbnails-{key[:12]}")
+        self._tasks[key] = task
+
+    async def _run(self, key: str, job: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await job()
+        except Exception:
+            logger.exception(f"Rendering thumbnails of {key} failed")
+        finally:
+            self._tasks.pop(key, None)
+
+    async def drain(self) -> None:
+        """Wait for the scheduled jobs (tests, shutdown)."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def shutdown(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_pool: ThumbnailPool | None = None
+
+
+def thumbnail_pool() -> ThumbnailPool:
+    """The thumbnail pool of this worker; processes start on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ThumbnailPool(settings.IMAGE_THUMBNAIL_WORKERS)
+    return _pool
@@ -0,0 +1,105 @@
+# 1. Standard library imports
+import logging
+import time
+
+# 2. Third-party imports
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# 3. Local application imports
+from config import settings
+from recipe_service.core.permissions import PermissionDenied
+
+logger = logging.getLogger("recipe_service")
+
+
+# ----------------------------------------------------------
+# Exception handlers
+# ----------------------------------------------------------
+async def sqlalchemy_error_handler(
+        request: Request,
+        exc: SQLAlchemyError
+) -> JSONResponse:
+    """Maps database errors that escaped the session dependency to HTTP 500,
+    or 503 when no pool connection freed up within ``pool_timeout``.
+    """
+    if isinstance(exc, PoolTimeoutError):
+        logger.warning(f"Connection pool exhausted on {request.method} {request.url}")
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server is busy, try again later"},
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+        )
+    logger.error(f"Database error on {request.method} {request.url}: {exc}")
+    return JSONResponse(
+        status_code=500,
+        content={"detail": "Internal database error"}
+    )
+
+
+async def permission_denied_handler(
+        request: Request,
+        exc: PermissionDenied
+) -> JSONResponse:
+    """Maps refused writes to HTTP 403, or 401 when nobody is signed in."""
+    if exc.user_id is None:
+        return JSONResponse(
+            status_code=401,
+            content={"detail": "Not authenticated"},
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return JSONResponse(status_code=403, content={"detail": str(exc)})
+
+
+# ----------------------------------------------------------
+# Pure ASGI middleware
+# ----------------------------------------------------------
+class ErrorTimingMiddleware:
+    """Times every request and turns unexpected errors into HTTP 500.
+
+    Unlike ``@app.middleware("http")`` this does not wrap the request in
+    BaseHTTPMiddleware, so there is no extra task or memory stream per
+    request and streaming bodies pass through untouched. The time to the
+    response headers is reported in ``X-Process-Time`` (seconds).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = f"{time.perf_counter() - start:.6f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            if response_started:
+                raise
+            logger.exception(
+                f"Unexpected error on {scope['method']} {scope['path']}: {e}"
+            )
+            response = JSONResponse(
+                status_code=500,
+                content={"detail": "Internal server error"}
+            )
+            await response(scope, receive, send_wrapper)
+        finally:
+            logger.debug(
+                f"{scope['method']} {scope['path']} took "
+                f"{(time.perf_counter() - start) * 1000:.2f} ms"
+            )
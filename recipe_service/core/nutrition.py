@@ -0,0 +1,104 @@
+# 1. Standard library imports
+import operator
+from array import array
+from itertools import repeat
+from typing import Iterable
+
+
+# ----------------------------------------------------------
+# Ingredient x nutrient matrix
+# ----------------------------------------------------------
+class NutritionMatrix:
+    """Dense ingredient x nutrient matrix, one row per ingredient.
+
+    Rows are stored back to back in a single ``array('d')``. A recipe is a
+    sparse vector of base-unit amounts (quantity x unit base factor) over
+    the ingredients; its nutrition is the product of that vector with the
+    matrix, computed as a sum of scaled rows. Ingredients without nutrient
+    data contribute nothing.
+
+    Every ingredient has a base dimension (mass, volume or count) and so
+    has every unit of a fixed size. A line whose unit has no dimension, or
+    another one than its ingredient (a cup of flour given per gram), cannot
+    be converted: it is left out and its ingredient reported as skipped.
+    """
+
+    def __init__(
+            self,
+            nutrients: list[tuple[int, str]],
+            units: dict[int, tuple[str | None, float | None]],
+            dimensions: dict[int, str],
+            amounts: Iterable[tuple[int, int, float]]
+    ):
+        self.nutrient_names = [name for _, name in nutrients]
+        self.units = units
+        self.dimensions = dimensions
+        columns = {
+            nutrient_id: column for column, (nutrient_id, _) in enumerate(nutrients)
+        }
+        width = self.width = len(nutrients)
+
+        self._rows: dict[int, int] = {}
+        self._values = array("d")
+        for ingredient_id, nutrient_id, amount in amounts:
+            row = self._rows.get(ingredient_id)
+            if row is None:
+                row = self._rows[ingredient_id] = len(self._rows)
+                self._values.extend(repeat(0.0, width))
+            self._values[row * width + columns[nutrient_id]] = amount
+
+    def base_amount(
+            self,
+            ingredient_id: int,
+            quantity: float,
+            unit_id: int | None
+    ) -> float | None:
+        """Quantity in base units, None if the unit does not convert."""
+        # Lines without a unit are already in base units
+        if not unit_id:
+            return quantity
+        dimension, factor = self.units.get(unit_id, (None, None))
+        if dimension is None or dimension != self.dimensions.get(ingredient_id):
+            return None
+        return quantity * factor
+
+    def product(
+            self,
+            lines: Iterable[tuple[int, float, int | None]]
+    ) -> tuple[tuple[float, ...], tuple[int, ...]]:
+        """Nutrients of ``(ingredient_id, quantity, unit_id)`` lines.
+
+        Returns the totals and the ingredients of the lines left out.
+        """
+        width = self.width
+        totals = [0.0] * width
+        skipped = []
+        for ingredient_id, quantity, unit_id in lines:
+            row = self._rows.get(ingredient_id)
+            if row is None:
+                continue
+            amount = self.base_amount(ingredient_id, quantity, unit_id)
+            if amount is None:
+                skipped.append(ingredient_id)
+                continue
+            start = row * width
+            totals = list(map(operator.add, totals, map(
+                operator.mul, self._values[start:start + width], repeat(amount)
+            )))
+        return tuple(totals), tuple(skipped)
+
+    def combine(
+            self,
+            vectors: Iterable[tuple[tuple[float, ...], float]]
+    ) -> tuple[float, ...]:
+        """Weighted sum of per-recipe nutrients, e.g. a meal plan."""
+        totals = [0.0] * self.width
+        for vector, weight in vectors:
+            totals = list(map(operator.add, totals, map(
+                operator.mul, vector, repeat(weight)
+            )))
+        return tuple(totals)
+
+    def named(self, vector: tuple[float, ...]) -> dict[str, float]:
+        return {name: round(value, 3)
+                for name, value in zip(self.nutrient_names, vector, strict=True)}
@@ -0,0 +1,178 @@
+# 1. Standard library imports
+import asyncio
+from collections import OrderedDict
+from typing import Iterable
+
+# 3. Local application imports
+from config import settings
+from recipe_service.core.cache import register_local_cache
+
+
+# ----------------------------------------------------------
+# Per-user matching state
+# ----------------------------------------------------------
+class PantryState:
+    """Missing ingredient count of every recipe that shares an ingredient
+    with the pantry, plus the recipes of each count up to ``max_missing``.
+    """
+
+    def __init__(self, max_missing: int):
+        self.ingredients: set[int] = set()
+        self.missing: dict[int, int] = {}
+        self.by_missing: list[set[int]] = [set() for _ in range(max_missing + 1)]
+
+    def move(self, recipe_id: int, old: int | None, new: int | None) -> None:
+        """Change a recipe's count; ``None`` means it shares nothing with the pantry."""
+        if old is not None and old < len(self.by_missing):
+            self.by_missing[old].discard(recipe_id)
+        if new is None:
+            self.missing.pop(recipe_id, None)
+            return
+        self.missing[recipe_id] = new
+        if new < len(self.by_missing):
+            self.by_missing[new].add(recipe_id)
+
+
+# ----------------------------------------------------------
+# Matcher
+# ----------------------------------------------------------
+class PantryMatcher:
+    """Per-worker "cookable now" matching of pantries against recipes.
+
+    Keeps the catalogue as ingredient -> recipes postings and, for the most
+    recently used pantries, the missing count of every recipe that shares
+    an ingredient with them. Adding or removing a pantry item only visits
+    the recipes containing that ingredient, instead of re-running the
+    GROUP BY/HAVING of ``search_recipes`` over the whole pantry.
+
+    The matcher is registered as a local cache. Changes mark recipes and
+    pantries stale (``pantry_items`` changes carry the user id as row id);
+    ``PantryService`` reloads them before the next match and applies the
+    difference, so a pantry change costs the same on every worker.
+    """
+
+    def __init__(self, max_missing: int = 3, max_users: int = 1000):
+        self.max_missing = max_missing
+        self.max_users = max_users
+        self.recipe_ingredients: dict[int, frozenset[int]] = {}
+        self.recipes_by_ingredient: dict[int, set[int]] = {}
+        self.pantries: OrderedDict[int, PantryState] = OrderedDict()
+        self.loaded = False
+        self.stale_recipes: set[int] = set()
+        self.stale_users: set[int] = set()
+        self.lock = asyncio.Lock()
+
+    # Catalogue
+    def set_recipe(self, recipe_id: int, ingredient_ids: Iterable[int]) -> None:
+        """Add, replace or (with no ingredients) remove a recipe."""
+        old = self.recipe_ingredients.get(recipe_id, frozenset())
+        new = frozenset(ingredient_ids)
+        if new == old:
+            return
+        for ingredient_id in old - new:
+            postings = self.recipes_by_ingredient[ingredient_id]
+            postings.discard(recipe_id)
+            if not postings:
+                del self.recipes_by_ingredient[ingredient_id]
+        for ingredient_id in new - old:
+            self.recipes_by_ingredient.setdefault(ingredient_id, set()).add(recipe_id)
+        if new:
+            self.recipe_ingredients[recipe_id] = new
+        else:
+            self.recipe_ingredients.pop(recipe_id, None)
+
+        for state in self.pantries.values():
+            shared = len(new & state.ingredients)
+            state.move(recipe_id, state.missing.get(recipe_id),
+                       len(new) - shared if shared else None)
+
+    # Pantries
+    def has_pantry(self, user_id: int) -> bool:
+        """Whether the user's state is loaded and no change is pending."""
+        return user_id in self.pantries and user_id not in self.stale_users
+
+    def set_pantry(self, user_id: int, ingredient_ids: Iterable[int]) -> PantryState:
+        """Bring a pantry up to date by adding and removing only the difference."""
+        state = self.pantries.get(user_id)
+        if state is None:
+            state = self.pantries[user_id] = PantryState(self.max_missing)
+            while len(self.pantries) > self.max_users:
+                self.pantries.popitem(last=False)
+        self.pantries.move_to_end(user_id)
+
+        ingredient_ids = set(ingredient_ids)
+        for ingredient_id in state.ingredients - ingredient_ids:
+            self.remove_item(state, ingredient_id)
+        for ingredient_id in ingredient_ids - state.ingredients:
+            self.add_item(state, ingredient_id)
+        return state
+
+    def add_item(self, state: PantryState, ingredient_id: int) -> None:
+        state.ingredients.add(ingredient_id)
+        for recipe_id in self.recipes_by_ingredient.get(ingredient_id, ()):
+            old = state.missing.get(recipe_id)
+            size = len(self.recipe_ingredients[recipe_id])
+            state.move(recipe_id, old, (size if old is None else old) - 1)
+
+    def remove_item(self, state: PantryState, ingredient_id: int) -> None:
+        state.ingredients.discard(ingredient_id)
+        for recipe_id in self.recipes_by_ingredient.get(ingredient_id, ()):
+            old = state.missing[recipe_id]
+            size = len(self.recipe_ingredients[recipe_id])
+            state.move(recipe_id, old, old + 1 if old + 1 < size else None)
+
+    def matches(
+            self,
+            user_id: int,
+            max_missing: int,
+            limit: int
+    ) -> list[tuple[int, list[int]]]:
+        """Recipes missing at most ``max_missing`` ingredients, fewest first,
+        with the ingredient ids they miss.
+        """
+        state = self.pantries[user_id]
+        found = []
+        for count in range(min(max_missing, self.max_missing) + 1):
+            for recipe_id in sorted(state.by_missing[count]):
+                if len(found) == limit:
+                    return found
+                missing = sorted(self.recipe_ingredients[recipe_id] - state.ingredients)
+                found.append((recipe_id, missing))
+        return found
+
+    # Local cache protocol (see recipe_service.core.cache)
+    def invalidate(self, table: str, row_id: int | None = None) -> None:
+        if row_id is None:
+            if table in ("recipes", "ingredients", "pantry_items"):
+                self.clear()
+        elif table == "recipes":
+            self.stale_recipes.add(row_id)
+        elif table == "pantry_items":
+            self.stale_users.add(row_id)
+        elif table == "ingredients":
+            # A deleted ingredient cascades to recipe lines and pantry items
+            self.stale_recipes.update(self.recipes_by_ingredient.get(row_id, ()))
+            self.stale_users.update(user_id for user_id, state in self.pantries.items()
+                                    if row_id in state.ingredients)
+
+    def clear(self) -> None:
+        self.recipe_ingredients.clear()
+        self.recipes_by_ingredient.clear()
+        self.pantries.clear()
+        self.stale_recipes.clear()
+        self.stale_users.clear()
+        self.loaded = False
+
+
+_matcher: PantryMatcher | None = None
+
+
+def pantry_matcher() -> PantryMatcher:
+    """The matcher of this worker, created (empty) on first use."""
+    global _matcher
+    if _matcher is None:
+        _matcher = PantryMatcher(
+            settings.PANTRY_MAX_MISSING, settings.PANTRY_CACHED_USERS
+        )
+        register_local_cache("pantry_matcher", _matcher)
+    return _matcher
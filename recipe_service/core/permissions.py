@@ -0,0 +1,142 @@
+# 1. Standard library imports
+import time
+from collections import OrderedDict
+
+# 2. Third-party imports
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# 3. Local application imports
+from common.permissions import (
+    DEFAULT_PERMISSIONS,
+    NO_PERMISSIONS,
+    Permission,
+    groups,
+    user_groups
+)
+from config import settings
+from recipe_service.core.cache import register_local_cache
+
+
+def anonymous_permissions() -> Permission:
+    """Rights of a request without a signed-in user.
+
+    Anonymous recipes have no author, so there is nothing of their own to
+    edit or delete; creating them can be switched off too.
+    """
+    if settings.RECIPE_WRITES_REQUIRE_AUTH:
+        return NO_PERMISSIONS
+    return Permission.RECIPE_CREATE
+
+
+class PermissionDenied(Exception):
+    """Exception thrown when the acting user may not perform a write."""
+    def __init__(self, user_id: int | None, allowed: Permission):
+        self.user_id = user_id
+        self.allowed = allowed
+        who = "Anonymous user" if user_id is None else f"User {user_id}"
+        super().__init__(f"{who} needs one of: {allowed.name}")
+
+
+# ----------------------------------------------------------
+# Per-worker resolver
+# ----------------------------------------------------------
+class PermissionResolver:
+    """Effective permissions of each user, resolved once per worker.
+
+    A user's groups are read with one query and folded into two ints: the
+    OR of their groups' permission bits, and a membership bitset over the
+    worker's group index (bit n = n-th group seen). An authorization check
+    is then ``granted & allowed`` instead of a ``user_groups`` join per
+    write.
+
+    Entries are dropped through the change feed: a ``user_groups`` change
+    (row id = user id) drops that user, a ``groups`` change drops every
+    user whose membership bitset has the group's bit. ``ttl`` bounds
+    staleness should a notification be lost.
+    """
+
+    WATCHED_TABLES = ("user_groups", "groups")
+
+    def __init__(self, max_users: int = 100_000, ttl: float = 300.0):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._group_bits: dict[int, int] = {}
+        self._users: OrderedDict[int, tuple[int, Permission, float]] = OrderedDict()
+        # Bumped by every invalidation; a load that overlapped one is not kept
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def permissions(self, session: AsyncSession, user_id: int) -> Permission:
+        entry = self._users.get(user_id)
+        if entry is not None and entry[2] > time.monotonic():
+            self._users.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        generation = self._generation
+        rows = (await session.execute(
+            select(user_groups.c.group_id, groups.c.permissions)
+            .join(groups, groups.c.id == user_groups.c.group_id)
+            .where(user_groups.c.user_id == user_id)
+        )).all()
+        members, granted = 0, DEFAULT_PERMISSIONS
+        for group_id, group_permissions in rows:
+            members |= 1 << self._bit(group_id)
+            granted |= group_permissions
+        granted = Permission(granted)
+
+        if generation == self._generation:
+            self._users[user_id] = (members, granted, time.monotonic() + self.ttl)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return granted
+
+    def members_of(self, group_id: int) -> list[int]:
+        """Cached users that belong to the group."""
+        bit = self._group_bits.get(group_id)
+        if bit is None:
+            return []
+        mask = 1 << bit
+        return [user_id for user_id, (members, _, _) in self._users.items()
+                if members & mask]
+
+    def _bit(self, group_id: int) -> int:
+        return self._group_bits.setdefault(group_id, len(self._group_bits))
+
+    # Local cache protocol (see recipe_service.core.cache)
+    def invalidate(self, table: str, row_id: int | None = None) -> None:
+        if table not in self.WATCHED_TABLES:
+            return
+        self._generation += 1
+        if row_id is None:
+            self._users.clear()
+        elif table == "user_groups":
+            self._users.pop(row_id, None)
+        else:
+            for user_id in self.members_of(row_id):
+                del self._users[user_id]
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._users.clear()
+        self._group_bits.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_resolver: PermissionResolver | None = None
+
+
+def permission_resolver() -> PermissionResolver:
+    """The resolver of this worker, created (empty) on first use."""
+    global _resolver
+    if _resolver is None:
+        _resolver = PermissionResolver(
+            settings.PERMISSION_CACHE_SIZE, settings.PERMISSION_CACHE_SECONDS
+        )
+        register_local_cache("permissions", _resolver)
+    return _resolver
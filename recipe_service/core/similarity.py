@@ -0,0 +1,162 @@
+# 1. Standard library imports
+import asyncio
+import random
+from typing import Iterable
+
+# 3. Local application imports
+from config import settings
+from recipe_service.core.cache import register_local_cache
+
+# Mersenne prime 2**61 - 1 for the universal hashes (a * x + b) mod p
+PRIME = (1 << 61) - 1
+# Memoized query results per worker
+MAX_RESULTS = 10_000
+
+
+# ----------------------------------------------------------
+# MinHash signatures with LSH buckets
+# ----------------------------------------------------------
+class MinHashLSH:
+    """Per-worker index of recipes by the MinHash of their ingredient sets.
+
+    Two signatures agree in a position with probability equal to the
+    Jaccard similarity of the sets, so the share of equal positions
+    estimates it. Only the lowest byte of every minimum is kept (b-bit
+    MinHash): a signature is a ``bytes`` object, and comparing two is one
+    XOR of big integers plus counting the zero bytes, corrected for the
+    1/256 chance of equal bytes by accident.
+
+    Signatures are cut into ``bands`` of ``num_perm / bands`` rows and every
+    band is a bucket key: only recipes sharing at least one bucket are
+    compared, instead of every pair. Results are memoized until the next
+    change to the index, since buckets of staple ingredients can hold a
+    large share of all recipes.
+
+    The index is registered as a local cache. A change of a recipe marks it
+    stale and ``RecipeService`` reloads just the stale recipes before the
+    next query; ``clear`` drops everything for a full reload.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._coefficients = [(rng.randrange(1, PRIME), rng.randrange(PRIME))
+                              for _ in range(num_perm)]
+        self._ingredient_hashes: dict[int, tuple[int, ...]] = {}
+        self.signatures: dict[int, bytes] = {}
+        self._buckets: list[dict[bytes, set[int]]] = [{} for _ in range(bands)]
+        self.loaded = False
+        self._results: dict[tuple[int, int], list[tuple[int, float]]] = {}
+        self.stale: set[int] = set()
+        self.lock = asyncio.Lock()
+
+    def _hashes(self, ingredient_id: int) -> tuple[int, ...]:
+        hashes = self._ingredient_hashes.get(ingredient_id)
+        if hashes is None:
+            hashes = tuple(
+                (a * ingredient_id + b) % PRIME for a, b in self._coefficients
+            )
+            self._ingredient_hashes[ingredient_id] = hashes
+        return hashes
+
+    def signature(self, ingredient_ids: Iterable[int]) -> bytes | None:
+        hashes = [self._hashes(i) for i in ingredient_ids]
+        if not hashes:
+            return None
+        # Position-wise minimum over the ingredients' hash vectors
+        minima = map(min, *hashes) if len(hashes) > 1 else hashes[0]
+        return bytes(value & 0xFF for value in minima)
+
+    def _band_keys(self, signature: bytes):
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows]
+
+    def upsert(self, recipe_id: int, ingredient_ids: Iterable[int]) -> None:
+        self.remove(recipe_id)
+        self._results.clear()
+        signature = self.signature(ingredient_ids)
+        if signature is None:
+            return
+        self.signatures[recipe_id] = signature
+        for band, key in self._band_keys(signature):
+            self._buckets[band].setdefault(key, set()).add(recipe_id)
+
+    def remove(self, recipe_id: int) -> None:
+        signature = self.signatures.pop(recipe_id, None)
+        if signature is None:
+            return
+        self._results.clear()
+        for band, key in self._band_keys(signature):
+            bucket = self._buckets[band][key]
+            bucket.discard(recipe_id)
+            if not bucket:
+                del self._buckets[band][key]
+
+    def _estimate(self, equal_bytes: int) -> float:
+        # Unrelated minima still share their lowest byte 1 time in 256
+        share = equal_bytes / self.num_perm
+        return max((share - 1 / 256) / (1 - 1 / 256), 0.0)
+
+    def query(self, recipe_id: int, k: int) -> list[tuple[int, float]]:
+        """Top ``k`` other recipes by estimated Jaccard similarity."""
+        result = self._results.get((recipe_id, k))
+        if result is None:
+            result = self._query(recipe_id, k)
+            if len(self._results) >= MAX_RESULTS:
+                del self._results[next(iter(self._results))]
+            self._results[(recipe_id, k)] = result
+        return result
+
+    def _query(self, recipe_id: int, k: int) -> list[tuple[int, float]]:
+        signature = self.signatures.get(recipe_id)
+        if signature is None:
+            return []
+        candidates = set().union(*(
+            self._buckets[band][key] for band, key in self._band_keys(signature)
+        ))
+        candidates.discard(recipe_id)
+
+        size = self.num_perm
+        value = int.from_bytes(signature)
+        signatures = self.signatures
+        equal = [
+            ((value ^ int.from_bytes(signatures[candidate])).to_bytes(size).count(0),
+             candidate)
+            for candidate in candidates
+        ]
+        top = sorted(equal, key=lambda item: (-item[0], item[1]))[:k]
+        return [(candidate, self._estimate(count)) for count, candidate in top]
+
+    # Local cache protocol (see recipe_service.core.cache)
+    def invalidate(self, table: str, row_id: int | None = None) -> None:
+        if table != "recipes":
+            return
+        if row_id is None:
+            self.clear()
+        else:
+            self.stale.add(row_id)
+
+    def clear(self) -> None:
+        self.signatures.clear()
+        self._results.clear()
+        for buckets in self._buckets:
+            buckets.clear()
+        self.stale.clear()
+        self.loaded = False
+
+
+_index: MinHashLSH | None = None
+
+
+def similarity_index() -> MinHashLSH:
+    """The index of this worker, created (empty) on first use."""
+    global _index
+    if _index is None:
+        _index = MinHashLSH(settings.SIMILARITY_NUM_PERM, settings.SIMILARITY_BANDS)
+        register_local_cache("recipe_similarity", _index)
+    return _index
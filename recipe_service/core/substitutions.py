@@ -0,0 +1,149 @@
+# 1. Standard library imports
+import asyncio
+from typing import Iterable, NamedTuple
+
+# 3. Local application imports
+from config import settings
+from recipe_service.core.cache import register_local_cache
+
+
+class Substitute(NamedTuple):
+    """Best chain to a substitute: product of the edge weights and the
+    ingredients passed through, ending with the substitute itself.
+    """
+    weight: float
+    path: tuple[int, ...]
+
+
+# ----------------------------------------------------------
+# Substitution graph
+# ----------------------------------------------------------
+class SubstitutionGraph:
+    """Per-worker directed graph of ingredient substitutes with its closure.
+
+    An edge ``a -> b`` with weight ``w`` means ``b`` can replace ``a``; a
+    chain ``a -> b -> c`` replaces ``a`` with ``c`` at the product of its
+    weights. For every ingredient the graph keeps the best chain to each
+    substitute reachable in at most ``max_depth`` steps with a weight of at
+    least ``min_weight``, so a search only looks the closure up.
+
+    Changing the edges of an ingredient recomputes just its own closure and
+    those of the ingredients whose closure passes through it. The graph is
+    registered as a local cache: changes mark ingredients stale and the
+    next reader reloads their edges (see ``IngredientService``).
+    """
+
+    def __init__(self, max_depth: int = 3, min_weight: float = 0.5):
+        self.max_depth = max_depth
+        self.min_weight = min_weight
+        self.edges: dict[int, dict[int, float]] = {}
+        self.incoming: dict[int, set[int]] = {}
+        self.closures: dict[int, dict[int, Substitute]] = {}
+        self.reached_by: dict[int, set[int]] = {}
+        self.loaded = False
+        self.stale: set[int] = set()
+        self.lock = asyncio.Lock()
+
+    def set_edges(self, edges_by_ingredient: dict[int, dict[int, float]]) -> None:
+        """Replace the outgoing edges of some ingredients (empty removes them)."""
+        affected = set()
+        for ingredient_id, edges in edges_by_ingredient.items():
+            for substitute_id in self.edges.pop(ingredient_id, {}):
+                _discard(self.incoming, substitute_id, ingredient_id)
+            if edges:
+                self.edges[ingredient_id] = dict(edges)
+                for substitute_id in edges:
+                    self.incoming.setdefault(substitute_id, set()).add(ingredient_id)
+            affected.add(ingredient_id)
+            affected.update(self.reached_by.get(ingredient_id, ()))
+        for ingredient_id in affected:
+            self._close(ingredient_id)
+
+    def _close(self, source: int) -> None:
+        """Recompute the closure of one ingredient, a depth-limited search
+        keeping the heaviest chain to every substitute.
+        """
+        for substitute_id in self.closures.pop(source, {}):
+            _discard(self.reached_by, substitute_id, source)
+
+        best: dict[int, Substitute] = {}
+        frontier = {source: Substitute(1.0, ())}
+        for _ in range(self.max_depth):
+            next_frontier = {}
+            for node, chain in frontier.items():
+                for substitute_id, edge_weight in self.edges.get(node, {}).items():
+                    weight = chain.weight * edge_weight
+                    if substitute_id == source or weight < self.min_weight:
+                        continue
+                    current = best.get(substitute_id)
+                    if current is None or weight > current.weight:
+                        best[substitute_id] = next_frontier[substitute_id] = Substitute(
+                            weight, chain.path + (substitute_id,)
+                        )
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        if best:
+            self.closures[source] = best
+            for substitute_id in best:
+                self.reached_by.setdefault(substitute_id, set()).add(source)
+
+    def substitutes(self, ingredient_id: int) -> dict[int, Substitute]:
+        return self.closures.get(ingredient_id, {})
+
+    def options(
+            self,
+            ingredient_ids: Iterable[int]
+    ) -> dict[int, dict[int, Substitute]]:
+        """Every ingredient that can stand in for each of ``ingredient_ids``,
+        the ingredient itself included at weight 1.
+        """
+        return {
+            ingredient_id: {
+                ingredient_id: Substitute(1.0, ()), **self.substitutes(ingredient_id)
+            }
+            for ingredient_id in ingredient_ids
+        }
+
+    # Local cache protocol (see recipe_service.core.cache)
+    def invalidate(self, table: str, row_id: int | None = None) -> None:
+        if row_id is None:
+            if table in ("ingredients", "ingredient_substitutions"):
+                self.clear()
+        elif table == "ingredient_substitutions":
+            self.stale.add(row_id)
+        elif table == "ingredients":
+            # A deleted ingredient cascades to its edges in both directions
+            self.stale.add(row_id)
+            self.stale.update(self.incoming.get(row_id, ()))
+
+    def clear(self) -> None:
+        self.edges.clear()
+        self.incoming.clear()
+        self.closures.clear()
+        self.reached_by.clear()
+        self.stale.clear()
+        self.loaded = False
+
+
+def _discard(index: dict[int, set[int]], key: int, value: int) -> None:
+    values = index.get(key)
+    if values is not None:
+        values.discard(value)
+        if not values:
+            del index[key]
+
+
+_graph: SubstitutionGraph | None = None
+
+
+def substitution_graph() -> SubstitutionGraph:
+    """The graph of this worker, created (empty) on first use."""
+    global _graph
+    if _graph is None:
+        _graph = SubstitutionGraph(
+            settings.SUBSTITUTION_MAX_DEPTH, settings.SUBSTITUTION_MIN_WEIGHT
+        )
+        register_local_cache("ingredient_substitutions", _graph)
+    return _graph
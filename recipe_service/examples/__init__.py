@@ -0,0 +1,47 @@
+from collections.abc import Mapping
+from importlib import import_module
+
+
+# ----------------------------------------------------------
+# Lazily loaded OpenAPI examples
+# ----------------------------------------------------------
+class _LazyExample(Mapping):
+    """``openapi_extra`` of one route, read from its module on first access.
+
+    FastAPI only iterates ``openapi_extra`` while generating the schema, so
+    the example dictionaries are not built at import time.
+    """
+
+    def __init__(self, module: str, key: str):
+        self._module = module
+        self._key = key
+
+    def _value(self) -> dict:
+        examples = getattr(import_module(f"{__name__}.{self._module}"), self._module)
+        return examples[self._key]
+
+    def __getitem__(self, item):
+        return self._value()[item]
+
+    def __iter__(self):
+        return iter(self._value())
+
+    def __len__(self):
+        return len(self._value())
+
+
+class _LazyExamples:
+    def __init__(self, module: str):
+        self._module = module
+
+    def __getitem__(self, key: str) -> _LazyExample:
+        return _LazyExample(self._module, key)
+
+
+def lazy_examples(module: str) -> _LazyExamples:
+    """Stand-in for the examples dictionary defined in ``module``.
+
+    ``lazy_examples("recipe_examples")["create"]`` can be passed as
+    ``openapi_extra`` just like ``recipe_examples["create"]``.
+    """
+    return _LazyExamples(module)
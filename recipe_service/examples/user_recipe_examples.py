@@ -0,0 +1,56 @@
+user_recipe_examples = {
+    "create": {
+        "requestBody": {
+            "description": "Fork a base recipe (ingredients are inherited, not copied)",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "base_recipe_id": 1,
+                        "user_id": 1,
+                        "title": "My spicy version",
+                        "description": "Less cheese, more pepper",
+                        "instructions": "Cook as usual",
+                        "cooking_time_in_minutes": 35
+                    }
+                }
+            }
+        }
+    },
+
+    "get_one": {
+        "responses": {
+            200: {
+                "description": "User recipe with its effective ingredients",
+                "content": {
+                    "application/json": {
+                        "example": {
+                            "id": 1,
+                            "base_recipe_id": 1,
+                            "user_id": 1,
+                            "updated_at": "2025-10-21T12:00:00Z",
+                            "cooking_time_in_minutes": 35,
+                            "title": "My spicy version",
+                            "description": "Less cheese, more pepper",
+                            "instructions": "Cook as usual",
+                            "ingredients": [
+                                {"ingredient_id": 1, "quantity": 50, "unit_id": 1},
+                                {"ingredient_id": 4, "quantity": 5, "unit_id": 1}
+                            ]
+                        }
+                    }
+                }
+            }
+        }
+    },
+
+    "set_ingredient": {
+        "requestBody": {
+            "description": "Add or change one ingredient line of the user recipe",
+            "content": {
+                "application/json": {
+                    "example": {"quantity": 50, "unit_id": 1}
+                }
+            }
+        }
+    }
+}
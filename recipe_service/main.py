@@ -1,11 +1,78 @@
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
 from sqlalchemy.exc import SQLAlchemyError
-import uvicorn
 
+from common.tokens import token_signer
+from config import settings
+from database import pool_usage
+from recipe_service.core.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    default_lanes
+)
+from recipe_service.core.change_feed import (
+    ChangeFeedListener,
+    purge_change_log_periodically
+)
+from recipe_service.core.compression import CompressionMiddleware
+from recipe_service.core.idempotency import IdempotencyMiddleware, purge_periodically
+from recipe_service.core.images import thumbnail_pool
+from recipe_service.core.middleware import (
+    ErrorTimingMiddleware,
+    permission_denied_handler,
+    sqlalchemy_error_handler
+)
+from recipe_service.core.permissions import PermissionDenied
+from recipe_service.routers.images import image_router
 from recipe_service.routers.ingredients import category_router, ingredient_router
-from recipe_service.core.dependencies import logger
-from recipe_service.routers.recipes import recipe_router
+from recipe_service.routers.nutrition import nutrition_router
+from recipe_service.routers.pantry import pantry_router
+from recipe_service.routers.recipes import recipe_router, user_recipe_router
+from recipe_service.routers.sync import sync_router
+from recipe_service.routers.system import change_feed_router
+from recipe_service.services.image_service import resume_thumbnails
+
+
+# ----------------------------------------------------------
+# Lifespan: per-worker change feed listener, cleanup of the
+# change log and expired idempotency keys, the thumbnail process pool
+# ----------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fail at startup, not on the first request that carries a token
+    token_signer()
+    listener = None
+    if settings.CHANGE_FEED_ENABLED:
+        listener = ChangeFeedListener(
+            settings.database_dsn,
+            poll_interval=settings.CHANGE_FEED_POLL_SECONDS
+        )
+        listener.start()
+    app.state.change_feed = listener
+    purge_changes = asyncio.create_task(purge_change_log_periodically(
+        settings.CHANGE_LOG_CLEANUP_INTERVAL_SECONDS,
+        settings.CHANGE_LOG_RETENTION_SECONDS,
+        settings.CHANGE_LOG_CLEANUP_BATCH_SIZE
+    ), name="change-log-purge")
+    purge = None
+    if settings.IDEMPOTENCY_ENABLED:
+        purge = asyncio.create_task(purge_periodically(
+            settings.IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS,
+            settings.IDEMPOTENCY_CLEANUP_BATCH_SIZE
+        ), name="idempotency-key-purge")
+    # Thumbnails whose rendering a restart cut short
+    resume = asyncio.create_task(resume_thumbnails(), name="thumbnails-resume")
+    yield
+    resume.cancel()
+    thumbnail_pool().shutdown()
+    if purge is not None:
+        purge.cancel()
+    purge_changes.cancel()
+    if listener is not None:
+        await listener.stop()
+
 
 # ----------------------------------------------------------
 # Initializing the Application
@@ -13,40 +80,76 @@ from recipe_service.routers.recipes import recipe_router
 app = FastAPI(
     title="Recipe Service API",
     description="API for managing recipes and ingredients",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 
 # ----------------------------------------------------------
-# SQLAlchemy Global Error Interception Middleware
+# Idempotency-Key support: innermost, so stored responses are
+# uncompressed and replays are timed and compressed like the rest
 # ----------------------------------------------------------
-@app.middleware("http")
-async def db_error_middleware(request: Request, call_next):
-    try:
-        response = await call_next(request)
-        return response
-    except HTTPException:
-        raise
-    except SQLAlchemyError as e:
-        logger.error(f"Database error on {request.method} {request.url}: {e}")
-        return JSONResponse(
-            status_code=500,
-            content={"detail": "Internal database error"}
-        )
-    except Exception as e:
-        logger.exception(f"Unexpected error on {request.method} {request.url}: {e}")
-        return JSONResponse(
-            status_code=500,
-            content={"detail": "Internal server error"}
-        )
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(
+        IdempotencyMiddleware,
+        ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+        lock_timeout=settings.IDEMPOTENCY_LOCK_SECONDS,
+        wait_timeout=settings.IDEMPOTENCY_WAIT_SECONDS,
+        max_body=settings.IDEMPOTENCY_MAX_BODY_BYTES
+    )
+
+
+# ----------------------------------------------------------
+# SQLAlchemy error mapping and request timing
+# ----------------------------------------------------------
+# SQLAlchemy errors and refused writes are mapped by exception handlers,
+# anything else that escapes a route is turned into a 500 by the pure ASGI
+# ErrorTimingMiddleware.
+app.add_exception_handler(SQLAlchemyError, sqlalchemy_error_handler)
+app.add_exception_handler(PermissionDenied, permission_denied_handler)
+app.add_middleware(ErrorTimingMiddleware)
+
+
+# ----------------------------------------------------------
+# Response compression (gzip, plus brotli/zstd when installed)
+# ----------------------------------------------------------
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    zstd_level=settings.COMPRESSION_ZSTD_LEVEL
+)
+
+
+# ----------------------------------------------------------
+# Admission control: added last, so it runs first and sheds
+# excess requests before any other work is done for them
+# ----------------------------------------------------------
+app.state.admission = None
+if settings.ADMISSION_ENABLED:
+    app.state.admission = AdmissionController(
+        default_lanes(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW),
+        pool_usage,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS
+    )
+    app.add_middleware(AdmissionMiddleware, controller=app.state.admission)
 
 app.include_router(category_router.router, tags=["Categories"])
 app.include_router(ingredient_router.router, tags=["Ingredients"])
 app.include_router(recipe_router.router, tags=["Recipes"])
+app.include_router(user_recipe_router.router, tags=["User Recipes"])
+app.include_router(pantry_router.router, tags=["Pantry"])
+app.include_router(nutrition_router.router, tags=["Nutrition"])
+app.include_router(sync_router.router, tags=["Sync"])
+app.include_router(change_feed_router.router, tags=["System"])
+app.include_router(image_router.router, tags=["Images"])
 
 
 # ----------------------------------------------------------
 # Entrypoint (dev only)
 # ----------------------------------------------------------
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("recipe_service.main:app", reload=True)
@@ -1,8 +1,15 @@
 from .ingredients_models import (
     Ingredient,
     Category,
-    IngredientCategory
+    CategoryClosure,
+    IngredientCategory,
+    IngredientSubstitution
 )
+from .changes_models import ChangeLog, ChangeLogHorizon
+from .idempotency_models import IdempotencyKey
+from .image_models import StoredImage
+from .nutrition_models import IngredientNutrient, Nutrient
+from .pantry_models import PantryItem
 from .recipes_models import (
     Recipe,
     RecipeIngredient,
@@ -14,10 +21,19 @@ from .recipes_models import (
 __all__ = [
     "Ingredient",
     "Category",
+    "CategoryClosure",
     "IngredientCategory",
+    "IngredientSubstitution",
     "Recipe",
     "RecipeIngredient",
     "UserRecipe",
     "UserRecipeIngredient",
-    "Unit"
+    "Unit",
+    "ChangeLog",
+    "ChangeLogHorizon",
+    "IdempotencyKey",
+    "StoredImage",
+    "Nutrient",
+    "IngredientNutrient",
+    "PantryItem"
 ]
@@ -0,0 +1,56 @@
+from sqlalchemy import (
+    Column, BigInteger, Boolean, CheckConstraint, Index, String, TIMESTAMP, func,
+    text, true
+)
+from db_base import Base
+
+
+class ChangeLog(Base):
+    """Outbox of catalogue changes, one row per changed entity.
+
+    Rows are written in the same transaction as the change itself and
+    announced with ``pg_notify``; the monotonically increasing ``id`` lets
+    listeners recover notifications they missed. Past the retention period
+    only the latest change of each live row is kept (see
+    ``change_feed.purge_change_log``).
+    """
+    __tablename__ = "change_log"
+    __table_args__ = (
+        # Newer changes of the same row, for the retention job
+        Index("ix_change_log_table_name_row_id", "table_name", "row_id", "id"),
+        {"schema": "recipes"}
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    row_id = Column(BigInteger, nullable=False)
+    # I(nsert), U(pdate) or D(elete)
+    op = Column(String(1), nullable=False)
+    changed_at = Column(
+        TIMESTAMP(timezone=True),
+        server_default=func.clock_timestamp(),
+        nullable=False
+    )
+
+    def __repr__(self):
+        return (f"<ChangeLog(id={self.id}, table_name={self.table_name!r}, "
+                f"row_id={self.row_id}, op={self.op!r})>")
+
+
+class ChangeLogHorizon(Base):
+    """Single row: the highest purged delete of ``change_log``.
+
+    A sync cursor below it may have missed that delete and needs a full
+    resync.
+    """
+    __tablename__ = "change_log_horizon"
+    __table_args__ = (
+        CheckConstraint("id", name="ck_change_log_horizon_single_row"),
+        {"schema": "recipes"}
+    )
+
+    id = Column(Boolean, primary_key=True, default=True, server_default=true())
+    purged_through = Column(BigInteger, nullable=False, server_default=text("0"))
+
+    def __repr__(self):
+        return f"<ChangeLogHorizon(purged_through={self.purged_through})>"
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Index, LargeBinary, SmallInteger, String, TIMESTAMP, func
+from db_base import Base
+
+
+class IdempotencyKey(Base):
+    """Response stored for a client's ``Idempotency-Key``.
+
+    A row is claimed with a NULL ``status_code`` while the first request
+    runs and holds its response afterwards; ``expires_at`` is the lease of
+    the claim, then the time the stored response is kept until.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Batch cleanup of expired keys
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+        {"schema": "recipes"}
+    )
+
+    key = Column(String(255), primary_key=True)
+    # sha256 of method, path, query, Authorization and body: a key is only
+    # valid for one request by one caller
+    fingerprint = Column(LargeBinary(32), nullable=False)
+    status_code = Column(SmallInteger, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    # zlib-compressed response body
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<IdempotencyKey(key={self.key!r}, status_code={self.status_code})>"
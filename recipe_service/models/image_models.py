@@ -0,0 +1,52 @@
+from sqlalchemy import (
+    Boolean, Column, Index, Integer, String, TIMESTAMP, func, text
+)
+from db_base import Base
+from recipe_service.core.images import CONTENT_TYPES, original_url, thumbnail_urls
+
+
+class StoredImage(Base):
+    """An uploaded image, stored once per content hash.
+
+    Files live on disk under the hash (see ``recipe_service.core.images``);
+    this row holds what the header said about them, so metadata is served
+    without touching the file.
+    """
+    __tablename__ = "images"
+    __table_args__ = (
+        # Images whose thumbnails still have to be rendered
+        Index(
+            "ix_images_pending_thumbnails",
+            "created_at",
+            postgresql_where=text("NOT thumbnails_ready")
+        ),
+        {"schema": "recipes"}
+    )
+
+    # sha256 of the original, hex
+    hash = Column(String(64), primary_key=True)
+    format = Column(String(10), nullable=False)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    byte_size = Column(Integer, nullable=False)
+    thumbnails_ready = Column(Boolean, server_default=text("false"), nullable=False)
+    created_at = Column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPES[self.format]
+
+    @property
+    def original_url(self) -> str:
+        return original_url(self.hash)
+
+    @property
+    def thumbnails(self) -> dict[str, str] | None:
+        """Thumbnail URLs by size name, once they are rendered."""
+        return thumbnail_urls(self.hash) if self.thumbnails_ready else None
+
+    def __repr__(self):
+        return (f"<StoredImage(hash={self.hash[:12]!r}, format={self.format!r}, "
+                f"size={self.width}x{self.height})>")
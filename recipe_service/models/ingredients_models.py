@@ -1,11 +1,17 @@
-from sqlalchemy import Column, BigInteger, String, ForeignKey
+from sqlalchemy import (
+    Column, BigInteger, CheckConstraint, Float, Integer, String, ForeignKey, Index
+)
 from db_base import Base
 from sqlalchemy.orm import relationship
 
 
 class IngredientCategory(Base):
     __tablename__ = "ingredient_categories"
-    __table_args__ = {"schema": "recipes"}
+    __table_args__ = (
+        # Category -> ingredients lookups; the PK only serves ingredient_id
+        Index("ix_ingredient_categories_category_id", "category_id", "ingredient_id"),
+        {"schema": "recipes"}
+    )
 
     ingredient_id = Column(BigInteger,
                            ForeignKey("recipes.ingredients.id", ondelete="CASCADE"),
@@ -19,24 +25,66 @@ class IngredientCategory(Base):
                 f"category_id={self.category_id})>")
 
 
+class IngredientSubstitution(Base):
+    """``substitute_id`` can replace ``ingredient_id``.
+
+    ``weight`` in (0, 1] rates how well.
+    """
+    __tablename__ = "ingredient_substitutions"
+    __table_args__ = (
+        CheckConstraint(
+            "weight > 0 AND weight <= 1",
+            name="ck_ingredient_substitution_weight"
+        ),
+        CheckConstraint(
+            "ingredient_id <> substitute_id",
+            name="ck_ingredient_substitution_not_self"
+        ),
+        # Reverse lookups when a substitute is deleted; the PK starts with ingredient_id
+        Index("ix_ingredient_substitutions_substitute_id", "substitute_id"),
+        {"schema": "recipes"}
+    )
+
+    ingredient_id = Column(BigInteger,
+                           ForeignKey("recipes.ingredients.id", ondelete="CASCADE"),
+                           primary_key=True)
+    substitute_id = Column(BigInteger,
+                           ForeignKey("recipes.ingredients.id", ondelete="CASCADE"),
+                           primary_key=True)
+    weight = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return (f"<IngredientSubstitution(ingredient_id={self.ingredient_id}, "
+                f"substitute_id={self.substitute_id}, weight={self.weight})>")
+
+
 class Ingredient(Base):
     __tablename__ = "ingredients"
-    __table_args__ = {"schema": "recipes"}
+    __table_args__ = (
+        CheckConstraint(
+            "dimension IN ('mass', 'volume', 'count')", name="ck_ingredient_dimension"
+        ),
+        {"schema": "recipes"}
+    )
 
     id = Column(BigInteger, primary_key=True)
     name = Column(String(100), nullable=False, unique=True)
+    # Base dimension of its nutrient amounts: per g, per ml or per piece
+    dimension = Column(String(10), nullable=False, server_default="mass")
 
-    # Relationship for ORM
+    # Relationship for ORM; lazy loads raise, queries declare what they load
     categories = relationship("Category",
                               secondary="recipes.ingredient_categories",
                               back_populates="ingredients",
-                              lazy="selectin"
+                              lazy="raise"
                               )
     recipe_ingredients = relationship("RecipeIngredient",
-                                      back_populates="ingredient")
+                                      back_populates="ingredient",
+                                      lazy="raise")
 
     user_recipes = relationship("UserRecipeIngredient",
-                                back_populates="ingredient"
+                                back_populates="ingredient",
+                                lazy="raise"
                                 )
 
     def __repr__(self):
@@ -45,16 +93,54 @@ class Ingredient(Base):
 
 class Category(Base):
     __tablename__ = "categories"
-    __table_args__ = {"schema": "recipes"}
+    __table_args__ = (
+        Index("ix_categories_parent_id", "parent_id"),
+        {"schema": "recipes"}
+    )
 
     id = Column(BigInteger, primary_key=True)
     name = Column(String(100), unique=True, nullable=False)
+    # Deferred so that snapshot imports may load children before parents
+    parent_id = Column(BigInteger,
+                       ForeignKey("recipes.categories.id",
+                                  deferrable=True, initially="DEFERRED"),
+                       nullable=True)
 
     # Relationship for ORM
     ingredients = relationship("Ingredient",
                                secondary=IngredientCategory.__table__,
-                               back_populates="categories"
+                               back_populates="categories",
+                               lazy="raise"
                                )
 
     def __repr__(self):
-        return f"<Category(id={self.id}, name={self.name!r})>"
+        return (f"<Category(id={self.id}, name={self.name!r}, "
+                f"parent_id={self.parent_id})>")
+
+
+class CategoryClosure(Base):
+    """Every (ancestor, descendant) pair of the category tree, ``depth`` links apart.
+
+    Only proper ancestors are stored, so a category without a parent or
+    children has no rows; ``CategoryService`` keeps the table in step with
+    ``Category.parent_id``.
+    """
+    __tablename__ = "category_closure"
+    __table_args__ = (
+        CheckConstraint("depth > 0", name="ck_category_closure_depth"),
+        # Ancestor lookups; the PK serves subtree lookups
+        Index("ix_category_closure_descendant_id", "descendant_id", "ancestor_id"),
+        {"schema": "recipes"}
+    )
+
+    ancestor_id = Column(BigInteger,
+                         ForeignKey("recipes.categories.id", ondelete="CASCADE"),
+                         primary_key=True)
+    descendant_id = Column(BigInteger,
+                           ForeignKey("recipes.categories.id", ondelete="CASCADE"),
+                           primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return (f"<CategoryClosure(ancestor_id={self.ancestor_id}, "
+                f"descendant_id={self.descendant_id}, depth={self.depth})>")
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, BigInteger, Float, ForeignKey, Index, String
+from db_base import Base
+
+
+class Nutrient(Base):
+    __tablename__ = "nutrients"
+    __table_args__ = {"schema": "recipes"}
+
+    id = Column(BigInteger, primary_key=True)
+    name = Column(String(50), nullable=False, unique=True)
+    # Unit of the amounts, e.g. "kcal", "g", "mg"
+    unit = Column(String(10), nullable=False)
+
+    def __repr__(self):
+        return f"<Nutrient(id={self.id}, name={self.name!r}, unit={self.unit!r})>"
+
+
+class IngredientNutrient(Base):
+    """Amount of a nutrient in one base unit (g, ml or piece) of an ingredient."""
+    __tablename__ = "ingredient_nutrients"
+    __table_args__ = (
+        # FK lookups when a nutrient is deleted; the PK starts with ingredient_id
+        Index("ix_ingredient_nutrients_nutrient_id", "nutrient_id"),
+        {"schema": "recipes"}
+    )
+
+    ingredient_id = Column(BigInteger,
+                           ForeignKey("recipes.ingredients.id", ondelete="CASCADE"),
+                           primary_key=True)
+    nutrient_id = Column(BigInteger,
+                         ForeignKey("recipes.nutrients.id", ondelete="CASCADE"),
+                         primary_key=True)
+    amount = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return (f"<IngredientNutrient(ingredient_id={self.ingredient_id}, "
+                f"nutrient_id={self.nutrient_id}, amount={self.amount})>")
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, BigInteger, ForeignKey, Index, TIMESTAMP, func
+from db_base import Base
+
+
+class PantryItem(Base):
+    """An ingredient a user has at home."""
+    __tablename__ = "pantry_items"
+    __table_args__ = (
+        # FK lookups when an ingredient is deleted; the PK starts with user_id
+        Index("ix_pantry_items_ingredient_id", "ingredient_id"),
+        {"schema": "recipes"}
+    )
+
+    user_id = Column(BigInteger, primary_key=True)
+    ingredient_id = Column(BigInteger,
+                           ForeignKey("recipes.ingredients.id", ondelete="CASCADE"),
+                           primary_key=True)
+    added_at = Column(TIMESTAMP(timezone=True), server_default=func.now(),
+                      nullable=False)
+
+    def __repr__(self):
+        return (f"<PantryItem(user_id={self.user_id}, "
+                f"ingredient_id={self.ingredient_id})>")
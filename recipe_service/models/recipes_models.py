@@ -1,4 +1,5 @@
 from db_base import Base
+from recipe_service.core.images import thumbnail_urls
 from sqlalchemy.orm import relationship
 from sqlalchemy import (
     Column,
@@ -9,12 +10,21 @@ from sqlalchemy import (
     TIMESTAMP,
     func,
     String,
-    Float)
+    Float,
+    Boolean,
+    CheckConstraint,
+    Index,
+    false,
+    text)
 
 
 class RecipeIngredient(Base):
     __tablename__ = "recipe_ingredients"
-    __table_args__ = {"schema": "recipes"}
+    __table_args__ = (
+        # Ingredient -> recipes lookups (search_recipes); the PK starts with recipe_id
+        Index("ix_recipe_ingredients_ingredient_id", "ingredient_id", "recipe_id"),
+        {"schema": "recipes"}
+    )
     __mapper_args__ = {"confirm_deleted_rows": False}
 
     recipe_id = Column(
@@ -31,23 +41,52 @@ class RecipeIngredient(Base):
     quantity = Column(Float, nullable=False)
     unit_id = Column(BigInteger, ForeignKey("recipes.units.id"), nullable=True)
 
-    unit = relationship("Unit", back_populates="recipe_ingredients")
-    recipe = relationship("Recipe", back_populates="ingredients")
-    ingredient = relationship("Ingredient", back_populates="recipe_ingredients")
+    # Lazy loads raise, queries declare what they load
+    unit = relationship("Unit", back_populates="recipe_ingredients", lazy="raise")
+    recipe = relationship("Recipe", back_populates="ingredients", lazy="raise")
+    ingredient = relationship(
+        "Ingredient", back_populates="recipe_ingredients", lazy="raise"
+    )
 
     def __repr__(self):
         return (f"<RecipeIngredient(recipe_id={self.recipe_id}, "
                 f"ingredient_id={self.ingredient_id}, quantity={self.quantity})>")
 
 
+# Recipes without a cooking time sort after all others (as NULLs would),
+# through a key that row comparisons and keyset pagination can use
+UNKNOWN_COOKING_TIME = 2147483647
+COOKING_TIME_SORT_KEY = f"coalesce(cooking_time_in_minutes, {UNKNOWN_COOKING_TIME})"
+
+
 class Recipe(Base):
     __tablename__ = "recipes"
-    __table_args__ = {"schema": "recipes"}
+    __table_args__ = (
+        # Recipes by author, newest first; most catalogue recipes have no author
+        Index(
+            "ix_recipes_author_id_created_at",
+            "author_id",
+            "created_at",
+            "id",
+            postgresql_where=text("author_id IS NOT NULL")
+        ),
+        # Sort orders of the recipe search, each with id as tie-breaker
+        Index("ix_recipes_created_at", "created_at", "id"),
+        Index("ix_recipes_updated_at", "updated_at", "id"),
+        Index("ix_recipes_cooking_time", text(COOKING_TIME_SORT_KEY), "id"),
+        {"schema": "recipes"}
+    )
 
     id = Column(BigInteger, primary_key=True)
     author_id = Column(BigInteger, nullable=True)
     cooking_time_in_minutes = Column(Integer)
     image_url = Column(String(1000))
+    # Uploaded image; image_url then points at its original
+    image_hash = Column(
+        String(64),
+        ForeignKey("recipes.images.hash", ondelete="SET NULL"),
+        nullable=True
+    )
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(
         TIMESTAMP(timezone=True),
@@ -58,10 +97,20 @@ class Recipe(Base):
     ingredients = relationship(
         "RecipeIngredient",
         back_populates="recipe",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise"
+    )
+
+    user_recipes = relationship(
+        "UserRecipe", back_populates="base_recipe", lazy="raise"
     )
 
-    user_recipes = relationship("UserRecipe", back_populates="base_recipe")
+    @property
+    def thumbnails(self) -> dict[str, str] | None:
+        """Thumbnail URLs of the uploaded image, by size name."""
+        if self.image_hash is None:
+            return None
+        return thumbnail_urls(self.image_hash)
 
     def __repr__(self):
         return (f"<Recipe(id={self.id}, author_id={self.author_id}, "
@@ -70,7 +119,11 @@ class Recipe(Base):
 
 class UserRecipe(Base):
     __tablename__ = "user_recipes"
-    __table_args__ = {'schema': 'recipes'}
+    __table_args__ = (
+        Index("ix_user_recipes_user_id", "user_id", "id"),
+        Index("ix_user_recipes_base_recipe_id", "base_recipe_id"),
+        {"schema": "recipes"}
+    )
 
     id = Column(BigInteger, primary_key=True)
     base_recipe_id = Column(
@@ -89,8 +142,14 @@ class UserRecipe(Base):
         onupdate=func.now()
     )
 
-    base_recipe = relationship("Recipe", back_populates="user_recipes")
-    ingredients = relationship("UserRecipeIngredient", back_populates="user_recipe")
+    base_recipe = relationship("Recipe", back_populates="user_recipes", lazy="raise")
+    ingredients = relationship(
+        "UserRecipeIngredient",
+        back_populates="user_recipe",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise"
+    )
 
     def __repr__(self):
         return (f"<UserRecipe(id={self.id}, user_id={self.user_id}, "
@@ -98,8 +157,22 @@ class UserRecipe(Base):
 
 
 class UserRecipeIngredient(Base):
+    """Ingredient override of a user recipe against its base recipe.
+
+    Only the lines that differ from the base recipe are stored: added and
+    changed lines carry a quantity, removed lines are kept as tombstones
+    with ``is_removed`` set.
+    """
     __tablename__ = "user_recipe_ingredients"
-    __table_args__ = {"schema": "recipes"}
+    __table_args__ = (
+        CheckConstraint(
+            "is_removed OR quantity IS NOT NULL",
+            name="ck_user_recipe_ingredient_quantity"
+        ),
+        # FK lookups when an ingredient is deleted
+        Index("ix_user_recipe_ingredients_ingredient_id", "ingredient_id"),
+        {"schema": "recipes"}
+    )
     __mapper_args__ = {"confirm_deleted_rows": False}
 
     user_recipe_id = Column(
@@ -114,31 +187,48 @@ class UserRecipeIngredient(Base):
         nullable=False,
         primary_key=True
     )
-    quantity = Column(Float, nullable=False)
+    quantity = Column(Float, nullable=True)
     unit_id = Column(BigInteger, ForeignKey("recipes.units.id"), nullable=True)
+    is_removed = Column(Boolean, nullable=False, default=False, server_default=false())
 
-    user_recipe = relationship("UserRecipe", back_populates="ingredients")
-    ingredient = relationship("Ingredient", back_populates="user_recipes")
-    unit = relationship("Unit", back_populates="user_recipe_ingredients")
+    user_recipe = relationship("UserRecipe", back_populates="ingredients", lazy="raise")
+    ingredient = relationship("Ingredient", back_populates="user_recipes", lazy="raise")
+    unit = relationship("Unit", back_populates="user_recipe_ingredients", lazy="raise")
 
     def __repr__(self):
         return (f"<UserRecipeIngredient(user_recipe_id={self.user_recipe_id}, "
-                f"ingredient_id={self.ingredient_id}, quantity={self.quantity})>"
-                )
+                f"ingredient_id={self.ingredient_id}, quantity={self.quantity}, "
+                f"is_removed={self.is_removed})>")
 
 
 class Unit(Base):
     __tablename__ = "units"
-    __table_args__ = {"schema": "recipes"}
+    __table_args__ = (
+        CheckConstraint(
+            "dimension IN ('mass', 'volume', 'count')", name="ck_unit_dimension"
+        ),
+        CheckConstraint(
+            "(dimension IS NULL) = (base_factor IS NULL) AND base_factor > 0",
+            name="ck_unit_base_factor"
+        ),
+        {"schema": "recipes"}
+    )
 
     id = Column(BigInteger, primary_key=True)
     symbol = Column(String(10), nullable=False, unique=True)
+    # mass, volume or count; NULL for units without a fixed size (pinch, clove)
+    dimension = Column(String(10), nullable=True)
+    # Base units (g, ml or piece) in one unit: 1000 for kg, 5 for tsp
+    base_factor = Column(Float, nullable=True)
 
     user_recipe_ingredients = relationship(
         "UserRecipeIngredient",
-        back_populates="unit"
+        back_populates="unit",
+        lazy="raise"
+    )
+    recipe_ingredients = relationship(
+        "RecipeIngredient", back_populates="unit", lazy="raise"
     )
-    recipe_ingredients = relationship("RecipeIngredient", back_populates="unit")
 
     def __repr__(self):
         return f"<Unit(id={self.id}, symbol={self.symbol!r})>"
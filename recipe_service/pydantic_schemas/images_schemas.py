@@ -0,0 +1,23 @@
+from typing import Dict
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class BaseSchema(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+
+class ImageReadSchema(BaseSchema):
+    hash: str = Field(description="sha256 of the original, hex")
+    content_type: str = Field(examples=["image/jpeg"])
+    width: int = Field(ge=0, examples=[1600])
+    height: int = Field(ge=0, examples=[1200])
+    byte_size: int = Field(ge=0, description="Size of the original", examples=[284113])
+    original_url: str
+    thumbnails: Dict[str, str] | None = Field(
+        default=None,
+        description="Thumbnail URLs by size, once rendered; other formats by "
+                    "swapping the extension"
+    )
+
+    model_config = ConfigDict(from_attributes=True)
@@ -18,6 +18,11 @@ class CategoryCreateSchema(BaseSchema):
         description="Category name",
         examples=["Fruits"]
     )
+    parent_id: int | None = Field(
+        default=None,
+        description="Parent category, none for a top-level category",
+        examples=[None]
+    )
 
 
 class CategoryUpdateSchema(BaseSchema):
@@ -27,11 +32,17 @@ class CategoryUpdateSchema(BaseSchema):
         examples=["Fruits"],
         description="New category name"
     )
+    parent_id: int | None = Field(
+        default=None,
+        description="New parent category; send null to move it to the top level",
+        examples=[2]
+    )
 
 
 class CategoryReadSchema(BaseSchema):
     id: int = Field(..., examples=[1])
     name: constr(min_length=2, max_length=100) = Field(..., examples=["Fruits"])
+    parent_id: int | None = Field(default=None, examples=[None])
 
 
 # ----------------------------------------------------------
@@ -64,6 +75,29 @@ class IngredientReadSchema(BaseSchema):
     categories: List[CategoryReadSchema]
 
 
+# ----------------------------------------------------------
+# Substitute Schemas
+# ----------------------------------------------------------
+class SubstituteWeightSchema(BaseSchema):
+    weight: float = Field(..., gt=0, le=1, description="How well it substitutes",
+                          examples=[0.8])
+
+
+class IngredientSubstitutionSchema(SubstituteWeightSchema):
+    ingredient_id: int = Field(..., examples=[1])
+    substitute_id: int = Field(..., examples=[2])
+
+
+class IngredientSubstituteSchema(BaseSchema):
+    substitute_id: int = Field(..., examples=[2])
+    weight: float = Field(..., description="Product of the weights along the path",
+                          examples=[0.72])
+    path: List[int] = Field(
+        ..., description="Substitution chain, ending with the substitute",
+        examples=[[4, 2]]
+    )
+
+
 # ----------------------------------------------------------
 # Delete Response Schemas
 # ----------------------------------------------------------
@@ -0,0 +1,64 @@
+from typing import Dict, List, Literal
+
+from pydantic import BaseModel, ConfigDict, Field, constr
+
+
+# ----------------------------------------------------------
+# Nutrient Schemas
+# ----------------------------------------------------------
+class NutrientCreateSchema(BaseModel):
+    name: constr(min_length=2, max_length=50) = Field(examples=["protein"])
+    unit: constr(min_length=1, max_length=10) = Field(examples=["g"])
+
+
+class NutrientReadSchema(NutrientCreateSchema):
+    id: int = Field(examples=[1])
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Base unit of an ingredient's amounts: g, ml or piece
+Dimension = Literal["mass", "volume", "count"]
+
+
+class IngredientNutrientSchema(BaseModel):
+    nutrient_id: int = Field(examples=[1])
+    amount: float = Field(ge=0, description="Amount in one base unit (g, ml or piece)",
+                          examples=[0.031])
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ----------------------------------------------------------
+# Recipe Nutrition Schemas
+# ----------------------------------------------------------
+class RecipeNutritionRequestSchema(BaseModel):
+    recipe_ids: List[int] = Field(min_length=1, max_length=1000, examples=[[1, 2, 3]])
+
+
+class RecipeNutritionSchema(BaseModel):
+    recipe_id: int = Field(examples=[1])
+    nutrients: Dict[str, float] = Field(examples=[{"energy": 412.5, "protein": 18.2}])
+    skipped_ingredient_ids: List[int] = Field(
+        default=[],
+        description="Ingredients left out: their unit does not convert to the "
+                    "ingredient's base dimension (mass, volume or count)",
+        examples=[[7]]
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MealPlanItemSchema(BaseModel):
+    recipe_id: int = Field(examples=[1])
+    portions: float = Field(
+        default=1, gt=0, description="Whole recipes", examples=[0.5]
+    )
+
+
+class MealPlanRequestSchema(BaseModel):
+    items: List[MealPlanItemSchema] = Field(min_length=1, max_length=1000)
+
+
+class MealPlanNutritionSchema(BaseModel):
+    nutrients: Dict[str, float] = Field(examples=[{"energy": 2150.0, "protein": 96.4}])
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from recipe_service.pydantic_schemas.recipes_schemas import RecipeReadSchema
+
+
+# ----------------------------------------------------------
+# Pantry Schemas
+# ----------------------------------------------------------
+class PantryItemSchema(BaseModel):
+    ingredient_id: int = Field(description="Ingredient ID", examples=[1])
+    added_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PantryMatchSchema(BaseModel):
+    recipe: RecipeReadSchema
+    missing_count: int = Field(
+        ge=0, description="Ingredients the pantry lacks", examples=[1]
+    )
+    missing_ingredient_ids: List[int] = Field(
+        description="IDs of the missing ingredients"
+    )
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,7 +1,6 @@
 from datetime import datetime
-from typing import List
-from pydantic import BaseModel, Field, ConfigDict
-from recipe_service.examples.recipe_examples import recipe_examples
+from typing import Dict, List, Literal
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict
 
 
 # ----------------------------------------------------------
@@ -24,6 +23,8 @@ class RecipeIngredientSchema(BaseSchema):
         examples=["15"])
     unit_id: int | None = Field(default=None, description="Unit ID", examples=[1])
 
+    model_config = ConfigDict(from_attributes=True)
+
 
 class RecipeCreateSchema(RecipeSchema):
     ingredients: List[RecipeIngredientSchema] = Field(default_factory=list)
@@ -38,6 +39,12 @@ class RecipeReadSchema(BaseSchema):
     author_id: int | None = Field(default=None, description="Author's ID", examples=[1])
     cooking_time_in_minutes: int | None = Field(default=None, ge=0, le=1200, examples=[60])
     image_url: str | None = Field(default=None, max_length=1000, examples=["http://example.com/image.jpg"])
+    thumbnails: Dict[str, str] | None = Field(
+        default=None,
+        description="Thumbnail URLs of the uploaded image by size; other formats "
+                    "by swapping the extension",
+        examples=[{"small": "/images/3a7bd3e2.../small.webp"}]
+    )
     ingredients: List[RecipeIngredientSchema] | None = Field(default=None)
     created_at: datetime
     updated_at: datetime
@@ -45,6 +52,100 @@ class RecipeReadSchema(BaseSchema):
     model_config = ConfigDict(from_attributes=True)
 
 
+class RecipeSearchQuerySchema(BaseSchema):
+    """Filters, sort order and page of ``GET /recipes/search``."""
+    ingredient_ids: List[int] = Field(
+        default_factory=list, description="IDs of ingredients to search for"
+    )
+    match_all: bool = Field(
+        default=False, description="If true, recipe must contain all ingredients"
+    )
+    min_cooking_time: int | None = Field(default=None, ge=0, examples=[10])
+    max_cooking_time: int | None = Field(default=None, ge=0, examples=[45])
+    author_id: int | None = Field(default=None, examples=[1])
+    created_after: datetime | None = Field(default=None, description="Inclusive")
+    created_before: datetime | None = Field(default=None, description="Exclusive")
+    updated_after: datetime | None = Field(default=None, description="Inclusive")
+    updated_before: datetime | None = Field(default=None, description="Exclusive")
+    has_image: bool | None = Field(
+        default=None, description="Only with (or without) image"
+    )
+    sort: Literal[
+        "id", "cooking_time", "-cooking_time",
+        "created_at", "-created_at", "updated_at", "-updated_at"
+    ] = Field(
+        default="id",
+        description="Sort key, '-' for descending; recipes without a cooking time come "
+                    "last in ascending and first in descending order"
+    )
+    limit: int = Field(default=100, ge=1, le=1000, description="Page size")
+    after: str | None = Field(
+        default=None,
+        description="Cursor from the X-Next-Cursor header of the last page"
+    )
+
+
+class SimilarRecipeSchema(BaseSchema):
+    recipe: RecipeReadSchema
+    similarity: float = Field(
+        ge=0,
+        le=1,
+        description="Estimated Jaccard similarity of the ingredient sets",
+        examples=[0.42]
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SearchFacetsSchema(BaseSchema):
+    categories: Dict[int, int] = Field(
+        description="Matching recipes per ingredient category ID",
+        examples=[{"1": 12, "4": 3}]
+    )
+    cooking_time: Dict[str, int] = Field(
+        description="Matching recipes per cooking time bucket (minutes)",
+        examples=[{"<15": 2, "15-29": 9, "unknown": 1}]
+    )
+    ingredients: Dict[int, int] = Field(
+        description="Matching recipes containing each requested ingredient ID",
+        examples=[{"1": 14, "3": 5}]
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FacetedSearchSchema(BaseSchema):
+    recipes: List[RecipeReadSchema]
+    total: int = Field(ge=0, description="Number of matching recipes", examples=[15])
+    facets: SearchFacetsSchema
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SubstitutionSchema(BaseSchema):
+    ingredient_id: int = Field(description="Requested ingredient", examples=[3])
+    substitute_id: int = Field(
+        description="Recipe ingredient used instead", examples=[8]
+    )
+    weight: float = Field(
+        gt=0, le=1, description="How well it substitutes", examples=[0.8]
+    )
+    path: List[int] = Field(
+        description="Substitution chain, ending with the substitute", examples=[[8]]
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SubstitutedRecipeSchema(BaseSchema):
+    recipe: RecipeReadSchema
+    score: float = Field(gt=0, le=1, description="Product of the substitution weights",
+                         examples=[0.8])
+    substitutions: List[SubstitutionSchema]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 # ----------------------------------------------------------
 # User Recipe Schemas
 # ----------------------------------------------------------
@@ -60,6 +161,13 @@ class UserRecipeCreateSchema(UserRecipeSchema):
     user_id: int
 
 
+class UserRecipeUpdateSchema(BaseSchema):
+    cooking_time_in_minutes: int | None = Field(default=None, ge=0, le=1200)
+    title: str | None = Field(default=None, max_length=100)
+    description: str | None = Field(default=None, max_length=1000)
+    instructions: str | None = Field(default=None)
+
+
 class UserRecipeReadSchema(BaseSchema):
     id: int
     base_recipe_id: int
@@ -69,6 +177,11 @@ class UserRecipeReadSchema(BaseSchema):
     title: str = Field(max_length=100)
     description: str | None = Field(default=None, max_length=1000)
     instructions: str
+    # Effective list: base recipe ingredients merged with the user's overrides
+    ingredients: List[RecipeIngredientSchema] = Field(
+        default_factory=list,
+        validation_alias=AliasChoices("effective_ingredients", "ingredients")
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -83,6 +196,13 @@ class UserRecipeIngredientSchema(BaseSchema):
     unit_id: int | None = Field(default=None)
 
 
+class UserRecipeIngredientOverrideSchema(BaseSchema):
+    quantity: float = Field(
+        gt=0, description="Quantity in the user recipe", examples=[150]
+    )
+    unit_id: int | None = Field(default=None, description="Unit ID", examples=[1])
+
+
 # ----------------------------------------------------------
 # Unit Schema
 # ----------------------------------------------------------
@@ -0,0 +1,70 @@
+from typing import List, Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from recipe_service.pydantic_schemas.ingredients_schemas import (
+    CategoryReadSchema,
+    IngredientReadSchema
+)
+from recipe_service.pydantic_schemas.recipes_schemas import RecipeReadSchema
+
+
+# ----------------------------------------------------------
+# Sync Schemas
+# ----------------------------------------------------------
+class RecipeTranslationSyncSchema(BaseModel):
+    id: int
+    recipe_id: int
+    language_id: int
+    title: str
+    description: str | None = None
+    instructions: str | None = None
+
+
+class IngredientTranslationSyncSchema(BaseModel):
+    id: int
+    ingredient_id: int
+    language_id: int
+
+
+class UnitTranslationSyncSchema(BaseModel):
+    id: int
+    unit_id: int
+    language_id: int
+    symbol: str
+
+
+class TombstoneSchema(BaseModel):
+    table: Literal[
+        "recipes",
+        "ingredients",
+        "categories",
+        "recipe_translations",
+        "ingredient_translations",
+        "unit_translations"
+    ] = Field(..., examples=["recipes"])
+    id: int = Field(..., examples=[42])
+
+
+class SyncResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    cursor: int = Field(
+        ...,
+        description="Pass as `since` in the next request",
+        examples=[1234]
+    )
+    has_more: bool = Field(
+        ...,
+        description="More changes are waiting; request again right away"
+    )
+    recipes: List[RecipeReadSchema]
+    ingredients: List[IngredientReadSchema]
+    categories: List[CategoryReadSchema]
+    recipe_translations: List[RecipeTranslationSyncSchema]
+    ingredient_translations: List[IngredientTranslationSyncSchema]
+    unit_translations: List[UnitTranslationSyncSchema]
+    deleted: List[TombstoneSchema] = Field(
+        ...,
+        description="Rows deleted since the cursor"
+    )
@@ -0,0 +1,41 @@
+from typing import Dict
+
+from pydantic import BaseModel, Field
+
+
+# ----------------------------------------------------------
+# Change feed Schemas
+# ----------------------------------------------------------
+class ChangeFeedStatsSchema(BaseModel):
+    enabled: bool = Field(..., description="Whether this worker runs a listener")
+    received: int = Field(0, description="Changes delivered by NOTIFY")
+    recovered: int = Field(
+        0, description="Changes recovered from the outbox after missed notifications"
+    )
+    reconnects: int = Field(0, description="Listener reconnects")
+    last_seq: int = Field(0, description="Highest applied change_log id")
+    last_lag_ms: float = Field(
+        0.0, description="Commit-to-invalidation lag of the last change"
+    )
+    max_lag_ms: float = Field(
+        0.0, description="Highest commit-to-invalidation lag seen"
+    )
+
+
+# ----------------------------------------------------------
+# Admission control Schemas
+# ----------------------------------------------------------
+class LaneStatsSchema(BaseModel):
+    limit: int = Field(..., description="Requests of the lane run at once")
+    active: int = Field(..., description="Requests running now")
+    queued: int = Field(..., description="Requests waiting for a slot")
+    admitted: int = Field(..., description="Requests admitted since startup")
+    shed: int = Field(..., description="Requests refused with 503 since startup")
+
+
+class AdmissionStatsSchema(BaseModel):
+    enabled: bool = Field(..., description="Whether admission control is on")
+    pool_usage: float = Field(
+        0.0, description="Share of the primary's pool connections checked out"
+    )
+    lanes: Dict[str, LaneStatsSchema] = Field(default_factory=dict)
@@ -0,0 +1,85 @@
+# 1. Standard library imports
+from typing import Annotated
+
+# 2. Third-party imports
+from fastapi import APIRouter, HTTPException, Path
+from fastapi.responses import FileResponse, RedirectResponse
+
+# 3. Local application imports
+from config import settings
+from recipe_service.core.dependencies import ImageServiceDep
+from recipe_service.core.images import (
+    CONTENT_TYPES,
+    original_path,
+    original_url,
+    variant_path
+)
+from recipe_service.pydantic_schemas.images_schemas import ImageReadSchema
+from recipe_service.services.image_service import ImageNotFound
+
+# ----------------------------------------------------------
+# Router
+# ----------------------------------------------------------
+router = APIRouter(
+    prefix="/images",
+)
+
+Digest = Annotated[str, Path(pattern=r"^[0-9a-f]{64}$", description="sha256, hex")]
+
+# Files never change under their hash
+IMMUTABLE = {"Cache-Control": "public, max-age=31536000, immutable"}
+
+
+async def _get_image(service: ImageServiceDep, digest: str):
+    try:
+        return await service.get_image(digest)
+    except ImageNotFound as e:
+        raise HTTPException(status_code=404, detail="Image not found") from e
+
+
+# ----------------------------------------------------------
+# Metadata and files
+# ----------------------------------------------------------
+@router.get(
+    "/{digest}",
+    response_model=ImageReadSchema,
+    summary="Format, size and URLs of an image (read from the database, not the file)"
+)
+async def get_image(digest: Digest, service: ImageServiceDep):
+    return await _get_image(service, digest)
+
+
+@router.get("/{digest}/original", summary="The uploaded file")
+async def get_original(digest: Digest, service: ImageServiceDep):
+    image = await _get_image(service, digest)
+    return FileResponse(
+        original_path(image.hash, image.format),
+        media_type=image.content_type,
+        headers=IMMUTABLE
+    )
+
+
+@router.get(
+    "/{digest}/{variant}",
+    summary="A thumbnail, e.g. small.webp; redirects to the original until rendered"
+)
+async def get_thumbnail(
+        digest: Digest,
+        variant: Annotated[str, Path(pattern=r"^\w+\.\w+$", examples=["small.webp"])],
+        service: ImageServiceDep
+):
+    size, _, image_format = variant.partition(".")
+    if (size not in settings.IMAGE_THUMBNAIL_SIZES
+            or image_format not in settings.IMAGE_THUMBNAIL_FORMATS):
+        raise HTTPException(status_code=404, detail="Unknown thumbnail")
+
+    path = variant_path(digest, size, image_format)
+    if path.is_file():
+        return FileResponse(
+            path, media_type=CONTENT_TYPES[image_format], headers=IMMUTABLE
+        )
+    # Not rendered yet, or not an image at all
+    await _get_image(service, digest)
+    return RedirectResponse(
+        original_url(digest), status_code=307, headers={"Cache-Control": "no-store"}
+    )
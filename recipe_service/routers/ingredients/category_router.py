@@ -3,11 +3,11 @@ from typing import List
 from functools import wraps
 
 # 2. Third-party imports
-from fastapi import HTTPException, status, APIRouter
+from fastapi import HTTPException, status, APIRouter, Query
 
 # 3. Local application imports
 import recipe_service.pydantic_schemas.ingredients_schemas as schemas
-from recipe_service.examples.category_examples import category_examples
+from recipe_service.examples import lazy_examples
 
 from recipe_service.services.category_service import (
     CategoryAlreadyExists,
@@ -19,6 +19,8 @@ from recipe_service.core.dependencies import (CategoryServiceDep, logger)
 # ----------------------------------------------------------
 # Router
 # ----------------------------------------------------------
+category_examples = lazy_examples("category_examples")
+
 router = APIRouter(
     prefix="/ingredient_category",
 )
@@ -47,13 +49,14 @@ def handle_not_found(func):
     response_model=schemas.CategoryReadSchema,
     openapi_extra=category_examples["create"]
 )
+@handle_not_found
 async def add_category(
         category: schemas.CategoryCreateSchema,
         service: CategoryServiceDep
 ):
     try:
         # All database logic has been moved to service.category_service.create_category
-        new_category = await service.create_category(category.name)
+        new_category = await service.create_category(category.name, category.parent_id)
         logger.info(f"Added category: {new_category.name} (id={new_category.id})")
         return new_category
 
@@ -103,14 +106,39 @@ async def get_category_by_id(
 @handle_not_found
 async def get_ingredients_by_category_id(
         category_id: int,
-        service: CategoryServiceDep
+        service: CategoryServiceDep,
+        include_subcategories: bool = Query(
+            default=True,
+            description="Also return the ingredients of all subcategories")
 ):
-    ingredients = await service.get_ingredients_by_category_id(category_id)
+    ingredients = await service.get_ingredients_by_category_id(
+        category_id, include_subcategories
+    )
     logger.info(f"Retrieved {len(ingredients)} "
                 f"ingredients for category ID={category_id}")
     return ingredients
 
 
+# GET ANCESTORS
+@router.get(
+    "/{category_id}/ancestors",
+    summary="Get the parent categories up to the top level, top level first",
+    response_model=List[schemas.CategoryReadSchema])
+@handle_not_found
+async def get_category_ancestors(category_id: int, service: CategoryServiceDep):
+    return await service.get_category_ancestors(category_id)
+
+
+# GET SUBCATEGORIES
+@router.get(
+    "/{category_id}/subcategories",
+    summary="Get all categories below a category, level by level",
+    response_model=List[schemas.CategoryReadSchema])
+@handle_not_found
+async def get_subcategories(category_id: int, service: CategoryServiceDep):
+    return await service.get_subcategories(category_id)
+
+
 # UPDATE
 @router.put("/{category_id}",
             summary="Update ingredient category",
@@ -125,6 +153,11 @@ async def update_category_by_id(
 ):
     try:
         updated_category = await service.update_category(category_id, updated.name)
+        # An explicit null moves the category to the top level
+        if "parent_id" in updated.model_fields_set:
+            updated_category = await service.move_category(
+                category_id, updated.parent_id
+            )
         logger.info(
             f"Updated category ID={updated_category.id} -> {updated_category.name}"
         )
@@ -135,6 +168,8 @@ async def update_category_by_id(
             status_code=status.HTTP_409_CONFLICT,
             detail=str(e)
         ) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 # DELETE
@@ -7,11 +7,13 @@ from fastapi import HTTPException, status, APIRouter
 
 # 3. Local application imports
 import recipe_service.pydantic_schemas.ingredients_schemas as schemas
-from recipe_service.examples.ingredient_examples import ingredient_examples
+from recipe_service.pydantic_schemas.recipes_schemas import DeleteResponseSchema
+from recipe_service.examples import lazy_examples
 
 from recipe_service.services.ingredient_service import (
     IngredientAlreadyExists,
-    IngredientNotFound
+    IngredientNotFound,
+    SubstitutionNotFound
 )
 
 from recipe_service.core.dependencies import (IngredientServiceDep, logger)
@@ -19,6 +21,8 @@ from recipe_service.core.dependencies import (IngredientServiceDep, logger)
 # ----------------------------------------------------------
 # Router
 # ----------------------------------------------------------
+ingredient_examples = lazy_examples("ingredient_examples")
+
 router = APIRouter(
     prefix="/ingredients",
 )
@@ -140,3 +144,54 @@ async def delete_ingredient(ingredient_id: int, service: IngredientServiceDep):
     deleted = await service.delete_ingredient(ingredient_id)
     logger.info(f"Deleted ingredient ID={ingredient_id}, name={deleted!r}")
     return {"Result": True, "id": ingredient_id, "name": deleted}
+
+
+# ----------------------------------------------------------
+# Substitutes
+# ----------------------------------------------------------
+@router.get(
+    "/{ingredient_id}/substitutes",
+    summary="Direct and transitive substitutes of an ingredient, best first",
+    response_model=List[schemas.IngredientSubstituteSchema])
+@handle_not_found
+async def get_substitutes(ingredient_id: int, service: IngredientServiceDep):
+    substitutes = await service.get_substitutes(ingredient_id)
+    return [schemas.IngredientSubstituteSchema.model_validate(s) for s in substitutes]
+
+
+@router.put(
+    "/{ingredient_id}/substitutes/{substitute_id}",
+    summary="Set how well one ingredient can replace another",
+    response_model=schemas.IngredientSubstitutionSchema)
+@handle_not_found
+async def set_substitute(
+        ingredient_id: int,
+        substitute_id: int,
+        body: schemas.SubstituteWeightSchema,
+        service: IngredientServiceDep
+):
+    try:
+        substitution = await service.set_substitute(
+            ingredient_id, substitute_id, body.weight
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    logger.info(f"Ingredient ID={substitute_id} substitutes ID={ingredient_id} "
+                f"with weight {body.weight}")
+    return substitution
+
+
+@router.delete(
+    "/{ingredient_id}/substitutes/{substitute_id}",
+    summary="Remove a substitute",
+    response_model=DeleteResponseSchema)
+async def remove_substitute(
+        ingredient_id: int,
+        substitute_id: int,
+        service: IngredientServiceDep
+):
+    try:
+        removed_id = await service.remove_substitute(ingredient_id, substitute_id)
+    except SubstitutionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    return {"Result": True, "id": removed_id}
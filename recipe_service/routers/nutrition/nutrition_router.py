@@ -0,0 +1,124 @@
+# 1. Standard library imports
+from functools import wraps
+from typing import List
+
+# 2. Third-party imports
+from fastapi import APIRouter, HTTPException, Query
+
+# 3. Local application imports
+from recipe_service.core.dependencies import NutritionServiceDep
+from recipe_service.pydantic_schemas.nutrition_schemas import (
+    Dimension,
+    IngredientNutrientSchema,
+    MealPlanNutritionSchema,
+    MealPlanRequestSchema,
+    NutrientCreateSchema,
+    NutrientReadSchema,
+    RecipeNutritionRequestSchema,
+    RecipeNutritionSchema
+)
+from recipe_service.services.nutrition_service import (
+    NutrientAlreadyExists,
+    NutrientNotFound
+)
+from recipe_service.services.recipe_service import IngredientNotFound, RecipeNotFound
+
+# ----------------------------------------------------------
+# Router
+# ----------------------------------------------------------
+router = APIRouter()
+
+
+def handle_not_found(func):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except RecipeNotFound as e:
+            raise HTTPException(status_code=404, detail="Recipe not found") from e
+        except IngredientNotFound as e:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Ingredients not found: {e}"
+            ) from e
+        except NutrientNotFound as e:
+            raise HTTPException(status_code=404, detail=str(e)) from e
+    return wrapper
+
+
+# ----------------------------------------------------------
+# Nutrients
+# ----------------------------------------------------------
+@router.get("/nutrients", response_model=List[NutrientReadSchema])
+async def get_nutrients(service: NutritionServiceDep):
+    return await service.get_nutrients()
+
+
+@router.post("/nutrients", response_model=NutrientReadSchema)
+async def add_nutrient(nutrient: NutrientCreateSchema, service: NutritionServiceDep):
+    try:
+        return await service.create_nutrient(nutrient.name, nutrient.unit)
+    except NutrientAlreadyExists as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+
+@router.put(
+    "/ingredients/{ingredient_id}/nutrients",
+    response_model=List[IngredientNutrientSchema],
+    summary="Replace the nutrients of an ingredient, per base unit (g, ml or piece)"
+)
+@handle_not_found
+async def set_ingredient_nutrients(
+        ingredient_id: int,
+        nutrients: List[IngredientNutrientSchema],
+        service: NutritionServiceDep,
+        dimension: Dimension | None = Query(
+            default=None,
+            description="Base dimension of the amounts: per g (mass), per ml "
+                        "(volume) or per piece (count); unchanged if omitted"
+        )
+):
+    amounts = {item.nutrient_id: item.amount for item in nutrients}
+    return await service.set_ingredient_nutrients(
+        ingredient_id, amounts, dimension
+    )
+
+
+# ----------------------------------------------------------
+# Recipe nutrition
+# ----------------------------------------------------------
+@router.get("/recipes/{recipe_id}/nutrition", response_model=RecipeNutritionSchema)
+async def get_recipe_nutrition(recipe_id: int, service: NutritionServiceDep):
+    found = await service.get_nutrition([recipe_id])
+    if not found:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return RecipeNutritionSchema.model_validate(found[0])
+
+
+@router.post(
+    "/nutrition/recipes",
+    response_model=List[RecipeNutritionSchema],
+    summary="Nutrition of up to 1000 recipes; unknown recipe IDs are left out"
+)
+async def get_recipes_nutrition(
+        request: RecipeNutritionRequestSchema,
+        service: NutritionServiceDep
+):
+    found = await service.get_nutrition(request.recipe_ids)
+    return [RecipeNutritionSchema.model_validate(item) for item in found]
+
+
+@router.post(
+    "/nutrition/meal_plan",
+    response_model=MealPlanNutritionSchema,
+    summary="Total nutrition of a set of recipes, each scaled by its portions"
+)
+@handle_not_found
+async def get_meal_plan_nutrition(
+        request: MealPlanRequestSchema,
+        service: NutritionServiceDep
+):
+    portions: dict[int, float] = {}
+    for item in request.items:
+        portions[item.recipe_id] = portions.get(item.recipe_id, 0) + item.portions
+    return {"nutrients": await service.get_meal_plan_nutrition(portions)}
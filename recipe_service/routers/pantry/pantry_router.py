@@ -0,0 +1,88 @@
+# 1. Standard library imports
+from functools import wraps
+from typing import List
+
+# 2. Third-party imports
+from fastapi import APIRouter, HTTPException, Query
+
+# 3. Local application imports
+from config import settings
+from recipe_service.core.dependencies import PantryServiceDep
+from recipe_service.pydantic_schemas.pantry_schemas import (
+    PantryItemSchema,
+    PantryMatchSchema
+)
+from recipe_service.pydantic_schemas.recipes_schemas import DeleteResponseSchema
+from recipe_service.services.pantry_service import PantryItemNotFound
+from recipe_service.services.recipe_service import IngredientNotFound
+
+# ----------------------------------------------------------
+# Router
+# ----------------------------------------------------------
+router = APIRouter(
+    prefix="/users/{user_id}/pantry",
+)
+
+
+def handle_not_found(func):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except PantryItemNotFound as e:
+            raise HTTPException(status_code=404, detail=str(e)) from e
+        except IngredientNotFound as e:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Ingredients not found: {e}"
+            ) from e
+    return wrapper
+
+
+# ----------------------------------------------------------
+# Pantry items
+# ----------------------------------------------------------
+@router.get("", response_model=List[PantryItemSchema])
+async def get_pantry(user_id: int, service: PantryServiceDep):
+    return await service.get_pantry(user_id)
+
+
+@router.put("/{ingredient_id}", response_model=PantryItemSchema)
+@handle_not_found
+async def add_pantry_item(user_id: int, ingredient_id: int, service: PantryServiceDep):
+    return await service.add_item(user_id, ingredient_id)
+
+
+@router.delete("/{ingredient_id}", response_model=DeleteResponseSchema)
+@handle_not_found
+async def remove_pantry_item(
+        user_id: int,
+        ingredient_id: int,
+        service: PantryServiceDep
+):
+    removed_id = await service.remove_item(user_id, ingredient_id)
+    return {"Result": True, "id": removed_id}
+
+
+# ----------------------------------------------------------
+# Cookable now
+# ----------------------------------------------------------
+@router.get(
+    "/cookable",
+    response_model=List[PantryMatchSchema],
+    summary="Recipes the pantry covers, then near-misses by missing ingredient count"
+)
+async def get_cookable_recipes(
+        user_id: int,
+        service: PantryServiceDep,
+        max_missing: int = Query(
+            0,
+            ge=0,
+            le=settings.PANTRY_MAX_MISSING,
+            description="Also return recipes missing up to this many ingredients"
+        ),
+        limit: int = Query(50, ge=1, le=500, description="Maximum number of recipes")
+):
+    matches = await service.get_cookable(user_id, max_missing, limit)
+    # Validated here: FastAPI would deep-copy the ORM objects out of a dataclass
+    return [PantryMatchSchema.model_validate(match) for match in matches]
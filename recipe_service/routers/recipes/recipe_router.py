@@ -1,16 +1,24 @@
 from functools import wraps
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import Annotated, List
 
 from pydantic.v1 import Field
 
 from recipe_service.pydantic_schemas.recipes_schemas import (
-    RecipeCreateSchema, RecipeUpdateSchema, RecipeReadSchema, DeleteResponseSchema
+    RecipeCreateSchema, RecipeUpdateSchema, RecipeReadSchema, DeleteResponseSchema,
+    SimilarRecipeSchema, SubstitutedRecipeSchema, FacetedSearchSchema,
+    RecipeSearchQuerySchema
 )
+from recipe_service.services.image_service import ImageTooLarge, schedule_thumbnails
 from recipe_service.services.recipe_service import RecipeNotFound, IngredientNotFound
-from recipe_service.core.dependencies import RecipeServiceDep
-from recipe_service.examples.recipe_examples import recipe_examples
+from recipe_service.core.images import CONTENT_TYPES, UPLOAD_FORMATS, UnsupportedImage
+from recipe_service.core.permissions import PermissionDenied
+from recipe_service.core.dependencies import ImageServiceDep, RecipeServiceDep
+from config import settings
+from recipe_service.examples import lazy_examples
+
+recipe_examples = lazy_examples("recipe_examples")
 
 router = APIRouter(prefix="/recipes")
 
@@ -39,6 +47,8 @@ async def add_recipe(
         service: RecipeServiceDep):
     try:
         return await service.create_recipe(recipe)
+    except PermissionDenied:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
@@ -57,23 +67,68 @@ async def get_recipes(service: RecipeServiceDep):
     response_model=List[RecipeReadSchema],
     openapi_extra=recipe_examples["search"]
 )
-@handle_not_found
 async def search_recipes(
         service: RecipeServiceDep,
-        ingredient_ids: List[int] =  Query(
+        query: Annotated[RecipeSearchQuerySchema, Query()],
+        response: Response
+):
+    """Filtered, sorted recipes, one page at a time: the cursor of the next
+    page is in the ``X-Next-Cursor`` header, to be passed back as ``after``.
+    """
+    try:
+        page = await service.filter_recipes(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    if not page.recipes and query.after is None:
+        raise HTTPException(status_code=404, detail="No recipes found with given ingredients")
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.recipes
+
+
+@router.get(
+    "/search/faceted",
+    response_model=FacetedSearchSchema,
+    summary="Search with counts per category, cooking time and requested ingredient"
+)
+async def search_recipes_with_facets(
+        service: RecipeServiceDep,
+        ingredient_ids: List[int] = Query(
             ...,
             description="IDs of ingredients to search for",
             example=[1, 3]),
         match_all: bool = Query(
             default=False,
             description="If true, recipe must contain all ingredients",
-            example=False)
+            example=False),
+        limit: int = Query(50, ge=1, le=500, description="Maximum number of recipes")
 ):
     match_mode = "all" if match_all else "any"
-    recipes = await service.search_recipes(ingredient_ids, match_mode)
-    if not recipes:
-        raise HTTPException(status_code=404, detail="No recipes found with given ingredients")
-    return recipes
+    result = await service.search_recipes_with_facets(ingredient_ids, match_mode, limit)
+    # Validated here: FastAPI would deep-copy the ORM objects out of a dataclass
+    return FacetedSearchSchema.model_validate(result)
+
+
+@router.get(
+    "/search/substitutes",
+    response_model=List[SubstitutedRecipeSchema],
+    summary="Recipes with all ingredients, each possibly replaced by a substitute"
+)
+async def search_recipes_with_substitutes(
+        service: RecipeServiceDep,
+        ingredient_ids: List[int] = Query(
+            ...,
+            description="IDs of ingredients to search for",
+            example=[1, 3]),
+        limit: int = Query(50, ge=1, le=500, description="Maximum number of recipes")
+):
+    found = await service.search_recipes_with_substitutes(ingredient_ids, limit)
+    if not found:
+        raise HTTPException(
+            status_code=404, detail="No recipes found with given ingredients"
+        )
+    # Validated here: FastAPI would deep-copy the ORM objects out of a dataclass
+    return [SubstitutedRecipeSchema.model_validate(match) for match in found]
 
 
 @router.get(
@@ -85,6 +140,22 @@ async def get_recipe(recipe_id: int, service: RecipeServiceDep):
     return await service.get_recipe_by_id(recipe_id)
 
 
+@router.get(
+    "/{recipe_id}/similar",
+    response_model=List[SimilarRecipeSchema],
+    summary="Recipes with the most similar ingredient sets"
+)
+@handle_not_found
+async def get_similar_recipes(
+        recipe_id: int,
+        service: RecipeServiceDep,
+        k: int = Query(10, ge=1, le=100, description="Number of recipes to return")
+):
+    similar = await service.get_similar_recipes(recipe_id, k)
+    # Validated here: FastAPI would deep-copy the ORM objects out of a dataclass
+    return [SimilarRecipeSchema.model_validate(s) for s in similar]
+
+
 @router.put(
     "/{recipe_id}",
     response_model=RecipeReadSchema,
@@ -98,6 +169,54 @@ async def update_recipe(
     return await service.update_recipe(recipe_id, updated)
 
 
+async def _read_upload(request: Request) -> bytes:
+    """The raw request body, refused with 413 past ``IMAGE_MAX_BYTES``."""
+    limit = settings.IMAGE_MAX_BYTES
+    too_large = HTTPException(
+        status_code=413, detail=f"Images are limited to {limit} bytes"
+    )
+    if int(request.headers.get("content-length") or 0) > limit:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise too_large
+    return bytes(body)
+
+
+@router.put(
+    "/{recipe_id}/image",
+    response_model=RecipeReadSchema,
+    summary="Upload the recipe's image (raw request body)",
+    openapi_extra={"requestBody": {"required": True, "content": {
+        CONTENT_TYPES[image_format]: {"schema": {"type": "string", "format": "binary"}}
+        for image_format in UPLOAD_FORMATS
+    }}}
+)
+@handle_not_found
+async def upload_recipe_image(
+        recipe_id: int,
+        request: Request,
+        service: RecipeServiceDep,
+        images: ImageServiceDep):
+    """Identical uploads are stored once; thumbnails are rendered in the
+    background and linked from ``thumbnails`` right away (until they exist,
+    their URLs redirect to the original).
+    """
+    # Not found or not allowed before the body is read and stored
+    await service.get_editable_recipe(recipe_id)
+    try:
+        image, created = await images.store(await _read_upload(request))
+    except UnsupportedImage as e:
+        raise HTTPException(status_code=415, detail=str(e)) from e
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    if created:
+        schedule_thumbnails(image)
+    return await service.set_image(recipe_id, image)
+
+
 @router.delete(
     "/{recipe_id}",
     response_model=DeleteResponseSchema,
@@ -0,0 +1,122 @@
+from functools import wraps
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import List
+
+from recipe_service.pydantic_schemas.recipes_schemas import (
+    DeleteResponseSchema,
+    UserRecipeCreateSchema,
+    UserRecipeIngredientOverrideSchema,
+    UserRecipeReadSchema,
+    UserRecipeUpdateSchema
+)
+from recipe_service.services.recipe_service import RecipeNotFound, IngredientNotFound
+from recipe_service.services.user_recipe_service import UserRecipeNotFound
+from recipe_service.core.dependencies import UserRecipeServiceDep
+from recipe_service.examples import lazy_examples
+
+user_recipe_examples = lazy_examples("user_recipe_examples")
+
+router = APIRouter(prefix="/user_recipes")
+
+
+def handle_not_found(func):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except UserRecipeNotFound as e:
+            raise HTTPException(status_code=404, detail="User recipe not found") from e
+        except RecipeNotFound as e:
+            raise HTTPException(status_code=404, detail="Recipe not found") from e
+        except IngredientNotFound as e:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Ingredients not found: {e}"
+            ) from e
+    return wrapper
+
+
+@router.post(
+    "",
+    response_model=UserRecipeReadSchema,
+    openapi_extra=user_recipe_examples["create"])
+@handle_not_found
+async def add_user_recipe(
+        user_recipe: UserRecipeCreateSchema,
+        service: UserRecipeServiceDep):
+    return await service.create_user_recipe(user_recipe)
+
+
+@router.get("", response_model=List[UserRecipeReadSchema])
+async def get_user_recipes(
+        service: UserRecipeServiceDep,
+        user_id: int | None = Query(default=None, description="Owner of the variants"),
+        ids: List[int] | None = Query(default=None, description="User recipe IDs")
+):
+    return await service.get_user_recipes(user_id=user_id, user_recipe_ids=ids)
+
+
+@router.get(
+    "/{user_recipe_id}",
+    response_model=UserRecipeReadSchema,
+    openapi_extra=user_recipe_examples["get_one"])
+@handle_not_found
+async def get_user_recipe(user_recipe_id: int, service: UserRecipeServiceDep):
+    return await service.get_user_recipe_by_id(user_recipe_id)
+
+
+@router.put("/{user_recipe_id}", response_model=UserRecipeReadSchema)
+@handle_not_found
+async def update_user_recipe(
+        user_recipe_id: int,
+        updated: UserRecipeUpdateSchema,
+        service: UserRecipeServiceDep):
+    return await service.update_user_recipe(user_recipe_id, updated)
+
+
+@router.put(
+    "/{user_recipe_id}/ingredients/{ingredient_id}",
+    response_model=UserRecipeReadSchema,
+    openapi_extra=user_recipe_examples["set_ingredient"])
+@handle_not_found
+async def set_user_recipe_ingredient(
+        user_recipe_id: int,
+        ingredient_id: int,
+        override: UserRecipeIngredientOverrideSchema,
+        service: UserRecipeServiceDep):
+    return await service.set_ingredient(
+        user_recipe_id,
+        ingredient_id,
+        quantity=override.quantity,
+        unit_id=override.unit_id
+    )
+
+
+@router.delete(
+    "/{user_recipe_id}/ingredients/{ingredient_id}",
+    response_model=UserRecipeReadSchema)
+@handle_not_found
+async def remove_user_recipe_ingredient(
+        user_recipe_id: int,
+        ingredient_id: int,
+        service: UserRecipeServiceDep):
+    return await service.remove_ingredient(user_recipe_id, ingredient_id)
+
+
+@router.delete(
+    "/{user_recipe_id}/ingredients/{ingredient_id}/override",
+    response_model=UserRecipeReadSchema)
+@handle_not_found
+async def reset_user_recipe_ingredient(
+        user_recipe_id: int,
+        ingredient_id: int,
+        service: UserRecipeServiceDep):
+    return await service.reset_ingredient(user_recipe_id, ingredient_id)
+
+
+@router.delete("/{user_recipe_id}", response_model=DeleteResponseSchema)
+@handle_not_found
+async def delete_user_recipe(user_recipe_id: int, service: UserRecipeServiceDep):
+    deleted_id = await service.delete_user_recipe(user_recipe_id)
+    return {"Result": True, "id": deleted_id}
@@ -0,0 +1,48 @@
+# 2. Third-party imports
+from fastapi import APIRouter, HTTPException, Query
+
+# 3. Local application imports
+from recipe_service.core.dependencies import SyncServiceDep
+from recipe_service.pydantic_schemas.sync_schemas import SyncResponseSchema
+from recipe_service.services.sync_service import CursorTooOld
+
+# ----------------------------------------------------------
+# Router
+# ----------------------------------------------------------
+router = APIRouter(
+    prefix="/sync",
+)
+
+
+# ----------------------------------------------------------
+# Delta sync
+# ----------------------------------------------------------
+@router.get(
+    "",
+    response_model=SyncResponseSchema,
+    summary="Recipes, ingredients, categories and translations changed since a cursor",
+    responses={410: {
+        "description": "The cursor is older than the retained change log: "
+                       "discard the local copy and sync again from 0"
+    }}
+)
+async def sync(
+        service: SyncServiceDep,
+        since: int = Query(
+            0,
+            ge=0,
+            description="Cursor returned by the previous sync; 0 for a full sync"
+        ),
+        limit: int = Query(
+            500,
+            ge=1,
+            le=5000,
+            description="Maximum number of changes per page"
+        )
+):
+    try:
+        page = await service.get_changes(since, limit)
+    except CursorTooOld as e:
+        raise HTTPException(status_code=410, detail=str(e)) from e
+    # Validated here: FastAPI would deep-copy the ORM objects out of a dataclass
+    return SyncResponseSchema.model_validate(page)
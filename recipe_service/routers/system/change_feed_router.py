@@ -0,0 +1,45 @@
+# 2. Third-party imports
+from fastapi import APIRouter, Request
+
+# 3. Local application imports
+from recipe_service.pydantic_schemas.system_schemas import (
+    AdmissionStatsSchema,
+    ChangeFeedStatsSchema
+)
+
+# ----------------------------------------------------------
+# Router
+# ----------------------------------------------------------
+router = APIRouter(
+    prefix="/system",
+)
+
+
+# ----------------------------------------------------------
+# Change feed statistics of this worker
+# ----------------------------------------------------------
+@router.get(
+    "/change_feed",
+    response_model=ChangeFeedStatsSchema,
+    summary="Change feed delivery statistics of the serving worker"
+)
+async def get_change_feed_stats(request: Request):
+    listener = getattr(request.app.state, "change_feed", None)
+    if listener is None:
+        return ChangeFeedStatsSchema(enabled=False)
+    return ChangeFeedStatsSchema(enabled=True, **listener.snapshot())
+
+
+# ----------------------------------------------------------
+# Admission control lanes of this worker
+# ----------------------------------------------------------
+@router.get(
+    "/admission",
+    response_model=AdmissionStatsSchema,
+    summary="Admission control lanes of the serving worker"
+)
+async def get_admission_stats(request: Request):
+    controller = getattr(request.app.state, "admission", None)
+    if controller is None:
+        return AdmissionStatsSchema(enabled=False)
+    return AdmissionStatsSchema(enabled=True, **controller.snapshot())
@@ -1,12 +1,18 @@
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import (
+    BigInteger, Integer, delete, exists, literal, select, true, union_all, update
+)
+from sqlalchemy.dialects.postgresql import insert
 from typing import Sequence, Type
 
-from sqlalchemy.orm import InstrumentedAttribute, selectinload
+from sqlalchemy.orm import InstrumentedAttribute, aliased, selectinload
 
+from database import read_replica
+
+from recipe_service.core.cache import local_cache
+from recipe_service.core.change_feed import track_change
 from recipe_service.models import ingredients_models as models
-import logging
 
 
 # ----------------------------------------------------------
@@ -34,26 +40,42 @@ class CategoryService:
         self.session = session
         self.Category = models.Category
 
-    async def create_category(self, name: str) -> models.Category:
-        """Creates a new category, checking for duplicates."""
+    async def create_category(
+            self,
+            name: str,
+            parent_id: int | None = None
+    ) -> models.Category:
+        """Creates a new category in one INSERT ... ON CONFLICT DO NOTHING.
 
-        # Check for existence
-        result = await self.session.execute(
-            select(self.Category).where(self.Category.name == name)
+        The unique constraint on the name decides atomically between
+        "created" and "already exists", also under concurrent requests.
+        A subcategory also gets its closure rows, one per ancestor.
+        """
+        if parent_id is not None:
+            await self.get_category_by_id(parent_id)
+        new_category = await self.session.scalar(
+            insert(self.Category)
+            .values(name=name, parent_id=parent_id)
+            .on_conflict_do_nothing(index_elements=[self.Category.name])
+            .returning(self.Category)
         )
-        if result.scalar_one_or_none():
+        if new_category is None:
             raise CategoryAlreadyExists(name=name)
+        if parent_id is not None:
+            await self.session.execute(self._relink(new_category.id, parent_id))
 
-        # Creation and saving
-        new_category = self.Category(name=name)
-        self.session.add(new_category)
+        track_change(self.session, "categories", [new_category.id], "I")
         await self.session.commit()
-        await self.session.refresh(new_category)
-
         return new_category
 
     async def get_all_categories(self) -> Sequence[models.Category]:
-        """Return all categories"""
+        """Return all categories, cached per worker until a category changes"""
+        return await local_cache("categories").get_or_load(
+            "all", self._load_all_categories, tags=["categories"]
+        )
+
+    @read_replica
+    async def _load_all_categories(self) -> Sequence[models.Category]:
         result = await self.session.execute(select(self.Category)
                                             .order_by(self.Category.id)
                                             )
@@ -66,53 +88,188 @@ class CategoryService:
             raise CategoryNotFound(category_id)
         return category
 
-    async def get_ingredients_by_category_id(self, category_id: int) -> (
-            Sequence)[models.Ingredient]:
-        """Return ingredients by category id"""
-        result = await self.session.execute(
-            select(models.Category)
-            .options(selectinload(models.Category.ingredients)
-                     .selectinload(models.Ingredient.categories))
-            .where(models.Category.id == category_id)
+    @read_replica
+    async def get_ingredients_by_category_id(
+            self,
+            category_id: int,
+            include_subcategories: bool = True
+    ) -> Sequence[models.Ingredient]:
+        """Return ingredients of a category and, by default, of its whole subtree.
+
+        The subtree is one index lookup in the closure table, so this is a
+        single join whatever the depth of the tree.
+        """
+        found = await self.session.scalar(
+            select(self.Category.id).where(self.Category.id == category_id)
         )
-        category = result.scalar_one_or_none()
-        if category is None:
+        if found is None:
             raise CategoryNotFound(category_id)
-        return category.ingredients
+
+        category_ids = select(literal(category_id, BigInteger))
+        if include_subcategories:
+            category_ids = union_all(
+                category_ids,
+                select(models.CategoryClosure.descendant_id)
+                .where(models.CategoryClosure.ancestor_id == category_id)
+            )
+        result = await self.session.scalars(
+            select(models.Ingredient)
+            .options(selectinload(models.Ingredient.categories))
+            .where(models.Ingredient.id.in_(
+                select(models.IngredientCategory.ingredient_id)
+                .where(models.IngredientCategory.category_id.in_(category_ids))
+            ))
+            .order_by(models.Ingredient.id)
+        )
+        return result.all()
+
+    @read_replica
+    async def get_category_ancestors(
+            self,
+            category_id: int
+    ) -> Sequence[models.Category]:
+        """Return the ancestors of a category, root first"""
+        await self.get_category_by_id(category_id)
+        result = await self.session.scalars(
+            select(self.Category)
+            .join(models.CategoryClosure,
+                  models.CategoryClosure.ancestor_id == self.Category.id)
+            .where(models.CategoryClosure.descendant_id == category_id)
+            .order_by(models.CategoryClosure.depth.desc())
+        )
+        return result.all()
+
+    @read_replica
+    async def get_subcategories(self, category_id: int) -> Sequence[models.Category]:
+        """Return the whole subtree below a category, level by level"""
+        await self.get_category_by_id(category_id)
+        result = await self.session.scalars(
+            select(self.Category)
+            .join(models.CategoryClosure,
+                  models.CategoryClosure.descendant_id == self.Category.id)
+            .where(models.CategoryClosure.ancestor_id == category_id)
+            .order_by(models.CategoryClosure.depth, self.Category.id)
+        )
+        return result.all()
 
     async def update_category(
             self,
             category_id: int,
-            new_name: str
+            new_name: str | None
     ) -> Type[models.Category]:
-        """Updates a category by id"""
-        category = await self.get_category_by_id(category_id)
-        if not category:
-            raise CategoryNotFound(category_id)
+        """Updates a category by id in one UPDATE ... RETURNING."""
+        if new_name is None:
+            return await self.get_category_by_id(category_id)
 
-        if category.name == new_name:
-            logging.info(
-                f"No change in category name (id={category_id}, name={new_name})"
+        try:
+            category = await self.session.scalar(
+                update(self.Category)
+                .where(self.Category.id == category_id)
+                .values(name=new_name)
+                .returning(self.Category)
+                .execution_options(populate_existing=True)
             )
+        except IntegrityError as e:
+            # Unique violation on the name, raised atomically by the database
+            await self.session.rollback()
+            raise CategoryAlreadyExists(new_name) from e
+
+        if category is None:
+            raise CategoryNotFound(category_id)
+
+        track_change(self.session, "categories", [category.id], "U")
+        await self.session.commit()
+        return category
+
+    async def move_category(
+            self,
+            category_id: int,
+            parent_id: int | None
+    ) -> models.Category:
+        """Moves a category with its subtree under another parent (or to the root)."""
+        category = await self.get_category_by_id(category_id)
+        if parent_id == category.parent_id:
             return category
+        if parent_id is not None:
+            await self.get_category_by_id(parent_id)
+            cycle = parent_id == category_id or await self.session.scalar(
+                select(exists().where(
+                    models.CategoryClosure.ancestor_id == category_id,
+                    models.CategoryClosure.descendant_id == parent_id
+                ))
+            )
+            if cycle:
+                raise ValueError("Cannot move a category into its own subtree")
 
-        existing = await self.session.execute(
-            select(self.Category).where(self.Category.name == new_name)
+        await self.session.execute(self._relink(category_id, parent_id))
+        track_change(self.session, "categories", [category_id], "U")
+        await self.session.commit()
+        return await self.session.get(
+            self.Category, category_id, populate_existing=True
         )
-        if existing.scalar_one_or_none():
-            raise CategoryAlreadyExists(new_name)
 
-        category.name = new_name
-        try:
-            await self.session.commit()
-            await self.session.refresh(category)
-            return category
-        except IntegrityError as e:
-            await self.session.rollback()
-            raise CategoryAlreadyExists(new_name) from e
+    @staticmethod
+    def _relink(category_id: int, parent_id: int | None):
+        """One statement that hangs a category's subtree under ``parent_id``.
+
+        The closure rows linking the subtree to ancestors outside it are
+        replaced by the new parent's ancestors x the subtree: rows that
+        stay are upserted with their new depth, the others deleted, and
+        ``parent_id`` is set alongside.
+        """
+        closure = models.CategoryClosure
+        subtree = union_all(
+            select(literal(category_id, BigInteger).label("descendant_id"),
+                   literal(0, Integer).label("depth")),
+            select(closure.descendant_id, closure.depth)
+            .where(closure.ancestor_id == category_id)
+        ).cte("subtree")
+
+        stale = (
+            delete(closure)
+            .where(closure.descendant_id.in_(select(subtree.c.descendant_id)))
+            .where(closure.ancestor_id.not_in(select(subtree.c.descendant_id)))
+        )
+        statement = (
+            update(models.Category)
+            .where(models.Category.id == category_id)
+            .values(parent_id=parent_id)
+        )
+        if parent_id is None:
+            return statement.add_cte(stale.cte("unlinked"))
+
+        ancestors = union_all(
+            select(literal(parent_id, BigInteger).label("ancestor_id"),
+                   literal(1, Integer).label("depth")),
+            select(closure.ancestor_id, closure.depth + 1)
+            .where(closure.descendant_id == parent_id)
+        ).cte("new_ancestors")
+        links = (
+            select(ancestors.c.ancestor_id, subtree.c.descendant_id,
+                   (ancestors.c.depth + subtree.c.depth).label("depth"))
+            .join(subtree, true())
+            .cte("links")
+        )
+        stale = stale.where(~exists().where(
+            links.c.ancestor_id == closure.ancestor_id,
+            links.c.descendant_id == closure.descendant_id
+        ))
+        linked = insert(closure).from_select(
+            ["ancestor_id", "descendant_id", "depth"], select(links)
+        )
+        linked = linked.on_conflict_do_update(
+            index_elements=[closure.ancestor_id, closure.descendant_id],
+            set_={"depth": linked.excluded.depth}
+        )
+        return statement.add_cte(stale.cte("unlinked")).add_cte(linked.cte("linked"))
 
     async def delete_category(self, category_id: int) -> InstrumentedAttribute:
-        """Deletes a category by id"""
+        """Deletes a category by id.
+
+        Its subcategories move up to its parent and its ingredients that
+        would be left without a category go to the parent too, or to the
+        default category for a root.
+        """
         category = await self.get_category_by_id(category_id)
 
         if not category:
@@ -121,23 +278,61 @@ class CategoryService:
         if category.name == "noname":
             raise ValueError("Cannot delete default category")
 
-        default_category = await self.session.scalar(
-            select(models.Category).where(models.Category.name == "noname")
-        )
+        if category.parent_id is not None:
+            default_category = await self.get_category_by_id(category.parent_id)
+        else:
+            default_category = await self.session.scalar(
+                select(models.Category).where(models.Category.name == "noname")
+            )
         if not default_category:
             default_category = models.Category(name="noname")
             self.session.add(default_category)
+            await self.session.flush()
+            track_change(self.session, "categories", [default_category.id], "I")
             await self.session.commit()
             await self.session.refresh(default_category)
 
-        ingredients = await self.session.scalars(select(models.Ingredient))
+        # Only the ingredients of this category, with the categories they keep
+        ingredients = await self.session.scalars(
+            select(models.Ingredient)
+            .join(models.Ingredient.categories)
+            .where(models.Category.id == category.id)
+            .options(selectinload(models.Ingredient.categories))
+        )
+        reassigned = []
         for ing in ingredients:
-            if len(ing.categories) == 1 and ing.categories[0].id == category.id:
+            if len(ing.categories) == 1:
                 ing.categories = [default_category]
             else:
                 ing.categories = [c for c in ing.categories if c.id != category.id]
+            reassigned.append(ing.id)
+
+        # Children move up a level: re-point them and shorten every path
+        # through this category by one link; its own rows cascade with it
+        closure = models.CategoryClosure
+        above, below = aliased(closure), aliased(closure)
+        shortened = (
+            update(closure)
+            .where(closure.ancestor_id.in_(
+                select(above.ancestor_id).where(above.descendant_id == category.id)
+            ))
+            .where(closure.descendant_id.in_(
+                select(below.descendant_id).where(below.ancestor_id == category.id)
+            ))
+            .values(depth=closure.depth - 1)
+        )
+        children = (await self.session.scalars(
+            update(models.Category)
+            .where(models.Category.parent_id == category.id)
+            .values(parent_id=category.parent_id)
+            .returning(models.Category.id)
+            .add_cte(shortened.cte("shortened"))
+        )).all()
 
         deleted_name = category.name
+        track_change(self.session, "categories", children, "U")
+        track_change(self.session, "ingredients", reassigned, "U")
+        track_change(self.session, "categories", [category.id], "D")
         await self.session.delete(category)
         await self.session.commit()
 
@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import logging
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import async_session
+from recipe_service.core.images import (
+    original_path,
+    probe,
+    thumbnail_pool,
+    variant_path,
+    write_once
+)
+from recipe_service.models.image_models import StoredImage
+
+logger = logging.getLogger("recipe_service")
+
+
+# ----------------------------------------------------------
+# Custom exceptions
+# ----------------------------------------------------------
+class ImageNotFound(Exception):
+    """Exception thrown when no image has the requested hash."""
+
+
+class ImageTooLarge(Exception):
+    """Exception thrown when an upload exceeds the byte or pixel limit."""
+
+
+# ----------------------------------------------------------
+# Image service
+# ----------------------------------------------------------
+class ImageService:
+    """Service class for uploaded images.
+
+    Originals are stored once per sha256: uploading the same bytes again
+    returns the existing image without writing anything. Format and size
+    come from the header (``probe``), so nothing is decoded on the request
+    path; thumbnails are rendered afterwards by ``schedule_thumbnails``.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def store(self, data: bytes) -> tuple[StoredImage, bool]:
+        """The stored image for ``data``, and whether it was new."""
+        if len(data) > settings.IMAGE_MAX_BYTES:
+            raise ImageTooLarge(
+                f"Images are limited to {settings.IMAGE_MAX_BYTES} bytes"
+            )
+        info = probe(data)
+        if info.width * info.height > settings.IMAGE_MAX_PIXELS:
+            raise ImageTooLarge(
+                f"Images are limited to {settings.IMAGE_MAX_PIXELS} pixels"
+            )
+
+        digest = await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
+        existing = await self.session.get(StoredImage, digest)
+        if existing is not None:
+            return existing, False
+
+        # The file is in place before any row points at it
+        await asyncio.to_thread(write_once, original_path(digest, info.format), data)
+        inserted = await self.session.scalar(
+            insert(StoredImage)
+            .values(hash=digest, format=info.format, width=info.width,
+                    height=info.height, byte_size=len(data))
+            .on_conflict_do_nothing()
+            .returning(StoredImage.hash)
+        )
+        await self.session.commit()
+        return await self.session.get(StoredImage, digest), inserted is not None
+
+    async def get_image(self, digest: str) -> StoredImage:
+        image = await self.session.get(StoredImage, digest)
+        if image is None:
+            raise ImageNotFound
+        return image
+
+
+# ----------------------------------------------------------
+# Background rendering
+# ----------------------------------------------------------
+def schedule_thumbnails(image: StoredImage, session_factory=async_session) -> None:
+    """Render every thumbnail of ``image`` off the request path, then mark it."""
+    digest, image_format = image.hash, image.format
+
+    async def job():
+        targets = [
+            (str(variant_path(digest, size, thumbnail_format)), side, thumbnail_format)
+            for size, side in settings.IMAGE_THUMBNAIL_SIZES.items()
+            for thumbnail_format in settings.IMAGE_THUMBNAIL_FORMATS
+        ]
+        await thumbnail_pool().render(original_path(digest, image_format), targets)
+        async with session_factory() as session:
+            await session.execute(
+                update(StoredImage)
+                .where(StoredImage.hash == digest)
+                .values(thumbnails_ready=True)
+            )
+            await session.commit()
+
+    thumbnail_pool().schedule(digest, job)
+
+
+async def resume_thumbnails(session_factory=async_session, limit: int = 1000) -> int:
+    """Schedule images whose rendering was cut short, e.g. by a restart."""
+    try:
+        async with session_factory() as session:
+            pending = (await session.scalars(
+                select(StoredImage)
+                .where(~StoredImage.thumbnails_ready)
+                .order_by(StoredImage.created_at)
+                .limit(limit)
+            )).all()
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not look up pending thumbnails: {e}")
+        return 0
+    for image in pending:
+        schedule_thumbnails(image, session_factory)
+    if pending:
+        logger.info(f"Resumed thumbnails of {len(pending)} images")
+    return len(pending)
@@ -1,9 +1,17 @@
+from dataclasses import dataclass
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, func, literal, select, true
+from sqlalchemy.dialects.postgresql import insert
 from typing import Sequence, Type
 
-from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.orm import InstrumentedAttribute, selectinload
+
+from database import read_replica
 
+from recipe_service.core.cache import local_cache
+from recipe_service.core.change_feed import track_change
+from recipe_service.core.substitutions import SubstitutionGraph, substitution_graph
 from recipe_service.models import ingredients_models as models
 
 from recipe_service.models.ingredients_models import Category
@@ -24,6 +32,22 @@ class IngredientNotFound(Exception):
         super().__init__(f"Ingredient with ID {ingredient_id} not found.")
 
 
+class SubstitutionNotFound(Exception):
+    """Exception thrown when an ingredient has no such direct substitute."""
+    def __init__(self, ingredient_id: int, substitute_id: int):
+        super().__init__(
+            f"Ingredient {substitute_id} is not a substitute "
+            f"of ingredient {ingredient_id}."
+        )
+
+
+@dataclass
+class IngredientSubstitute:
+    substitute_id: int
+    weight: float
+    path: list[int]
+
+
 # ----------------------------------------------------------
 # Ingredient service
 # ----------------------------------------------------------
@@ -39,43 +63,90 @@ class IngredientService:
             name: str,
             category_obj: list[int]
     ) -> models.Ingredient:
-        """Creates a new ingredient, checking for duplicates."""
+        """Creates a new ingredient and its category links in one statement.
+
+        Categories are validated, the ingredient is inserted with
+        ON CONFLICT (name) DO NOTHING and the links are inserted from its
+        RETURNING row, so "created" versus "already exists" is decided
+        atomically by the unique constraint.
+        """
         if not category_obj:
             raise ValueError("Ingredient must belong to at least one category")
+        category_ids = set(category_obj)
 
-        existing = await self.session.execute(
-            select(self.Ingredient).where(self.Ingredient.name == name)
+        found = (
+            select(Category.id)
+            .where(Category.id.in_(category_ids))
+            .cte("found_categories")
         )
-        if existing.scalar_one_or_none():
-            raise IngredientAlreadyExists(name=name)
+        found_count = select(func.count()).select_from(found).scalar_subquery()
+        new_ingredient = (
+            insert(self.Ingredient)
+            .from_select(
+                ["name"],
+                select(literal(name)).where(found_count == len(category_ids))
+            )
+            .on_conflict_do_nothing(index_elements=[self.Ingredient.name])
+            .returning(self.Ingredient.id)
+            .cte("new_ingredient")
+        )
+        links = (
+            insert(models.IngredientCategory)
+            .from_select(
+                ["ingredient_id", "category_id"],
+                select(new_ingredient.c.id, found.c.id)
+                .select_from(new_ingredient)
+                .join(found, true())
+            )
+            .returning(models.IngredientCategory.category_id)
+            .cte("new_links")
+        )
+        result = (await self.session.execute(
+            select(
+                found_count.label("found_categories"),
+                select(new_ingredient.c.id).scalar_subquery().label("id"),
+                select(func.count()).select_from(links).scalar_subquery()
+                .label("links")
+            )
+        )).one()
 
-        result = (await self.session.scalars(select(models.Category)
-                                             .where(models.Category
-                                                    .id.in_(category_obj)
-                                                    )
-                                             )
-                  )
-        categories: Sequence[Category] = result.all()
-        if len(categories) != len(category_obj):
+        if result.found_categories != len(category_ids):
             raise ValueError("Some categories not found")
+        if result.id is None:
+            raise IngredientAlreadyExists(name=name)
 
-        new_ingredient = self.Ingredient(name=name, categories=categories)
-        self.session.add(new_ingredient)
+        track_change(self.session, "ingredients", [result.id], "I")
         await self.session.commit()
-        await self.session.refresh(new_ingredient)
-
-        return new_ingredient
+        return await self.session.scalar(
+            select(self.Ingredient)
+            .options(selectinload(self.Ingredient.categories))
+            .where(self.Ingredient.id == result.id)
+        )
 
     async def get_all_ingredients(self) -> Sequence[models.Ingredient]:
-        """Return all ingredients"""
-        result = await self.session.execute(select(self.Ingredient)
-                                            .order_by(self.Ingredient.id)
-                                            )
+        """Return all ingredients, cached per worker until one changes"""
+        # Ingredients are returned with their categories, so a renamed
+        # category invalidates the list too
+        return await local_cache("ingredients").get_or_load(
+            "all", self._load_all_ingredients, tags=["ingredients", "categories"]
+        )
+
+    @read_replica
+    async def _load_all_ingredients(self) -> Sequence[models.Ingredient]:
+        result = await self.session.execute(
+            select(self.Ingredient)
+            .options(selectinload(self.Ingredient.categories))
+            .order_by(self.Ingredient.id)
+        )
         return result.scalars().all()
 
     async def get_ingredient_by_id(self, ingredient_id: int) -> Type[models.Ingredient]:
-        """Return ingredient by id"""
-        ingredient = await self.session.get(self.Ingredient, ingredient_id)
+        """Return ingredient by id with its categories"""
+        ingredient = await self.session.scalar(
+            select(self.Ingredient)
+            .options(selectinload(self.Ingredient.categories))
+            .where(self.Ingredient.id == ingredient_id)
+        )
         if ingredient is None:
             raise IngredientNotFound(ingredient_id)
         return ingredient
@@ -113,8 +184,9 @@ class IngredientService:
         if not updated:
             return ingredient
 
+        track_change(self.session, "ingredients", [ingredient.id], "U")
+        # No server-generated columns, so nothing to refresh after the commit
         await self.session.commit()
-        await self.session.refresh(ingredient)
         return ingredient
 
     async def delete_ingredient(self, ingredient_id: int) -> InstrumentedAttribute:
@@ -124,7 +196,117 @@ class IngredientService:
             raise IngredientNotFound(ingredient_id)
 
         deleted = ingredient.name
+        track_change(self.session, "ingredients", [ingredient.id], "D")
         await self.session.delete(ingredient)
         await self.session.commit()
 
         return deleted
+
+    # ----------------------------------------------------------
+    # Substitutes
+    # ----------------------------------------------------------
+    async def set_substitute(
+            self,
+            ingredient_id: int,
+            substitute_id: int,
+            weight: float
+    ) -> models.IngredientSubstitution:
+        """Adds or reweights the edge.
+
+        The edge reads "``substitute_id`` can replace ``ingredient_id``".
+        """
+        if ingredient_id == substitute_id:
+            raise ValueError("An ingredient cannot substitute itself")
+        found = set(await self.session.scalars(
+            select(self.Ingredient.id)
+            .where(self.Ingredient.id.in_([ingredient_id, substitute_id]))
+        ))
+        for required_id in (ingredient_id, substitute_id):
+            if required_id not in found:
+                raise IngredientNotFound(required_id)
+
+        statement = insert(models.IngredientSubstitution).values(
+            ingredient_id=ingredient_id, substitute_id=substitute_id, weight=weight
+        )
+        await self.session.execute(statement.on_conflict_do_update(
+            index_elements=["ingredient_id", "substitute_id"],
+            set_={"weight": statement.excluded.weight}
+        ))
+        track_change(self.session, "ingredient_substitutions", [ingredient_id], "U")
+        await self.session.commit()
+        return await self.session.get(
+            models.IngredientSubstitution,
+            (ingredient_id, substitute_id),
+            populate_existing=True
+        )
+
+    async def remove_substitute(self, ingredient_id: int, substitute_id: int) -> int:
+        deleted = await self.session.scalar(
+            delete(models.IngredientSubstitution)
+            .where(
+                models.IngredientSubstitution.ingredient_id == ingredient_id,
+                models.IngredientSubstitution.substitute_id == substitute_id
+            )
+            .returning(models.IngredientSubstitution.substitute_id)
+        )
+        if deleted is None:
+            raise SubstitutionNotFound(ingredient_id, substitute_id)
+        track_change(self.session, "ingredient_substitutions", [ingredient_id], "U")
+        await self.session.commit()
+        return substitute_id
+
+    async def get_substitutes(self, ingredient_id: int) -> list[IngredientSubstitute]:
+        """Direct and transitive substitutes from the closure, best first."""
+        graph = await self.get_substitution_graph()
+        substitutes = graph.substitutes(ingredient_id)
+        if not substitutes:
+            await self.get_ingredient_by_id(ingredient_id)
+        return [
+            IngredientSubstitute(substitute_id, chain.weight, list(chain.path))
+            for substitute_id, chain in sorted(
+                substitutes.items(), key=lambda item: (-item[1].weight, item[0])
+            )
+        ]
+
+    async def get_substitution_graph(self) -> SubstitutionGraph:
+        """The worker's substitution graph, with edges changed since reloaded.
+
+        Runs on the primary: stale marks are cleared once reloaded, so a
+        lagging replica would leave the closure outdated.
+        """
+        graph = substitution_graph()
+        async with graph.lock:
+            if not graph.loaded:
+                graph.clear()
+                rows = await self.session.execute(select(
+                    models.IngredientSubstitution.ingredient_id,
+                    models.IngredientSubstitution.substitute_id,
+                    models.IngredientSubstitution.weight
+                ))
+                graph.set_edges(self._group_edges(rows))
+                graph.loaded = True
+            elif graph.stale:
+                # Changes arriving while we read are kept for the next refresh
+                stale, graph.stale = graph.stale, set()
+                try:
+                    rows = await self.session.execute(
+                        select(
+                            models.IngredientSubstitution.ingredient_id,
+                            models.IngredientSubstitution.substitute_id,
+                            models.IngredientSubstitution.weight
+                        )
+                        .where(models.IngredientSubstitution.ingredient_id.in_(stale))
+                    )
+                except BaseException:
+                    graph.stale |= stale
+                    raise
+                graph.set_edges({ingredient_id: {} for ingredient_id in stale}
+                                | self._group_edges(rows))
+        return graph
+
+    @staticmethod
+    def _group_edges(rows) -> dict[int, dict[int, float]]:
+        edges: dict[int, dict[int, float]] = {}
+        for ingredient_id, substitute_id, weight in rows:
+            edges.setdefault(ingredient_id, {})[substitute_id] = weight
+        return edges
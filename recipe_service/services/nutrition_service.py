@@ -0,0 +1,232 @@
+from dataclasses import dataclass, field
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import read_replica
+from recipe_service.core.cache import local_cache
+from recipe_service.core.change_feed import track_change
+from recipe_service.core.nutrition import NutritionMatrix
+from recipe_service.models.ingredients_models import Ingredient
+from recipe_service.models.nutrition_models import IngredientNutrient, Nutrient
+from recipe_service.models.recipes_models import Recipe, RecipeIngredient, Unit
+from recipe_service.services.recipe_service import IngredientNotFound, RecipeNotFound
+
+
+# ----------------------------------------------------------
+# Custom exceptions
+# ----------------------------------------------------------
+class NutrientAlreadyExists(Exception):
+    """Exception thrown when a nutrient with the same name already exists."""
+    def __init__(self, name: str):
+        super().__init__(f"Nutrient {name!r} already exists.")
+
+
+class NutrientNotFound(Exception):
+    """Exception thrown when nutrients by ID are not found."""
+    def __init__(self, nutrient_ids: list[int]):
+        super().__init__(f"Nutrients not found: {sorted(nutrient_ids)}")
+
+
+@dataclass
+class RecipeNutrition:
+    recipe_id: int
+    nutrients: dict[str, float]
+    # Ingredients of lines whose unit does not convert to their dimension
+    skipped_ingredient_ids: list[int] = field(default_factory=list)
+
+
+# ----------------------------------------------------------
+# Nutrition service
+# ----------------------------------------------------------
+class NutritionService:
+    """Service class for nutrients and recipe nutrition.
+
+    Nutrition is computed on the worker: the ingredient x nutrient matrix
+    is loaded once into a ``NutritionMatrix`` and each recipe is a product
+    of its lines with it. Both the matrix and the per-recipe vectors are
+    local cache entries, dropped by the change feed when a recipe, an
+    ingredient, a nutrient or a unit changes. Lines whose unit does not
+    convert to the base dimension of their ingredient are left out and
+    reported with the recipe.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    # Nutrients
+    @read_replica
+    async def get_nutrients(self):
+        return (await self.session.scalars(
+            select(Nutrient).order_by(Nutrient.id)
+        )).all()
+
+    async def create_nutrient(self, name: str, unit: str) -> Nutrient:
+        nutrient_id = await self.session.scalar(
+            insert(Nutrient)
+            .values(name=name, unit=unit)
+            .on_conflict_do_nothing(index_elements=[Nutrient.name])
+            .returning(Nutrient.id)
+        )
+        if nutrient_id is None:
+            raise NutrientAlreadyExists(name)
+        track_change(self.session, "nutrients", [nutrient_id], "I")
+        await self.session.commit()
+        return await self.session.get(Nutrient, nutrient_id)
+
+    async def set_ingredient_nutrients(
+            self,
+            ingredient_id: int,
+            amounts: dict[int, float],
+            dimension: str | None = None
+    ) -> list[IngredientNutrient]:
+        """Replace the nutrients of an ingredient (amounts per base unit).
+
+        ``dimension`` (mass, volume or count) also sets the base unit the
+        amounts are given in; by default the ingredient keeps its own.
+        """
+        if dimension is None:
+            exists = await self.session.scalar(
+                select(Ingredient.id).where(Ingredient.id == ingredient_id)
+            )
+        else:
+            exists = await self.session.scalar(
+                update(Ingredient)
+                .where(Ingredient.id == ingredient_id)
+                .values(dimension=dimension)
+                .returning(Ingredient.id)
+            )
+        if exists is None:
+            raise IngredientNotFound([ingredient_id])
+        if amounts:
+            found = await self.session.scalars(
+                select(Nutrient.id).where(Nutrient.id.in_(amounts))
+            )
+            missing = set(amounts) - set(found)
+            if missing:
+                raise NutrientNotFound(list(missing))
+
+        await self.session.execute(
+            delete(IngredientNutrient)
+            .where(IngredientNutrient.ingredient_id == ingredient_id)
+        )
+        if amounts:
+            await self.session.execute(insert(IngredientNutrient).values([
+                {"ingredient_id": ingredient_id, "nutrient_id": nutrient_id,
+                 "amount": amount}
+                for nutrient_id, amount in amounts.items()
+            ]))
+        # Recipe vectors are tagged with their ingredients
+        track_change(self.session, "ingredients", [ingredient_id], "U")
+        await self.session.commit()
+        return (await self.session.scalars(
+            select(IngredientNutrient)
+            .where(IngredientNutrient.ingredient_id == ingredient_id)
+            .order_by(IngredientNutrient.nutrient_id)
+        )).all()
+
+    # Recipe nutrition
+    @read_replica
+    async def get_nutrition(self, recipe_ids: list[int]) -> list[RecipeNutrition]:
+        """Nutrition of the given recipes, in order; unknown IDs are skipped."""
+        matrix = await self._matrix()
+        vectors = await self._vectors(matrix, recipe_ids)
+        found = []
+        for recipe_id in dict.fromkeys(recipe_ids):
+            if recipe_id in vectors:
+                vector, skipped = vectors[recipe_id]
+                found.append(
+                    RecipeNutrition(recipe_id, matrix.named(vector), list(skipped))
+                )
+        return found
+
+    @read_replica
+    async def get_meal_plan_nutrition(
+            self,
+            portions: dict[int, float]
+    ) -> dict[str, float]:
+        """Total nutrition of ``recipe_id -> portions``.
+
+        A portion is a whole recipe.
+        """
+        matrix = await self._matrix()
+        vectors = await self._vectors(matrix, list(portions))
+        if len(vectors) < len(portions):
+            raise RecipeNotFound
+        return matrix.named(matrix.combine(
+            (vectors[recipe_id][0], weight) for recipe_id, weight in portions.items()
+        ))
+
+    async def _matrix(self) -> NutritionMatrix:
+        async def load():
+            nutrients = (await self.session.execute(
+                select(Nutrient.id, Nutrient.name).order_by(Nutrient.id)
+            )).all()
+            units = {
+                unit_id: (dimension, factor)
+                for unit_id, dimension, factor in await self.session.execute(
+                    select(Unit.id, Unit.dimension, Unit.base_factor)
+                )
+            }
+            dimensions = dict((await self.session.execute(
+                select(Ingredient.id, Ingredient.dimension).where(
+                    Ingredient.id.in_(select(IngredientNutrient.ingredient_id))
+                )
+            )).all())
+            amounts = await self.session.stream(
+                select(
+                    IngredientNutrient.ingredient_id,
+                    IngredientNutrient.nutrient_id,
+                    IngredientNutrient.amount
+                ).execution_options(yield_per=50_000)
+            )
+            rows = [row async for row in amounts]
+            return NutritionMatrix(nutrients, units, dimensions, rows)
+
+        return await local_cache("nutrition").get_or_load(
+            "matrix", load, tags=["nutrients", "units", "ingredients"]
+        )
+
+    async def _vectors(
+            self,
+            matrix: NutritionMatrix,
+            recipe_ids: list[int]
+    ) -> dict[int, tuple[tuple[float, ...], tuple[int, ...]]]:
+        """Per-recipe nutrient vectors and skipped ingredients.
+
+        Only the lines of uncached recipes are read.
+        """
+        cache = local_cache("recipe_nutrition")
+        vectors = {}
+        for recipe_id in recipe_ids:
+            vector = cache.get(recipe_id)
+            if vector is not None:
+                vectors[recipe_id] = vector
+        uncached = set(recipe_ids) - vectors.keys()
+        if not uncached:
+            return vectors
+
+        rows = await self.session.execute(
+            select(
+                Recipe.id,
+                RecipeIngredient.ingredient_id,
+                RecipeIngredient.quantity,
+                RecipeIngredient.unit_id
+            )
+            .outerjoin(RecipeIngredient, RecipeIngredient.recipe_id == Recipe.id)
+            .where(Recipe.id.in_(uncached))
+        )
+        lines_by_recipe: dict[int, list[tuple[int, float, int | None]]] = {}
+        for recipe_id, ingredient_id, quantity, unit_id in rows:
+            lines = lines_by_recipe.setdefault(recipe_id, [])
+            if ingredient_id is not None:
+                lines.append((ingredient_id, quantity, unit_id))
+
+        for recipe_id, lines in lines_by_recipe.items():
+            vector = vectors[recipe_id] = matrix.product(lines)
+            cache.set(recipe_id, vector, tags=[
+                f"recipes:{recipe_id}", "nutrients", "units",
+                *(f"ingredients:{ingredient_id}" for ingredient_id, _, _ in lines)
+            ])
+        return vectors
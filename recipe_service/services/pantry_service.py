@@ -0,0 +1,165 @@
+from dataclasses import dataclass
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from database import read_replica
+from recipe_service.core.change_feed import track_change
+from recipe_service.core.pantry_matcher import PantryMatcher, pantry_matcher
+from recipe_service.models.ingredients_models import Ingredient
+from recipe_service.models.pantry_models import PantryItem
+from recipe_service.models.recipes_models import Recipe, RecipeIngredient
+from recipe_service.services.recipe_service import IngredientNotFound
+
+
+# ----------------------------------------------------------
+# Custom exceptions
+# ----------------------------------------------------------
+class PantryItemNotFound(Exception):
+    """Exception thrown when an ingredient is not in the user's pantry."""
+    def __init__(self, ingredient_id: int):
+        super().__init__(f"Ingredient with ID {ingredient_id} is not in the pantry.")
+
+
+@dataclass
+class PantryMatch:
+    recipe: Recipe
+    missing_count: int
+    missing_ingredient_ids: list[int]
+
+
+# ----------------------------------------------------------
+# Pantry service
+# ----------------------------------------------------------
+class PantryService:
+    """Service class for user pantries and "cookable now" matching.
+
+    Writes only store pantry items and log them to the change feed (with
+    the user id as row id). Matching runs on the worker's ``PantryMatcher``,
+    which reloads just the recipes and pantries that changed since.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _load_items(self, user_id: int):
+        return (await self.session.scalars(
+            select(PantryItem)
+            .where(PantryItem.user_id == user_id)
+            .order_by(PantryItem.ingredient_id)
+        )).all()
+
+    @read_replica
+    async def get_pantry(self, user_id: int):
+        return await self._load_items(user_id)
+
+    async def add_item(self, user_id: int, ingredient_id: int) -> PantryItem:
+        exists = await self.session.scalar(
+            select(Ingredient.id).where(Ingredient.id == ingredient_id)
+        )
+        if exists is None:
+            raise IngredientNotFound([ingredient_id])
+
+        inserted = await self.session.scalar(
+            insert(PantryItem)
+            .values(user_id=user_id, ingredient_id=ingredient_id)
+            .on_conflict_do_nothing()
+            .returning(PantryItem.ingredient_id)
+        )
+        if inserted is not None:
+            track_change(self.session, "pantry_items", [user_id], "U")
+        await self.session.commit()
+        return await self.session.scalar(
+            select(PantryItem).where(
+                PantryItem.user_id == user_id,
+                PantryItem.ingredient_id == ingredient_id
+            )
+        )
+
+    async def remove_item(self, user_id: int, ingredient_id: int) -> int:
+        deleted = await self.session.scalar(
+            delete(PantryItem)
+            .where(PantryItem.user_id == user_id,
+                   PantryItem.ingredient_id == ingredient_id)
+            .returning(PantryItem.ingredient_id)
+        )
+        if deleted is None:
+            raise PantryItemNotFound(ingredient_id)
+        track_change(self.session, "pantry_items", [user_id], "U")
+        await self.session.commit()
+        return ingredient_id
+
+    async def get_cookable(
+            self,
+            user_id: int,
+            max_missing: int = 0,
+            limit: int = 50
+    ) -> list[PantryMatch]:
+        """Recipes the pantry covers, then near-misses by missing count.
+
+        Only recipes sharing at least one ingredient with the pantry count
+        as near-misses. Runs on the primary: stale marks are cleared once
+        reloaded, so a lagging replica would leave the matcher outdated.
+        """
+        matcher = pantry_matcher()
+        async with matcher.lock:
+            await self._refresh_catalogue(matcher)
+            if not matcher.has_pantry(user_id):
+                # A change arriving while we read marks the pantry again
+                matcher.stale_users.discard(user_id)
+                try:
+                    items = await self._load_items(user_id)
+                except BaseException:
+                    matcher.stale_users.add(user_id)
+                    raise
+                matcher.set_pantry(user_id, [item.ingredient_id for item in items])
+            matches = matcher.matches(user_id, max_missing, limit)
+        if not matches:
+            return []
+
+        result = await self.session.scalars(
+            select(Recipe)
+            .options(selectinload(Recipe.ingredients))
+            .where(Recipe.id.in_([recipe_id for recipe_id, _ in matches]))
+        )
+        recipes = {recipe.id: recipe for recipe in result}
+        return [PantryMatch(recipes[recipe_id], len(missing), missing)
+                for recipe_id, missing in matches if recipe_id in recipes]
+
+    async def _refresh_catalogue(self, matcher: PantryMatcher) -> None:
+        """Load all recipe lines once, afterwards only recipes changed since."""
+        if not matcher.loaded:
+            matcher.clear()
+            result = await self.session.stream(
+                select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id)
+                .execution_options(yield_per=50_000)
+            )
+            ingredients_by_recipe: dict[int, list[int]] = {}
+            async for partition in result.partitions():
+                for recipe_id, ingredient_id in partition:
+                    lines = ingredients_by_recipe.setdefault(recipe_id, [])
+                    lines.append(ingredient_id)
+            for recipe_id, ingredient_ids in ingredients_by_recipe.items():
+                matcher.set_recipe(recipe_id, ingredient_ids)
+            matcher.loaded = True
+            return
+
+        if not matcher.stale_recipes:
+            return
+        # Changes arriving while we read are kept for the next refresh
+        stale, matcher.stale_recipes = matcher.stale_recipes, set()
+        try:
+            rows = await self.session.execute(
+                select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id)
+                .where(RecipeIngredient.recipe_id.in_(stale))
+            )
+        except BaseException:
+            matcher.stale_recipes |= stale
+            raise
+        ingredients_by_recipe = {recipe_id: [] for recipe_id in stale}
+        for recipe_id, ingredient_id in rows:
+            ingredients_by_recipe[recipe_id].append(ingredient_id)
+        for recipe_id, ingredient_ids in ingredients_by_recipe.items():
+            matcher.set_recipe(recipe_id, ingredient_ids)
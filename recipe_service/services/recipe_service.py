@@ -1,14 +1,55 @@
+import base64
+import json
+import math
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Literal
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, func, literal
+from sqlalchemy import (
+    BigInteger, Integer, Select, case, cast, column, delete, distinct, func, literal,
+    literal_column, select, tuple_, values
+)
+from sqlalchemy.dialects.postgresql import ARRAY, array
 from sqlalchemy.orm import selectinload
-from recipe_service.models.recipes_models import Recipe, RecipeIngredient
-from recipe_service.models.ingredients_models import Ingredient
+from database import read_replica
+from recipe_service.core.change_feed import track_change
+from recipe_service.core.permissions import (
+    NO_PERMISSIONS,
+    Permission,
+    PermissionDenied,
+    anonymous_permissions,
+    permission_resolver
+)
+from recipe_service.core.similarity import MinHashLSH, similarity_index
+from recipe_service.core.substitutions import Substitute
+from recipe_service.models.recipes_models import (
+    UNKNOWN_COOKING_TIME,
+    Recipe,
+    RecipeIngredient
+)
+from recipe_service.models.image_models import StoredImage
+from recipe_service.models.ingredients_models import Ingredient, IngredientCategory
 from recipe_service.pydantic_schemas.recipes_schemas import (
     RecipeCreateSchema,
+    RecipeSearchQuerySchema,
     RecipeUpdateSchema
 )
+from recipe_service.services.ingredient_service import IngredientService
+
+
+# Upper bounds (exclusive) of the cooking time facet buckets, in minutes
+COOKING_TIME_BUCKETS = (15, 30, 60, 120)
+
+
+def _bucket_label(bucket: int | None) -> str:
+    if bucket is None:
+        return "unknown"
+    if bucket == 0:
+        return f"<{COOKING_TIME_BUCKETS[0]}"
+    if bucket == len(COOKING_TIME_BUCKETS):
+        return f"{COOKING_TIME_BUCKETS[-1]}+"
+    return f"{COOKING_TIME_BUCKETS[bucket - 1]}-{COOKING_TIME_BUCKETS[bucket] - 1}"
 
 
 class RecipeAlreadyExists(Exception):
@@ -23,16 +64,112 @@ class IngredientNotFound(Exception):
     pass
 
 
+@dataclass
+class SimilarRecipe:
+    recipe: Recipe
+    similarity: float
+
+
+@dataclass
+class Substitution:
+    ingredient_id: int
+    substitute_id: int
+    weight: float
+    path: list[int]
+
+
+@dataclass
+class SubstitutedRecipe:
+    recipe: Recipe
+    score: float
+    substitutions: list[Substitution]
+
+
+@dataclass
+class RecipePage:
+    recipes: list[Recipe]
+    # Cursor of the following page, None on the last one
+    next_cursor: str | None
+
+
+@dataclass
+class SearchFacets:
+    categories: dict[int, int]
+    cooking_time: dict[str, int]
+    ingredients: dict[int, int]
+
+
+@dataclass
+class FacetedSearchResult:
+    recipes: list[Recipe]
+    total: int
+    facets: SearchFacets
+
+
+def _fold_facets(rows) -> tuple[list[int], int, SearchFacets]:
+    """Hit ids, total and facets from the rows of the GROUPING SETS query."""
+    result_ids, total = [], 0
+    facets = SearchFacets({}, {}, {})
+    # GROUPING() sets a bit for every column not grouped by, first column highest
+    for grouping, hit_id, hit_bucket, hit_ingredient, hit_category, count in rows:
+        if grouping == 0b1111:
+            total = count
+        elif grouping == 0b0111:
+            result_ids.append(hit_id)
+        elif grouping == 0b1011:
+            facets.cooking_time[_bucket_label(hit_bucket)] = count
+        elif grouping == 0b1101 and hit_ingredient is not None:
+            facets.ingredients[hit_ingredient] = count
+        elif grouping == 0b1110 and hit_category is not None:
+            facets.categories[hit_category] = count
+    return result_ids, total, facets
+
+
 class RecipeService:
-    def __init__(self, session: AsyncSession):
+    """Recipe reads and writes.
+
+    ``user_id`` is the signed-in user acting through the API. Writes check
+    their permissions (see ``PermissionResolver``). Anonymous callers hold
+    ``ANONYMOUS_PERMISSIONS``: they may create recipes unless
+    ``RECIPE_WRITES_REQUIRE_AUTH`` is set, never edit or delete one.
+    Internal callers and scripts that act for nobody in particular pass
+    ``trusted=True`` to skip the checks; the API never does.
+    """
+
+    def __init__(
+            self,
+            session: AsyncSession,
+            user_id: int | None = None,
+            *,
+            trusted: bool = False
+    ):
         self.session = session
+        self.user_id = user_id
+        self.trusted = trusted
+
+    async def _authorize(self, allowed: Permission) -> None:
+        """Raise ``PermissionDenied`` unless the user holds any of ``allowed``."""
+        if self.user_id is None:
+            if self.trusted:
+                return
+            granted = anonymous_permissions()
+        else:
+            granted = await permission_resolver().permissions(
+                self.session, self.user_id
+            )
+        if not granted & allowed:
+            raise PermissionDenied(self.user_id, allowed)
+
+    def _if_own(self, recipe: Recipe, permission: Permission) -> Permission:
+        if self.user_id is not None and recipe.author_id == self.user_id:
+            return permission
+        return NO_PERMISSIONS
 
     async def _validate_ingredients(self, ingredient_ids: list[int]):
-        result = await self.session.scalars(
-            select(Ingredient).where(Ingredient.id.in_(ingredient_ids))
+        found = await self.session.scalars(
+            select(Ingredient.id).where(Ingredient.id.in_(ingredient_ids))
         )
-        ingredients = result.all()
-        missing = set(ingredient_ids) - {i.id for i in ingredients}
+        missing = set(ingredient_ids) - set(found)
         if missing:
             raise IngredientNotFound(list(missing))
 
@@ -41,11 +178,12 @@ class RecipeService:
             data: RecipeCreateSchema,
             author_id: int | None = None
     ):
+        await self._authorize(Permission.RECIPE_CREATE)
         await self._validate_ingredients([i.ingredient_id for i in data.ingredients])
         recipe = Recipe(
             cooking_time_in_minutes=data.cooking_time_in_minutes,
             image_url=data.image_url,
-            author_id=author_id,
+            author_id=author_id if author_id is not None else self.user_id,
         )
         self.session.add(recipe)
         await self.session.flush()
@@ -58,25 +196,26 @@ class RecipeService:
             )
             for i in data.ingredients
         ])
+        track_change(self.session, "recipes", [recipe.id], "I")
         await self.session.commit()
-        await self.session.refresh(recipe)
-        result = await self.session.execute(
-            select(Recipe)
-            .options(
-                selectinload(Recipe.ingredients)
-                .selectinload(RecipeIngredient.ingredient)
-            )
-            .where(Recipe.id == recipe.id)
-        )
-        recipe = result.scalar_one()
-        return recipe
+        return await self._reload_recipe(recipe.id)
 
+    @read_replica
     async def get_all_recipes(self):
         result = await self.session.execute(
             select(Recipe).options(selectinload(Recipe.ingredients))
         )
         return result.scalars().all()
 
+    async def _reload_recipe(self, recipe_id: int) -> Recipe:
+        """Reload a written recipe: server defaults and its new ingredient lines"""
+        return await self.session.scalar(
+            select(Recipe)
+            .options(selectinload(Recipe.ingredients))
+            .where(Recipe.id == recipe_id)
+            .execution_options(populate_existing=True)
+        )
+
     async def get_recipe_by_id(self, recipe_id: int):
         result = await self.session.execute(
             select(Recipe)
@@ -88,8 +227,17 @@ class RecipeService:
             raise RecipeNotFound
         return recipe
 
-    async def update_recipe(self, recipe_id: int, data: RecipeUpdateSchema):
+    async def get_editable_recipe(self, recipe_id: int) -> Recipe:
+        """The recipe, if the user may edit it; ``PermissionDenied`` otherwise."""
         recipe = await self.get_recipe_by_id(recipe_id)
+        await self._authorize(
+            Permission.RECIPE_EDIT_ANY
+            | self._if_own(recipe, Permission.RECIPE_EDIT_OWN)
+        )
+        return recipe
+
+    async def update_recipe(self, recipe_id: int, data: RecipeUpdateSchema):
+        recipe = await self.get_editable_recipe(recipe_id)
         updated = False
 
         if data.cooking_time_in_minutes is not None:
@@ -97,6 +245,7 @@ class RecipeService:
             updated = True
         if data.image_url is not None:
             recipe.image_url = data.image_url
+            recipe.image_hash = None
             updated = True
         if data.ingredients is not None:
             await self._validate_ingredients(
@@ -117,16 +266,32 @@ class RecipeService:
             updated = True
 
         if updated:
+            track_change(self.session, "recipes", [recipe.id], "U")
             await self.session.commit()
-            await self.session.refresh(recipe)
+            recipe = await self._reload_recipe(recipe_id)
         return recipe
 
+    async def set_image(self, recipe_id: int, image: StoredImage) -> Recipe:
+        """Use an uploaded image for the recipe; ``image_url`` links its original."""
+        recipe = await self.get_editable_recipe(recipe_id)
+        recipe.image_hash = image.hash
+        recipe.image_url = image.original_url
+        track_change(self.session, "recipes", [recipe.id], "U")
+        await self.session.commit()
+        return await self._reload_recipe(recipe_id)
+
     async def delete_recipe(self, recipe_id: int):
         recipe = await self.get_recipe_by_id(recipe_id)
+        await self._authorize(
+            Permission.RECIPE_DELETE_ANY
+            | self._if_own(recipe, Permission.RECIPE_DELETE_OWN)
+        )
+        track_change(self.session, "recipes", [recipe.id], "D")
         await self.session.delete(recipe)
         await self.session.commit()
         return recipe.id
 
+    @read_replica
     async def search_recipes(
             self,
             ingredient_ids: list[int],
@@ -140,7 +305,7 @@ class RecipeService:
             return []
 
         query = select(Recipe).join(Recipe.ingredients).options(
-            selectinload(Recipe.ingredients).selectinload(RecipeIngredient.ingredient)
+            selectinload(Recipe.ingredients)
         )
 
         if match == "any":
@@ -159,3 +324,410 @@ class RecipeService:
 
         result = await self.session.execute(query)
         return result.scalars().all()
+
+    @read_replica
+    async def filter_recipes(self, query: RecipeSearchQuerySchema) -> RecipePage:
+        """One page of recipes matching every given filter, in ``query.sort`` order.
+
+        Filters and sort compile to a single statement; each sort order has
+        a composite (key, id) index, and pages continue with a row
+        comparison on that pair, so deep pages cost the same as the first.
+        """
+        sort, descending = query.sort.lstrip("-"), query.sort.startswith("-")
+        columns = (Recipe.id,) if sort == "id" else (_SORT_KEYS[sort], Recipe.id)
+        statement = _filter_statement(query)
+        if query.after is not None:
+            values = _decode_cursor(query.after, query.sort)
+            left, right = (columns[0], values[0]) if len(columns) == 1 else (
+                tuple_(*columns), tuple_(*values)
+            )
+            statement = statement.where(left < right if descending else left > right)
+        order = [column.desc() for column in columns] if descending else columns
+
+        recipes = (await self.session.scalars(
+            statement
+            .options(selectinload(Recipe.ingredients))
+            .order_by(*order)
+            .limit(query.limit + 1)
+        )).all()
+        if len(recipes) <= query.limit:
+            return RecipePage(list(recipes), None)
+        recipes = recipes[:query.limit]
+        return RecipePage(list(recipes), _encode_cursor(recipes[-1], query.sort))
+
+    @read_replica
+    async def search_recipes_with_facets(
+            self,
+            ingredient_ids: list[int],
+            match: Literal["any", "all"] = "any",
+            limit: int = 50
+    ) -> FacetedSearchResult:
+        """``search_recipes`` plus the counts a search page shows next to it.
+
+        One GROUPING SETS statement over the hits returns, in the same scan,
+        the hit ids, their total and the number of hits per ingredient
+        category, per cooking time bucket and per requested ingredient.
+        Only the first ``limit`` recipes (by id) are loaded.
+        """
+        empty = FacetedSearchResult([], 0, SearchFacets({}, {}, {}))
+        requested = list(dict.fromkeys(ingredient_ids))
+        if not requested:
+            return empty
+
+        hits = (
+            select(RecipeIngredient.recipe_id)
+            .where(RecipeIngredient.ingredient_id.in_(requested))
+            .group_by(RecipeIngredient.recipe_id)
+        )
+        if match == "all":
+            hits = hits.having(
+                func.count(RecipeIngredient.ingredient_id) == len(requested)
+            )
+        elif match != "any":
+            raise ValueError("Match must be 'any' or 'all'")
+        hits = hits.cte("hits")
+
+        bucket = func.width_bucket(
+            Recipe.cooking_time_in_minutes,
+            cast(array(COOKING_TIME_BUCKETS), ARRAY(Integer))
+        )
+        line_ingredient = RecipeIngredient.ingredient_id
+        requested_id = case((line_ingredient.in_(requested), line_ingredient))
+        # One row per hit, line and category of the line's ingredient
+        lines = (
+            select(
+                hits.c.recipe_id,
+                bucket.label("bucket"),
+                requested_id.label("requested_id"),
+                IngredientCategory.category_id
+            )
+            .join(Recipe, Recipe.id == hits.c.recipe_id)
+            .join(RecipeIngredient, RecipeIngredient.recipe_id == hits.c.recipe_id)
+            .outerjoin(IngredientCategory,
+                       IngredientCategory.ingredient_id == line_ingredient)
+            .subquery("lines")
+        )
+        columns = (
+            lines.c.recipe_id, lines.c.bucket, lines.c.requested_id, lines.c.category_id
+        )
+        rows = await self.session.execute(
+            select(
+                func.grouping(*columns).label("grouping_set"),
+                *columns,
+                func.count(distinct(lines.c.recipe_id))
+            )
+            .group_by(func.grouping_sets(tuple_(), *(tuple_(c) for c in columns)))
+        )
+
+        result_ids, total, facets = _fold_facets(rows)
+        if not total:
+            return empty
+
+        page = sorted(result_ids)[:limit]
+        recipes = await self.session.scalars(
+            select(Recipe)
+            .options(selectinload(Recipe.ingredients))
+            .where(Recipe.id.in_(page))
+            .order_by(Recipe.id)
+        )
+        return FacetedSearchResult(recipes.all(), total, facets)
+
+    async def search_recipes_with_substitutes(
+            self,
+            ingredient_ids: list[int],
+            limit: int = 50
+    ) -> list[SubstitutedRecipe]:
+        """Like ``match="all"``, but each ingredient may be replaced by a
+        substitute from the precomputed closure.
+
+        One query finds the recipes covering every requested ingredient
+        with itself or a substitute; the substitutions are then chosen per
+        recipe, exact matches first, so one recipe line never stands in for
+        two requested ingredients. Recipes are ranked by the product of the
+        substitution weights (1 for an exact match).
+        """
+        requested = list(dict.fromkeys(ingredient_ids))
+        if not requested:
+            return []
+        graph = await IngredientService(self.session).get_substitution_graph()
+        options = graph.options(requested)
+
+        candidates = (
+            values(column("requested", BigInteger), column("candidate", BigInteger),
+                   name="candidates")
+            .data([(requested_id, candidate_id)
+                   for requested_id, chains in options.items()
+                   for candidate_id in chains])
+        )
+        hits = (
+            select(
+                RecipeIngredient.recipe_id,
+                candidates.c.requested,
+                candidates.c.candidate
+            )
+            .join(candidates, candidates.c.candidate == RecipeIngredient.ingredient_id)
+            .cte("hits")
+        )
+        covered = (
+            select(hits.c.recipe_id)
+            .group_by(hits.c.recipe_id)
+            .having(func.count(distinct(hits.c.requested)) == len(requested))
+        )
+        rows = await self.session.execute(
+            select(hits).where(hits.c.recipe_id.in_(covered))
+        )
+
+        present: dict[int, set[int]] = {}
+        for recipe_id, _, candidate_id in rows:
+            present.setdefault(recipe_id, set()).add(candidate_id)
+        ranked = []
+        for recipe_id, ingredient_set in present.items():
+            chosen = _choose_substitutes(options, ingredient_set)
+            if chosen is not None:
+                score = 1.0
+                for _, chain in chosen.values():
+                    score *= chain.weight
+                ranked.append((recipe_id, score, chosen))
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        ranked = ranked[:limit]
+        if not ranked:
+            return []
+
+        result = await self.session.scalars(
+            select(Recipe)
+            .options(selectinload(Recipe.ingredients))
+            .where(Recipe.id.in_([recipe_id for recipe_id, _, _ in ranked]))
+        )
+        recipes = {recipe.id: recipe for recipe in result}
+        return [
+            SubstitutedRecipe(recipes[recipe_id], score, [
+                Substitution(
+                    requested_id, substitute_id, chain.weight, list(chain.path)
+                )
+                for requested_id, (substitute_id, chain) in chosen.items()
+                if substitute_id != requested_id
+            ])
+            for recipe_id, score, chosen in ranked if recipe_id in recipes
+        ]
+
+    async def get_similar_recipes(
+            self,
+            recipe_id: int,
+            k: int = 10
+    ) -> list[SimilarRecipe]:
+        """Top ``k`` recipes by estimated Jaccard similarity of their ingredients.
+
+        Runs on the primary: the index clears a recipe's stale mark once it
+        is reloaded, so a lagging replica would leave it outdated for good.
+        """
+        index = similarity_index()
+        await self._refresh_similarity_index(index)
+
+        matches = index.query(recipe_id, k)
+        if recipe_id not in index.signatures:
+            # Unknown, or a recipe without ingredients that nothing resembles
+            exists = await self.session.scalar(
+                select(Recipe.id).where(Recipe.id == recipe_id)
+            )
+            if exists is None:
+                raise RecipeNotFound
+            return []
+        if not matches:
+            return []
+
+        result = await self.session.scalars(
+            select(Recipe)
+            .options(selectinload(Recipe.ingredients))
+            .where(Recipe.id.in_([match_id for match_id, _ in matches]))
+        )
+        recipes = {recipe.id: recipe for recipe in result}
+        # A match deleted since the index was refreshed is skipped
+        return [SimilarRecipe(recipes[match_id], similarity)
+                for match_id, similarity in matches if match_id in recipes]
+
+    async def _refresh_similarity_index(self, index: MinHashLSH) -> None:
+        """Load the whole index once, afterwards only recipes changed since."""
+        async with index.lock:
+            if not index.loaded:
+                index.clear()
+                result = await self.session.stream(
+                    select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id)
+                    .execution_options(yield_per=50_000)
+                )
+                ingredients_by_recipe: dict[int, list[int]] = {}
+                async for partition in result.partitions():
+                    for recipe_id, ingredient_id in partition:
+                        lines = ingredients_by_recipe.setdefault(recipe_id, [])
+                        lines.append(ingredient_id)
+                for recipe_id, ingredient_ids in ingredients_by_recipe.items():
+                    index.upsert(recipe_id, ingredient_ids)
+                index.loaded = True
+                return
+
+            if not index.stale:
+                return
+            # Changes arriving while we read are kept for the next refresh
+            stale, index.stale = index.stale, set()
+            try:
+                rows = await self.session.execute(
+                    select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id)
+                    .where(RecipeIngredient.recipe_id.in_(stale))
+                )
+            except BaseException:
+                index.stale |= stale
+                raise
+            ingredients_by_recipe = {recipe_id: [] for recipe_id in stale}
+            for recipe_id, ingredient_id in rows:
+                ingredients_by_recipe[recipe_id].append(ingredient_id)
+            for recipe_id, ingredient_ids in ingredients_by_recipe.items():
+                # Deleted recipes have no lines left and drop out of the index
+                index.upsert(recipe_id, ingredient_ids)
+
+
+def _choose_substitutes(
+        options: dict[int, dict[int, Substitute]],
+        ingredient_ids: set[int]
+) -> dict[int, tuple[int, Substitute]] | None:
+    """Pick a distinct recipe ingredient for every requested one, maximizing
+    the product of the weights. ``None`` if the recipe cannot cover them all.
+
+    A minimum cost bipartite matching with costs ``-log(weight)``: each
+    requested ingredient is added along the cheapest alternating path to a
+    free recipe ingredient, which may move earlier ones to other lines.
+    """
+    costs = {
+        requested_id: {
+            candidate_id: -math.log(chain.weight)
+            for candidate_id, chain in chains.items() if candidate_id in ingredient_ids
+        }
+        for requested_id, chains in options.items()
+    }
+    owner: dict[int, int] = {}
+    assigned: dict[int, int] = {}
+    for start in costs:
+        # Bellman-Ford: going back along a matched line earns its cost back
+        distance = {start: 0.0}
+        reached: dict[int, tuple[float, int]] = {}
+        frontier = [start]
+        while frontier:
+            relaxed = []
+            for requested_id in frontier:
+                for candidate_id, cost in costs[requested_id].items():
+                    total = distance[requested_id] + cost
+                    known = reached.get(candidate_id)
+                    if known is not None and known[0] <= total + 1e-12:
+                        continue
+                    reached[candidate_id] = (total, requested_id)
+                    holder = owner.get(candidate_id)
+                    if holder is None:
+                        continue
+                    back = total - costs[holder][candidate_id]
+                    if holder not in distance or back < distance[holder] - 1e-12:
+                        distance[holder] = back
+                        relaxed.append(holder)
+            frontier = relaxed
+
+        free = [(cost, candidate_id) for candidate_id, (cost, _) in reached.items()
+                if candidate_id not in owner]
+        if not free:
+            return None
+        _, candidate_id = min(free)
+        while candidate_id is not None:
+            requested_id = reached[candidate_id][1]
+            previous = assigned.get(requested_id)
+            owner[candidate_id], assigned[requested_id] = requested_id, candidate_id
+            candidate_id = previous
+    return {requested_id: (candidate_id, options[requested_id][candidate_id])
+            for requested_id, candidate_id in assigned.items()}
+
+
+# ----------------------------------------------------------
+# Recipe search filters and keyset cursors
+# ----------------------------------------------------------
+# Matches the expression of ix_recipes_cooking_time
+_COOKING_TIME_KEY = func.coalesce(
+    Recipe.cooking_time_in_minutes, literal_column(str(UNKNOWN_COOKING_TIME))
+)
+_SORT_KEYS = {
+    "cooking_time": _COOKING_TIME_KEY,
+    "created_at": Recipe.created_at,
+    "updated_at": Recipe.updated_at,
+}
+
+
+# Filters that compare one column with the (non-None) query value
+_FIELD_FILTERS = {
+    "author_id": lambda value: Recipe.author_id == value,
+    "created_after": lambda value: Recipe.created_at >= value,
+    "created_before": lambda value: Recipe.created_at < value,
+    "updated_after": lambda value: Recipe.updated_at >= value,
+    "updated_before": lambda value: Recipe.updated_at < value,
+    "has_image": lambda value: (
+        Recipe.image_url.is_not(None) if value else Recipe.image_url.is_(None)
+    ),
+}
+
+
+def _ingredient_filter(query: RecipeSearchQuerySchema):
+    ingredient_ids = list(dict.fromkeys(query.ingredient_ids))
+    if not ingredient_ids:
+        return None
+    hits = (
+        select(RecipeIngredient.recipe_id)
+        .where(RecipeIngredient.ingredient_id.in_(ingredient_ids))
+    )
+    if query.match_all:
+        hits = (
+            hits.group_by(RecipeIngredient.recipe_id)
+            .having(func.count() == len(ingredient_ids))
+        )
+    return Recipe.id.in_(hits)
+
+
+def _cooking_time_filter(query: RecipeSearchQuerySchema):
+    if query.min_cooking_time is None and query.max_cooking_time is None:
+        return None
+    # Bounded on the sort key, so the cooking time index serves the range
+    upper = UNKNOWN_COOKING_TIME - 1
+    if query.max_cooking_time is not None:
+        upper = query.max_cooking_time
+    return _COOKING_TIME_KEY.between(query.min_cooking_time or 0, upper)
+
+
+def _filter_statement(query: RecipeSearchQuerySchema) -> Select:
+    clauses = [_ingredient_filter(query), _cooking_time_filter(query)]
+    for field, clause in _FIELD_FILTERS.items():
+        value = getattr(query, field)
+        if value is not None:
+            clauses.append(clause(value))
+    return select(Recipe).where(*(c for c in clauses if c is not None))
+
+
+def _encode_cursor(recipe: Recipe, sort: str) -> str:
+    """Opaque position after ``recipe``: the sort order, key value and id."""
+    key = sort.lstrip("-")
+    if key == "id":
+        values = [recipe.id]
+    elif key == "cooking_time":
+        minutes = recipe.cooking_time_in_minutes
+        values = [UNKNOWN_COOKING_TIME if minutes is None else minutes, recipe.id]
+    else:
+        values = [getattr(recipe, key).isoformat(), recipe.id]
+    raw = json.dumps([sort, *values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str) -> tuple:
+    """The key values of a cursor made for ``sort``; ``ValueError`` otherwise."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, *values = json.loads(raw)
+        if cursor_sort != sort or len(values) != (1 if sort == "id" else 2):
+            raise ValueError
+        if sort.lstrip("-") in ("created_at", "updated_at"):
+            values[0] = datetime.fromisoformat(values[0])
+        if not all(isinstance(v, (int, datetime)) for v in values):
+            raise ValueError
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor for this sort order") from e
+    return tuple(values)
@@ -0,0 +1,174 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import column, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from database import read_replica
+from recipe_service.models.changes_models import ChangeLog, ChangeLogHorizon
+from recipe_service.models.ingredients_models import Category, Ingredient
+from recipe_service.models.recipes_models import Recipe
+
+# Translation tables belong to the translation service; lightweight table
+# constructs are enough to read them without mapping its models here.
+recipe_translations = table(
+    "recipe_translations",
+    column("id"),
+    column("recipe_id"),
+    column("language_id"),
+    column("title"),
+    column("description"),
+    column("instructions"),
+    schema="translations"
+)
+ingredient_translations = table(
+    "ingredient_translations",
+    column("id"),
+    column("ingredient_id"),
+    column("language_id"),
+    schema="translations"
+)
+unit_translations = table(
+    "unit_translations",
+    column("id"),
+    column("unit_id"),
+    column("language_id"),
+    column("symbol"),
+    schema="translations"
+)
+
+
+class CursorTooOld(Exception):
+    """Exception thrown when a delete after the sync cursor was purged."""
+    def __init__(self, cursor: int, horizon: int):
+        self.cursor = cursor
+        self.horizon = horizon
+        super().__init__(
+            f"Cursor {cursor} is older than the change log, which was compacted "
+            f"through {horizon}: discard the local copy and sync again from 0"
+        )
+
+
+@dataclass
+class SyncPage:
+    """Current state of everything changed in one page of the change log."""
+    cursor: int
+    has_more: bool
+    recipes: list = field(default_factory=list)
+    ingredients: list = field(default_factory=list)
+    categories: list = field(default_factory=list)
+    recipe_translations: list[dict[str, Any]] = field(default_factory=list)
+    ingredient_translations: list[dict[str, Any]] = field(default_factory=list)
+    unit_translations: list[dict[str, Any]] = field(default_factory=list)
+    deleted: list[dict[str, Any]] = field(default_factory=list)
+
+
+class SyncService:
+    """Delta sync for clients that keep a local copy of the catalogue.
+
+    The cursor is the last ``change_log.id`` a client has seen. Change ids
+    become visible in id order (see ``change_feed.CHANGE_LOG_LOCK``), so a
+    client that stores the returned cursor never misses a change, and an
+    up-to-date client costs two primary key probes.
+
+    Old changes are compacted (see ``change_feed.purge_change_log``): a
+    full sync from 0 still sees every live row, but a cursor older than the
+    last purged delete raises ``CursorTooOld`` and the client starts over.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._loaders = {
+            "recipes": self._load_recipes,
+            "ingredients": self._load_ingredients,
+            "categories": self._load_categories,
+            "recipe_translations": self._load_recipe_translations,
+            "ingredient_translations": self._load_ingredient_translations,
+            "unit_translations": self._load_unit_translations,
+        }
+
+    @read_replica
+    async def get_changes(self, since: int = 0, limit: int = 500) -> SyncPage:
+        if since:
+            horizon = await self.session.scalar(
+                select(ChangeLogHorizon.purged_through)
+            )
+            if horizon and since < horizon:
+                raise CursorTooOld(since, horizon)
+        changes = (await self.session.execute(
+            select(ChangeLog.id, ChangeLog.table_name, ChangeLog.row_id, ChangeLog.op)
+            .where(ChangeLog.id > since)
+            .order_by(ChangeLog.id)
+            .limit(limit + 1)
+        )).all()
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        page = SyncPage(cursor=changes[-1].id if changes else since, has_more=has_more)
+
+        # Only the latest state matters: collapse repeated changes of a row
+        latest: dict[str, dict[int, str]] = {}
+        for change in changes:
+            latest.setdefault(change.table_name, {})[change.row_id] = change.op
+
+        for table_name, ops in latest.items():
+            loader = self._loaders.get(table_name)
+            if loader is None:
+                continue
+            live_ids = [row_id for row_id, op in ops.items() if op != "D"]
+            rows = await loader(live_ids) if live_ids else []
+            getattr(page, table_name).extend(rows)
+
+            # Tombstones: deletes, and changed rows that are gone by now
+            found = {row["id"] if isinstance(row, Mapping) else row.id for row in rows}
+            page.deleted.extend(
+                {"table": table_name, "id": row_id}
+                for row_id in ops
+                if row_id not in found
+            )
+
+        return page
+
+    async def _load_recipes(self, ids: list[int]):
+        return (await self.session.scalars(
+            select(Recipe)
+            .options(selectinload(Recipe.ingredients))
+            .where(Recipe.id.in_(ids))
+            .order_by(Recipe.id)
+        )).all()
+
+    async def _load_ingredients(self, ids: list[int]):
+        return (await self.session.scalars(
+            select(Ingredient)
+            .options(selectinload(Ingredient.categories))
+            .where(Ingredient.id.in_(ids))
+            .order_by(Ingredient.id)
+        )).all()
+
+    async def _load_categories(self, ids: list[int]):
+        return (await self.session.scalars(
+            select(Category).where(Category.id.in_(ids)).order_by(Category.id)
+        )).all()
+
+    async def _load_recipe_translations(self, ids: list[int]):
+        return (await self.session.execute(
+            select(recipe_translations)
+            .where(recipe_translations.c.id.in_(ids))
+            .order_by(recipe_translations.c.id)
+        )).mappings().all()
+
+    async def _load_ingredient_translations(self, ids: list[int]):
+        return (await self.session.execute(
+            select(ingredient_translations)
+            .where(ingredient_translations.c.id.in_(ids))
+            .order_by(ingredient_translations.c.id)
+        )).mappings().all()
+
+    async def _load_unit_translations(self, ids: list[int]):
+        return (await self.session.execute(
+            select(unit_translations)
+            .where(unit_translations.c.id.in_(ids))
+            .order_by(unit_translations.c.id)
+        )).mappings().all()
@@ -0,0 +1,281 @@
+from collections import defaultdict
+from typing import Sequence
+
+from sqlalchemy import and_, case, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import read_replica
+
+from recipe_service.models.ingredients_models import Ingredient
+from recipe_service.models.recipes_models import (
+    Recipe,
+    RecipeIngredient,
+    UserRecipe,
+    UserRecipeIngredient
+)
+from recipe_service.pydantic_schemas.recipes_schemas import (
+    UserRecipeCreateSchema,
+    UserRecipeUpdateSchema
+)
+from recipe_service.services.recipe_service import IngredientNotFound, RecipeNotFound
+
+
+# ----------------------------------------------------------
+# Custom exceptions
+# ----------------------------------------------------------
+class UserRecipeNotFound(Exception):
+    """Exception thrown when user recipe by ID is not found."""
+    def __init__(self, user_recipe_id: int):
+        super().__init__(f"User recipe with ID {user_recipe_id} not found.")
+
+
+# ----------------------------------------------------------
+# User recipe service
+# ----------------------------------------------------------
+class UserRecipeService:
+    """Service class for user variants of recipes.
+
+    A variant never copies the ingredients of its base recipe. Only the
+    overrides are stored in ``user_recipe_ingredients`` and the effective
+    ingredient list is resolved on read with a single merge query.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def _effective_ingredients_query(user_recipe_ids: list[int]):
+        """Merge base recipe lines with the overrides of the given variants."""
+        base = (
+            select(
+                UserRecipe.id.label("user_recipe_id"),
+                RecipeIngredient.ingredient_id,
+                RecipeIngredient.quantity,
+                RecipeIngredient.unit_id
+            )
+            .join(
+                RecipeIngredient,
+                RecipeIngredient.recipe_id == UserRecipe.base_recipe_id
+            )
+            .where(UserRecipe.id.in_(user_recipe_ids))
+            .subquery("base")
+        )
+        override = (
+            select(
+                UserRecipeIngredient.user_recipe_id,
+                UserRecipeIngredient.ingredient_id,
+                UserRecipeIngredient.quantity,
+                UserRecipeIngredient.unit_id,
+                UserRecipeIngredient.is_removed
+            )
+            .where(UserRecipeIngredient.user_recipe_id.in_(user_recipe_ids))
+            .subquery("override")
+        )
+        overridden = override.c.ingredient_id.is_not(None)
+        return (
+            select(
+                func.coalesce(override.c.user_recipe_id, base.c.user_recipe_id)
+                .label("user_recipe_id"),
+                func.coalesce(override.c.ingredient_id, base.c.ingredient_id)
+                .label("ingredient_id"),
+                case((overridden, override.c.quantity), else_=base.c.quantity)
+                .label("quantity"),
+                case((overridden, override.c.unit_id), else_=base.c.unit_id)
+                .label("unit_id")
+            )
+            .select_from(
+                base.join(
+                    override,
+                    and_(
+                        base.c.user_recipe_id == override.c.user_recipe_id,
+                        base.c.ingredient_id == override.c.ingredient_id
+                    ),
+                    full=True
+                )
+            )
+            .where(override.c.is_removed.is_not(True))
+            .order_by("user_recipe_id", "ingredient_id")
+        )
+
+    async def _attach_effective_ingredients(
+            self,
+            user_recipes: Sequence[UserRecipe]
+    ) -> Sequence[UserRecipe]:
+        """Resolve effective ingredients for one or many variants at once."""
+        if not user_recipes:
+            return user_recipes
+
+        rows = await self.session.execute(
+            self._effective_ingredients_query([ur.id for ur in user_recipes])
+        )
+        by_recipe = defaultdict(list)
+        for row in rows:
+            by_recipe[row.user_recipe_id].append({
+                "ingredient_id": row.ingredient_id,
+                "quantity": row.quantity,
+                "unit_id": row.unit_id
+            })
+        for user_recipe in user_recipes:
+            user_recipe.effective_ingredients = by_recipe.get(user_recipe.id, [])
+        return user_recipes
+
+    async def _get_user_recipe(self, user_recipe_id: int) -> UserRecipe:
+        user_recipe = await self.session.get(UserRecipe, user_recipe_id)
+        if user_recipe is None:
+            raise UserRecipeNotFound(user_recipe_id)
+        return user_recipe
+
+    async def create_user_recipe(self, data: UserRecipeCreateSchema) -> UserRecipe:
+        """Forks a base recipe. No ingredient rows are copied."""
+        if await self.session.get(Recipe, data.base_recipe_id) is None:
+            raise RecipeNotFound
+
+        user_recipe = UserRecipe(**data.model_dump())
+        self.session.add(user_recipe)
+        await self.session.commit()
+        await self.session.refresh(user_recipe)
+
+        (user_recipe,) = await self._attach_effective_ingredients([user_recipe])
+        return user_recipe
+
+    async def get_user_recipe_by_id(self, user_recipe_id: int) -> UserRecipe:
+        """Return user recipe by id with its effective ingredients"""
+        user_recipe = await self._get_user_recipe(user_recipe_id)
+        (user_recipe,) = await self._attach_effective_ingredients([user_recipe])
+        return user_recipe
+
+    @read_replica
+    async def get_user_recipes(
+            self,
+            user_id: int | None = None,
+            user_recipe_ids: list[int] | None = None
+    ) -> Sequence[UserRecipe]:
+        """Return user recipes (optionally filtered) with effective ingredients"""
+        query = select(UserRecipe).order_by(UserRecipe.id)
+        if user_id is not None:
+            query = query.where(UserRecipe.user_id == user_id)
+        if user_recipe_ids is not None:
+            query = query.where(UserRecipe.id.in_(user_recipe_ids))
+
+        user_recipes = (await self.session.scalars(query)).all()
+        return await self._attach_effective_ingredients(user_recipes)
+
+    async def update_user_recipe(
+            self,
+            user_recipe_id: int,
+            data: UserRecipeUpdateSchema
+    ) -> UserRecipe:
+        """Updates user recipe metadata (title, description, ...)"""
+        user_recipe = await self._get_user_recipe(user_recipe_id)
+        changes = data.model_dump(exclude_none=True)
+        if changes:
+            for field, value in changes.items():
+                setattr(user_recipe, field, value)
+            await self.session.commit()
+            await self.session.refresh(user_recipe)
+
+        (user_recipe,) = await self._attach_effective_ingredients([user_recipe])
+        return user_recipe
+
+    async def _get_base_line(self, user_recipe: UserRecipe, ingredient_id: int):
+        return await self.session.get(
+            RecipeIngredient,
+            (user_recipe.base_recipe_id, ingredient_id)
+        )
+
+    async def _delete_override(self, user_recipe_id: int, ingredient_id: int):
+        await self.session.execute(
+            delete(UserRecipeIngredient).where(
+                UserRecipeIngredient.user_recipe_id == user_recipe_id,
+                UserRecipeIngredient.ingredient_id == ingredient_id
+            )
+        )
+
+    async def _upsert_override(self, user_recipe_id: int, ingredient_id: int, **values):
+        stmt = insert(UserRecipeIngredient).values(
+            user_recipe_id=user_recipe_id,
+            ingredient_id=ingredient_id,
+            **values
+        )
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    UserRecipeIngredient.user_recipe_id,
+                    UserRecipeIngredient.ingredient_id
+                ],
+                set_={key: stmt.excluded[key] for key in values}
+            )
+        )
+
+    async def set_ingredient(
+            self,
+            user_recipe_id: int,
+            ingredient_id: int,
+            quantity: float,
+            unit_id: int | None = None
+    ) -> UserRecipe:
+        """Adds or changes an ingredient line of a user recipe.
+
+        A line identical to the base recipe drops the override instead of
+        storing a redundant copy.
+        """
+        user_recipe = await self._get_user_recipe(user_recipe_id)
+        if await self.session.get(Ingredient, ingredient_id) is None:
+            raise IngredientNotFound([ingredient_id])
+
+        base_line = await self._get_base_line(user_recipe, ingredient_id)
+        if (base_line is not None
+                and base_line.quantity == quantity
+                and base_line.unit_id == unit_id):
+            await self._delete_override(user_recipe_id, ingredient_id)
+        else:
+            await self._upsert_override(
+                user_recipe_id,
+                ingredient_id,
+                quantity=quantity,
+                unit_id=unit_id,
+                is_removed=False
+            )
+        await self.session.commit()
+        return await self.get_user_recipe_by_id(user_recipe_id)
+
+    async def remove_ingredient(
+            self,
+            user_recipe_id: int,
+            ingredient_id: int
+    ) -> UserRecipe:
+        """Removes an ingredient from the effective list of a user recipe."""
+        user_recipe = await self._get_user_recipe(user_recipe_id)
+
+        if await self._get_base_line(user_recipe, ingredient_id) is None:
+            # Line was added by the user: dropping the override removes it
+            await self._delete_override(user_recipe_id, ingredient_id)
+        else:
+            await self._upsert_override(
+                user_recipe_id,
+                ingredient_id,
+                quantity=None,
+                unit_id=None,
+                is_removed=True
+            )
+        await self.session.commit()
+        return await self.get_user_recipe_by_id(user_recipe_id)
+
+    async def reset_ingredient(
+            self,
+            user_recipe_id: int,
+            ingredient_id: int
+    ) -> UserRecipe:
+        """Drops the override so the line follows the base recipe again."""
+        await self._get_user_recipe(user_recipe_id)
+        await self._delete_override(user_recipe_id, ingredient_id)
+        await self.session.commit()
+        return await self.get_user_recipe_by_id(user_recipe_id)
+
+    async def delete_user_recipe(self, user_recipe_id: int) -> int:
+        """Deletes a user recipe and its overrides"""
+        user_recipe = await self._get_user_recipe(user_recipe_id)
+        await self.session.delete(user_recipe)
+        await self.session.commit()
+        return user_recipe_id
@@ -1,31 +1,175 @@
 import asyncio
+import hashlib
+import os
+import subprocess
+import sys
+from contextlib import contextmanager
+from pathlib import Path
 
 import pytest
 import pytest_asyncio
-
-from database import engine, settings, async_engine, async_session
-from db_base import Base
+from psycopg import sql
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+import database
+from config import settings
+from recipe_service.core.cache import clear_local_caches
+
+# The configured test database holds the schema and serves as TEMPLATE for
+# one database per xdist worker (``<name>_gw0``, ... or ``<name>_main``).
+TEMPLATE_DB = settings.DB_NAME
+ROOT = Path(__file__).resolve().parent.parent
+MIGRATIONS = ROOT / "alembic"
+# The schemas CI and docker/init-db create before the migrations run
+SCHEMAS = ("users", "recipes", "translations")
+# Serializes template builds and clones between workers; CREATE DATABASE
+# fails while anyone else is connected to the template.
+TEMPLATE_LOCK = text("hashtext('recipes test template')")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--rebuild-template",
+        action="store_true",
+        help="Migrate the template test database again even if unchanged"
+    )
+
+
+def pytest_configure(config):
+    # Engines are created lazily, so renaming the database before any test
+    # module is imported points every engine at this worker's copy.
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    settings.DB_NAME = f"{TEMPLATE_DB}_{worker}"
+
+
+# ---------------------------------------------
+# Per-worker caches must not leak between tests
+# ---------------------------------------------
+@pytest.fixture(autouse=True)
+def empty_local_caches():
+    clear_local_caches()
+    yield
+    clear_local_caches()
+
+
+# ---------------------------------------------
+# PER-WORKER DATABASE CLONED FROM THE TEMPLATE
+# ---------------------------------------------
+@contextmanager
+def _connect(database_name: str):
+    engine = create_engine(
+        make_url(settings.database_url).set(database=database_name),
+        isolation_level="AUTOCOMMIT",
+        poolclass=NullPool
+    )
+    try:
+        with engine.connect() as connection:
+            yield connection
+    finally:
+        engine.dispose()
+
+
+def _execute(connection, statement: sql.Composable) -> None:
+    """Run DDL that takes no bind parameters; psycopg quotes the names."""
+    connection.connection.driver_connection.execute(statement)
+
+
+def _migrations_fingerprint() -> str:
+    digest = hashlib.sha256()
+    for path in [MIGRATIONS / "env.py", *sorted(MIGRATIONS.glob("versions/*.py"))]:
+        digest.update(path.name.encode() + b"\0" + path.read_bytes())
+    return digest.hexdigest()
+
+
+def _migrate_template() -> None:
+    """Build the schema with the migrations, the way deployments get it.
+
+    Triggers and functions only exist in migrations, so ``create_all``
+    would leave them untested.
+    """
+    with _connect(TEMPLATE_DB) as connection:
+        for schema in SCHEMAS:
+            _execute(connection, sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(
+                sql.Identifier(schema)
+            ))
+            _execute(connection, sql.SQL("CREATE SCHEMA {}").format(
+                sql.Identifier(schema)
+            ))
+        _execute(connection, sql.SQL("DROP TABLE IF EXISTS public.alembic_version"))
+
+    # A separate process: env.py imports the models of every service, and
+    # mapping those must not leak into the tests' registry
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=ROOT,
+        env={**os.environ, "DB_NAME": TEMPLATE_DB},
+        check=True
+    )
+
+
+def _ensure_template(admin, rebuild: bool) -> None:
+    """Migrate the template again when the migrations changed."""
+    fingerprint = f"migrations {_migrations_fingerprint()}"
+    current = admin.execute(
+        text("SELECT shobj_description(oid, 'pg_database') "
+             "FROM pg_database WHERE datname = :name"),
+        {"name": TEMPLATE_DB}
+    ).scalar()
+    if current == fingerprint and not rebuild:
+        return
+
+    _migrate_template()
+    _execute(admin, sql.SQL("COMMENT ON DATABASE {} IS {}").format(
+        sql.Identifier(TEMPLATE_DB), sql.Literal(fingerprint)
+    ))
+
+
+@pytest.fixture(scope="session")
+def test_database(request):
+    assert settings.MODE == "TEST"
+    worker_db = settings.DB_NAME
+    with _connect("postgres") as admin:
+        admin.execute(select(func.pg_advisory_lock(TEMPLATE_LOCK)))
+        try:
+            _ensure_template(admin, request.config.getoption("--rebuild-template"))
+            _execute(admin, sql.SQL("DROP DATABASE IF EXISTS {}").format(
+                sql.Identifier(worker_db)
+            ))
+            _execute(admin, sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(
+                sql.Identifier(worker_db), sql.Identifier(TEMPLATE_DB)
+            ))
+        finally:
+            admin.execute(select(func.pg_advisory_unlock(TEMPLATE_LOCK)))
+
+    yield worker_db
+
+    database.get_engine().dispose()
+    with _connect("postgres") as admin:
+        _execute(admin, sql.SQL("DROP DATABASE IF EXISTS {}").format(
+            sql.Identifier(worker_db)
+        ))
 
 
 # ---------------------------------------------
 # FIXTURES FOR ORM MODELS TESTING (SYNC)
 # ---------------------------------------------
 @pytest.fixture(scope="session")
-def setup_db():
+def setup_db(test_database):
     print(f"{settings.DB_NAME}")
-    assert settings.MODE == "TEST"
-    Base.metadata.drop_all(engine)
-    Base.metadata.create_all(engine)
     yield
-    Base.metadata.drop_all(engine)
 
 
 @pytest.fixture
 def session(setup_db):
-    with engine.connect() as connection:
+    with database.engine.connect() as connection:
         transaction = connection.begin()
-        test_session = Session(bind=connection)
+        test_session = Session(
+            bind=connection,
+            join_transaction_mode="create_savepoint"
+        )
         yield test_session
         test_session.close()
         transaction.rollback()
@@ -48,25 +192,19 @@ def event_loop():
 
 
 @pytest_asyncio.fixture(scope="session")
-async def async_setup_db():
+async def async_setup_db(test_database):
     print(f"{settings.DB_NAME}")
-    assert settings.MODE == "TEST"
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-
     yield
-
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-    await async_engine.dispose()
+    await database.async_engine.dispose()
 
 
 @pytest_asyncio.fixture
 async def setup_async_session(async_setup_db):
-    async with async_engine.connect() as connection:
+    # Each test runs in an outer transaction that is rolled back; commits
+    # inside the test only release SAVEPOINTs.
+    async with database.async_engine.connect() as connection:
         async with connection.begin() as transaction:
-            test_async_session = async_session(
+            test_async_session = database.async_session(
                 bind=connection,
                 join_transaction_mode="create_savepoint")
             try:
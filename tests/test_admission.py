@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from recipe_service.core.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    Lane,
+    default_lanes
+)
+
+
+@pytest.fixture
+def usage():
+    return {"pool": 0.0}
+
+
+@pytest.fixture
+def controller(usage):
+    lanes = {
+        "read": Lane("read", limit=2, max_queue=2, max_wait=0.2),
+        "write": Lane("write", limit=1, max_queue=1, max_wait=0.2),
+        "search": Lane("search", limit=1, max_queue=1, max_wait=0.2, shed_at=0.8),
+        "bulk": Lane("bulk", limit=1, max_queue=0, max_wait=0.2, shed_at=0.5),
+    }
+    return AdmissionController(lanes, lambda: usage["pool"], retry_after=3)
+
+
+# ----------------------------------------------------------------------
+# Controller
+# ----------------------------------------------------------------------
+def test_routes_are_classified_into_lanes(controller):
+    def lane(method, path):
+        found = controller.classify(method, path)
+        return found and found.name
+
+    assert lane("GET", "/recipes/12") == "read"
+    assert lane("GET", "/recipes/search") == "search"
+    assert lane("GET", "/recipes/search/faceted") == "search"
+    assert lane("GET", "/recipes/12/similar") == "search"
+    assert lane("GET", "/recipes") == "search"
+    assert lane("PUT", "/recipes/12") == "write"
+    assert lane("POST", "/nutrition/recipes") == "bulk"
+    assert lane("GET", "/sync") == "bulk"
+    assert lane("GET", "/system/admission") is None
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_admitted_in_arrival_order(controller):
+    lane = controller.lanes["read"]
+    assert await controller.acquire(lane)
+    assert await controller.acquire(lane)
+
+    order = []
+
+    async def wait(name):
+        assert await controller.acquire(lane)
+        order.append(name)
+
+    waiters = [asyncio.create_task(wait(name)) for name in ("first", "second")]
+    await asyncio.sleep(0)
+    # The queue is full: a third waiter is shed at once
+    assert not await controller.acquire(lane)
+
+    controller.release(lane)
+    controller.release(lane)
+    await asyncio.gather(*waiters)
+    assert order == ["first", "second"]
+    assert (lane.active, lane.admitted, lane.shed) == (2, 4, 1)
+
+
+@pytest.mark.asyncio
+async def test_waiters_time_out_and_free_their_place(controller):
+    lane = controller.lanes["write"]
+    assert await controller.acquire(lane)
+
+    assert not await controller.acquire(lane)
+    assert not lane.waiters
+    controller.release(lane)
+    assert lane.active == 0
+
+
+@pytest.mark.asyncio
+async def test_busy_pool_sheds_search_and_bulk_but_not_reads(controller, usage):
+    usage["pool"] = 0.9
+
+    assert not await controller.acquire(controller.lanes["search"])
+    assert not await controller.acquire(controller.lanes["bulk"])
+    assert await controller.acquire(controller.lanes["read"])
+    assert await controller.acquire(controller.lanes["write"])
+
+    usage["pool"] = 0.6
+    assert await controller.acquire(controller.lanes["search"])
+
+
+def test_default_lanes_follow_pool_capacity():
+    lanes = default_lanes(15)
+    limits = [lanes[name].limit for name in ("read", "write", "search", "bulk")]
+    assert limits == [15, 7, 5, 2]
+
+
+# ----------------------------------------------------------------------
+# Middleware
+# ----------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_search_is_shed_while_reads_by_id_go_through(controller):
+    search_started, release_search = asyncio.Event(), asyncio.Event()
+    app = FastAPI()
+
+    @app.get("/recipes/search")
+    async def search():
+        search_started.set()
+        await release_search.wait()
+        return []
+
+    @app.get("/recipes/{recipe_id}")
+    async def get_recipe(recipe_id: int):
+        return {"id": recipe_id}
+
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        running = asyncio.create_task(ac.get("/recipes/search"))
+        await search_started.wait()
+
+        # One search runs, one may wait 0.2 s, the next is refused at once
+        queued = asyncio.create_task(ac.get("/recipes/search"))
+        await asyncio.sleep(0.01)
+        refused = await ac.get("/recipes/search")
+        assert refused.status_code == 503
+        assert refused.headers["retry-after"] == "3"
+
+        assert (await ac.get("/recipes/7")).json() == {"id": 7}
+
+        assert (await queued).status_code == 503
+        release_search.set()
+        assert (await running).status_code == 200
+
+    assert controller.lanes["search"].active == 0
+    assert controller.lanes["search"].shed == 2
@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from common.tokens import InvalidToken, TokenSigner, token_signer
+from config import Settings, settings
+from user_service.core.security import (
+    PasswordHasher,
+    Principal,
+    TokenCache,
+    password_hasher,
+    token_cache
+)
+from user_service.models.groups import Group, UserGroup
+from user_service.services.auth_service import (
+    AuthService,
+    InvalidCredentials,
+    UserAlreadyExists
+)
+
+
+@pytest.fixture(autouse=True)
+def signing_keys(monkeypatch):
+    monkeypatch.setattr(
+        settings, "AUTH_SIGNING_KEYS", ["k2:new-secret", "k1:old-secret"]
+    )
+    # Cheap hashes: the cost is exercised by the PasswordHasher tests
+    monkeypatch.setattr(settings, "AUTH_SCRYPT_N", 2 ** 10)
+    password_hasher.cache_clear()
+    token_signer.cache_clear()
+    token_cache().clear()
+    yield
+    password_hasher.cache_clear()
+    token_signer.cache_clear()
+    token_cache().clear()
+
+
+# ----------------------------------------------------------------------
+# Password hashing
+# ----------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_hashes_verify_only_their_password():
+    hasher = PasswordHasher(workers=2, n=2 ** 10)
+    encoded = await hasher.hash("correct horse")
+
+    assert await hasher.verify("correct horse", encoded)
+    assert not await hasher.verify("battery staple", encoded)
+    assert not await hasher.verify("correct horse", "not-a-hash")
+    assert not await hasher.verify("correct horse", hasher.unmatchable_hash)
+    assert encoded != await hasher.hash("correct horse")  # salted
+
+
+@pytest.mark.asyncio
+async def test_hashing_does_not_stall_the_event_loop():
+    hasher = PasswordHasher(workers=2, n=2 ** 14)
+    started = time.perf_counter()
+    hasher.hash_sync("warm up")
+    one_hash = time.perf_counter() - started
+
+    gaps = []
+
+    async def ticker():
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    ticking = asyncio.create_task(ticker())
+    await asyncio.gather(*(hasher.hash(f"password {i}") for i in range(6)))
+    ticking.cancel()
+
+    # Six hashes ran while the loop kept ticking far more often than one hash
+    assert max(gaps) < one_hash / 2
+
+
+# ----------------------------------------------------------------------
+# Tokens
+# ----------------------------------------------------------------------
+def test_tokens_verify_with_every_listed_key():
+    old = TokenSigner({"k1": b"old-secret"})
+    rotated = TokenSigner({"k2": b"new-secret", "k1": b"old-secret"})
+    token, expires_at = old.sign(42, now=1000)
+
+    assert rotated.verify(token, now=1001) == (42, expires_at)
+    assert rotated.sign(42)[0] != token
+    with pytest.raises(InvalidToken):
+        TokenSigner({"k2": b"new-secret"}).verify(token, now=1001)
+    with pytest.raises(InvalidToken):
+        rotated.verify(token, now=expires_at)
+
+
+def test_tampered_tokens_are_rejected():
+    signer = TokenSigner({"k1": b"secret"})
+    token, _ = signer.sign(1)
+    other, _ = signer.sign(2)
+
+    for forged in (token.split(".")[0] + "." + other.split(".")[1], "abc", "a.b", ""):
+        with pytest.raises(InvalidToken):
+            signer.verify(forged)
+
+
+def test_signing_keys_are_checked_at_startup(monkeypatch):
+    for keys, message in (
+            ("k1", "entry 1 is not a kid:secret pair"),
+            ("k1:a,:b", "entry 2 is not a kid:secret pair"),
+            ("k1:a,k1:b", "key id 'k1' is listed twice"),
+    ):
+        with pytest.raises(ValidationError, match=message):
+            Settings(AUTH_SIGNING_KEYS=keys)
+    parsed = Settings(AUTH_SIGNING_KEYS="k2:b, k1:a")
+    assert parsed.AUTH_SIGNING_KEYS == ["k2:b", "k1:a"]
+
+    # Unset, the services refuse to start (their lifespan builds the signer)
+    monkeypatch.setattr(settings, "AUTH_SIGNING_KEYS", [])
+    token_signer.cache_clear()
+    with pytest.raises(RuntimeError, match="AUTH_SIGNING_KEYS is not configured"):
+        token_signer()
+
+
+def test_token_cache_is_an_lru_with_ttl():
+    cache = TokenCache(max_size=2, ttl=60)
+    far = int(time.time()) + 3600
+
+    cache.set("a", Principal(1, "a", frozenset(), far))
+    cache.set("b", Principal(2, "b", frozenset(), far))
+    assert cache.get("a").user_id == 1
+    cache.set("c", Principal(3, "c", frozenset(), far))  # evicts b
+
+    assert cache.get("b") is None
+    assert cache.get("c").user_id == 3
+
+    cache.set("expired", Principal(4, "d", frozenset(), int(time.time()) - 1))
+    assert cache.get("expired") is None
+
+    cache.invalidate_user(1)
+    assert cache.get("a") is None
+
+
+# ----------------------------------------------------------------------
+# AuthService
+# ----------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_register_login_and_authenticate(setup_async_session):
+    session = setup_async_session
+    service = AuthService(session)
+
+    user = await service.register("auth-user", "auth@example.com", "s3cret-pass")
+    with pytest.raises(UserAlreadyExists):
+        await service.register("auth-user", "other@example.com", "s3cret-pass")
+    with pytest.raises(InvalidCredentials):
+        await service.login("auth-user", "wrong-pass")
+    with pytest.raises(InvalidCredentials):
+        await service.login("nobody", "s3cret-pass")
+
+    group = Group(group_name="Auth editors")
+    session.add(group)
+    await session.flush()
+    session.add(UserGroup(user_id=user.id, group_id=group.id))
+    await session.commit()
+
+    token, expires_at = await service.login("auth-user", "s3cret-pass")
+    principal = await service.authenticate(token)
+    assert principal == Principal(
+        user.id, "auth-user", frozenset({group.id}), expires_at
+    )
+
+    # Served from the token cache from now on
+    hits = token_cache().hits
+    assert await service.authenticate(token) is principal
+    assert token_cache().hits == hits + 1
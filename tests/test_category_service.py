@@ -1,13 +1,20 @@
 import pytest
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, Generator
 
 from recipe_service.core.dependencies import get_session
 from recipe_service.main import app
+from recipe_service.models.ingredients_models import (
+    Category,
+    CategoryClosure,
+    Ingredient
+)
 from recipe_service.pydantic_schemas.ingredients_schemas import (
     CategoryReadSchema,
     IngredientReadSchema)
+from recipe_service.services.category_service import CategoryService
 
 
 # The setup_async_session fixture from conftest.py
@@ -245,3 +252,56 @@ async def test_get_ingredients_by_category(client: AsyncClient, setup_async_sess
     response = await client.get("/ingredient_category/999/ingredients")
     assert response.status_code == 404
     assert response.json()["detail"] == "Category not found"
+
+
+# ----------------------------------------------------------------------
+# Category tree
+# ----------------------------------------------------------------------
+async def _closure(session: AsyncSession) -> set[tuple[int, int, int]]:
+    rows = await session.execute(select(
+        CategoryClosure.ancestor_id,
+        CategoryClosure.descendant_id,
+        CategoryClosure.depth
+    ))
+    return set(rows.tuples())
+
+
+@pytest.mark.asyncio
+async def test_category_tree_moves_and_deletes_keep_closure(setup_async_session):
+    session = setup_async_session
+    service = CategoryService(session)
+    dairy = (await service.create_category("Tree dairy")).id
+    cheese = (await service.create_category("Tree cheese", dairy)).id
+    hard = (await service.create_category("Tree hard cheese", cheese)).id
+    other = (await service.create_category("Tree other")).id
+    assert await _closure(session) == {
+        (dairy, cheese, 1), (dairy, hard, 2), (cheese, hard, 1)
+    }
+
+    hard_cheese = await session.get(Category, hard)
+    session.add(Ingredient(name="Tree parmesan", categories=[hard_cheese]))
+    await session.commit()
+    assert [i.name for i in await service.get_ingredients_by_category_id(dairy)] == [
+        "Tree parmesan"
+    ]
+    assert await service.get_ingredients_by_category_id(
+        dairy, include_subcategories=False
+    ) == []
+    assert [c.id for c in await service.get_category_ancestors(hard)] == [dairy, cheese]
+
+    # Cheese takes its subtree along
+    await service.move_category(cheese, other)
+    assert await _closure(session) == {
+        (other, cheese, 1), (other, hard, 2), (cheese, hard, 1)
+    }
+    with pytest.raises(ValueError):
+        await service.move_category(other, hard)
+
+    # Hard cheese and the parmesan move up to "other"
+    await service.delete_category(cheese)
+    assert await _closure(session) == {(other, hard, 1)}
+    assert [c.id for c in await service.get_subcategories(other)] == [hard]
+    assert (await service.get_category_by_id(hard)).parent_id == other
+
+    await service.move_category(hard, None)
+    assert await _closure(session) == set()
@@ -0,0 +1,186 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from database import async_session
+from recipe_service.core.cache import LocalCache, local_cache
+from recipe_service.core.change_feed import ChangeFeedListener, purge_change_log
+from recipe_service.models.changes_models import ChangeLog, ChangeLogHorizon
+from recipe_service.services.category_service import CategoryService
+
+
+# ----------------------------------------------------------------------
+# Local cache
+# ----------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_local_cache_loads_once_until_invalidated():
+    cache = LocalCache("test", ttl=60)
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return len(loads)
+
+    assert await cache.get_or_load("all", loader, tags=["categories"]) == 1
+    assert await cache.get_or_load("all", loader, tags=["categories"]) == 1
+
+    cache.invalidate("ingredients", 3)
+    assert await cache.get_or_load("all", loader, tags=["categories"]) == 1
+
+    cache.invalidate("categories", 3)
+    assert await cache.get_or_load("all", loader, tags=["categories"]) == 2
+
+
+def test_local_cache_row_tags():
+    cache = LocalCache("test", ttl=60)
+    cache.set(("category", 1), "one", tags=["categories:1"])
+    cache.set(("category", 2), "two", tags=["categories:2"])
+
+    cache.invalidate("categories", 1)
+
+    assert cache.get(("category", 1)) is None
+    assert cache.get(("category", 2)) == "two"
+
+
+def test_local_cache_entries_expire():
+    cache = LocalCache("test", ttl=0)
+    cache.set("all", [1, 2], tags=["categories"])
+
+    assert cache.get("all") is None
+    assert len(cache) == 0
+    assert cache._keys_by_tag == {}
+
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalCache("test", ttl=60, max_entries=2)
+    cache.set(1, "one", tags=["recipes:1"])
+    cache.set(2, "two", tags=["recipes:2"])
+    cache.get(1)
+    cache.set(3, "three", tags=["recipes:3"])
+
+    assert (cache.get(1), cache.get(2), cache.get(3)) == ("one", None, "three")
+    assert set(cache._keys_by_tag) == {"recipes:1", "recipes:3"}
+
+
+def test_local_cache_overwrite_drops_stale_tags():
+    cache = LocalCache("test", ttl=60)
+    cache.set("vector", 1, tags=["recipes:1", "ingredients:7"])
+    cache.set("vector", 2, tags=["recipes:1", "ingredients:8"])
+
+    # The old ingredient no longer drops the entry
+    cache.invalidate("ingredients", 7)
+    assert cache.get("vector") == 2
+    assert set(cache._keys_by_tag) == {"recipes:1", "ingredients:8"}
+
+    cache.invalidate("ingredients", 8)
+    assert cache.get("vector") is None
+    assert cache._keys_by_tag == {}
+
+
+def test_local_cache_sweeps_expired_entries_on_write(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = LocalCache("test", ttl=10)
+    for key in range(5):
+        cache.set(key, key, tags=[f"recipes:{key}"])
+
+    now[0] += 11
+    cache.set("fresh", 0, tags=["recipes"])
+    assert len(cache) == 1
+    assert set(cache._keys_by_tag) == {"recipes"}
+
+
+# ----------------------------------------------------------------------
+# Listener bookkeeping
+# ----------------------------------------------------------------------
+def test_listener_applies_each_change_once_and_measures_lag():
+    applied = []
+    listener = ChangeFeedListener(
+        "postgresql://unused",
+        on_change=lambda table, row_id: applied.append((table, row_id))
+    )
+    committed_at = time.time() - 0.25
+
+    listener._apply(f"7|categories|3|U|{committed_at}", recovered=False)
+    # The same change seen again by the outbox catch-up is ignored
+    listener._apply(f"7|categories|3|U|{committed_at}", recovered=True)
+    # A missed notification recovered from the outbox
+    listener._apply(f"9|recipes|12|D|{committed_at}", recovered=True)
+
+    assert applied == [("categories", 3), ("recipes", 12)]
+    stats = listener.snapshot()
+    assert stats["received"] == 1
+    assert stats["recovered"] == 1
+    assert stats["last_seq"] == 9
+    assert stats["last_lag_ms"] >= 250
+
+
+# ----------------------------------------------------------------------
+# Outbox
+# ----------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_writes_are_logged_and_invalidate_local_cache(setup_async_session):
+    session = setup_async_session
+    service = CategoryService(session)
+
+    assert await service.get_all_categories() == []
+    category = await service.create_category("Spices")
+
+    # Invalidated by this worker on commit, without waiting for the listener
+    assert local_cache("categories").get("all") is None
+    assert [c.name for c in await service.get_all_categories()] == ["Spices"]
+
+    await service.update_category(category.id, "Herbs")
+    logged = (await session.execute(
+        select(ChangeLog.table_name, ChangeLog.row_id, ChangeLog.op)
+        .order_by(ChangeLog.id)
+    )).all()
+    assert logged == [
+        ("categories", category.id, "I"),
+        ("categories", category.id, "U"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_old_changes_are_compacted_in_batches(async_setup_db):
+    old = datetime.now(timezone.utc) - timedelta(days=2)
+    async with async_session() as session:
+        horizon = await session.scalar(select(ChangeLogHorizon.purged_through))
+        changes = [
+            ChangeLog(table_name="purge_test", row_id=1, op="I", changed_at=old),
+            ChangeLog(table_name="purge_test", row_id=2, op="I", changed_at=old),
+            ChangeLog(table_name="purge_test", row_id=1, op="U", changed_at=old),
+            ChangeLog(table_name="purge_test", row_id=3, op="D", changed_at=old),
+            ChangeLog(table_name="purge_test", row_id=2, op="U"),
+            ChangeLog(table_name="purge_test", row_id=4, op="D"),
+        ]
+        for change in changes:
+            session.add(change)
+            await session.flush()
+        await session.commit()
+
+    try:
+        # Superseded (1: I, 2: I) and deleted (3) rows past the retention go
+        assert await purge_change_log(86400, batch_size=2) == 3
+        async with async_session() as session:
+            remaining = (await session.execute(
+                select(ChangeLog.row_id, ChangeLog.op)
+                .where(ChangeLog.table_name == "purge_test")
+                .order_by(ChangeLog.id)
+            )).all()
+            purged_through = await session.scalar(
+                select(ChangeLogHorizon.purged_through)
+            )
+        assert remaining == [(1, "U"), (2, "U"), (4, "D")]
+        assert purged_through == changes[3].id
+    finally:
+        async with async_session() as session:
+            await session.execute(
+                delete(ChangeLog).where(ChangeLog.table_name == "purge_test")
+            )
+            await session.execute(
+                update(ChangeLogHorizon).values(purged_through=horizon)
+            )
+            await session.commit()
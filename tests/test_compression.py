@@ -0,0 +1,104 @@
+import gzip
+import json
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient, ASGITransport
+
+from recipe_service.core.compression import (
+    CompressionMiddleware,
+    available_encodings,
+    negotiate_encoding
+)
+
+PAYLOAD = [{"id": i, "name": f"Ingredient {i}", "categories": []} for i in range(200)]
+
+
+def _make_app(minimum_size: int = 500) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+
+    @app.get("/large")
+    async def large():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"id": 1}
+
+    @app.get("/stream")
+    async def stream():
+        async def rows():
+            for item in PAYLOAD:
+                yield json.dumps(item) + "\n"
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    return app
+
+
+@pytest.fixture
+async def raw_client():
+    """Client that does not decode bodies, to inspect what is on the wire."""
+    async with AsyncClient(
+            transport=ASGITransport(app=_make_app()),
+            base_url="http://test"
+    ) as ac:
+        yield ac
+
+
+def test_negotiate_encoding_respects_q_values():
+    encodings = ["zstd", "br", "gzip"]
+
+    assert negotiate_encoding("gzip, br", encodings) == "br"
+    assert negotiate_encoding("br;q=0.5, gzip", encodings) == "gzip"
+    assert negotiate_encoding("*;q=0, gzip", encodings) == "gzip"
+    assert negotiate_encoding("identity", encodings) is None
+    assert negotiate_encoding("", encodings) is None
+
+
+@pytest.mark.asyncio
+async def test_large_json_is_gzipped(raw_client: AsyncClient):
+    async with raw_client.stream(
+            "GET", "/large", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) == len(body)
+    assert json.loads(gzip.decompress(body)) == PAYLOAD
+
+
+@pytest.mark.asyncio
+async def test_small_response_is_not_compressed(raw_client: AsyncClient):
+    response = await raw_client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"id": 1}
+
+
+@pytest.mark.asyncio
+async def test_streaming_ndjson_is_compressed(raw_client: AsyncClient):
+    async with raw_client.stream(
+            "GET", "/stream", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = zlib.decompress(body, 31).decode().splitlines()
+    assert [json.loads(line) for line in lines] == PAYLOAD
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", ["br", "zstd"])
+async def test_optional_encodings(raw_client: AsyncClient, encoding: str):
+    if encoding not in available_encodings():
+        pytest.skip(f"{encoding} codec is not installed")
+
+    response = await raw_client.get("/large", headers={"Accept-Encoding": encoding})
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.json() == PAYLOAD
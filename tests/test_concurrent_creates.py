@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from config import settings
+from recipe_service.models import ingredients_models as models
+from recipe_service.services.category_service import (
+    CategoryAlreadyExists,
+    CategoryService
+)
+from recipe_service.services.ingredient_service import (
+    IngredientAlreadyExists,
+    IngredientService
+)
+
+# Above the pool size (5 + 10 overflow), so tasks also queue on the pool
+TASKS = 20
+
+
+# Unlike the other service tests these commit for real from independent
+# sessions, so every task races on the unique constraint; rows are removed
+# again at the end of each test. Each test gets its own engine: the pool's
+# wait queue belongs to the event loop it was first used on, and every test
+# runs in a new loop.
+@pytest.fixture
+async def async_session(async_setup_db):
+    engine = create_async_engine(
+        url=settings.database_url,
+        pool_size=5,
+        max_overflow=10
+    )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        yield session_factory
+    finally:
+        async with session_factory() as session:
+            await session.execute(delete(models.IngredientCategory))
+            await session.execute(delete(models.Ingredient))
+            await session.execute(delete(models.Category))
+            await session.commit()
+        await engine.dispose()
+
+
+async def _race(
+        async_session,
+        create,
+        already_exists: type[Exception]
+) -> tuple[int, int]:
+    async def attempt():
+        async with async_session() as session:
+            try:
+                await create(session)
+                return "created"
+            except already_exists:
+                return "exists"
+
+    outcomes = await asyncio.gather(*(attempt() for _ in range(TASKS)))
+    return outcomes.count("created"), outcomes.count("exists")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_create_category_same_name(async_session):
+    created, exists = await _race(
+        async_session,
+        lambda session: CategoryService(session).create_category("Hammered"),
+        CategoryAlreadyExists
+    )
+
+    assert (created, exists) == (1, TASKS - 1)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_update_category_to_same_name(async_session):
+    async with async_session() as session:
+        service = CategoryService(session)
+        ids = [
+            (await service.create_category(f"Category {i}")).id
+            for i in range(TASKS)
+        ]
+
+    async def rename(category_id: int):
+        async with async_session() as session:
+            try:
+                await CategoryService(session).update_category(category_id, "Renamed")
+                return "created"
+            except CategoryAlreadyExists:
+                return "exists"
+
+    outcomes = await asyncio.gather(*(rename(category_id) for category_id in ids))
+
+    assert outcomes.count("created") == 1
+    assert outcomes.count("exists") == TASKS - 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_create_ingredient_same_name(async_session):
+    async with async_session() as session:
+        category = await CategoryService(session).create_category("Dairy")
+
+    created, exists = await _race(
+        async_session,
+        lambda session: IngredientService(session).create_ingredient(
+            "Milk", [category.id]
+        ),
+        IngredientAlreadyExists
+    )
+
+    assert (created, exists) == (1, TASKS - 1)
+    async with async_session() as session:
+        ingredients = await IngredientService(session).get_all_ingredients()
+        assert [(i.name, [c.id for c in i.categories]) for i in ingredients] == [
+            ("Milk", [category.id])
+        ]
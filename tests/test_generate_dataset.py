@@ -0,0 +1,50 @@
+from collections import Counter
+
+from tools.generate_dataset import BLOCK, GENERATORS, Plan, chunks, generate_rows
+
+PLAN = Plan(recipes=3 * BLOCK, ingredients=2_000, categories=40, user_recipes=BLOCK)
+
+
+def _all_rows(plan: Plan, table: str, chunk_blocks: int) -> list[tuple]:
+    return [row
+            for start, stop in chunks(plan, table, chunk_blocks)
+            for row in generate_rows(plan, table, start, stop)]
+
+
+def test_rows_depend_on_seed_not_on_chunking():
+    one_chunk = _all_rows(PLAN, "recipe_ingredients", chunk_blocks=3)
+
+    assert _all_rows(PLAN, "recipe_ingredients", chunk_blocks=1) == one_chunk
+    reseeded = Plan(**{**PLAN.__dict__, "seed": 7})
+    assert _all_rows(reseeded, "recipe_ingredients", 3) != one_chunk
+
+
+def test_every_table_has_a_generator_with_unique_keys():
+    keys = {
+        "ingredient_categories": lambda row: row[:2],
+        "recipe_ingredients": lambda row: row[:2],
+        "user_recipe_ingredients": lambda row: row[:2],
+    }
+    for table in GENERATORS:
+        rows = _all_rows(PLAN, table, chunk_blocks=1)
+        key = keys.get(table, lambda row: row[0])
+        assert len({key(row) for row in rows}) == len(rows), table
+
+
+def test_ingredient_popularity_is_zipf_skewed():
+    rows = _all_rows(PLAN, "recipe_ingredients", chunk_blocks=3)
+    usage = Counter(ingredient_id for _, ingredient_id, _, _ in rows)
+
+    # The top 10% of ingredients is used by about three quarters of the lines
+    top = sum(count for _, count in usage.most_common(PLAN.ingredients // 10))
+    assert top / len(rows) > 0.7
+
+
+def test_user_recipe_lines_satisfy_quantity_check():
+    rows = _all_rows(PLAN, "user_recipe_ingredients", chunk_blocks=1)
+
+    assert all(
+        is_removed or quantity is not None
+        for _, _, quantity, _, is_removed in rows
+    )
+    assert any(is_removed for *_, is_removed in rows)
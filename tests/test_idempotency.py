@@ -0,0 +1,186 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, func, select
+
+from database import async_session
+from recipe_service.core.dependencies import get_recipe_service
+from recipe_service.core.idempotency import (
+    REPLAYED_HEADER,
+    IdempotencyMiddleware,
+    purge_expired_keys
+)
+from recipe_service.main import app
+from recipe_service.models.idempotency_models import IdempotencyKey
+
+NOW = datetime.now(timezone.utc)
+BODY = {"cooking_time_in_minutes": 30, "image_url": None, "ingredients": []}
+
+
+class _CountingRecipeService:
+    """Stands in for RecipeService and counts the recipes it creates."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def create_recipe(self, recipe):
+        self.calls += 1
+        await self.release.wait()
+        return {"id": self.calls, "author_id": None, "cooking_time_in_minutes": 30,
+                "image_url": None, "ingredients": [],
+                "created_at": NOW, "updated_at": NOW}
+
+
+# Stored responses are committed from the middleware's own sessions, so
+# keys are removed again at the end of each test.
+@pytest.fixture
+async def service(async_setup_db):
+    service = _CountingRecipeService()
+    app.dependency_overrides[get_recipe_service] = lambda: service
+    yield service
+    app.dependency_overrides.clear()
+    async with async_session() as session:
+        await session.execute(delete(IdempotencyKey))
+        await session.commit()
+
+
+@pytest.fixture
+async def client(service):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_retry_gets_the_stored_response(client, service):
+    headers = {"Idempotency-Key": "create-1"}
+    first = await client.post("/recipes", json=BODY, headers=headers)
+    retry = await client.post("/recipes", json=BODY, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert REPLAYED_HEADER not in first.headers
+    assert service.calls == 1
+
+    # Without a key every request runs
+    await client.post("/recipes", json=BODY)
+    assert service.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_wait_for_the_first(client, service):
+    service.release.clear()
+    headers = {"Idempotency-Key": "create-2"}
+    requests = [asyncio.create_task(client.post("/recipes", json=BODY, headers=headers))
+                for _ in range(3)]
+    await asyncio.sleep(0.2)
+    service.release.set()
+
+    responses = await asyncio.gather(*requests)
+    assert service.calls == 1
+    assert {r.status_code for r in responses} == {200}
+    assert sum(REPLAYED_HEADER in r.headers for r in responses) == 2
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_another_request_is_refused(client, service):
+    headers = {"Idempotency-Key": "create-3"}
+    await client.post("/recipes", json=BODY, headers=headers)
+    other = await client.post(
+        "/recipes", json={**BODY, "cooking_time_in_minutes": 5}, headers=headers
+    )
+
+    assert other.status_code == 422
+    assert service.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_key_reused_by_another_caller_is_not_replayed(client, service):
+    key = {"Idempotency-Key": "create-4"}
+    first = await client.post(
+        "/recipes", json=BODY, headers={**key, "Authorization": "Bearer first"}
+    )
+    other = await client.post(
+        "/recipes", json=BODY, headers={**key, "Authorization": "Bearer other"}
+    )
+
+    assert first.status_code == 200
+    assert other.status_code == 422
+    assert REPLAYED_HEADER not in other.headers
+    assert service.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_not_stored(service):
+    attempts = []
+    jobs = FastAPI()
+
+    @jobs.post("/jobs")
+    async def start_job():
+        attempts.append(None)
+        if len(attempts) == 1:
+            return JSONResponse({"detail": "Unavailable"}, status_code=503)
+        return {"attempt": len(attempts)}
+
+    jobs.add_middleware(IdempotencyMiddleware)
+    headers = {"Idempotency-Key": "job-1"}
+    transport = ASGITransport(app=jobs)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        assert (await ac.post("/jobs", headers=headers)).status_code == 503
+        assert (await ac.post("/jobs", headers=headers)).json() == {"attempt": 2}
+        replay = await ac.post("/jobs", headers=headers)
+
+    assert replay.json() == {"attempt": 2}
+    assert replay.headers[REPLAYED_HEADER] == "true"
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_large_keyed_bodies_are_refused(service):
+    uploads = []
+    files = FastAPI()
+
+    @files.put("/files")
+    async def upload(request: Request):
+        uploads.append(await request.body())
+        return {"size": len(uploads[-1])}
+
+    files.add_middleware(IdempotencyMiddleware, max_body=1024)
+    transport = ASGITransport(app=files)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        refused = await ac.put("/files", content=b"x" * 1025,
+                               headers={"Idempotency-Key": "file-1"})
+        small = await ac.put("/files", content=b"x" * 1024,
+                             headers={"Idempotency-Key": "file-2"})
+        # Without a key the body is not buffered by the middleware
+        unkeyed = await ac.put("/files", content=b"x" * 4096)
+
+    assert refused.status_code == 413
+    assert (small.status_code, unkeyed.json()) == (200, {"size": 4096})
+    assert [len(body) for body in uploads] == [1024, 4096]
+
+
+@pytest.mark.asyncio
+async def test_expired_keys_are_purged_in_batches(service):
+    async with async_session() as session:
+        session.add_all([
+            IdempotencyKey(key=f"old-{i}", fingerprint=b"\0" * 32,
+                           expires_at=NOW - timedelta(minutes=1))
+            for i in range(5)
+        ] + [IdempotencyKey(key="fresh", fingerprint=b"\0" * 32,
+                            expires_at=NOW + timedelta(hours=1))])
+        await session.commit()
+
+    assert await purge_expired_keys(batch_size=2) == 5
+    async with async_session() as session:
+        remaining = await session.scalar(
+            select(func.count()).select_from(IdempotencyKey)
+        )
+    assert remaining == 1
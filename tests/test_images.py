@@ -0,0 +1,187 @@
+import asyncio
+import struct
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+
+from common.tokens import token_signer
+from config import settings
+from recipe_service.core.dependencies import get_session
+from recipe_service.core.images import (
+    ImageInfo,
+    ThumbnailPool,
+    UnsupportedImage,
+    original_path,
+    probe,
+    variant_path
+)
+from recipe_service.models.image_models import StoredImage
+from recipe_service.pydantic_schemas.recipes_schemas import RecipeCreateSchema
+from recipe_service.services.image_service import ImageService, ImageTooLarge
+from recipe_service.main import app
+from recipe_service.services.recipe_service import RecipeService
+from user_service.models.users import User
+
+
+def _png(width: int, height: int) -> bytes:
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + ihdr
+            + b"\0" * 4 + b"rest of the file")
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\0" + b"\0" * 9
+    sof2 = b"\xff\xc2" + struct.pack(">HBHHB", 17, 8, height, width, 3) + b"\0" * 9
+    return b"\xff\xd8" + app0 + sof2 + b"\xff\xda"
+
+
+def _webp(chunk: bytes, payload: bytes) -> bytes:
+    return b"RIFF" + b"\0" * 4 + b"WEBP" + chunk + b"\0" * 4 + payload
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_STORAGE_DIR", str(tmp_path))
+    return tmp_path
+
+
+# ----------------------------------------------------------------------
+# Header probing
+# ----------------------------------------------------------------------
+def test_probe_reads_size_from_headers():
+    vp8x = b"\0" * 4 + (799).to_bytes(3, "little") + (599).to_bytes(3, "little")
+    vp8l = b"\x2f" + (1023 | 767 << 14).to_bytes(4, "little")
+
+    assert probe(_png(640, 480)) == ImageInfo("png", 640, 480)
+    assert probe(_jpeg(1920, 1080)) == ImageInfo("jpeg", 1920, 1080)
+    assert probe(b"GIF89a" + struct.pack("<HH", 320, 200)) == ImageInfo("gif", 320, 200)
+    assert probe(_webp(b"VP8X", vp8x)) == ImageInfo("webp", 800, 600)
+    assert probe(_webp(b"VP8L", vp8l)) == ImageInfo("webp", 1024, 768)
+
+
+@pytest.mark.parametrize("data", [b"", b"<svg></svg>", b"\xff\xd8\xff\xe0", b"GIF89a"])
+def test_probe_refuses_unknown_or_truncated_files(data):
+    with pytest.raises(UnsupportedImage):
+        probe(data)
+
+
+# ----------------------------------------------------------------------
+# Thumbnail pool
+# ----------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_pool_runs_one_job_per_key_at_a_time():
+    pool, runs, release = ThumbnailPool(), [], asyncio.Event()
+
+    async def job():
+        runs.append(None)
+        await release.wait()
+
+    pool.schedule("abc", job)
+    pool.schedule("abc", job)
+    await asyncio.sleep(0)
+    release.set()
+    await pool.drain()
+
+    assert len(runs) == 1
+
+
+@pytest.mark.asyncio
+async def test_thumbnails_are_rendered_in_worker_processes(storage):
+    image_module = pytest.importorskip("PIL.Image")
+    source = storage / "source.jpeg"
+    image_module.new("RGB", (1200, 800), "orange").save(source)
+    targets = [(str(variant_path("ab" * 32, size, fmt)), side, fmt)
+               for size, side in {"small": 160, "large": 960}.items()
+               for fmt in ("webp", "jpeg")]
+
+    pool = ThumbnailPool(workers=1)
+    try:
+        written = await pool.render(source, targets)
+    finally:
+        pool.shutdown()
+
+    assert sorted(written) == sorted(path for path, _, _ in targets)
+    with image_module.open(variant_path("ab" * 32, "small", "webp")) as small:
+        assert small.size == (160, 107)
+
+
+# ----------------------------------------------------------------------
+# ImageService
+# ----------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_duplicate_uploads_are_stored_once(setup_async_session, storage):
+    session = setup_async_session
+    service = ImageService(session)
+
+    image, created = await service.store(_png(640, 480))
+    again, created_again = await service.store(_png(640, 480))
+
+    assert (created, created_again) == (True, False)
+    assert again.hash == image.hash
+    assert (image.width, image.height, image.content_type) == (640, 480, "image/png")
+    assert original_path(image.hash, "png").read_bytes() == _png(640, 480)
+    assert await session.scalar(select(func.count()).select_from(StoredImage)) == 1
+    # Not rendered yet
+    assert image.thumbnails is None
+
+    with pytest.raises(ImageTooLarge):
+        await service.store(_png(100_000, 100_000))
+
+
+@pytest.mark.asyncio
+async def test_recipes_link_thumbnails_of_their_image(setup_async_session, storage):
+    session = setup_async_session
+    recipes = RecipeService(session, trusted=True)
+    recipe = await recipes.create_recipe(
+        RecipeCreateSchema(cooking_time_in_minutes=10, image_url=None)
+    )
+    assert recipe.thumbnails is None
+
+    image, _ = await ImageService(session).store(_jpeg(1600, 1200))
+    recipe = await recipes.set_image(recipe.id, image)
+
+    assert recipe.image_url == f"/images/{image.hash}/original"
+    assert recipe.thumbnails == {
+        size: f"/images/{image.hash}/{size}.{settings.IMAGE_THUMBNAIL_FORMATS[0]}"
+        for size in settings.IMAGE_THUMBNAIL_SIZES
+    }
+
+
+@pytest.mark.asyncio
+async def test_uploads_are_authorized_before_storing(
+        setup_async_session, storage, monkeypatch
+):
+    session = setup_async_session
+    monkeypatch.setattr(settings, "AUTH_SIGNING_KEYS", ["k1:secret"])
+    token_signer.cache_clear()
+    author = User(username="author", email="author@example.com", password_hash="x")
+    other = User(username="other", email="other@example.com", password_hash="x")
+    session.add_all([author, other])
+    await session.commit()
+    recipe = await RecipeService(session, author.id).create_recipe(
+        RecipeCreateSchema(cooking_time_in_minutes=10, image_url=None)
+    )
+
+    async def _get_session_override():
+        yield session
+
+    app.dependency_overrides[get_session] = _get_session_override
+    try:
+        async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            token, _ = token_signer().sign(other.id)
+            response = await client.put(
+                f"/recipes/{recipe.id}/image",
+                content=_png(640, 480),
+                headers={"Authorization": f"Bearer {token}",
+                         "Content-Type": "image/png"}
+            )
+    finally:
+        app.dependency_overrides.clear()
+        token_signer.cache_clear()
+
+    assert response.status_code == 403
+    assert await session.scalar(select(func.count()).select_from(StoredImage)) == 0
+    assert not any(storage.iterdir())
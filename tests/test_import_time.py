@@ -0,0 +1,91 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from recipe_service.main import app
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Budget for ``import recipe_service.main`` after ``import fastapi`` in a fresh
+# interpreter, as a multiple of the time fastapi itself takes to import:
+# measured on the same machine in the same process, so it holds on slow CI
+# runners too. IMPORT_TIME_BUDGET_RATIO overrides it.
+IMPORT_TIME_BUDGET_RATIO = float(os.environ.get("IMPORT_TIME_BUDGET_RATIO", 2.5))
+
+# Only needed once the app serves requests or the schema
+DEFERRED_MODULES = [
+    "psycopg",
+    "uvicorn",
+    "recipe_service.examples.recipe_examples",
+    "recipe_service.examples.category_examples",
+    "recipe_service.examples.ingredient_examples",
+    "recipe_service.examples.user_recipe_examples",
+    # Thumbnail rendering: the process pool and Pillow
+    "multiprocessing",
+    "concurrent.futures.process",
+    "PIL",
+    # Optional response codecs
+    "brotli",
+    "zstandard",
+    # Another service: tokens and permissions come from common
+    "user_service",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import fastapi
+baseline = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+import recipe_service.main
+elapsed = (time.perf_counter() - start) * 1000
+import database
+print(json.dumps({
+    "baseline_ms": baseline,
+    "elapsed_ms": elapsed,
+    "loaded": [name for name in %r if name in sys.modules],
+    "engines": [name for name in ("engine", "async_engine") if name in vars(database)],
+}))
+""" % DEFERRED_MODULES
+
+
+def _cold_import() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_defers_drivers_engines_and_examples():
+    probe = _cold_import()
+
+    assert probe["loaded"] == []
+    assert probe["engines"] == []
+
+
+def test_import_time_budget():
+    probes = [_cold_import() for _ in range(3)]
+    baseline = min(probe["baseline_ms"] for probe in probes)
+    best = min(probe["elapsed_ms"] for probe in probes)
+
+    assert best < IMPORT_TIME_BUDGET_RATIO * baseline, (
+        f"import recipe_service.main took {best:.0f} ms, "
+        f"{best / baseline:.1f}x import fastapi ({baseline:.0f} ms; "
+        f"budget {IMPORT_TIME_BUDGET_RATIO}x)"
+    )
+
+
+def test_openapi_schema_has_lazy_examples_and_is_cached():
+    schema = app.openapi()
+
+    body = schema["paths"]["/recipes"]["post"]["requestBody"]
+    example = body["content"]["application/json"]["example"]
+    assert example["cooking_time_in_minutes"] == 30
+    # Generated once per process, later calls reuse the schema
+    assert app.openapi() is schema
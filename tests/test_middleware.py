@@ -0,0 +1,67 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.exc import OperationalError, TimeoutError
+
+from recipe_service.core.dependencies import get_recipe_service
+from recipe_service.main import app
+from recipe_service.services.recipe_service import RecipeNotFound
+
+
+class _FailingRecipeService:
+    """Stands in for RecipeService and raises the configured error."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def get_recipe_by_id(self, recipe_id: int):
+        raise self.error
+
+
+@pytest.fixture
+async def client_with_error():
+    async def _client(error: Exception) -> AsyncClient:
+        app.dependency_overrides[get_recipe_service] = (
+            lambda: _FailingRecipeService(error)
+        )
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+    yield _client
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_sqlalchemy_error_maps_to_database_error(client_with_error):
+    error = OperationalError("SELECT 1", {}, Exception())
+    async with await client_with_error(error) as ac:
+        response = await ac.get("/recipes/1")
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Internal database error"}
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error_maps_to_server_error(client_with_error):
+    async with await client_with_error(RuntimeError("boom")) as ac:
+        response = await ac.get("/recipes/1")
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Internal server error"}
+
+
+@pytest.mark.asyncio
+async def test_http_exceptions_and_timing_header(client_with_error):
+    async with await client_with_error(RecipeNotFound()) as ac:
+        response = await ac.get("/recipes/1")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Recipe not found"}
+    assert float(response.headers["x-process-time"]) >= 0
+
+
+@pytest.mark.asyncio
+async def test_pool_timeout_maps_to_service_unavailable(client_with_error):
+    async with await client_with_error(TimeoutError("QueuePool limit reached")) as ac:
+        response = await ac.get("/recipes/1")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,128 @@
+import pytest
+
+from recipe_service.core.nutrition import NutritionMatrix
+from recipe_service.models import ingredients_models as models
+from recipe_service.models.recipes_models import Unit
+from recipe_service.pydantic_schemas.recipes_schemas import (
+    RecipeCreateSchema,
+    RecipeUpdateSchema
+)
+from recipe_service.services.nutrition_service import NutrientNotFound, NutritionService
+from recipe_service.services.recipe_service import RecipeNotFound, RecipeService
+
+
+# ----------------------------------------------------------------------
+# Matrix
+# ----------------------------------------------------------------------
+@pytest.fixture
+def matrix():
+    return NutritionMatrix(
+        nutrients=[(10, "energy"), (20, "protein")],
+        units={1: ("mass", 1000.0), 2: ("volume", 5.0), 3: (None, None)},
+        dimensions={1: "mass", 2: "volume"},
+        amounts=[(1, 10, 2.0), (1, 20, 0.5), (2, 10, 1.0)]
+    )
+
+
+def test_product_scales_rows_by_base_amount(matrix):
+    # 0.5 kg of ingredient 1 and 3 base units of ingredient 2
+    assert matrix.product([(1, 0.5, 1), (2, 3, None)]) == ((1003.0, 250.0), ())
+    assert matrix.product([(2, 2, 2)]) == ((10.0, 0.0), ())
+
+
+def test_product_ignores_ingredients_without_data(matrix):
+    assert matrix.product([(3, 100, None)]) == ((0.0, 0.0), ())
+    assert matrix.product([]) == ((0.0, 0.0), ())
+
+
+def test_product_skips_lines_of_another_dimension(matrix):
+    # A teaspoon of a per-gram ingredient, a kilogram of a per-ml one and a
+    # unit without a size (pinch) are left out instead of guessed
+    lines = [(1, 2, 2), (2, 1, 1), (1, 3, 3), (2, 4, 2)]
+    assert matrix.product(lines) == ((20.0, 0.0), (1, 2, 1))
+
+
+def test_combine_weights_and_names(matrix):
+    vector = matrix.combine([((1.0, 2.0), 2), ((0.5, 0.0), 0.5)])
+    assert matrix.named(vector) == {"energy": 2.25, "protein": 4.0}
+
+
+# ----------------------------------------------------------------------
+# NutritionService
+# ----------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_nutrition_follows_recipe_and_ingredient_writes(setup_async_session):
+    session = setup_async_session
+    flour = models.Ingredient(name="Nutrition flour")
+    egg = models.Ingredient(name="Nutrition egg")
+    kg = Unit(symbol="nkg", dimension="mass", base_factor=1000)
+    cup = Unit(symbol="ncup", dimension="volume", base_factor=240)
+    session.add_all([flour, egg, kg, cup])
+    await session.commit()
+
+    nutrition = NutritionService(session)
+    recipes = RecipeService(session, trusted=True)
+    energy = await nutrition.create_nutrient("energy", "kcal")
+    await nutrition.set_ingredient_nutrients(flour.id, {energy.id: 3.6})
+    await nutrition.set_ingredient_nutrients(egg.id, {energy.id: 70})
+    recipe = await recipes.create_recipe(RecipeCreateSchema(
+        cooking_time_in_minutes=10,
+        image_url=None,
+        ingredients=[
+            {"ingredient_id": flour.id, "quantity": 0.5, "unit_id": kg.id},
+            {"ingredient_id": egg.id, "quantity": 2}
+        ]
+    ))
+
+    [found] = await nutrition.get_nutrition([recipe.id, 10 ** 9])
+    assert found.nutrients == {"energy": 1940.0}
+
+    # Both the cached vector and the cached matrix are dropped
+    await nutrition.set_ingredient_nutrients(egg.id, {energy.id: 80})
+    [found] = await nutrition.get_nutrition([recipe.id])
+    assert found.nutrients == {"energy": 1960.0}
+
+    await recipes.update_recipe(recipe.id, RecipeUpdateSchema(
+        image_url=None, ingredients=[{"ingredient_id": egg.id, "quantity": 1}]
+    ))
+    meal_plan = await nutrition.get_meal_plan_nutrition({recipe.id: 1.5})
+    assert meal_plan == {"energy": 120.0}
+
+    with pytest.raises(RecipeNotFound):
+        await nutrition.get_meal_plan_nutrition({recipe.id: 1, 10 ** 9: 1})
+    with pytest.raises(NutrientNotFound):
+        await nutrition.set_ingredient_nutrients(egg.id, {10 ** 9: 1})
+
+
+@pytest.mark.asyncio
+async def test_cup_of_a_per_gram_ingredient_is_flagged(setup_async_session):
+    session = setup_async_session
+    sugar = models.Ingredient(name="Dimension sugar")
+    milk = models.Ingredient(name="Dimension milk")
+    cup = Unit(symbol="dcup", dimension="volume", base_factor=240)
+    session.add_all([sugar, milk, cup])
+    await session.commit()
+
+    nutrition = NutritionService(session)
+    energy = await nutrition.create_nutrient("dimension energy", "kcal")
+    await nutrition.set_ingredient_nutrients(sugar.id, {energy.id: 4})
+    await nutrition.set_ingredient_nutrients(milk.id, {energy.id: 0.5}, "volume")
+    recipe = await RecipeService(session).create_recipe(RecipeCreateSchema(
+        cooking_time_in_minutes=10,
+        image_url=None,
+        ingredients=[
+            {"ingredient_id": sugar.id, "quantity": 1, "unit_id": cup.id},
+            {"ingredient_id": milk.id, "quantity": 1, "unit_id": cup.id}
+        ]
+    ))
+
+    # Sugar is given per gram: a cup of it has no weight, it is not 240 g
+    [found] = await nutrition.get_nutrition([recipe.id])
+    assert found.nutrients == {"dimension energy": 120.0}
+    assert found.skipped_ingredient_ids == [sugar.id]
+
+    # Once sugar is given per ml the cup converts
+    await nutrition.set_ingredient_nutrients(sugar.id, {energy.id: 3.4}, "volume")
+    [found] = await nutrition.get_nutrition([recipe.id])
+    assert found.nutrients == {"dimension energy": 936.0}
+    assert found.skipped_ingredient_ids == []
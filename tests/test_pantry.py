@@ -0,0 +1,127 @@
+import pytest
+
+from recipe_service.core.pantry_matcher import PantryMatcher
+from recipe_service.models import ingredients_models as models
+from recipe_service.pydantic_schemas.pantry_schemas import PantryMatchSchema
+from recipe_service.pydantic_schemas.recipes_schemas import (
+    RecipeCreateSchema,
+    RecipeUpdateSchema
+)
+from recipe_service.services.pantry_service import PantryItemNotFound, PantryService
+from recipe_service.services.recipe_service import IngredientNotFound, RecipeService
+
+
+# ----------------------------------------------------------------------
+# Matcher
+# ----------------------------------------------------------------------
+@pytest.fixture
+def matcher():
+    matcher = PantryMatcher(max_missing=2)
+    matcher.set_recipe(1, [1, 2])
+    matcher.set_recipe(2, [1, 2, 3])
+    matcher.set_recipe(3, [4, 5, 6, 7])
+    return matcher
+
+
+def test_matcher_ranks_by_missing_count(matcher):
+    matcher.set_pantry(7, [1, 2])
+
+    assert matcher.matches(7, max_missing=0, limit=10) == [(1, [])]
+    assert matcher.matches(7, max_missing=2, limit=10) == [(1, []), (2, [3])]
+    assert matcher.matches(7, max_missing=2, limit=1) == [(1, [])]
+
+
+def test_matcher_pantry_changes_visit_only_affected_recipes(matcher):
+    state = matcher.set_pantry(7, [1, 2, 3])
+    assert state.missing == {1: 0, 2: 0}
+
+    matcher.set_pantry(7, [1, 3, 4])
+    # Recipe 3 now shares ingredient 4 but misses three: not a near-miss
+    assert state.missing == {1: 1, 2: 1, 3: 3}
+    assert matcher.matches(7, max_missing=2, limit=10) == [(1, [2]), (2, [2])]
+
+    matcher.set_pantry(7, [])
+    assert state.missing == {}
+    assert all(not recipes for recipes in state.by_missing)
+
+
+def test_matcher_follows_recipe_changes(matcher):
+    matcher.set_pantry(7, [4, 5, 6])
+
+    matcher.set_recipe(3, [4, 5])
+    assert matcher.matches(7, max_missing=0, limit=10) == [(3, [])]
+
+    matcher.set_recipe(3, [])
+    assert matcher.matches(7, max_missing=2, limit=10) == []
+    assert 4 not in matcher.recipes_by_ingredient
+
+
+def test_matcher_marks_changes_stale(matcher):
+    matcher.set_pantry(7, [1])
+
+    matcher.invalidate("pantry_items", 7)
+    matcher.invalidate("ingredients", 3)
+
+    assert not matcher.has_pantry(7)
+    assert matcher.stale_recipes == {2}
+
+
+# ----------------------------------------------------------------------
+# PantryService
+# ----------------------------------------------------------------------
+@pytest.fixture
+async def ingredient_ids(setup_async_session):
+    ingredients = [models.Ingredient(name=f"Pantry {i}") for i in range(4)]
+    setup_async_session.add_all(ingredients)
+    await setup_async_session.commit()
+    return [ingredient.id for ingredient in ingredients]
+
+
+def _recipe(ingredient_ids) -> RecipeCreateSchema:
+    return RecipeCreateSchema(
+        cooking_time_in_minutes=10,
+        image_url=None,
+        ingredients=[{"ingredient_id": i, "quantity": 1} for i in ingredient_ids]
+    )
+
+
+@pytest.mark.asyncio
+async def test_cookable_follows_pantry_and_recipe_writes(
+        setup_async_session, ingredient_ids
+):
+    recipes = RecipeService(setup_async_session, trusted=True)
+    pantry = PantryService(setup_async_session)
+    salad = await recipes.create_recipe(_recipe(ingredient_ids[:2]))
+    stew = await recipes.create_recipe(_recipe(ingredient_ids[:3]))
+    user_id = 42
+
+    await pantry.add_item(user_id, ingredient_ids[0])
+    await pantry.add_item(user_id, ingredient_ids[1])
+    await pantry.add_item(user_id, ingredient_ids[1])  # idempotent
+
+    matches = await pantry.get_cookable(user_id, max_missing=1)
+    assert [(m.recipe.id, m.missing_ingredient_ids) for m in matches] == [
+        (salad.id, []), (stew.id, [ingredient_ids[2]])
+    ]
+    PantryMatchSchema.model_validate(matches[1])
+
+    await pantry.remove_item(user_id, ingredient_ids[1])
+    await recipes.update_recipe(stew.id, RecipeUpdateSchema(
+        image_url=None, ingredients=_recipe(ingredient_ids[:1]).ingredients
+    ))
+    matches = await pantry.get_cookable(user_id, max_missing=1)
+    assert [(m.recipe.id, m.missing_count) for m in matches] == [
+        (stew.id, 0), (salad.id, 1)
+    ]
+    pantry_items = await pantry.get_pantry(user_id)
+    assert [item.ingredient_id for item in pantry_items] == ingredient_ids[:1]
+
+
+@pytest.mark.asyncio
+async def test_pantry_item_errors(setup_async_session, ingredient_ids):
+    pantry = PantryService(setup_async_session)
+
+    with pytest.raises(IngredientNotFound):
+        await pantry.add_item(1, 10 ** 9)
+    with pytest.raises(PantryItemNotFound):
+        await pantry.remove_item(1, ingredient_ids[0])
@@ -0,0 +1,219 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, text
+
+from common.tokens import token_signer
+from config import settings
+from recipe_service.core.cache import invalidate_local_caches
+from recipe_service.core.dependencies import get_session
+from recipe_service.core.permissions import (
+    DEFAULT_PERMISSIONS,
+    Permission,
+    PermissionDenied,
+    permission_resolver
+)
+from recipe_service.pydantic_schemas.recipes_schemas import (
+    RecipeCreateSchema,
+    RecipeUpdateSchema
+)
+from recipe_service.main import app
+from recipe_service.models.changes_models import ChangeLog
+from recipe_service.services.recipe_service import RecipeService
+from user_service.models.groups import Group, UserGroup
+from user_service.models.users import User
+
+RECIPE = RecipeCreateSchema(cooking_time_in_minutes=30, image_url=None, ingredients=[])
+
+
+@pytest.fixture
+async def people(setup_async_session):
+    session = setup_async_session
+    author = User(username="author", email="author@example.com", password_hash="x")
+    other = User(username="other", email="other@example.com", password_hash="x")
+    moderators = Group(
+        group_name="Moderators",
+        permissions=int(Permission.RECIPE_EDIT_ANY | Permission.RECIPE_DELETE_ANY)
+    )
+    session.add_all([author, other, moderators])
+    await session.commit()
+    return {"author": author, "other": other, "moderators": moderators}
+
+
+@pytest.fixture
+async def client(setup_async_session, monkeypatch):
+    session = setup_async_session
+    monkeypatch.setattr(settings, "AUTH_SIGNING_KEYS", ["k1:secret"])
+    token_signer.cache_clear()
+
+    async def _get_session_override():
+        yield session
+
+    app.dependency_overrides[get_session] = _get_session_override
+    try:
+        async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        token_signer.cache_clear()
+
+
+def _auth(user: User) -> dict[str, str]:
+    token, _ = token_signer().sign(user.id)
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+async def test_permissions_are_resolved_once_per_user(setup_async_session, people):
+    session, resolver = setup_async_session, permission_resolver()
+    other, moderators = people["other"], people["moderators"]
+
+    assert await resolver.permissions(session, other.id) == DEFAULT_PERMISSIONS
+    session.add(UserGroup(user_id=other.id, group_id=moderators.id))
+    await session.commit()
+    # Still cached: nobody announced the membership change
+    assert await resolver.permissions(session, other.id) == DEFAULT_PERMISSIONS
+    assert (resolver.hits, resolver.misses) == (1, 1)
+
+    invalidate_local_caches("user_groups", other.id)
+    granted = await resolver.permissions(session, other.id)
+    assert granted & Permission.RECIPE_EDIT_ANY
+    assert resolver.members_of(moderators.id) == [other.id]
+
+
+@pytest.mark.asyncio
+async def test_group_changes_drop_only_its_members(setup_async_session, people):
+    session, resolver = setup_async_session, permission_resolver()
+    author, other, moderators = people["author"], people["other"], people["moderators"]
+    session.add(UserGroup(user_id=other.id, group_id=moderators.id))
+    await session.commit()
+    await resolver.permissions(session, author.id)
+    await resolver.permissions(session, other.id)
+
+    moderators.permissions = int(Permission.RECIPE_EDIT_ANY)
+    await session.commit()
+    invalidate_local_caches("groups", moderators.id)
+
+    granted = await resolver.permissions(session, other.id)
+    assert not granted & Permission.RECIPE_DELETE_ANY
+    await resolver.permissions(session, author.id)
+    assert resolver.misses == 3  # author was served from the cache
+
+
+@pytest.mark.asyncio
+async def test_recipe_writes_are_authorized(setup_async_session, people):
+    session = setup_async_session
+    author, other, moderators = people["author"], people["other"], people["moderators"]
+    recipe = await RecipeService(session, author.id).create_recipe(RECIPE)
+    assert recipe.author_id == author.id
+
+    as_other = RecipeService(session, other.id)
+    update = RecipeUpdateSchema(cooking_time_in_minutes=45, image_url=None)
+    with pytest.raises(PermissionDenied):
+        await as_other.update_recipe(recipe.id, update)
+    with pytest.raises(PermissionDenied):
+        await as_other.delete_recipe(recipe.id)
+
+    updated = await RecipeService(session, author.id).update_recipe(recipe.id, update)
+    assert updated.cooking_time_in_minutes == 45
+
+    session.add(UserGroup(user_id=other.id, group_id=moderators.id))
+    await session.commit()
+    invalidate_local_caches("user_groups", other.id)
+    assert await as_other.delete_recipe(recipe.id) == recipe.id
+
+
+@pytest.mark.asyncio
+async def test_anonymous_callers_may_only_create(setup_async_session, people):
+    session, author = setup_async_session, people["author"]
+    recipe = await RecipeService(session, author.id).create_recipe(RECIPE)
+    update = RecipeUpdateSchema(cooking_time_in_minutes=45, image_url=None)
+
+    anonymous = RecipeService(session)
+    assert (await anonymous.create_recipe(RECIPE)).author_id is None
+    with pytest.raises(PermissionDenied):
+        await anonymous.update_recipe(recipe.id, update)
+    with pytest.raises(PermissionDenied):
+        await anonymous.delete_recipe(recipe.id)
+
+    # Internal callers opt out explicitly
+    internal = RecipeService(session, trusted=True)
+    updated = await internal.update_recipe(recipe.id, update)
+    assert updated.cooking_time_in_minutes == 45
+
+
+@pytest.mark.asyncio
+async def test_refused_writes_map_to_401_and_403(client, people):
+    author, other = people["author"], people["other"]
+    created = await client.post("/recipes", json=RECIPE.model_dump(),
+                                headers=_auth(author))
+    assert created.status_code == 200
+    recipe_id = created.json()["id"]
+    body = {"cooking_time_in_minutes": 45, "image_url": None}
+
+    anonymous = await client.put(f"/recipes/{recipe_id}", json=body)
+    assert anonymous.status_code == 401
+    assert anonymous.headers["WWW-Authenticate"] == "Bearer"
+    assert (await client.delete(f"/recipes/{recipe_id}")).status_code == 401
+
+    forbidden = await client.put(f"/recipes/{recipe_id}", json=body,
+                                 headers=_auth(other))
+    assert forbidden.status_code == 403
+    assert (await client.delete(f"/recipes/{recipe_id}",
+                                headers=_auth(other))).status_code == 403
+
+    bad_token = {"Authorization": "Bearer not-a-token"}
+    assert (await client.put(f"/recipes/{recipe_id}", json=body,
+                             headers=bad_token)).status_code == 401
+
+    updated = await client.put(f"/recipes/{recipe_id}", json=body,
+                               headers=_auth(author))
+    assert updated.status_code == 200
+    assert updated.json()["cooking_time_in_minutes"] == 45
+    assert (await client.delete(f"/recipes/{recipe_id}",
+                                headers=_auth(author))).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_anonymous_creates_need_auth_once_required(client, people, monkeypatch):
+    assert (await client.post("/recipes", json=RECIPE.model_dump())).status_code == 200
+
+    monkeypatch.setattr(settings, "RECIPE_WRITES_REQUIRE_AUTH", True)
+    refused = await client.post("/recipes", json=RECIPE.model_dump())
+    assert refused.status_code == 401
+    created = await client.post("/recipes", json=RECIPE.model_dump(),
+                                headers=_auth(people["author"]))
+    assert created.status_code == 200
+    assert created.json()["author_id"] == people["author"].id
+
+
+@pytest.mark.asyncio
+async def test_membership_changes_are_logged(setup_async_session, people):
+    session, other, moderators = (
+        setup_async_session, people["other"], people["moderators"]
+    )
+
+    async def logged(table: str) -> list[tuple[int, str]]:
+        rows = await session.execute(
+            select(ChangeLog.row_id, ChangeLog.op)
+            .where(ChangeLog.table_name == table)
+            .order_by(ChangeLog.id)
+        )
+        return [tuple(row) for row in rows]
+
+    membership = UserGroup(user_id=other.id, group_id=moderators.id)
+    session.add(membership)
+    await session.commit()
+    await session.delete(membership)
+    moderators.permissions = int(Permission.RECIPE_EDIT_ANY)
+    await session.commit()
+    # The triggers are deferred to COMMIT, which the test transaction never
+    # reaches; switching them to immediate fires the pending ones now
+    await session.execute(text("SET CONSTRAINTS ALL IMMEDIATE"))
+
+    # users.log_membership_change() logs the user, recipes.log_change() the group
+    assert (await logged("user_groups"))[-2:] == [(other.id, "I"), (other.id, "D")]
+    assert (await logged("groups"))[-2:] == [
+        (moderators.id, "I"), (moderators.id, "U")
+    ]
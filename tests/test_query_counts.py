@@ -0,0 +1,154 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from database import async_engine
+from recipe_service.models import ingredients_models as models
+from recipe_service.models.recipes_models import Recipe, RecipeIngredient
+from recipe_service.pydantic_schemas.recipes_schemas import (
+    RecipeCreateSchema,
+    RecipeReadSchema
+)
+from recipe_service.pydantic_schemas.ingredients_schemas import IngredientReadSchema
+from recipe_service.services.category_service import CategoryService
+from recipe_service.services.ingredient_service import IngredientService
+from recipe_service.services.recipe_service import RecipeService
+
+STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+# ----------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------
+@contextmanager
+def counted_queries():
+    """Counts the statements sent to the database (savepoints excluded)."""
+    queries = []
+
+    def before_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+    ):
+        if statement.lstrip().upper().startswith(STATEMENTS):
+            queries.append(statement)
+
+    engine = async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+async def catalogue(setup_async_session):
+    session = setup_async_session
+    categories = [models.Category(name=f"Category {i}") for i in range(3)]
+    ingredients = [
+        models.Ingredient(name=f"Ingredient {i}", categories=categories[:1 + i % 3])
+        for i in range(6)
+    ]
+    session.add_all(categories + ingredients)
+    await session.flush()
+    recipes = [Recipe(cooking_time_in_minutes=10 * i) for i in range(4)]
+    session.add_all(recipes)
+    await session.flush()
+    session.add_all([
+        RecipeIngredient(recipe_id=recipe.id, ingredient_id=ingredient.id, quantity=50)
+        for recipe in recipes
+        for ingredient in ingredients[:3]
+    ])
+    await session.commit()
+    session.expunge_all()
+    return {
+        "category_ids": [c.id for c in categories],
+        "ingredient_ids": [i.id for i in ingredients],
+        "recipe_ids": [r.id for r in recipes]
+    }
+
+
+# ----------------------------------------------------------------------
+# Per-endpoint budgets
+# ----------------------------------------------------------------------
+# Each call is serialized like its endpoint, so a relationship the query
+# did not declare would raise instead of silently adding a query.
+@pytest.mark.asyncio
+async def test_search_recipes_query_count(setup_async_session, catalogue):
+    with counted_queries() as queries:
+        recipes = await RecipeService(setup_async_session).search_recipes(
+            catalogue["ingredient_ids"][:2], "any"
+        )
+        [RecipeReadSchema.model_validate(r) for r in recipes]
+
+    # recipes + their lines; was 4 with ingredients and categories eager-loaded
+    assert len(queries) == 2
+
+
+@pytest.mark.asyncio
+async def test_create_recipe_query_count(setup_async_session, catalogue):
+    ingredient_ids = catalogue["ingredient_ids"][:3]
+
+    with counted_queries() as queries:
+        service = RecipeService(setup_async_session)
+        recipe = await service.create_recipe(RecipeCreateSchema(
+            cooking_time_in_minutes=15,
+            image_url=None,
+            ingredients=[{"ingredient_id": i, "quantity": 10} for i in ingredient_ids]
+        ))
+        RecipeReadSchema.model_validate(recipe)
+
+    # validate ids, insert recipe, insert lines, change log lock + insert,
+    # reload recipe + lines; was 11 (categories on validate, refresh, and
+    # ingredients and their categories on reload)
+    assert len(queries) == 7
+
+
+@pytest.mark.asyncio
+async def test_get_recipe_query_count(setup_async_session, catalogue):
+    with counted_queries() as queries:
+        recipe = await RecipeService(setup_async_session).get_recipe_by_id(
+            catalogue["recipe_ids"][0]
+        )
+        RecipeReadSchema.model_validate(recipe)
+
+    assert len(queries) == 2
+
+
+@pytest.mark.asyncio
+async def test_ingredient_reads_query_count(setup_async_session, catalogue):
+    service = IngredientService(setup_async_session)
+
+    with counted_queries() as queries:
+        ingredients = await service.get_all_ingredients()
+        [IngredientReadSchema.model_validate(i) for i in ingredients]
+    assert len(queries) == 2
+
+    with counted_queries() as queries:
+        categories = CategoryService(setup_async_session)
+        ingredients = await categories.get_ingredients_by_category_id(
+            catalogue["category_ids"][0]
+        )
+        [IngredientReadSchema.model_validate(i) for i in ingredients]
+    assert len(queries) == 3
+
+
+@pytest.mark.asyncio
+async def test_delete_category_scans_only_its_ingredients(
+        setup_async_session, catalogue
+):
+    session = setup_async_session
+    category_id = catalogue["category_ids"][2]
+    loaded = []
+
+    def on_load(target, context):
+        loaded.append(target.id)
+
+    event.listen(models.Ingredient, "load", on_load)
+    try:
+        await CategoryService(session).delete_category(category_id)
+    finally:
+        event.remove(models.Ingredient, "load", on_load)
+
+    # Ingredient i belongs to categories[:1 + i % 3], so only i % 3 == 2 use category 2;
+    # the full-table scan used to load all of them
+    assert sorted(loaded) == sorted(catalogue["ingredient_ids"][2::3])
@@ -0,0 +1,156 @@
+import json
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from database import async_engine
+from recipe_service.models import ingredients_models as models
+from recipe_service.models.recipes_models import Recipe, RecipeIngredient, UserRecipe
+from recipe_service.pydantic_schemas.recipes_schemas import RecipeSearchQuerySchema
+from recipe_service.services.category_service import CategoryService
+from recipe_service.services.ingredient_service import IngredientService
+from recipe_service.services.recipe_service import RecipeService
+from recipe_service.services.user_recipe_service import UserRecipeService
+
+
+# ----------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------
+@contextmanager
+def captured_selects():
+    """Collects the SELECT statements (with parameters) sent to the database."""
+    statements = []
+
+    def before_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+    ):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan["Node Type"] == "Seq Scan":
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+async def _assert_index_backed(session, statements):
+    """EXPLAIN ANALYZE every statement with seq scans disabled.
+
+    With enable_seqscan off the planner only falls back to a Seq Scan when
+    no index can serve the query, so any Seq Scan left is a missing index.
+    """
+    connection = await session.connection()
+    await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    offenders = {}
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters
+        )
+        raw = result.scalar_one()
+        plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+        scans = _seq_scans(plan)
+        if scans:
+            offenders[statement] = scans
+    await connection.exec_driver_sql("SET LOCAL enable_seqscan = on")
+    assert not offenders, f"Sequential scans found: {offenders}"
+
+
+# ----------------------------------------------------------------------
+# Seed data
+# ----------------------------------------------------------------------
+@pytest.fixture
+async def seeded(setup_async_session):
+    session = setup_async_session
+    categories = [models.Category(name=f"Category {i}") for i in range(20)]
+    ingredients = [
+        models.Ingredient(name=f"Ingredient {i}", categories=[categories[i % 20]])
+        for i in range(400)
+    ]
+    session.add_all(categories + ingredients)
+    await session.flush()
+
+    recipes = [Recipe(author_id=i % 7 or None, cooking_time_in_minutes=i % 90)
+               for i in range(300)]
+    session.add_all(recipes)
+    await session.flush()
+    session.add_all([
+        RecipeIngredient(
+            recipe_id=recipe.id,
+            ingredient_id=ingredients[(r * 7 + k * 13) % 400].id,
+            quantity=100
+        )
+        for r, recipe in enumerate(recipes)
+        for k in range(6)
+    ])
+    session.add_all([
+        UserRecipe(base_recipe_id=recipes[i].id, user_id=i % 25,
+                   title=f"Variant {i}", instructions="Cook")
+        for i in range(200)
+    ])
+    await session.commit()
+    await (await session.connection()).exec_driver_sql("ANALYZE")
+    return {"categories": categories, "ingredients": ingredients, "recipes": recipes}
+
+
+# ----------------------------------------------------------------------
+# Checks
+# ----------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_service_read_queries_use_indexes(setup_async_session, seeded):
+    session = setup_async_session
+    ingredient_ids = [i.id for i in seeded["ingredients"][:3]]
+
+    with captured_selects() as statements:
+        await RecipeService(session).search_recipes(ingredient_ids, "any")
+        await RecipeService(session).search_recipes(ingredient_ids, "all")
+        await RecipeService(session).get_recipe_by_id(seeded["recipes"][5].id)
+        await CategoryService(session).get_ingredients_by_category_id(
+            seeded["categories"][3].id
+        )
+        await IngredientService(session).get_ingredient_by_id(ingredient_ids[0])
+        await UserRecipeService(session).get_user_recipes(user_id=3)
+
+    assert statements
+    await _assert_index_backed(session, statements)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort", ["id", "-cooking_time", "created_at", "-updated_at"])
+async def test_recipe_filters_use_indexes(setup_async_session, seeded, sort):
+    session = setup_async_session
+    ingredient_ids = [i.id for i in seeded["ingredients"][:3]]
+    filters = [
+        {},
+        {"ingredient_ids": ingredient_ids},
+        {"ingredient_ids": ingredient_ids, "match_all": True},
+        {"author_id": 3},
+        {"author_id": 3, "max_cooking_time": 30},
+        {"min_cooking_time": 10, "max_cooking_time": 30},
+        {"created_after": "2000-01-01T00:00:00Z", "has_image": False},
+    ]
+
+    service = RecipeService(session)
+    with captured_selects() as statements:
+        for query in filters:
+            page = await service.filter_recipes(
+                RecipeSearchQuerySchema(**query, sort=sort, limit=5)
+            )
+            if page.next_cursor:
+                await service.filter_recipes(RecipeSearchQuerySchema(
+                    **query, sort=sort, limit=5, after=page.next_cursor
+                ))
+
+    assert statements
+    await _assert_index_backed(session, statements)
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import database
+from database import ReplicaSet, RoutingSession
+from recipe_service.models.ingredients_models import Category
+
+
+def _engine(host: str):
+    # Engines connect lazily, so no server is needed to test routing
+    return create_async_engine(f"postgresql+psycopg://user:pass@{host}/db")
+
+
+@pytest.fixture
+def replica_set(monkeypatch):
+    replica_set = ReplicaSet([_engine("replica1"), _engine("replica2")], retry_after=30)
+    monkeypatch.setattr(database, "replicas", replica_set)
+    return replica_set
+
+
+@pytest.fixture
+def routing_session():
+    primary = _engine("primary")
+    session = RoutingSession(bind=primary.sync_engine)
+    yield session, primary.sync_engine
+    session.close()
+
+
+def _host(bind) -> str:
+    return bind.url.host
+
+
+def test_reads_outside_replica_methods_use_primary(replica_set, routing_session):
+    session, primary = routing_session
+
+    assert session.get_bind(clause=select(Category)) is primary
+
+
+def test_replica_reads_round_robin(replica_set, routing_session):
+    session, _ = routing_session
+    session.info["replica"] = True
+
+    first = session.get_bind(clause=select(Category))
+    # The replica is pinned for the rest of the method call
+    assert session.get_bind(clause=select(Category)) is first
+
+    session.info.pop("replica_engine")
+    second = session.get_bind(clause=select(Category))
+    assert {_host(first), _host(second)} == {"replica1", "replica2"}
+
+
+def test_writes_and_reads_after_write_use_primary(replica_set, routing_session):
+    session, primary = routing_session
+    session.info["replica"] = True
+
+    assert session.get_bind(clause=update(Category).values(name="x")) is primary
+    session.info["wrote"] = True
+    assert session.get_bind(clause=select(Category)) is primary
+
+
+def test_read_your_writes_window_uses_primary(replica_set, routing_session):
+    session, primary = routing_session
+    session.info.update(replica=True, primary_only=True)
+
+    assert session.get_bind(clause=select(Category)) is primary
+
+
+def test_failed_replicas_are_skipped_then_fall_back_to_primary(
+        replica_set,
+        routing_session):
+    session, primary = routing_session
+    session.info["replica"] = True
+
+    replica_set.mark_down(replica_set.engines[0])
+    assert _host(session.get_bind(clause=select(Category))) == "replica2"
+
+    session.info.pop("replica_engine")
+    replica_set.mark_down(replica_set.engines[1])
+    assert session.get_bind(clause=select(Category)) is primary
+
+
+def test_replica_urls_accept_comma_separated_env(monkeypatch):
+    monkeypatch.setenv(
+        "DB_READ_REPLICA_URLS",
+        "postgresql://u:p@r1:5432/db, postgresql://u:p@r2:5432/db"
+    )
+    settings = database.settings.__class__()
+
+    assert settings.database_replica_urls == [
+        "postgresql+psycopg://u:p@r1:5432/db",
+        "postgresql+psycopg://u:p@r2:5432/db"
+    ]
@@ -0,0 +1,152 @@
+import pytest
+
+from recipe_service.models import ingredients_models as models
+from recipe_service.models.recipes_models import Recipe, RecipeIngredient
+from recipe_service.pydantic_schemas.recipes_schemas import (
+    FacetedSearchSchema,
+    RecipeSearchQuerySchema
+)
+from recipe_service.services.recipe_service import RecipeService
+
+
+@pytest.fixture
+async def catalogue(setup_async_session):
+    session = setup_async_session
+    dairy = models.Category(name="Search dairy")
+    grains = models.Category(name="Search grains")
+    milk = models.Ingredient(name="Search milk", categories=[dairy])
+    flour = models.Ingredient(name="Search flour", categories=[grains])
+    butter = models.Ingredient(name="Search butter", categories=[dairy])
+    session.add_all([dairy, grains, milk, flour, butter])
+    await session.flush()
+
+    # pancakes: milk + flour, 20 min; porridge: milk, 10 min;
+    # bread: flour + butter, 90 min; toast: butter, no time
+    recipes = {
+        "pancakes": (20, [milk, flour]),
+        "porridge": (10, [milk]),
+        "bread": (90, [flour, butter]),
+        "toast": (None, [butter]),
+    }
+    ids = {}
+    for name, (minutes, ingredients) in recipes.items():
+        recipe = Recipe(cooking_time_in_minutes=minutes)
+        session.add(recipe)
+        await session.flush()
+        session.add_all([
+            RecipeIngredient(recipe_id=recipe.id, ingredient_id=i.id, quantity=1)
+            for i in ingredients
+        ])
+        ids[name] = recipe.id
+    await session.commit()
+    return {"recipes": ids, "dairy": dairy.id, "grains": grains.id,
+            "milk": milk.id, "flour": flour.id, "butter": butter.id}
+
+
+# ----------------------------------------------------------------------
+# Filters and keyset pages
+# ----------------------------------------------------------------------
+async def _all_pages(service, **query):
+    ids, after = [], None
+    while True:
+        page = await service.filter_recipes(
+            RecipeSearchQuerySchema(**query, limit=1, after=after)
+        )
+        ids.extend(recipe.id for recipe in page.recipes)
+        if page.next_cursor is None:
+            return ids
+        after = page.next_cursor
+
+
+@pytest.mark.asyncio
+async def test_filters_combine_in_one_query(setup_async_session, catalogue):
+    service = RecipeService(setup_async_session)
+    recipes = catalogue["recipes"]
+
+    page = await service.filter_recipes(RecipeSearchQuerySchema(
+        ingredient_ids=[catalogue["milk"], catalogue["flour"]], max_cooking_time=30
+    ))
+    assert [r.id for r in page.recipes] == sorted(
+        [recipes["pancakes"], recipes["porridge"]]
+    )
+    assert page.next_cursor is None
+
+    page = await service.filter_recipes(RecipeSearchQuerySchema(
+        ingredient_ids=[catalogue["flour"], catalogue["butter"]], match_all=True
+    ))
+    assert [r.id for r in page.recipes] == [recipes["bread"]]
+
+    page = await service.filter_recipes(RecipeSearchQuerySchema(
+        min_cooking_time=15, has_image=False, sort="-cooking_time"
+    ))
+    assert [r.id for r in page.recipes] == [recipes["bread"], recipes["pancakes"]]
+
+
+@pytest.mark.asyncio
+async def test_pages_follow_every_sort_order(setup_async_session, catalogue):
+    service = RecipeService(setup_async_session)
+    recipes = catalogue["recipes"]
+    by_time = [recipes[name] for name in ("porridge", "pancakes", "bread", "toast")]
+
+    assert await _all_pages(service, sort="cooking_time") == by_time
+    # Unknown cooking times come first when descending
+    assert await _all_pages(service, sort="-cooking_time") == by_time[::-1]
+    # Created in one transaction: ties are broken by id
+    assert await _all_pages(service, sort="created_at") == sorted(recipes.values())
+    assert await _all_pages(service, sort="-updated_at") == sorted(
+        recipes.values(), reverse=True
+    )
+    assert await _all_pages(
+        service, sort="id", ingredient_ids=[catalogue["butter"]]
+    ) == sorted([recipes["bread"], recipes["toast"]])
+
+
+@pytest.mark.asyncio
+async def test_cursor_must_match_sort_order(setup_async_session, catalogue):
+    service = RecipeService(setup_async_session)
+    page = await service.filter_recipes(
+        RecipeSearchQuerySchema(sort="created_at", limit=1)
+    )
+
+    with pytest.raises(ValueError):
+        await service.filter_recipes(RecipeSearchQuerySchema(
+            sort="-created_at", after=page.next_cursor
+        ))
+    with pytest.raises(ValueError):
+        await service.filter_recipes(RecipeSearchQuerySchema(after="not-a-cursor"))
+
+
+# ----------------------------------------------------------------------
+# Facets
+# ----------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_facets_count_all_hits_in_one_pass(setup_async_session, catalogue):
+    service = RecipeService(setup_async_session)
+    recipes = catalogue["recipes"]
+
+    result = await service.search_recipes_with_facets(
+        [catalogue["milk"], catalogue["flour"]], "any", limit=2
+    )
+    assert result.total == 3
+    assert [r.id for r in result.recipes] == sorted(
+        [recipes["pancakes"], recipes["porridge"], recipes["bread"]]
+    )[:2]
+    assert result.facets.ingredients == {catalogue["milk"]: 2, catalogue["flour"]: 2}
+    # Bread also counts for dairy through its butter
+    assert result.facets.categories == {catalogue["dairy"]: 3, catalogue["grains"]: 2}
+    assert result.facets.cooking_time == {"<15": 1, "15-29": 1, "60-119": 1}
+    FacetedSearchSchema.model_validate(result)
+
+
+@pytest.mark.asyncio
+async def test_facets_follow_match_all(setup_async_session, catalogue):
+    service = RecipeService(setup_async_session)
+
+    result = await service.search_recipes_with_facets([catalogue["butter"]], "all")
+    assert result.total == 2
+    assert result.facets.cooking_time == {"60-119": 1, "unknown": 1}
+
+    result = await service.search_recipes_with_facets(
+        [catalogue["milk"], catalogue["butter"]], "all"
+    )
+    assert (result.total, result.recipes, result.facets.categories) == (0, [], {})
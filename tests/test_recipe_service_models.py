@@ -1,4 +1,8 @@
 import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import selectinload
+
 from recipe_service.models.recipes_models import (
     Recipe,
     UserRecipeIngredient,
@@ -65,27 +69,59 @@ def sample_data(session):
     }
 
 
-def test_recipe_author_and_ingredients(sample_data):
-    recipe = sample_data["recipe"]
-    ingredient = sample_data["ingredient"]
+def _load(session, model, obj_id, *options):
+    """Relationships raise on lazy load, so every test loads what it checks."""
+    return session.scalars(
+        select(model).options(*options).where(model.id == obj_id)
+    ).one()
+
+
+def test_recipe_author_and_ingredients(session, sample_data):
+    recipe = _load(
+        session, Recipe, sample_data["recipe"].id,
+        selectinload(Recipe.ingredients).selectinload(RecipeIngredient.ingredient)
+    )
+    ingredient = _load(
+        session, Ingredient, sample_data["ingredient"].id,
+        selectinload(Ingredient.recipe_ingredients)
+        .selectinload(RecipeIngredient.recipe)
+    )
 
     assert recipe.author_id == 1
     assert ingredient in [ri.ingredient for ri in recipe.ingredients]
     assert recipe in [ri.recipe for ri in ingredient.recipe_ingredients]
 
 
-def test_category_ingredient(sample_data):
-    ingredient = sample_data["ingredient"]
-    category = sample_data["category"]
+def test_category_ingredient(session, sample_data):
+    ingredient = _load(
+        session, Ingredient, sample_data["ingredient"].id,
+        selectinload(Ingredient.categories)
+    )
+    category = _load(
+        session, Category, sample_data["category"].id,
+        selectinload(Category.ingredients)
+    )
 
     assert category in ingredient.categories
     assert ingredient in category.ingredients
 
 
-def test_user_recipe_and_links(sample_data):
-    user_recipe = sample_data["user_recipe"]
+def test_user_recipe_and_links(session, sample_data):
+    user_recipe = _load(
+        session, UserRecipe, sample_data["user_recipe"].id,
+        selectinload(UserRecipe.base_recipe),
+        selectinload(UserRecipe.ingredients)
+        .selectinload(UserRecipeIngredient.ingredient)
+    )
     recipe = sample_data["recipe"]
 
     assert user_recipe.base_recipe == recipe
     assert user_recipe.user_id == 1
     assert any(ing.ingredient.name == "Tomato" for ing in user_recipe.ingredients)
+
+
+def test_relationships_raise_instead_of_lazy_loading(session, sample_data):
+    recipe = _load(session, Recipe, sample_data["recipe"].id)
+
+    with pytest.raises(InvalidRequestError):
+        recipe.user_recipes
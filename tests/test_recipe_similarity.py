@@ -0,0 +1,106 @@
+import pytest
+
+from recipe_service.core.cache import invalidate_local_caches
+from recipe_service.core.similarity import MinHashLSH
+from recipe_service.models import ingredients_models as models
+from recipe_service.pydantic_schemas.recipes_schemas import (
+    RecipeCreateSchema,
+    RecipeUpdateSchema,
+    SimilarRecipeSchema
+)
+from recipe_service.services.recipe_service import RecipeNotFound, RecipeService
+
+
+# ----------------------------------------------------------------------
+# Index
+# ----------------------------------------------------------------------
+def test_index_ranks_by_estimated_jaccard():
+    index = MinHashLSH(num_perm=128, bands=32)
+    index.upsert(1, range(1, 11))
+    index.upsert(2, range(1, 11))   # identical
+    index.upsert(3, range(1, 10))   # Jaccard 0.9
+    index.upsert(4, range(100, 110))  # disjoint
+
+    matches = index.query(1, k=3)
+
+    assert [recipe_id for recipe_id, _ in matches][:2] == [2, 3]
+    assert matches[0][1] == 1.0
+    assert 0.7 < matches[1][1] < 1.0
+    assert 4 not in [recipe_id for recipe_id, _ in matches]
+
+
+def test_index_upsert_replaces_and_remove_forgets():
+    index = MinHashLSH()
+    index.upsert(1, [1, 2, 3])
+    index.upsert(2, [1, 2, 3])
+    index.upsert(2, [7, 8, 9])
+
+    assert index.query(1, k=5) == []
+
+    index.remove(1)
+    assert index.query(1, k=5) == []
+    assert all(
+        1 not in bucket
+        for buckets in index._buckets for bucket in buckets.values()
+    )
+
+
+def test_index_marks_changed_recipes_stale():
+    index = MinHashLSH()
+    index.loaded = True
+
+    index.invalidate("ingredients", 3)
+    index.invalidate("recipes", 5)
+    assert index.stale == {5}
+
+    index.invalidate("recipes")
+    assert not index.loaded
+
+
+# ----------------------------------------------------------------------
+# RecipeService
+# ----------------------------------------------------------------------
+@pytest.fixture
+async def ingredient_ids(setup_async_session):
+    ingredients = [models.Ingredient(name=f"Similar {i}") for i in range(8)]
+    setup_async_session.add_all(ingredients)
+    await setup_async_session.commit()
+    return [ingredient.id for ingredient in ingredients]
+
+
+def _recipe(ingredient_ids) -> RecipeCreateSchema:
+    return RecipeCreateSchema(
+        cooking_time_in_minutes=10,
+        image_url=None,
+        ingredients=[{"ingredient_id": i, "quantity": 1} for i in ingredient_ids]
+    )
+
+
+@pytest.mark.asyncio
+async def test_similar_recipes_follow_recipe_writes(
+        setup_async_session, ingredient_ids
+):
+    service = RecipeService(setup_async_session, trusted=True)
+    base = await service.create_recipe(_recipe(ingredient_ids[:4]))
+    twin = await service.create_recipe(_recipe(ingredient_ids[:4]))
+    other = await service.create_recipe(_recipe(ingredient_ids[4:]))
+
+    similar = await service.get_similar_recipes(base.id, k=5)
+    assert [s.recipe.id for s in similar] == [twin.id]
+    SimilarRecipeSchema.model_validate(similar[0])
+
+    # Only the updated recipe is reloaded (the write invalidated it locally)
+    await service.update_recipe(other.id, RecipeUpdateSchema(
+        image_url=None, ingredients=_recipe(ingredient_ids[:4]).ingredients
+    ))
+    await service.delete_recipe(twin.id)
+    similar = await service.get_similar_recipes(base.id, k=5)
+    assert [s.recipe.id for s in similar] == [other.id]
+
+
+@pytest.mark.asyncio
+async def test_similar_recipes_of_unknown_recipe(setup_async_session):
+    invalidate_local_caches("recipes")
+
+    with pytest.raises(RecipeNotFound):
+        await RecipeService(setup_async_session).get_similar_recipes(10 ** 9)
@@ -0,0 +1,129 @@
+import json
+
+import psycopg
+import pytest
+
+from config import settings
+from tools import snapshot
+from tools.snapshot import (
+    FORMAT_VERSION,
+    MANIFEST,
+    SnapshotError,
+    export_snapshot,
+    import_snapshot,
+    read_manifest,
+    verify_snapshot
+)
+
+CATALOGUE = ("recipes.change_log, recipes.recipe_ingredients, "
+             "recipes.ingredient_categories, recipes.recipes, recipes.ingredients, "
+             "recipes.categories, recipes.units")
+
+
+@pytest.fixture
+def catalogue(test_database):
+    """Committed rows, since the tool reads through its own connections."""
+    dsn = settings.database_dsn
+    with psycopg.connect(dsn) as connection:
+        connection.execute(f"TRUNCATE {CATALOGUE} CASCADE")
+        connection.execute(
+            "INSERT INTO recipes.units (id, symbol) VALUES (1, 'g'), (2, 'ml')"
+        )
+        connection.execute(
+            "INSERT INTO recipes.categories (id, name) VALUES (1, 'Grains')"
+        )
+        connection.execute(
+            "INSERT INTO recipes.ingredients (id, name) "
+            "SELECT i, 'Ingredient ' || i FROM generate_series(1, 50) AS i"
+        )
+        connection.execute(
+            "INSERT INTO recipes.ingredient_categories (ingredient_id, category_id) "
+            "SELECT i, 1 FROM generate_series(1, 50, 2) AS i"
+        )
+        connection.execute(
+            "INSERT INTO recipes.recipes (id, cooking_time_in_minutes) "
+            "SELECT i, i % 90 FROM generate_series(1, 200) AS i"
+        )
+        connection.execute(
+            "INSERT INTO recipes.recipe_ingredients "
+            "(recipe_id, ingredient_id, quantity, unit_id) "
+            "SELECT r, i, r * 1.5, 1 + i % 2 "
+            "FROM generate_series(1, 200) AS r, generate_series(1, 5) AS i"
+        )
+    yield dsn
+    with psycopg.connect(dsn) as connection:
+        connection.execute(f"TRUNCATE {CATALOGUE} CASCADE")
+
+
+def test_export_import_round_trip(catalogue, tmp_path):
+    manifest = export_snapshot(catalogue, tmp_path, workers=3)
+    counts = {entry["name"]: entry["rows"] for entry in manifest["tables"]}
+    assert counts["recipes.recipe_ingredients"] == 1000
+    assert counts["recipes.ingredient_categories"] == 25
+
+    with psycopg.connect(catalogue) as connection:
+        connection.execute("DELETE FROM recipes.recipe_ingredients WHERE recipe_id = 1")
+    with pytest.raises(SnapshotError, match="recipe_ingredients"):
+        verify_snapshot(catalogue, tmp_path)
+
+    with pytest.raises(SnapshotError, match="not empty"):
+        import_snapshot(catalogue, tmp_path)
+    import_snapshot(catalogue, tmp_path, workers=3, truncate=True)
+
+    with psycopg.connect(catalogue) as connection:
+        # Sequences continue after the imported ids
+        assert connection.execute(
+            "INSERT INTO recipes.recipes DEFAULT VALUES RETURNING id"
+        ).fetchone()[0] == 201
+        logged = connection.execute(
+            "SELECT op, count(*) FROM recipes.change_log "
+            "WHERE table_name = 'recipes' GROUP BY op ORDER BY op").fetchall()
+    assert logged == [("D", 200), ("I", 200)]
+
+
+def test_corrupt_file_is_rejected_before_loading(catalogue, tmp_path):
+    manifest = export_snapshot(catalogue, tmp_path, workers=2)
+    entry = next(e for e in manifest["tables"] if e["name"] == "recipes.recipes")
+    manifest_path = tmp_path / MANIFEST
+    entry["sha256"] = "0" * 64
+    manifest_path.write_text(json.dumps(manifest))
+
+    with pytest.raises(SnapshotError, match="checksum"):
+        import_snapshot(catalogue, tmp_path, truncate=True)
+    # Nothing was truncated
+    with psycopg.connect(catalogue) as connection:
+        count = connection.execute("SELECT count(*) FROM recipes.recipes")
+        assert count.fetchone()[0] == 200
+
+
+def test_failed_load_keeps_the_catalogue(catalogue, tmp_path, monkeypatch):
+    export_snapshot(catalogue, tmp_path, workers=2)
+    load_table = snapshot._load_table
+    state = ("SELECT (SELECT count(*) FROM recipes.recipes), "
+             "(SELECT count(*) FROM recipes.recipe_ingredients), "
+             "(SELECT count(*) FROM recipes.change_log)")
+    with psycopg.connect(catalogue) as connection:
+        before = connection.execute(state).fetchone()
+
+    def failing_load(connection, directory, compression, entry):
+        if entry["name"] == "recipes.recipe_ingredients":
+            raise SnapshotError("disk full")
+        load_table(connection, directory, compression, entry)
+
+    monkeypatch.setattr(snapshot, "_load_table", failing_load)
+    with pytest.raises(SnapshotError, match="disk full"):
+        import_snapshot(catalogue, tmp_path, truncate=True)
+
+    # The truncate and the tables loaded before the failure were rolled back
+    with psycopg.connect(catalogue) as connection:
+        assert connection.execute(state).fetchone() == before
+    assert before[:2] == (200, 1000)
+
+
+def test_newer_snapshot_version_is_rejected(tmp_path):
+    (tmp_path / MANIFEST).write_text(json.dumps(
+        {"format": "recipes-snapshot", "version": FORMAT_VERSION + 1, "tables": []}
+    ))
+
+    with pytest.raises(SnapshotError, match="newer"):
+        read_manifest(tmp_path)
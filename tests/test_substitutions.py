@@ -0,0 +1,143 @@
+import pytest
+
+from recipe_service.core.substitutions import Substitute, SubstitutionGraph
+from recipe_service.models import ingredients_models as models
+from recipe_service.pydantic_schemas.recipes_schemas import (
+    RecipeCreateSchema,
+    SubstitutedRecipeSchema
+)
+from recipe_service.services.ingredient_service import (
+    IngredientService,
+    SubstitutionNotFound
+)
+from recipe_service.services.recipe_service import RecipeService, _choose_substitutes
+
+
+# ----------------------------------------------------------------------
+# Graph
+# ----------------------------------------------------------------------
+@pytest.fixture
+def graph():
+    graph = SubstitutionGraph(max_depth=2, min_weight=0.5)
+    # 1 -> 2 -> 3 -> 4, and a weaker shortcut 1 -> 3
+    graph.set_edges({1: {2: 0.9, 3: 0.6}, 2: {3: 0.9}, 3: {4: 0.9}})
+    return graph
+
+
+def test_closure_keeps_heaviest_chain_within_limits(graph):
+    assert graph.substitutes(1) == {
+        2: Substitute(0.9, (2,)),
+        3: Substitute(pytest.approx(0.81), (2, 3)),
+        # 1 -> 3 -> 4 is within depth 2, 1 -> 2 -> 3 -> 4 is not
+        4: Substitute(pytest.approx(0.54), (3, 4)),
+    }
+    assert graph.substitutes(4) == {}
+
+
+def test_closure_drops_chains_below_min_weight(graph):
+    graph.set_edges({3: {4: 0.7}})
+    assert 4 not in graph.substitutes(1)
+    assert graph.substitutes(2)[4] == Substitute(pytest.approx(0.63), (3, 4))
+
+
+def test_edge_changes_recompute_only_affected_closures(graph):
+    untouched = graph.substitutes(3)
+    graph.set_edges({2: {}})
+
+    # 1 now reaches 3 only through its shortcut
+    assert graph.substitutes(1)[3] == Substitute(0.6, (3,))
+    assert graph.substitutes(2) == {}
+    assert graph.substitutes(3) is untouched
+    assert graph.reached_by[3] == {1}
+
+
+def test_deleted_ingredient_marks_its_predecessors_stale(graph):
+    graph.invalidate("ingredients", 3)
+    assert graph.stale == {1, 2, 3}
+
+    graph.invalidate("ingredient_substitutions")
+    assert not graph.loaded and not graph.closures
+
+
+def test_choose_substitutes_uses_each_line_once():
+    options = {
+        1: {1: Substitute(1.0, ()), 2: Substitute(0.9, (2,))},
+        2: {2: Substitute(1.0, ()), 3: Substitute(0.8, (3,))},
+    }
+    # 2 stands in for 1 while 3 stands in for 2
+    assert _choose_substitutes(options, {2, 3}) == {
+        1: (2, Substitute(0.9, (2,))), 2: (3, Substitute(0.8, (3,)))
+    }
+    assert _choose_substitutes(options, {1, 3}) == {
+        1: (1, Substitute(1.0, ())), 2: (3, Substitute(0.8, (3,)))
+    }
+    assert _choose_substitutes(options, {2}) is None
+
+
+def test_choose_substitutes_reassigns_earlier_choices():
+    options = {
+        3: {11: Substitute(0.9, (11,)), 12: Substitute(0.6, (12,))},
+        1: {10: Substitute(0.9, (10,)), 11: Substitute(0.9, (11,))},
+        2: {10: Substitute(0.9, (10,)), 11: Substitute(0.9, (11,))},
+    }
+    # 3 takes its heaviest line 11 first; only moving it to 12 covers 1 and 2
+    chosen = _choose_substitutes(options, {10, 11, 12})
+    assert chosen[3][0] == 12
+    assert {chosen[1][0], chosen[2][0]} == {10, 11}
+    assert _choose_substitutes(options, {10, 11}) is None
+
+
+def test_choose_substitutes_maximizes_the_score():
+    options = {
+        1: {10: Substitute(0.9, (10,)), 11: Substitute(0.8, (11,))},
+        2: {10: Substitute(0.5, (10,)), 11: Substitute(0.1, (11,))},
+    }
+    # 1 -> 10, 2 -> 11 scores 0.09; 1 -> 11, 2 -> 10 scores 0.4
+    assert _choose_substitutes(options, {10, 11}) == {
+        1: (11, Substitute(0.8, (11,))), 2: (10, Substitute(0.5, (10,)))
+    }
+
+
+# ----------------------------------------------------------------------
+# Services
+# ----------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_search_with_substitutes_follows_edge_writes(setup_async_session):
+    session = setup_async_session
+    butter, margarine, oil, flour = (
+        models.Ingredient(name=f"Substitute {name}")
+        for name in ("butter", "margarine", "oil", "flour")
+    )
+    session.add_all([butter, margarine, oil, flour])
+    await session.commit()
+    ingredients = IngredientService(session)
+    recipes = RecipeService(session)
+    cake = await recipes.create_recipe(RecipeCreateSchema(
+        cooking_time_in_minutes=40,
+        image_url=None,
+        ingredients=[{"ingredient_id": flour.id, "quantity": 1},
+                     {"ingredient_id": oil.id, "quantity": 1}]
+    ))
+
+    assert await recipes.search_recipes_with_substitutes([butter.id, flour.id]) == []
+
+    await ingredients.set_substitute(butter.id, margarine.id, 0.9)
+    await ingredients.set_substitute(margarine.id, oil.id, 0.8)
+    [found] = await recipes.search_recipes_with_substitutes([butter.id, flour.id])
+    assert found.recipe.id == cake.id
+    assert found.score == pytest.approx(0.72)
+    [substitution] = found.substitutions
+    assert substitution.ingredient_id == butter.id
+    assert substitution.substitute_id == oil.id
+    assert substitution.path == [margarine.id, oil.id]
+    SubstitutedRecipeSchema.model_validate(found)
+
+    assert [s.substitute_id for s in await ingredients.get_substitutes(butter.id)] == [
+        margarine.id, oil.id
+    ]
+    await ingredients.remove_substitute(margarine.id, oil.id)
+    assert await recipes.search_recipes_with_substitutes([butter.id, flour.id]) == []
+    with pytest.raises(SubstitutionNotFound):
+        await ingredients.remove_substitute(margarine.id, oil.id)
+    with pytest.raises(ValueError):
+        await ingredients.set_substitute(oil.id, oil.id, 1)
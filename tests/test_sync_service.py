@@ -0,0 +1,162 @@
+import pytest
+from sqlalchemy import column, delete, func, insert, select, table, text, update
+
+from recipe_service.models.changes_models import ChangeLog, ChangeLogHorizon
+from recipe_service.pydantic_schemas.recipes_schemas import RecipeCreateSchema
+from recipe_service.pydantic_schemas.sync_schemas import SyncResponseSchema
+from recipe_service.services.category_service import CategoryService
+from recipe_service.services.ingredient_service import IngredientService
+from recipe_service.services.recipe_service import RecipeService
+from recipe_service.models.recipes_models import Unit
+from recipe_service.services.sync_service import (
+    CursorTooOld,
+    SyncService,
+    recipe_translations,
+    unit_translations
+)
+
+languages = table(
+    "languages",
+    column("id"),
+    column("language_code"),
+    column("language_name"),
+    schema="translations"
+)
+
+
+@pytest.fixture
+async def cursor(setup_async_session):
+    """Cursor of a client that is up to date before the test starts."""
+    return await setup_async_session.scalar(
+        select(func.coalesce(func.max(ChangeLog.id), 0))
+    )
+
+
+@pytest.mark.asyncio
+async def test_sync_without_changes_returns_same_cursor(setup_async_session, cursor):
+    page = await SyncService(setup_async_session).get_changes(cursor)
+
+    assert page.cursor == cursor
+    assert not page.has_more
+    assert page.recipes == page.ingredients == page.categories == page.deleted == []
+
+
+@pytest.mark.asyncio
+async def test_sync_returns_changed_rows_and_tombstones(setup_async_session, cursor):
+    session = setup_async_session
+    category = await CategoryService(session).create_category("Grains")
+    ingredient = await IngredientService(session).create_ingredient(
+        "Rice", [category.id]
+    )
+    recipe = await RecipeService(session).create_recipe(RecipeCreateSchema(
+        cooking_time_in_minutes=20,
+        image_url=None,
+        ingredients=[{"ingredient_id": ingredient.id, "quantity": 150}]
+    ))
+    await CategoryService(session).update_category(category.id, "Cereals")
+
+    page = await SyncService(session).get_changes(cursor)
+
+    # The rename and the insert of the category collapse into its current state
+    assert [c.name for c in page.categories] == ["Cereals"]
+    assert [i.name for i in page.ingredients] == ["Rice"]
+    assert [r.id for r in page.recipes] == [recipe.id]
+    assert page.deleted == []
+    SyncResponseSchema.model_validate(page)
+
+    await RecipeService(session, trusted=True).delete_recipe(recipe.id)
+    next_page = await SyncService(session).get_changes(page.cursor)
+
+    assert next_page.cursor > page.cursor
+    assert next_page.recipes == []
+    assert next_page.deleted == [{"table": "recipes", "id": recipe.id}]
+
+
+@pytest.mark.asyncio
+async def test_sync_pages_through_changes_in_order(setup_async_session, cursor):
+    service = CategoryService(setup_async_session)
+    created = [(await service.create_category(f"Category {i}")).id for i in range(5)]
+
+    seen, since, has_more = [], cursor, True
+    while has_more:
+        page = await SyncService(setup_async_session).get_changes(since, limit=2)
+        seen.extend(c.id for c in page.categories)
+        since, has_more = page.cursor, page.has_more
+
+    assert seen == created
+
+
+@pytest.mark.asyncio
+async def test_cursor_before_a_purged_delete_needs_a_full_resync(
+        setup_async_session, cursor
+):
+    session = setup_async_session
+    category = await CategoryService(session).create_category("Legumes")
+    page = await SyncService(session).get_changes(cursor)
+    # The retention job compacted a delete logged as the last change
+    await session.execute(
+        update(ChangeLogHorizon).values(purged_through=page.cursor)
+    )
+
+    with pytest.raises(CursorTooOld):
+        await SyncService(session).get_changes(page.cursor - 1)
+    assert (await SyncService(session).get_changes(page.cursor)).categories == []
+    # A full sync still returns every live row
+    full = await SyncService(session).get_changes(0, limit=5000)
+    assert category.id in [c.id for c in full.categories]
+
+
+@pytest.mark.asyncio
+async def test_translation_writes_are_logged_by_the_trigger(
+        setup_async_session, cursor
+):
+    session = setup_async_session
+    recipe = await RecipeService(session).create_recipe(RecipeCreateSchema(
+        cooking_time_in_minutes=5, image_url=None
+    ))
+    tbsp, tsp = Unit(symbol="tbsp-sync"), Unit(symbol="tsp-sync")
+    session.add_all([tbsp, tsp])
+    await session.flush()
+    language_id = await session.scalar(
+        insert(languages)
+        .values(language_code="sv", language_name="Swedish")
+        .returning(languages.c.id)
+    )
+    # Written the way the translation service writes, without track_change
+    recipe_translation_id = await session.scalar(
+        insert(recipe_translations)
+        .values(recipe_id=recipe.id, language_id=language_id, title="Gröt")
+        .returning(recipe_translations.c.id)
+    )
+    kept_id, removed_id = [
+        await session.scalar(
+            insert(unit_translations)
+            .values(unit_id=unit.id, language_id=language_id, symbol=symbol)
+            .returning(unit_translations.c.id)
+        )
+        for unit, symbol in ((tsp, "tsk"), (tbsp, "msk"))
+    ]
+    await session.execute(
+        delete(unit_translations).where(unit_translations.c.id == removed_id)
+    )
+    # recipes.log_change() is deferred to COMMIT, which the test transaction
+    # never reaches; switching it to immediate fires the pending rows now
+    await session.execute(text("SET CONSTRAINTS ALL IMMEDIATE"))
+
+    logged = (await session.execute(
+        select(ChangeLog.table_name, ChangeLog.row_id, ChangeLog.op)
+        .where(ChangeLog.id > cursor, ChangeLog.table_name.like("%_translations"))
+        .order_by(ChangeLog.id)
+    )).all()
+    assert logged == [
+        ("recipe_translations", recipe_translation_id, "I"),
+        ("unit_translations", kept_id, "I"),
+        ("unit_translations", removed_id, "I"),
+        ("unit_translations", removed_id, "D"),
+    ]
+
+    page = await SyncService(session).get_changes(cursor)
+    assert [t["title"] for t in page.recipe_translations] == ["Gröt"]
+    assert [t["symbol"] for t in page.unit_translations] == ["tsk"]
+    assert page.deleted == [{"table": "unit_translations", "id": removed_id}]
+    SyncResponseSchema.model_validate(page)
@@ -0,0 +1,153 @@
+import pytest
+from sqlalchemy import func, select
+
+from recipe_service.models import ingredients_models as models
+from recipe_service.models.recipes_models import Unit, UserRecipeIngredient
+from recipe_service.pydantic_schemas.recipes_schemas import (
+    RecipeCreateSchema,
+    UserRecipeCreateSchema
+)
+from recipe_service.services.recipe_service import RecipeService, RecipeNotFound
+from recipe_service.services.user_recipe_service import (
+    UserRecipeService,
+    UserRecipeNotFound
+)
+
+
+@pytest.fixture
+async def base_recipe(setup_async_session):
+    session = setup_async_session
+    cat = models.Category(name="Dairy")
+    cheese = models.Ingredient(name="Cheese", categories=[cat])
+    milk = models.Ingredient(name="Milk", categories=[cat])
+    pepper = models.Ingredient(name="Pepper", categories=[cat])
+    unit = Unit(symbol="g")
+    session.add_all([cat, cheese, milk, pepper, unit])
+    await session.commit()
+
+    recipe = await RecipeService(session).create_recipe(RecipeCreateSchema(
+        cooking_time_in_minutes=30,
+        image_url=None,
+        ingredients=[
+            {"ingredient_id": cheese.id, "quantity": 100, "unit_id": unit.id},
+            {"ingredient_id": milk.id, "quantity": 200, "unit_id": unit.id}
+        ]
+    ))
+    return {"recipe": recipe, "cheese": cheese, "milk": milk,
+            "pepper": pepper, "unit": unit}
+
+
+async def _fork(service: UserRecipeService, recipe_id: int, user_id: int = 1):
+    return await service.create_user_recipe(UserRecipeCreateSchema(
+        base_recipe_id=recipe_id,
+        user_id=user_id,
+        title="My version",
+        instructions="Cook"
+    ))
+
+
+async def _override_count(session) -> int:
+    return await session.scalar(select(func.count()).select_from(UserRecipeIngredient))
+
+
+def _lines(user_recipe) -> dict[int, float]:
+    return {
+        i["ingredient_id"]: i["quantity"]
+        for i in user_recipe.effective_ingredients
+    }
+
+
+@pytest.mark.asyncio
+async def test_fork_inherits_base_ingredients_without_copies(
+        setup_async_session,
+        base_recipe):
+    service = UserRecipeService(setup_async_session)
+
+    user_recipe = await _fork(service, base_recipe["recipe"].id)
+
+    assert _lines(user_recipe) == {
+        base_recipe["cheese"].id: 100,
+        base_recipe["milk"].id: 200
+    }
+    assert await _override_count(setup_async_session) == 0
+
+
+@pytest.mark.asyncio
+async def test_fork_missing_base_recipe(setup_async_session):
+    service = UserRecipeService(setup_async_session)
+
+    with pytest.raises(RecipeNotFound):
+        await _fork(service, 999)
+
+
+@pytest.mark.asyncio
+async def test_overrides_add_change_remove(setup_async_session, base_recipe):
+    service = UserRecipeService(setup_async_session)
+    user_recipe = await _fork(service, base_recipe["recipe"].id)
+    cheese, milk, pepper = (base_recipe[k].id for k in ("cheese", "milk", "pepper"))
+    unit_id = base_recipe["unit"].id
+
+    await service.set_ingredient(user_recipe.id, cheese, quantity=50, unit_id=unit_id)
+    await service.set_ingredient(user_recipe.id, pepper, quantity=5, unit_id=unit_id)
+    result = await service.remove_ingredient(user_recipe.id, milk)
+
+    assert _lines(result) == {cheese: 50, pepper: 5}
+    assert await _override_count(setup_async_session) == 3
+
+
+@pytest.mark.asyncio
+async def test_override_equal_to_base_is_not_stored(setup_async_session, base_recipe):
+    service = UserRecipeService(setup_async_session)
+    user_recipe = await _fork(service, base_recipe["recipe"].id)
+    cheese = base_recipe["cheese"].id
+    unit_id = base_recipe["unit"].id
+
+    await service.set_ingredient(user_recipe.id, cheese, quantity=50, unit_id=unit_id)
+    result = await service.set_ingredient(
+        user_recipe.id, cheese, quantity=100, unit_id=unit_id
+    )
+
+    assert _lines(result)[cheese] == 100
+    assert await _override_count(setup_async_session) == 0
+
+
+@pytest.mark.asyncio
+async def test_reset_and_remove_added_line(setup_async_session, base_recipe):
+    service = UserRecipeService(setup_async_session)
+    user_recipe = await _fork(service, base_recipe["recipe"].id)
+    milk, pepper = base_recipe["milk"].id, base_recipe["pepper"].id
+
+    await service.remove_ingredient(user_recipe.id, milk)
+    await service.set_ingredient(user_recipe.id, pepper, quantity=5)
+    await service.reset_ingredient(user_recipe.id, milk)
+    result = await service.remove_ingredient(user_recipe.id, pepper)
+
+    assert set(_lines(result)) == {base_recipe["cheese"].id, milk}
+    assert await _override_count(setup_async_session) == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_read_resolves_each_variant(setup_async_session, base_recipe):
+    service = UserRecipeService(setup_async_session)
+    recipe_id = base_recipe["recipe"].id
+    first = await _fork(service, recipe_id, user_id=1)
+    second = await _fork(service, recipe_id, user_id=1)
+    await _fork(service, recipe_id, user_id=2)
+    await service.remove_ingredient(second.id, base_recipe["cheese"].id)
+
+    result = await service.get_user_recipes(user_id=1)
+
+    assert [ur.id for ur in result] == [first.id, second.id]
+    assert len(result[0].effective_ingredients) == 2
+    assert _lines(result[1]) == {base_recipe["milk"].id: 200}
+
+
+@pytest.mark.asyncio
+async def test_delete_user_recipe(setup_async_session, base_recipe):
+    service = UserRecipeService(setup_async_session)
+    user_recipe = await _fork(service, base_recipe["recipe"].id)
+    await service.remove_ingredient(user_recipe.id, base_recipe["milk"].id)
+
+    assert await service.delete_user_recipe(user_recipe.id) == user_recipe.id
+    with pytest.raises(UserRecipeNotFound):
+        await service.get_user_recipe_by_id(user_recipe.id)
@@ -0,0 +1,435 @@
+"""Load a deterministic synthetic catalogue into Postgres for benchmarks.
+
+Ingredient popularity follows a Zipf law, so a handful of staples appear in
+most recipes while the long tail is rare, like real recipe data. Every table
+is cut into fixed blocks of ids and each block draws from its own
+``Random(seed, table, block)``: the generated rows depend only on the seed
+and the sizes, never on ``--workers`` or ``--chunk-blocks``.
+
+The generators run in a process pool; each worker streams its rows straight
+into Postgres with binary ``COPY`` on its own psycopg connection. Tables are
+loaded in foreign key order, one phase at a time, then the id sequences are
+moved past the generated ids and the tables are analyzed.
+
+The defaults produce roughly 10M rows.
+
+Usage:
+    python -m tools.generate_dataset [--seed 42] [--recipes 1000000] [--workers 8]
+        [--truncate]
+"""
+# 1. Standard library imports
+import argparse
+import os
+import random
+import time
+from bisect import bisect
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import cache
+from itertools import accumulate
+
+# 3. Local application imports
+from config import settings
+
+# Rows of a table generated from one Random; chunks are made of whole blocks.
+BLOCK = 10_000
+
+# symbol, dimension, base units (g, ml or piece) per unit
+UNITS = (
+    ("g", "mass", 1.0), ("kg", "mass", 1000.0), ("ml", "volume", 1.0),
+    ("l", "volume", 1000.0), ("tsp", "volume", 5.0), ("tbsp", "volume", 15.0),
+    ("cup", "volume", 240.0), ("pc", "count", 1.0), ("pinch", None, None),
+    ("slice", None, None), ("oz", "mass", 28.35), ("lb", "mass", 453.6),
+)
+LANGUAGES = (
+    ("en", "English"), ("de", "German"), ("fr", "French"), ("es", "Spanish"),
+    ("it", "Italian"), ("pl", "Polish"), ("uk", "Ukrainian"), ("pt", "Portuguese"),
+)
+ADJECTIVES = (
+    "fresh", "dried", "smoked", "roasted", "wild", "sweet", "spicy", "pickled",
+    "ground", "whole", "baby", "red", "green", "golden", "aged", "raw",
+)
+NOUNS = (
+    "tomato", "basil", "rice", "lentil", "garlic", "onion", "pepper", "cheese",
+    "butter", "flour", "salmon", "chicken", "mushroom", "lemon", "almond", "honey",
+)
+DISHES = ("soup", "stew", "salad", "pie", "risotto", "curry", "tart", "bowl",
+          "gratin", "pasta", "roast", "stir-fry")
+WORDS = ADJECTIVES + NOUNS + DISHES
+
+
+@dataclass(frozen=True)
+class Plan:
+    seed: int = 42
+    recipes: int = 1_000_000
+    ingredients: int = 20_000
+    categories: int = 300
+    languages: int = 5
+    user_recipes: int = 200_000
+    users: int = 50_000
+    lines_per_recipe: tuple[int, int] = (3, 12)
+    zipf_exponent: float = 1.1
+    translated_share: float = 0.3
+
+    def count(self, table: str) -> int:
+        return {
+            "units": len(UNITS),
+            "languages": self.languages,
+            "categories": self.categories,
+            "ingredients": self.ingredients,
+            "ingredient_categories": self.ingredients,
+            "ingredient_translations": self.ingredients,
+            "recipes": self.recipes,
+            "recipe_ingredients": self.recipes,
+            "recipe_translations": self.recipes,
+            "user_recipes": self.user_recipes,
+            "user_recipe_ingredients": self.user_recipes,
+        }[table]
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """Target of one generator; ``columns`` pairs each name with its COPY type."""
+    name: str
+    columns: tuple[tuple[str, str], ...]
+    sequence: bool = True
+
+    @property
+    def copy_sql(self) -> str:
+        names = ", ".join(name for name, _ in self.columns)
+        return f"COPY {self.name} ({names}) FROM STDIN (FORMAT BINARY)"
+
+    @property
+    def types(self) -> list[str]:
+        return [type_ for _, type_ in self.columns]
+
+
+TABLES = {
+    "units": TableSpec("recipes.units", (
+        ("id", "int8"), ("symbol", "varchar"), ("dimension", "varchar"),
+        ("base_factor", "float8"))),
+    "languages": TableSpec("translations.languages", (
+        ("id", "int8"), ("language_code", "varchar"), ("language_name", "varchar"))),
+    "categories": TableSpec("recipes.categories", (
+        ("id", "int8"), ("name", "varchar"))),
+    "ingredients": TableSpec("recipes.ingredients", (
+        ("id", "int8"), ("name", "varchar"))),
+    "ingredient_categories": TableSpec("recipes.ingredient_categories", (
+        ("ingredient_id", "int8"), ("category_id", "int8")), sequence=False),
+    "ingredient_translations": TableSpec("translations.ingredient_translations", (
+        ("id", "int8"), ("ingredient_id", "int8"), ("language_id", "int8"))),
+    "recipes": TableSpec("recipes.recipes", (
+        ("id", "int8"), ("author_id", "int8"), ("cooking_time_in_minutes", "int4"),
+        ("image_url", "varchar"))),
+    "recipe_ingredients": TableSpec("recipes.recipe_ingredients", (
+        ("recipe_id", "int8"), ("ingredient_id", "int8"), ("quantity", "float8"),
+        ("unit_id", "int8")), sequence=False),
+    "recipe_translations": TableSpec("translations.recipe_translations", (
+        ("id", "int8"), ("recipe_id", "int8"), ("language_id", "int8"),
+        ("title", "varchar"), ("description", "varchar"), ("instructions", "text"))),
+    "user_recipes": TableSpec("recipes.user_recipes", (
+        ("id", "int8"), ("base_recipe_id", "int8"), ("user_id", "int8"),
+        ("cooking_time_in_minutes", "int4"), ("title", "varchar"),
+        ("description", "varchar"), ("instructions", "text"))),
+    "user_recipe_ingredients": TableSpec("recipes.user_recipe_ingredients", (
+        ("user_recipe_id", "int8"), ("ingredient_id", "int8"), ("quantity", "float8"),
+        ("unit_id", "int8"), ("is_removed", "bool")), sequence=False),
+}
+
+# Foreign key order: every table only references tables of earlier phases.
+PHASES = (
+    ("units", "languages", "categories", "ingredients"),
+    ("ingredient_categories", "ingredient_translations", "recipes"),
+    ("recipe_ingredients", "recipe_translations", "user_recipes"),
+    ("user_recipe_ingredients",),
+)
+
+
+# ----------------------------------------------------------
+# Random helpers
+# ----------------------------------------------------------
+class Zipf:
+    """Draws ids ``1..n`` where the k-th most popular has weight ``1 / k**s``.
+
+    Popularity ranks are shuffled with the seed, so the staples are spread
+    over the id range instead of being the lowest ids.
+    """
+
+    def __init__(self, n: int, exponent: float, seed: int):
+        self.cumulative = list(
+            accumulate(1 / rank ** exponent for rank in range(1, n + 1))
+        )
+        self.total = self.cumulative[-1]
+        self.ids = list(range(1, n + 1))
+        random.Random(f"{seed}:zipf:{n}").shuffle(self.ids)
+
+    def draw(self, rng: random.Random) -> int:
+        return self.ids[bisect(self.cumulative, rng.random() * self.total)]
+
+    def sample(self, rng: random.Random, k: int) -> list[int]:
+        """``k`` distinct ids (``k`` must be well below ``n``)."""
+        chosen = {}
+        while len(chosen) < k:
+            chosen.setdefault(self.draw(rng), None)
+        return list(chosen)
+
+
+@cache
+def _zipf(n: int, exponent: float, seed: int) -> Zipf:
+    # Built once per worker process and table size
+    return Zipf(n, exponent, seed)
+
+
+def _phrase(rng: random.Random, words: int = 3) -> str:
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def _quantity(rng: random.Random) -> float:
+    return rng.choice((0.5, 1, 2, 3, 5, 10, 25, 50, 100, 150, 200, 250, 500))
+
+
+# ----------------------------------------------------------
+# Row generators, one per table
+# ----------------------------------------------------------
+# Each gets the Random of its block and the ids [start, stop) of the rows
+# (or parent rows) it generates.
+def _units(plan, rng, start, stop):
+    for id_ in range(start, stop):
+        yield id_, *UNITS[id_ - 1]
+
+
+def _languages(plan, rng, start, stop):
+    for id_ in range(start, stop):
+        code, name = LANGUAGES[id_ - 1]
+        yield id_, code, name
+
+
+def _categories(plan, rng, start, stop):
+    for id_ in range(start, stop):
+        yield id_, f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}s #{id_}"
+
+
+def _ingredients(plan, rng, start, stop):
+    for id_ in range(start, stop):
+        yield id_, f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} #{id_}"
+
+
+def _ingredient_categories(plan, rng, start, stop):
+    # Overlapping membership: one category, often a second, sometimes more
+    categories = _zipf(plan.categories, plan.zipf_exponent, plan.seed)
+    for ingredient_id in range(start, stop):
+        k = 1 + (rng.random() < 0.5) + (rng.random() < 0.15)
+        for category_id in categories.sample(rng, min(k, plan.categories)):
+            yield ingredient_id, category_id
+
+
+def _ingredient_translations(plan, rng, start, stop):
+    for ingredient_id in range(start, stop):
+        for language_id in range(1, plan.languages + 1):
+            if language_id == 1 or rng.random() < plan.translated_share:
+                id_ = (ingredient_id - 1) * plan.languages + language_id
+                yield id_, ingredient_id, language_id
+
+
+def _recipes(plan, rng, start, stop):
+    for id_ in range(start, stop):
+        author_id = rng.randint(1, plan.users) if rng.random() < 0.7 else None
+        image_url = (
+            f"https://example.com/images/{id_}.jpg" if rng.random() < 0.6 else None
+        )
+        cooking_time = rng.choice((5, 10, 15, 20, 30, 45, 60, 90, 120))
+        yield id_, author_id, cooking_time, image_url
+
+
+def _recipe_ingredients(plan, rng, start, stop):
+    ingredients = _zipf(plan.ingredients, plan.zipf_exponent, plan.seed)
+    low, high = plan.lines_per_recipe
+    for recipe_id in range(start, stop):
+        for ingredient_id in ingredients.sample(rng, rng.randint(low, high)):
+            unit_id = rng.randint(1, len(UNITS)) if rng.random() < 0.9 else None
+            yield recipe_id, ingredient_id, _quantity(rng), unit_id
+
+
+def _recipe_translations(plan, rng, start, stop):
+    for recipe_id in range(start, stop):
+        for language_id in range(1, plan.languages + 1):
+            if language_id == 1 or rng.random() < plan.translated_share:
+                id_ = (recipe_id - 1) * plan.languages + language_id
+                yield (id_, recipe_id, language_id, _phrase(rng).capitalize(),
+                       _phrase(rng, 12), _phrase(rng, 40))
+
+
+def _user_recipes(plan, rng, start, stop):
+    # Popular recipes are forked more often
+    recipes = _zipf(plan.recipes, plan.zipf_exponent, plan.seed)
+    for id_ in range(start, stop):
+        yield (id_, recipes.draw(rng), rng.randint(1, plan.users),
+               rng.choice((None, 10, 20, 30, 45, 60)), f"My {_phrase(rng, 2)}",
+               _phrase(rng, 8) if rng.random() < 0.5 else None, _phrase(rng, 30))
+
+
+def _user_recipe_ingredients(plan, rng, start, stop):
+    # Variants store only their changed, added and removed lines
+    ingredients = _zipf(plan.ingredients, plan.zipf_exponent, plan.seed)
+    for user_recipe_id in range(start, stop):
+        for ingredient_id in ingredients.sample(rng, rng.randint(1, 4)):
+            if rng.random() < 0.2:
+                yield user_recipe_id, ingredient_id, None, None, True
+            else:
+                quantity = _quantity(rng)
+                unit_id = rng.randint(1, len(UNITS))
+                yield user_recipe_id, ingredient_id, quantity, unit_id, False
+
+
+GENERATORS = {
+    "units": _units,
+    "languages": _languages,
+    "categories": _categories,
+    "ingredients": _ingredients,
+    "ingredient_categories": _ingredient_categories,
+    "ingredient_translations": _ingredient_translations,
+    "recipes": _recipes,
+    "recipe_ingredients": _recipe_ingredients,
+    "recipe_translations": _recipe_translations,
+    "user_recipes": _user_recipes,
+    "user_recipe_ingredients": _user_recipe_ingredients,
+}
+
+
+def generate_rows(plan: Plan, table: str, start: int, stop: int) -> Iterator[tuple]:
+    """Rows of ``table`` for the (parent) ids ``[start, stop)``.
+
+    ``start`` must be the first id of a block (``1 + k * BLOCK``).
+    """
+    for block_start in range(start, stop, BLOCK):
+        block = (block_start - 1) // BLOCK
+        rng = random.Random(f"{plan.seed}:{table}:{block}")
+        block_stop = min(stop, 1 + (block + 1) * BLOCK)
+        yield from GENERATORS[table](plan, rng, block_start, block_stop)
+
+
+def chunks(plan: Plan, table: str, chunk_blocks: int) -> Iterator[tuple[int, int]]:
+    total = plan.count(table)
+    size = BLOCK * chunk_blocks
+    for start in range(1, total + 1, size):
+        yield start, min(start + size, total + 1)
+
+
+# ----------------------------------------------------------
+# Loading
+# ----------------------------------------------------------
+_connection = None
+
+
+def _init_worker(dsn: str) -> None:
+    global _connection
+    import psycopg
+
+    _connection = psycopg.connect(dsn)
+
+
+def _copy_chunk(plan: Plan, table: str, start: int, stop: int) -> int:
+    spec = TABLES[table]
+    rows = 0
+    with _connection.cursor() as cursor:
+        with cursor.copy(spec.copy_sql) as copy:
+            copy.set_types(spec.types)
+            for row in generate_rows(plan, table, start, stop):
+                copy.write_row(row)
+                rows += 1
+    _connection.commit()
+    return rows
+
+
+def _prepare(dsn: str, truncate: bool) -> None:
+    import psycopg
+
+    tables = ", ".join(spec.name for spec in TABLES.values())
+    with psycopg.connect(dsn) as connection:
+        if truncate:
+            connection.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+            return
+        for spec in TABLES.values():
+            query = f"SELECT EXISTS (SELECT FROM {spec.name})"
+            if connection.execute(query).fetchone()[0]:
+                raise SystemExit(
+                    f"{spec.name} is not empty, pass --truncate to replace its rows"
+                )
+
+
+def _finish(dsn: str) -> None:
+    import psycopg
+
+    with psycopg.connect(dsn, autocommit=True) as connection:
+        for spec in TABLES.values():
+            if spec.sequence:
+                connection.execute(
+                    f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                    f"(SELECT coalesce(max(id), 0) + 1 FROM {spec.name}), false)",
+                    (spec.name,)
+                )
+        tables = ", ".join(spec.name for spec in TABLES.values())
+        connection.execute(f"ANALYZE {tables}")
+
+
+def load(plan: Plan, dsn: str, workers: int, chunk_blocks: int, truncate: bool) -> int:
+    _prepare(dsn, truncate)
+    total = 0
+    with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(dsn,)
+    ) as pool:
+        for phase in PHASES:
+            started = time.perf_counter()
+            futures = {
+                table: [pool.submit(_copy_chunk, plan, table, start, stop)
+                        for start, stop in chunks(plan, table, chunk_blocks)]
+                for table in phase
+            }
+            counts = {table: sum(f.result() for f in table_futures)
+                      for table, table_futures in futures.items()}
+            elapsed = time.perf_counter() - started
+            rows = sum(counts.values())
+            total += rows
+            print(", ".join(f"{table} {count:,}" for table, count in counts.items()),
+                  f"({rows / elapsed:,.0f} rows/s)")
+    _finish(dsn)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    defaults = Plan()
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--recipes", type=int, default=defaults.recipes)
+    parser.add_argument("--ingredients", type=int, default=defaults.ingredients)
+    parser.add_argument("--categories", type=int, default=defaults.categories)
+    parser.add_argument("--languages", type=int, default=defaults.languages,
+                        choices=range(1, len(LANGUAGES) + 1))
+    parser.add_argument("--user-recipes", type=int, default=defaults.user_recipes)
+    parser.add_argument("--zipf-exponent", type=float, default=defaults.zipf_exponent)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-blocks", type=int, default=5,
+                        help=f"blocks of {BLOCK} ids per COPY")
+    parser.add_argument("--dsn", default=settings.database_dsn)
+    parser.add_argument("--truncate", action="store_true",
+                        help="empty the generated tables first")
+    args = parser.parse_args()
+
+    plan = Plan(
+        seed=args.seed,
+        recipes=args.recipes,
+        ingredients=args.ingredients,
+        categories=args.categories,
+        languages=args.languages,
+        user_recipes=args.user_recipes,
+        zipf_exponent=args.zipf_exponent,
+    )
+    started = time.perf_counter()
+    rows = load(plan, args.dsn, args.workers, args.chunk_blocks, args.truncate)
+    elapsed = time.perf_counter() - started
+    print(f"loaded {rows:,} rows in {elapsed:.1f} s ({rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""Export and import catalogue snapshots with streaming binary COPY.
+
+A snapshot is a directory with one compressed ``COPY ... (FORMAT BINARY)``
+stream per table and a ``manifest.json`` that records the format version,
+the columns, row counts and SHA-256 checksums of the uncompressed streams.
+The manifest is written last, so a directory without one is incomplete.
+
+Export runs one worker per table. They all attach to the snapshot that the
+coordinator exported from its repeatable-read transaction, so every table
+is read at the same point in time. Tables missing from the database (the
+translations schema of a recipe-only database) are left out. Rows are
+ordered by primary key, which makes the checksums reproducible: after an
+import the tables are exported again (without writing files) and compared
+with the manifest.
+
+Import verifies the files before touching the database, then empties (with
+``--truncate``) and loads the tables in foreign key order in a single
+transaction: a failed load leaves the previous catalogue in place. Imported
+rows are written to ``recipes.change_log`` in one statement per load, so
+delta sync clients and other workers' caches pick them up.
+
+Usage:
+    python -m tools.snapshot export DIRECTORY [--workers 4] [--level 3]
+    python -m tools.snapshot import DIRECTORY [--workers 4] [--truncate]
+    python -m tools.snapshot verify DIRECTORY
+"""
+# 1. Standard library imports
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+# 2. Third-party imports
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# 3. Local application imports
+from config import settings
+
+FORMAT = "recipes-snapshot"
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+CHUNK_SIZE = 1 << 20
+
+
+class SnapshotError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class SnapshotTable:
+    name: str
+    key: tuple[str, ...]
+    # Import phase: a table only references tables of earlier phases
+    phase: int
+    # Rows are announced in recipes.change_log (see SyncService)
+    synced: bool = False
+
+    @property
+    def schema(self) -> str:
+        return self.name.split(".")[0]
+
+    @property
+    def table(self) -> str:
+        return self.name.split(".")[1]
+
+
+TABLES = (
+    SnapshotTable("recipes.units", ("id",), phase=0),
+    SnapshotTable("recipes.categories", ("id",), phase=0, synced=True),
+    SnapshotTable("recipes.ingredients", ("id",), phase=0, synced=True),
+    SnapshotTable("recipes.recipes", ("id",), phase=0, synced=True),
+    SnapshotTable("recipes.nutrients", ("id",), phase=0),
+    SnapshotTable("translations.languages", ("id",), phase=0),
+    SnapshotTable("recipes.category_closure",
+                  ("ancestor_id", "descendant_id"), phase=1),
+    SnapshotTable("recipes.ingredient_categories",
+                  ("ingredient_id", "category_id"), phase=1),
+    SnapshotTable("recipes.recipe_ingredients",
+                  ("recipe_id", "ingredient_id"), phase=1),
+    SnapshotTable("recipes.ingredient_nutrients",
+                  ("ingredient_id", "nutrient_id"), phase=1),
+    SnapshotTable("recipes.ingredient_substitutions",
+                  ("ingredient_id", "substitute_id"), phase=1),
+    SnapshotTable("translations.ingredient_translations",
+                  ("id",), phase=1, synced=True),
+    SnapshotTable("translations.recipe_translations", ("id",), phase=1, synced=True),
+    SnapshotTable("translations.unit_translations", ("id",), phase=1),
+)
+TABLES_BY_NAME = {table.name: table for table in TABLES}
+
+
+# ----------------------------------------------------------
+# Archive files
+# ----------------------------------------------------------
+def default_compression() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def _open(path: Path, mode: str, compression: str, level: int = 3):
+    if compression == "zstd":
+        if zstandard is None:
+            raise SnapshotError(
+                "zstandard is not installed, cannot read a zstd snapshot"
+            )
+        if mode == "wb":
+            compressor = zstandard.ZstdCompressor(level=level)
+            return zstandard.open(path, mode, cctx=compressor)
+        return zstandard.open(path, mode)
+    if compression == "gzip":
+        return gzip.open(path, mode, compresslevel=min(level, 9)) if mode == "wb" \
+            else gzip.open(path, mode)
+    raise SnapshotError(f"Unknown compression {compression!r}")
+
+
+def _read_chunks(path: Path, compression: str) -> Iterator[bytes]:
+    with _open(path, "rb", compression) as file:
+        while data := file.read(CHUNK_SIZE):
+            yield data
+
+
+def read_manifest(directory: Path) -> dict:
+    path = directory / MANIFEST
+    if not path.exists():
+        raise SnapshotError(f"{directory} has no {MANIFEST}; the export did not finish")
+    manifest = json.loads(path.read_text())
+    if manifest.get("format") != FORMAT:
+        raise SnapshotError(f"{directory} is not a {FORMAT} directory")
+    if manifest["version"] > FORMAT_VERSION:
+        raise SnapshotError(
+            f"Snapshot version {manifest['version']} is newer than supported "
+            f"({FORMAT_VERSION})"
+        )
+    unknown = [
+        entry["name"] for entry in manifest["tables"]
+        if entry["name"] not in TABLES_BY_NAME
+    ]
+    if unknown:
+        raise SnapshotError(f"Snapshot contains unknown tables: {', '.join(unknown)}")
+    return manifest
+
+
+# ----------------------------------------------------------
+# Export
+# ----------------------------------------------------------
+def _connect(dsn: str, **kwargs):
+    import psycopg
+
+    return psycopg.connect(dsn, **kwargs)
+
+
+def _begin_snapshot(connection, snapshot_id: str) -> None:
+    from psycopg import IsolationLevel, sql
+
+    connection.isolation_level = IsolationLevel.REPEATABLE_READ
+    connection.read_only = True
+    connection.execute(sql.SQL("SET TRANSACTION SNAPSHOT {}").format(snapshot_id))
+
+
+def _columns(connection, table: SnapshotTable) -> list[str]:
+    return [row[0] for row in connection.execute(
+        "SELECT attname FROM pg_attribute "
+        "WHERE attrelid = %s::regclass AND attnum > 0 "
+        "AND NOT attisdropped AND attgenerated = '' "
+        "ORDER BY attnum",
+        (table.name,)
+    )]
+
+
+def _copy_out_sql(table: SnapshotTable, columns: list[str]):
+    from psycopg import sql
+
+    return sql.SQL("COPY (SELECT {columns} FROM {table} ORDER BY {key}) "
+                   "TO STDOUT (FORMAT BINARY)").format(
+        columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+        table=sql.Identifier(table.schema, table.table),
+        key=sql.SQL(", ").join(map(sql.Identifier, table.key)),
+    )
+
+
+def _dump_table(connection, table: SnapshotTable, columns: list[str], out=None) -> dict:
+    """Stream one table through the checksum (and into ``out``)."""
+    from psycopg import sql
+
+    rows = connection.execute(
+        sql.SQL("SELECT count(*) FROM {}").format(
+            sql.Identifier(table.schema, table.table)
+        )
+    ).fetchone()[0]
+    digest = hashlib.sha256()
+    with connection.cursor() as cursor:
+        with cursor.copy(_copy_out_sql(table, columns)) as copy:
+            for data in copy:
+                digest.update(data)
+                if out is not None:
+                    out.write(data)
+    return {"rows": rows, "sha256": digest.hexdigest()}
+
+
+def _export_table(dsn: str, snapshot_id: str, table: SnapshotTable, directory: Path,
+                  compression: str, level: int) -> dict:
+    file_name = f"{table.name}.copy.{'zst' if compression == 'zstd' else 'gz'}"
+    with _connect(dsn) as connection:
+        _begin_snapshot(connection, snapshot_id)
+        columns = _columns(connection, table)
+        with _open(directory / file_name, "wb", compression, level) as out:
+            result = _dump_table(connection, table, columns, out)
+    return {"name": table.name, "file": file_name, "columns": columns,
+            "key": list(table.key), **result}
+
+
+def export_snapshot(dsn: str, directory: Path, workers: int = 4,
+                    compression: str | None = None, level: int = 3) -> dict:
+    from psycopg import IsolationLevel
+
+    compression = compression or default_compression()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / MANIFEST).unlink(missing_ok=True)
+
+    with _connect(dsn) as coordinator:
+        # The exported snapshot stays importable while this transaction is open
+        coordinator.isolation_level = IsolationLevel.REPEATABLE_READ
+        coordinator.read_only = True
+        snapshot_id = coordinator.execute("SELECT pg_export_snapshot()").fetchone()[0]
+        # Databases without the translation service have no translations schema
+        tables = [table for table in TABLES if coordinator.execute(
+            "SELECT to_regclass(%s) IS NOT NULL", (table.name,)).fetchone()[0]]
+        with ThreadPoolExecutor(workers) as pool:
+            entries = list(pool.map(
+                lambda table: _export_table(dsn, snapshot_id, table, directory,
+                                            compression, level),
+                tables
+            ))
+        server_version = coordinator.info.server_version
+
+    manifest = {
+        "format": FORMAT,
+        "version": FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "server_version": server_version,
+        "compression": compression,
+        "tables": entries,
+    }
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+# ----------------------------------------------------------
+# Import
+# ----------------------------------------------------------
+def _check_file(directory: Path, compression: str, entry: dict) -> None:
+    digest = hashlib.sha256()
+    for data in _read_chunks(directory / entry["file"], compression):
+        digest.update(data)
+    if digest.hexdigest() != entry["sha256"]:
+        raise SnapshotError(f"{entry['file']} does not match its checksum")
+
+
+def _log_changes(connection, tables: list[SnapshotTable], op: str) -> None:
+    """One change_log row per row of ``tables``, as recipes.log_change() writes them."""
+    from psycopg import sql
+
+    if not tables:
+        return
+    rows = sql.SQL(" UNION ALL ").join(
+        sql.SQL(
+            "SELECT {order} AS ord, {name} AS table_name, id AS row_id FROM {table}"
+        ).format(
+            order=sql.Literal(order),
+            name=sql.Literal(table.table),
+            table=sql.Identifier(table.schema, table.table),
+        )
+        for order, table in enumerate(tables)
+    )
+    connection.execute("SELECT pg_advisory_xact_lock(hashtext('recipes.change_log'))")
+    connection.execute(sql.SQL(
+        "INSERT INTO recipes.change_log (table_name, row_id, op) "
+        "SELECT table_name, row_id, {op} FROM ({rows}) AS changed ORDER BY ord, row_id"
+    ).format(op=sql.Literal(op), rows=rows))
+
+
+def _prepare_import(connection, tables: list[SnapshotTable], truncate: bool) -> None:
+    from psycopg import sql
+
+    if truncate:
+        names = sql.SQL(", ").join(sql.Identifier(t.schema, t.table) for t in tables)
+        _log_changes(connection, [t for t in tables if t.synced], "D")
+        connection.execute(sql.SQL("TRUNCATE {} CASCADE").format(names))
+        return
+    for table in tables:
+        if connection.execute(sql.SQL("SELECT EXISTS (SELECT FROM {})").format(
+                sql.Identifier(table.schema, table.table))).fetchone()[0]:
+            raise SnapshotError(
+                f"{table.name} is not empty, pass --truncate to replace it"
+            )
+
+
+def _load_table(connection, directory: Path, compression: str, entry: dict) -> None:
+    from psycopg import sql
+
+    table = TABLES_BY_NAME[entry["name"]]
+    identifier = sql.Identifier(table.schema, table.table)
+    copy_sql = sql.SQL("COPY {table} ({columns}) FROM STDIN (FORMAT BINARY)").format(
+        table=identifier,
+        columns=sql.SQL(", ").join(map(sql.Identifier, entry["columns"])),
+    )
+    digest = hashlib.sha256()
+    # Skip per-row change logging; _log_changes writes it in one statement.
+    # Foreign key checks are system triggers and stay enabled.
+    connection.execute(
+        sql.SQL("ALTER TABLE {} DISABLE TRIGGER USER").format(identifier)
+    )
+    with connection.cursor() as cursor:
+        with cursor.copy(copy_sql) as copy:
+            for data in _read_chunks(directory / entry["file"], compression):
+                digest.update(data)
+                copy.write(data)
+    if digest.hexdigest() != entry["sha256"]:
+        raise SnapshotError(f"{entry['file']} changed while it was imported")
+    # Deferred foreign keys (a child category may precede its parent) are
+    # checked now: ALTER TABLE refuses a table with pending trigger events.
+    connection.execute("SET CONSTRAINTS ALL IMMEDIATE")
+    connection.execute(
+        sql.SQL("ALTER TABLE {} ENABLE TRIGGER USER").format(identifier)
+    )
+
+
+def _finish_import(connection, tables: list[SnapshotTable]) -> None:
+    from psycopg import sql
+
+    for table in tables:
+        if table.key == ("id",):
+            connection.execute(sql.SQL(
+                "SELECT setval(pg_get_serial_sequence({name}, 'id'), "
+                "(SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"
+            ).format(name=sql.Literal(table.name),
+                     table=sql.Identifier(table.schema, table.table)))
+    _log_changes(connection, [t for t in tables if t.synced], "I")
+
+
+def import_snapshot(dsn: str, directory: Path, workers: int = 4,
+                    truncate: bool = False) -> dict:
+    """Load a snapshot; the database is left untouched if anything fails.
+
+    The truncate, the loads and the change_log rows share one transaction,
+    so tables are loaded one after another in foreign key order; ``workers``
+    only parallelizes the checksum pass before it and the verify after it.
+    """
+    manifest = read_manifest(directory)
+    compression = manifest["compression"]
+    entries = manifest["tables"]
+    tables = [TABLES_BY_NAME[entry["name"]] for entry in entries]
+
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(
+            lambda entry: _check_file(directory, compression, entry), entries
+        ))
+
+    with _connect(dsn) as connection:
+        # Leaving the block on an error rolls back the truncate as well
+        _prepare_import(connection, tables, truncate)
+        for entry in sorted(entries, key=lambda e: TABLES_BY_NAME[e["name"]].phase):
+            _load_table(connection, directory, compression, entry)
+        _finish_import(connection, tables)
+    with _connect(dsn, autocommit=True) as connection:
+        connection.execute(f"ANALYZE {', '.join(table.name for table in tables)}")
+    verify_snapshot(dsn, directory, workers)
+    return manifest
+
+
+# ----------------------------------------------------------
+# Verify
+# ----------------------------------------------------------
+def _verify_table(dsn: str, snapshot_id: str, entry: dict) -> str | None:
+    with _connect(dsn) as connection:
+        _begin_snapshot(connection, snapshot_id)
+        table = TABLES_BY_NAME[entry["name"]]
+        result = _dump_table(connection, table, entry["columns"])
+    if result["rows"] != entry["rows"]:
+        return f"{entry['name']}: {result['rows']} rows, expected {entry['rows']}"
+    if result["sha256"] != entry["sha256"]:
+        return f"{entry['name']}: checksum differs"
+    return None
+
+
+def verify_snapshot(dsn: str, directory: Path, workers: int = 4) -> None:
+    """Raise SnapshotError unless the database holds exactly the snapshot's rows."""
+    from psycopg import IsolationLevel
+
+    manifest = read_manifest(directory)
+    with _connect(dsn) as coordinator:
+        coordinator.isolation_level = IsolationLevel.REPEATABLE_READ
+        coordinator.read_only = True
+        snapshot_id = coordinator.execute("SELECT pg_export_snapshot()").fetchone()[0]
+        with ThreadPoolExecutor(workers) as pool:
+            errors = [error for error in pool.map(
+                lambda entry: _verify_table(dsn, snapshot_id, entry), manifest["tables"]
+            ) if error]
+    if errors:
+        raise SnapshotError(
+            "Database does not match the snapshot: " + "; ".join(errors)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("export", "import", "verify"))
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--workers", type=int,
+                        default=min(len(TABLES), os.cpu_count() or 1))
+    parser.add_argument("--compression", choices=("zstd", "gzip"),
+                        help=f"export only, default {default_compression()}")
+    parser.add_argument("--level", type=int, default=3, help="export compression level")
+    parser.add_argument("--truncate", action="store_true",
+                        help="import only: empty the catalogue tables first, "
+                             "together with the tables that reference them "
+                             "(user recipe variants); rolled back if the "
+                             "import fails")
+    parser.add_argument("--dsn", default=settings.database_dsn)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        if args.command == "export":
+            manifest = export_snapshot(args.dsn, args.directory, args.workers,
+                                       args.compression, args.level)
+        elif args.command == "import":
+            manifest = import_snapshot(args.dsn, args.directory, args.workers,
+                                       args.truncate)
+        else:
+            verify_snapshot(args.dsn, args.directory, args.workers)
+            manifest = read_manifest(args.directory)
+    except SnapshotError as error:
+        raise SystemExit(str(error)) from error
+
+    for entry in manifest["tables"]:
+        print(f"{entry['name']:<40} {entry['rows']:>12,} rows  {entry['sha256'][:12]}")
+    elapsed = time.perf_counter() - started
+    print(f"{args.command} of {args.directory} ok in {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
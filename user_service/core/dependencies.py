@@ -0,0 +1,68 @@
+# 1. Standard library imports
+from typing import Annotated, Any, AsyncGenerator
+
+# 2. Third-party imports
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# 3. Local application imports
+from common.tokens import InvalidToken
+from database import async_session
+from user_service.core.security import Principal
+from user_service.services.auth_service import AuthService
+
+
+# ----------------------------------------------------------
+# Session Dependency
+# ----------------------------------------------------------
+async def get_session() -> AsyncGenerator[Any, Any]:
+    async with async_session() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
+
+
+# ----------------------------------------------------------
+# Service Dependencies
+# ----------------------------------------------------------
+def get_auth_service(session: SessionDep) -> AuthService:
+    """A dependency that provides an instance of AuthService."""
+    return AuthService(session)
+
+
+AuthServiceDep = Annotated[AuthService, Depends(get_auth_service)]
+
+
+# ----------------------------------------------------------
+# Current user from the bearer token
+# ----------------------------------------------------------
+bearer = HTTPBearer(auto_error=False)
+
+
+async def get_current_user(
+        service: AuthServiceDep,
+        credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer)]
+) -> Principal:
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    try:
+        return await service.authenticate(credentials.credentials)
+    except InvalidToken as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"}
+        ) from e
+
+
+CurrentUserDep = Annotated[Principal, Depends(get_current_user)]
@@ -0,0 +1,153 @@
+# 1. Standard library imports
+import asyncio
+import hashlib
+import hmac
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cache
+
+# 3. Local application imports
+from common.tokens import b64url_decode, b64url_encode
+from config import settings
+
+
+# ----------------------------------------------------------
+# Password hashing
+# ----------------------------------------------------------
+class PasswordHasher:
+    """scrypt password hashes computed on a bounded thread pool.
+
+    A hash takes tens of milliseconds of CPU by design; on the event loop
+    it would stall every other request of the worker. ``hashlib.scrypt``
+    releases the GIL, so ``workers`` threads hash in parallel while the
+    loop keeps serving, and the semaphore keeps extra logins waiting on
+    the loop rather than piling up in the executor queue.
+
+    Hashes are stored as ``scrypt$n$r$p$salt$hash`` so the cost can be
+    raised later without breaking existing passwords.
+    """
+
+    def __init__(self, workers: int = 2, n: int = 2 ** 14, r: int = 8, p: int = 1):
+        self.n, self.r, self.p = n, r, p
+        self.workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    async def hash(self, password: str) -> str:
+        return await self._off_loop(self.hash_sync, password)
+
+    async def verify(self, password: str, encoded: str) -> bool:
+        return await self._off_loop(self.verify_sync, password, encoded)
+
+    def hash_sync(self, password: str, salt: bytes | None = None) -> str:
+        salt = salt or os.urandom(16)
+        digest = self._scrypt(password, salt, self.n, self.r, self.p)
+        return "$".join((
+            "scrypt", str(self.n), str(self.r), str(self.p),
+            b64url_encode(salt), b64url_encode(digest)
+        ))
+
+    def verify_sync(self, password: str, encoded: str) -> bool:
+        try:
+            scheme, n, r, p, salt, digest = encoded.split("$")
+            if scheme != "scrypt":
+                return False
+            expected = b64url_decode(digest)
+            actual = self._scrypt(password, b64url_decode(salt), int(n), int(r), int(p))
+        except ValueError:
+            return False
+        return hmac.compare_digest(actual, expected)
+
+    @property
+    def unmatchable_hash(self) -> str:
+        """A hash with the current cost that no password matches."""
+        return "$".join((
+            "scrypt", str(self.n), str(self.r), str(self.p),
+            b64url_encode(bytes(16)), b64url_encode(bytes(64))
+        ))
+
+    @staticmethod
+    def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 2 ** 20
+        )
+
+    async def _off_loop(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="hash")
+            self._slots = asyncio.Semaphore(self.workers)
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args
+            )
+
+
+# ----------------------------------------------------------
+# Token -> user cache
+# ----------------------------------------------------------
+@dataclass(frozen=True)
+class Principal:
+    """The user a token was issued to, with the groups it belongs to."""
+    user_id: int
+    username: str
+    group_ids: frozenset[int]
+    expires_at: int
+
+
+class TokenCache:
+    """LRU of verified tokens -> ``Principal``, per worker.
+
+    An entry lives until its token expires but at most ``ttl`` seconds, so
+    group changes reach cached tokens within ``ttl`` even on workers that
+    did not make them; ``invalidate_user`` drops them at once locally.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[Principal, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Principal | None:
+        entry = self._entries.get(token)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, token: str, principal: Principal) -> None:
+        expires_at = min(principal.expires_at, time.time() + self.ttl)
+        self._entries[token] = (principal, expires_at)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        stale = [token for token, (principal, _) in self._entries.items()
+                 if principal.user_id == user_id]
+        for token in stale:
+            del self._entries[token]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# ----------------------------------------------------------
+# Per-worker instances
+# ----------------------------------------------------------
+@cache
+def password_hasher() -> PasswordHasher:
+    return PasswordHasher(settings.AUTH_HASH_WORKERS, settings.AUTH_SCRYPT_N)
+
+
+@cache
+def token_cache() -> TokenCache:
+    return TokenCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_SECONDS)
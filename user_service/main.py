@@ -0,0 +1,46 @@
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from sqlalchemy.exc import SQLAlchemyError
+
+from common.tokens import token_signer
+from recipe_service.core.middleware import (
+    ErrorTimingMiddleware,
+    sqlalchemy_error_handler
+)
+from user_service.routes import auth, users
+
+
+# ----------------------------------------------------------
+# Lifespan: the token signer, so missing keys fail at startup
+# ----------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    token_signer()
+    yield
+
+
+# ----------------------------------------------------------
+# Initializing the Application
+# ----------------------------------------------------------
+app = FastAPI(
+    title="User Service API",
+    description="API for user accounts and authentication",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+app.add_exception_handler(SQLAlchemyError, sqlalchemy_error_handler)
+app.add_middleware(ErrorTimingMiddleware)
+
+app.include_router(auth.router, tags=["Auth"])
+app.include_router(users.router, tags=["Users"])
+
+
+# ----------------------------------------------------------
+# Entrypoint (dev only)
+# ----------------------------------------------------------
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("user_service.main:app", reload=True)
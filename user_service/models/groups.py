@@ -1,5 +1,5 @@
 from db_base import Base
-from sqlalchemy import Column, BigInteger, ForeignKey, String
+from sqlalchemy import Column, BigInteger, ForeignKey, String, text
 from sqlalchemy.orm import relationship
 
 
@@ -26,6 +26,8 @@ class Group(Base):
     id = Column(BigInteger, primary_key=True)
     group_name = Column(String(100), nullable=False, unique=True)
     description = Column(String(255))
+    # Bitmask of common.permissions.Permission
+    permissions = Column(BigInteger, nullable=False, server_default=text("0"))
 
     users = relationship("User", secondary=UserGroup.__table__, back_populates="groups")
 
@@ -29,10 +29,6 @@ class User(Base):
     is_verified = Column(Boolean, server_default=text("false"))
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
-    # Relationships to Recipe Service
-    recipes = relationship("Recipe", back_populates="author")
-    user_recipes = relationship("UserRecipe", back_populates="user")
-
     # Relationships for UserGroups
     groups = relationship("Group",
                           secondary=UserGroup.__table__,
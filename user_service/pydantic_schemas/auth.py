@@ -0,0 +1,27 @@
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class BaseSchema(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+
+class LoginSchema(BaseSchema):
+    username: str = Field(max_length=100, examples=["alina"])
+    password: str = Field(max_length=128)
+
+
+class TokenSchema(BaseSchema):
+    access_token: str
+    token_type: str = "bearer"
+    expires_at: int = Field(description="Expiry as a unix timestamp")
+
+
+class PrincipalSchema(BaseSchema):
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: int
+    username: str
+    group_ids: List[int]
+    expires_at: int
@@ -14,3 +14,19 @@ class UserSchema(BaseSchema):
     provider_name: str | None = Field(max_length=100)
     is_verified: bool = Field(default=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)  # TODO
+
+
+class UserCreateSchema(BaseSchema):
+    username: str = Field(min_length=3, max_length=100, examples=["alina"])
+    email: EmailStr = Field(examples=["alina@example.com"])
+    password: str = Field(min_length=8, max_length=128)
+
+
+class UserReadSchema(BaseSchema):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    username: str
+    email: EmailStr
+    is_verified: bool
+    created_at: datetime
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, status
+
+from user_service.core.dependencies import AuthServiceDep, CurrentUserDep
+from user_service.pydantic_schemas.auth import LoginSchema, PrincipalSchema, TokenSchema
+from user_service.pydantic_schemas.users import UserCreateSchema, UserReadSchema
+from user_service.services.auth_service import InvalidCredentials, UserAlreadyExists
+
+router = APIRouter(prefix="/auth")
+
+
+@router.post(
+    "/register",
+    response_model=UserReadSchema,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a user with a password"
+)
+async def register(user: UserCreateSchema, service: AuthServiceDep):
+    try:
+        return await service.register(user.username, user.email, user.password)
+    except UserAlreadyExists as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+
+@router.post(
+    "/login",
+    response_model=TokenSchema,
+    summary="Exchange username and password for a bearer token"
+)
+async def login(credentials: LoginSchema, service: AuthServiceDep):
+    try:
+        token, expires_at = await service.login(
+            credentials.username, credentials.password
+        )
+    except InvalidCredentials as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid username or password"
+        ) from e
+    return TokenSchema(access_token=token, expires_at=expires_at)
+
+
+@router.get(
+    "/me",
+    response_model=PrincipalSchema,
+    summary="The user and groups behind the bearer token"
+)
+async def me(user: CurrentUserDep):
+    return PrincipalSchema.model_validate(user)
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+
+from user_service.core.dependencies import AuthServiceDep, CurrentUserDep
+from user_service.pydantic_schemas.users import UserReadSchema
+from user_service.services.auth_service import UserNotFound
+
+router = APIRouter(prefix="/users")
+
+
+@router.get(
+    "/{user_id}",
+    response_model=UserReadSchema,
+    summary="Get a user (authenticated)"
+)
+async def get_user(user_id: int, service: AuthServiceDep, _: CurrentUserDep):
+    try:
+        return await service.get_user(user_id)
+    except UserNotFound as e:
+        raise HTTPException(status_code=404, detail="User not found") from e
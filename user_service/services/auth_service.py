@@ -0,0 +1,100 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.tokens import InvalidToken, token_signer
+from user_service.core.security import Principal, password_hasher, token_cache
+from user_service.models.groups import UserGroup
+from user_service.models.users import User
+
+
+# ----------------------------------------------------------
+# Custom exceptions
+# ----------------------------------------------------------
+class UserAlreadyExists(Exception):
+    """Exception thrown when the username or email is already taken."""
+    def __init__(self, username: str):
+        super().__init__(f"User {username!r} or its email already exists.")
+
+
+class UserNotFound(Exception):
+    """Exception thrown when a user by ID is not found."""
+
+
+class InvalidCredentials(Exception):
+    """Exception thrown when the username or password is wrong."""
+
+
+# ----------------------------------------------------------
+# Auth service
+# ----------------------------------------------------------
+class AuthService:
+    """Service class for registration, login and token authentication.
+
+    Password hashes are computed off the event loop (see
+    ``PasswordHasher``). Tokens are stateless and signed, so checking one
+    needs no database; the user and groups behind it are read once and
+    kept in the per-worker ``TokenCache``.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def register(self, username: str, email: str, password: str) -> User:
+        password_hash = await password_hasher().hash(password)
+        user_id = await self.session.scalar(
+            insert(User)
+            .values(username=username, email=email, password_hash=password_hash)
+            .on_conflict_do_nothing()
+            .returning(User.id)
+        )
+        if user_id is None:
+            raise UserAlreadyExists(username)
+        await self.session.commit()
+        return await self.session.get(User, user_id)
+
+    async def login(self, username: str, password: str) -> tuple[str, int]:
+        """A signed token and its expiry for valid credentials."""
+        row = (await self.session.execute(
+            select(User.id, User.password_hash).where(User.username == username)
+        )).first()
+        hasher = password_hasher()
+        # Unknown users cost a hash too, so timing does not reveal them
+        encoded = row.password_hash if row is not None else hasher.unmatchable_hash
+        if not await hasher.verify(password, encoded) or row is None:
+            raise InvalidCredentials
+        return token_signer().sign(row.id)
+
+    async def authenticate(self, token: str) -> Principal:
+        """The user behind a token; ``InvalidToken`` if it is not valid."""
+        cache = token_cache()
+        principal = cache.get(token)
+        if principal is not None:
+            return principal
+
+        user_id, expires_at = token_signer().verify(token)
+        row = (await self.session.execute(
+            select(
+                User.username,
+                array_agg(aggregate_order_by(UserGroup.group_id, UserGroup.group_id))
+            )
+            .outerjoin(UserGroup, UserGroup.user_id == User.id)
+            .where(User.id == user_id)
+            .group_by(User.id)
+        )).first()
+        if row is None:
+            raise InvalidToken("User no longer exists")
+        username, group_ids = row
+        principal = Principal(
+            user_id, username,
+            frozenset(group_id for group_id in group_ids if group_id is not None),
+            expires_at
+        )
+        cache.set(token, principal)
+        return principal
+
+    async def get_user(self, user_id: int) -> User:
+        user = await self.session.get(User, user_id)
+        if user is None:
+            raise UserNotFound
+        return user